@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Prueba de carga de core/llm_inference.py.
+
+Lanza N peticiones concurrentes y compara el tiempo total con la latencia
+de una sola petición. Con el cliente asíncrono, N peticiones (N <= LLM_MAX_CONCURRENCY)
+deben terminar en ~1x la latencia del LLM, no en Nx.
+
+Uso:
+    # En proceso, con un LLM simulado (sin API key ni red)
+    python scripts/ai-module/load_test_llm_inference.py --mock-latency 1.0 -n 20
+
+    # Contra un servidor en marcha (python src/ai-module/core/llm_inference.py)
+    python scripts/ai-module/load_test_llm_inference.py --url http://localhost:9004 -n 20
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+from types import SimpleNamespace
+
+import httpx
+
+AI_MODULE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "ai-module")
+
+
+class _MockCompletions:
+    """Sustituye a `chat.completions` de AsyncOpenAI con una latencia fija."""
+
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def create(self, **kwargs):
+        await asyncio.sleep(self.latency)
+        message = SimpleNamespace(content="respuesta simulada")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)])
+
+
+def _build_mock_transport(latency: float) -> httpx.ASGITransport:
+    sys.path.insert(0, os.path.abspath(AI_MODULE_DIR))
+    from core import llm_inference
+
+    llm_inference.client = SimpleNamespace(chat=SimpleNamespace(completions=_MockCompletions(latency)))
+    return httpx.ASGITransport(app=llm_inference.app)
+
+
+async def _request(client: httpx.AsyncClient, i: int) -> float:
+    started = time.perf_counter()
+    response = await client.post("/analyze_prompt", json={"prompt": f"Análisis de BTC #{i}"})
+    response.raise_for_status()
+    return time.perf_counter() - started
+
+
+async def run(url: str, requests: int, mock_latency: float) -> bool:
+    if mock_latency:
+        client = httpx.AsyncClient(transport=_build_mock_transport(mock_latency), base_url="http://test", timeout=120)
+    else:
+        client = httpx.AsyncClient(base_url=url, timeout=120)
+
+    async with client:
+        print("📡 Petición individual de referencia...")
+        single = await _request(client, 0)
+        print(f"   Latencia: {single:.2f}s")
+
+        print(f"🚀 {requests} peticiones concurrentes...")
+        started = time.perf_counter()
+        latencies = await asyncio.gather(*[_request(client, i) for i in range(1, requests + 1)])
+        total = time.perf_counter() - started
+
+    ratio = total / single if single else 0.0
+    latencies.sort()
+    print(f"   Tiempo total: {total:.2f}s ({ratio:.1f}x la latencia individual)")
+    print(f"   p50: {latencies[len(latencies) // 2]:.2f}s  p95: {latencies[int(len(latencies) * 0.95) - 1]:.2f}s")
+
+    limit = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+    expected = -(-requests // limit)  # tandas necesarias con el limitador
+    ok = ratio <= expected + 0.5
+    print(("✅" if ok else "❌") + f" Esperado ~{expected}x con LLM_MAX_CONCURRENCY={limit}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga de llm_inference")
+    parser.add_argument("--url", default="http://localhost:9004", help="URL del servidor llm_inference")
+    parser.add_argument("-n", "--requests", type=int, default=10, help="Peticiones concurrentes")
+    parser.add_argument("--mock-latency", type=float, default=0.0,
+                        help="Ejecutar en proceso con un LLM simulado de esta latencia (segundos)")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args.url, args.requests, args.mock_latency))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
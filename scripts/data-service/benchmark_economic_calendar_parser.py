@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark del parser del calendario económico (data-service).
+
+Compara, sobre páginas HTML guardadas, el parseo anterior (árbol completo de
+BeautifulSoup + varios strptime por fila) con el parser incremental de
+services/economic_calendar_parser.py, en tiempo de CPU y pico de memoria.
+También mide un segundo scrape con la instantánea ya cargada (solo se
+reconstruyen las filas que cambian).
+
+Uso:
+    python scripts/data-service/benchmark_economic_calendar_parser.py
+    python scripts/data-service/benchmark_economic_calendar_parser.py pagina.html -n 50
+"""
+
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List, Tuple
+
+from bs4 import BeautifulSoup
+
+DATA_SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "data-service")
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+CHUNK_SIZE = 16384
+
+sys.path.insert(0, os.path.abspath(DATA_SERVICE_DIR))
+from services.economic_calendar_parser import CalendarSnapshot, parse_calendar_html  # noqa: E402
+
+
+def legacy_parse(html: bytes) -> List[dict]:
+    """Parseo anterior de fetch_economic_events (sin la descarga)."""
+    soup = BeautifulSoup(html, "lxml")
+    events_table = soup.find("table", {"id": "economicCalendarData"})
+    events = []
+    now = datetime.now()
+    for row in events_table.find_all("tr", {"class": "js-event-item"}):
+        cells = row.find_all("td")
+        if len(cells) < 5:
+            continue
+        event_time = cells[0].text.strip()
+        date_str = row.get("data-event-datetime", "")
+        try:
+            if "T" in date_str:
+                event_date = datetime.strptime(date_str.split("T")[0], "%Y-%m-%d")
+            elif "/" in date_str:
+                event_date = datetime.strptime(date_str.split(" ")[0], "%Y/%m/%d")
+            else:
+                event_date = now
+            date_str = event_date.strftime("%Y-%m-%d")
+        except ValueError:
+            date_str = now.strftime("%Y-%m-%d")
+        country_span = cells[1].find("span", {"class": "flagCur"})
+        country = country_span.get("title", "Global") if country_span else "Global"
+        impact_icons = cells[2].find_all("i", {"class": re.compile("grayFullBullishIcon")})
+        impact = {3: "high", 2: "medium"}.get(len(impact_icons), "low")
+        title = cells[3].text.strip()
+        events.append({
+            "title": title, "date": date_str, "time": event_time, "impact": impact,
+            "country": country, "description": cells[3].get("title", f"Economic event: {title}")
+        })
+    return events
+
+
+def streaming_parse(html: bytes, snapshot: CalendarSnapshot) -> List[dict]:
+    """Parser incremental, alimentado por trozos como en la descarga real."""
+    chunks = (html[i:i + CHUNK_SIZE] for i in range(0, len(html), CHUNK_SIZE))
+    return snapshot.apply(parse_calendar_html(chunks), datetime.now().strftime("%Y-%m-%d"))
+
+
+def measure(func: Callable[[], List[dict]], iterations: int) -> Tuple[float, float, int]:
+    """Tiempo de CPU medio (ms), pico de memoria (KiB) y número de eventos."""
+    tracemalloc.start()
+    events = func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    started = time.process_time()
+    for _ in range(iterations):
+        func()
+    cpu_ms = (time.process_time() - started) / iterations * 1000
+    return cpu_ms, peak / 1024, len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del parser del calendario económico")
+    parser.add_argument("files", nargs="*", help="Páginas HTML guardadas (por defecto fixtures/*.html)")
+    parser.add_argument("-n", "--iterations", type=int, default=20, help="Repeticiones por medida")
+    args = parser.parse_args()
+
+    files = args.files or sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+    if not files:
+        print("No hay páginas HTML que medir")
+        return 1
+
+    for path in files:
+        with open(path, "rb") as f:
+            html = f.read()
+        print(f"\n{os.path.basename(path)} ({len(html) / 1024:.0f} KiB)")
+
+        warm = CalendarSnapshot()
+        streaming_parse(html, warm)
+        results = [
+            ("BeautifulSoup (anterior)", lambda: legacy_parse(html)),
+            ("Incremental, sin instantánea", lambda: streaming_parse(html, CalendarSnapshot())),
+            ("Incremental, instantánea previa", lambda: streaming_parse(html, warm)),
+        ]
+        print(f"  {'parser':<34}{'CPU ms':>10}{'pico KiB':>12}{'eventos':>10}")
+        for name, func in results:
+            cpu_ms, peak_kib, count = measure(func, args.iterations)
+            print(f"  {name:<34}{cpu_ms:>10.2f}{peak_kib:>12.0f}{count:>10}")
+        print(f"  Diferencia con la instantánea previa: {warm.last_diff}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
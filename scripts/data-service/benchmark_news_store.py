@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark del índice local de noticias (data-service).
+
+Genera un año de titulares sintéticos, los ingiere por lotes en
+services/news_store.py (con duplicados, como ocurre al repetir consultas a la
+API) y mide búsquedas por palabras clave, símbolo y rango de fechas. Como
+referencia mide también el filtrado anterior: cargar la lista JSON completa y
+recorrerla con una comprensión de listas.
+
+Uso:
+    python scripts/data-service/benchmark_news_store.py
+    python scripts/data-service/benchmark_news_store.py --per-day 500 -n 200
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List
+
+DATA_SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "data-service")
+sys.path.insert(0, os.path.abspath(DATA_SERVICE_DIR))
+from services.news_store import NewsStore  # noqa: E402
+
+SYMBOLS = ["BTC", "ETH", "SOL", "ADA", "XRP", "DOT", "AVAX", "LINK", "MATIC", "LTC"]
+SUBJECTS = ["ETF", "halving", "exchange", "regulator", "whales", "miners", "stablecoin", "DeFi protocol", "hackers", "SEC"]
+VERBS = ["approves", "rejects", "drives", "drains", "boosts", "delays", "investigates", "targets", "fuels", "sinks"]
+OBJECTS = ["record inflows", "a sharp selloff", "new highs", "liquidations", "the rally", "network upgrade",
+           "institutional demand", "market volatility", "staking rewards", "futures volume"]
+SOURCES = ["CoinDesk", "Cointelegraph", "The Block", "Decrypt", "Bloomberg"]
+
+
+def generate_news(per_day: int, days: int = 365) -> List[dict]:
+    """Titulares sintéticos repartidos a lo largo de `days` días."""
+    rng = random.Random(42)
+    start = datetime.now(timezone.utc) - timedelta(days=days)
+    items = []
+    for i in range(per_day * days):
+        symbols = rng.sample(SYMBOLS, rng.choice([1, 1, 2]))
+        title = f"{symbols[0]}: {rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}"
+        items.append({
+            "title": title,
+            "description": f"{title}. Analysts expect {rng.choice(OBJECTS)} for {' and '.join(symbols)}.",
+            "url": f"https://news.example.com/{i}",
+            "source": rng.choice(SOURCES),
+            "symbols": symbols,
+            "published_at": (start + timedelta(seconds=i * 86400 / per_day)).isoformat(),
+            "sentiment": rng.choice(["positive", "negative", "neutral"])
+        })
+    return items
+
+
+def timed(func: Callable[[], object], iterations: int) -> float:
+    """Tiempo medio en ms."""
+    started = time.perf_counter()
+    for _ in range(iterations):
+        func()
+    return (time.perf_counter() - started) / iterations * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del índice local de noticias")
+    parser.add_argument("--per-day", type=int, default=300, help="Noticias por día")
+    parser.add_argument("-n", "--iterations", type=int, default=100, help="Repeticiones por consulta")
+    args = parser.parse_args()
+
+    items = generate_news(args.per_day)
+    workdir = tempfile.mkdtemp(prefix="news_store_")
+    store = NewsStore(path=os.path.join(workdir, "news.db"), retention_days=0)
+
+    # Ingesta por lotes de 100, con un 20 % de repetidos del lote anterior
+    started = time.perf_counter()
+    batch = 100
+    for offset in range(0, len(items), batch):
+        store.ingest_sync(items[max(0, offset - batch // 5):offset + batch])
+    ingest_s = time.perf_counter() - started
+    stats = store.get_stats()
+    print(f"{stats['documents']} noticias ({stats['duplicates']} duplicados descartados) "
+          f"ingeridas en {ingest_s:.1f} s")
+
+    month_ago = datetime.now(timezone.utc) - timedelta(days=30)
+    queries = [
+        ("palabras clave", dict(query="etf inflows")),
+        ("prefijo", dict(query="liquid")),
+        ("palabras clave + símbolo", dict(query="whales selloff", symbol="ETH")),
+        ("palabras clave + símbolo + 30 días", dict(query="regulator", symbol="SOL", since=month_ago)),
+        ("símbolo + 30 días", dict(symbol="BTC", since=month_ago)),
+    ]
+    print(f"\n  {'consulta':<38}{'ms':>8}{'total':>10}")
+    for name, kwargs in queries:
+        result = store.search_sync(limit=10, **kwargs)
+        ms = timed(lambda: store.search_sync(limit=10, **kwargs), args.iterations)
+        print(f"  {name:<38}{ms:>8.2f}{result['total_results']:>10}")
+
+    # Referencia: lista JSON cargada y filtrada en cada petición
+    cache_file = os.path.join(workdir, "news_cache.json")
+    with open(cache_file, "w") as f:
+        json.dump(items, f)
+
+    def legacy_filter():
+        with open(cache_file) as f:
+            cache = json.load(f)
+        return [item for item in cache if "BTC" in item.get("symbols", [])]
+
+    print(f"  {'JSON completo + filtro (anterior)':<38}{timed(legacy_filter, max(1, args.iterations // 20)):>8.2f}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark del pipeline local de sentimiento (data-service).
+
+Genera titulares y publicaciones sintéticos y mide la puntuación por lotes de
+services/sentiment_service.py (tokenización en una pasada + numpy) frente a la
+puntuación elemento a elemento, y la ingesta completa en los índices por
+símbolo con decaimiento temporal.
+
+Uso:
+    python scripts/data-service/benchmark_sentiment.py
+    python scripts/data-service/benchmark_sentiment.py -n 20000
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+DATA_SERVICE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "data-service")
+sys.path.insert(0, os.path.abspath(DATA_SERVICE_DIR))
+from services.sentiment_service import LexiconScorer, SentimentPipeline  # noqa: E402
+
+SYMBOLS = ["BTC", "ETH", "SOL", "ADA", "XRP", "DOT", "AVAX", "LINK"]
+SUBJECTS = ["ETF", "exchange", "regulator", "whales", "miners", "stablecoin", "DeFi protocol", "hackers"]
+VERBS = ["approves", "rejects", "drives", "drains", "boosts", "delays", "does not crash", "targets", "fuels"]
+OBJECTS = ["record inflows", "a sharp selloff", "new highs", "liquidations", "the rally", "network upgrade",
+           "institutional demand", "market volatility", "massive outflows", "futures volume"]
+TAILS = ["", " 🚀", " 📉", " amid fear of a crackdown", " as optimism returns", " says analyst"]
+
+
+def generate_items(count: int):
+    """Noticias y publicaciones sintéticas de la última semana."""
+    rng = random.Random(7)
+    now = time.time()
+    return [
+        {
+            "id": str(i),
+            "title": f"{symbol}: {rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(OBJECTS)}{rng.choice(TAILS)}",
+            "symbols": [symbol],
+            "published_at": now - rng.uniform(0, 7 * 86400),
+            "engagement": rng.randint(0, 5000)
+        }
+        for i, symbol in ((i, rng.choice(SYMBOLS)) for i in range(count))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark del pipeline local de sentimiento")
+    parser.add_argument("-n", "--items", type=int, default=5000, help="Elementos por lote")
+    args = parser.parse_args()
+
+    items = generate_items(args.items)
+    texts = [item["title"] for item in items]
+    scorer = LexiconScorer()
+
+    started = time.perf_counter()
+    scores = scorer.score_batch(texts)
+    batch_ms = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    for text in texts:
+        scorer.score(text)
+    single_ms = (time.perf_counter() - started) * 1000
+
+    pipeline = SentimentPipeline()
+    started = time.perf_counter()
+    pipeline.ingest(items)
+    ingest_ms = (time.perf_counter() - started) * 1000
+
+    print(f"{len(texts)} textos")
+    print(f"  puntuación por lotes          {batch_ms:>9.1f} ms")
+    print(f"  puntuación uno a uno          {single_ms:>9.1f} ms")
+    print(f"  ingesta en índices            {ingest_ms:>9.1f} ms")
+    print(f"  media {scores.mean():+.3f}, positivos {(scores > 0.05).mean():.0%}, negativos {(scores < -0.05).mean():.0%}")
+    print("\n  índice   score  confianza  elementos")
+    for symbol in SYMBOLS:
+        index = pipeline.get_index(symbol)
+        print(f"  {symbol:<6}{index['score']:>+8.3f}{index['confidence']:>11.2f}{index['items']:>11}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
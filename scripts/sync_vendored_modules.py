@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Sincroniza los módulos compartidos entre servicios.
+
+Cada servicio se despliega con una imagen que solo copia su propio directorio
+de src/, así que el código común no puede importarse entre servicios: vive en
+un único original y los demás servicios llevan una copia generada, con una
+cabecera que indica de dónde sale. Los originales no importan nada propio de
+su servicio (la configuración les llega como argumentos).
+
+Uso:
+    python scripts/sync_vendored_modules.py          # regenera las copias
+    python scripts/sync_vendored_modules.py --check  # falla si alguna está desfasada
+"""
+
+import os
+import sys
+import argparse
+from typing import Dict, List
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+# Original -> copias (rutas relativas a la raíz del repositorio)
+VENDORED_MODULES: Dict[str, List[str]] = {
+    "src/data-service/core/cache_backends.py": [
+        "src/ai-module/core/services/cache_backends.py",
+    ],
+    "src/data-service/core/circuit_breaker.py": [
+        "src/ai-module/core/services/circuit_breaker.py",
+        "src/backend/core/circuit_breaker.py",
+    ],
+}
+
+HEADER = (
+    "# Copia generada de {source}: no editar aquí.\n"
+    "# Edita el original y ejecuta python scripts/sync_vendored_modules.py\n"
+)
+
+
+def expected_copy(source: str) -> str:
+    """Contenido que debe tener cada copia de `source`."""
+    with open(os.path.join(REPO_ROOT, source), encoding="utf-8") as f:
+        return HEADER.format(source=source) + f.read()
+
+
+def stale_copies() -> List[str]:
+    """Copias que no coinciden con su original (o que no existen)."""
+    stale = []
+    for source, copies in VENDORED_MODULES.items():
+        content = expected_copy(source)
+        for copy in copies:
+            path = os.path.join(REPO_ROOT, copy)
+            if not os.path.exists(path):
+                stale.append(copy)
+                continue
+            with open(path, encoding="utf-8") as f:
+                if f.read() != content:
+                    stale.append(copy)
+    return stale
+
+
+def sync() -> List[str]:
+    """Regenera las copias desfasadas y devuelve las que se escribieron."""
+    written = stale_copies()
+    for source, copies in VENDORED_MODULES.items():
+        content = expected_copy(source)
+        for copy in copies:
+            if copy in written:
+                with open(os.path.join(REPO_ROOT, copy), "w", encoding="utf-8") as f:
+                    f.write(content)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sincroniza los módulos compartidos entre servicios")
+    parser.add_argument("--check", action="store_true", help="Solo comprobar; código 1 si hay copias desfasadas")
+    args = parser.parse_args()
+
+    if args.check:
+        stale = stale_copies()
+        for copy in stale:
+            print(f"❌ {copy} no coincide con su original")
+        if stale:
+            print("Ejecuta: python scripts/sync_vendored_modules.py")
+            return 1
+        print("✅ Copias sincronizadas")
+        return 0
+
+    for copy in sync():
+        print(f"✏️  {copy} actualizado")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
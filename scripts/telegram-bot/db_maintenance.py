@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""
+Mantenimiento de la base de datos SQLite del bot de Telegram.
+
+Tareas que no deben ejecutarse al arrancar el bot porque bloquean la base de
+datos durante mucho tiempo:
+
+- --enable-incremental-vacuum: conversión única a auto_vacuum incremental
+  (VACUUM completo). Sin ella, el job de retención elimina filas pero el
+  fichero no encoge. Si el modo ya es incremental no hace nada.
+- --run-retention: un ciclo de retención completo (purga por lotes, archivo
+  y incremental_vacuum) con el informe en JSON.
+
+Conviene ejecutarlo con el bot parado o en una ventana de poco tráfico.
+
+Uso:
+    python scripts/telegram-bot/db_maintenance.py --enable-incremental-vacuum
+    python scripts/telegram-bot/db_maintenance.py --db bot.db --run-retention --days 60
+"""
+
+import os
+import sys
+import json
+import logging
+import argparse
+
+TELEGRAM_CORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "src", "telegram-bot", "core")
+sys.path.insert(0, os.path.abspath(TELEGRAM_CORE_DIR))
+from retention import RetentionManager  # noqa: E402
+
+logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos del bot")
+    parser.add_argument("--db", default=os.getenv("MEMORY_DB", "telegram_bot_memory_secure.db"),
+                        help="Ruta de la base de datos (MEMORY_DB por defecto)")
+    parser.add_argument("--enable-incremental-vacuum", action="store_true",
+                        help="Activar auto_vacuum incremental (VACUUM completo, una sola vez)")
+    parser.add_argument("--run-retention", action="store_true", help="Ejecutar un ciclo de retención")
+    parser.add_argument("--days", type=int, default=None, help="Días a conservar (RETENTION_DAYS por defecto)")
+    args = parser.parse_args()
+
+    if not (args.enable_incremental_vacuum or args.run_retention):
+        parser.error("indica al menos una tarea")
+    if not os.path.exists(args.db):
+        logger.error(f"No existe la base de datos {args.db}")
+        return 1
+
+    retention = RetentionManager(args.db)
+
+    if args.enable_incremental_vacuum:
+        if retention.enable_incremental_vacuum():
+            logger.info(f"auto_vacuum incremental activado en {args.db}")
+        else:
+            logger.info(f"{args.db} ya tenía auto_vacuum incremental")
+
+    if args.run_retention:
+        report = retention.run_once(args.days)
+        print(json.dumps(report, indent=2, default=str))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
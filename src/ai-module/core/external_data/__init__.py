@@ -1,2 +1,2 @@
 # Paquete para servicios de datos externos
-# Incluye servicios para obtener noticias, eventos económicos y tendencias de redes sociales
+# Obtiene del data-service noticias, eventos económicos y tendencias de redes sociales
@@ -1,21 +1,19 @@
 """
 Servicio de integración de datos externos para análisis de criptomonedas.
-Este servicio combina datos de noticias, eventos económicos y redes sociales
-para proporcionar un contexto completo para el análisis de criptomonedas.
+Este servicio obtiene del data-service los datos integrados de noticias, eventos
+económicos y redes sociales para proporcionar un contexto completo para el
+análisis de criptomonedas.
 """
 import logging
-from typing import Dict, Any, Optional, List
-import asyncio
+from typing import Dict, Any, Optional
 
-# Importar servicios individuales
-from .news_service import get_news_for_symbol, get_all_relevant_news
-from .social_media_service import get_social_data_for_symbol, get_all_social_data
-from .economic_calendar_service import get_economic_events, get_events_for_symbol
+from ..services.external_data_client import external_data_client, adapt_integrated_data
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+
 async def get_external_data_for_symbol(symbol: str) -> Dict[str, Any]:
     """
     Obtiene todos los datos externos relevantes para una criptomoneda específica.
@@ -27,24 +25,7 @@ async def get_external_data_for_symbol(symbol: str) -> Dict[str, Any]:
         Diccionario con todos los datos externos relevantes
     """
     try:
-        # Ejecutar todas las consultas en paralelo para mejorar el rendimiento
-        news_task = asyncio.create_task(get_news_for_symbol(symbol))
-        social_task = asyncio.create_task(get_social_data_for_symbol(symbol))
-        events_task = asyncio.create_task(get_events_for_symbol(symbol))
-        
-        # Esperar a que todas las tareas se completen
-        news_data = await news_task
-        social_data = await social_task
-        events_data = await events_task
-        
-        # Combinar todos los datos en un solo diccionario
-        result = {
-            "symbol": symbol,
-            "news": news_data,
-            "social": social_data,
-            "events": events_data
-        }
-        
+        result = adapt_integrated_data(await external_data_client.get_integrated(symbol))
         logger.info(f"Datos externos obtenidos correctamente para {symbol}")
         return result
     except Exception as e:
@@ -65,23 +46,7 @@ async def get_all_external_data() -> Dict[str, Any]:
         Diccionario con todos los datos externos relevantes
     """
     try:
-        # Ejecutar todas las consultas en paralelo para mejorar el rendimiento
-        news_task = asyncio.create_task(get_all_relevant_news())
-        social_task = asyncio.create_task(get_all_social_data())
-        events_task = asyncio.create_task(get_economic_events())
-        
-        # Esperar a que todas las tareas se completen
-        news_data = await news_task
-        social_data = await social_task
-        events_data = await events_task
-        
-        # Combinar todos los datos en un solo diccionario
-        result = {
-            "news": news_data,
-            "social": social_data,
-            "events": events_data
-        }
-        
+        result = adapt_integrated_data(await external_data_client.get_integrated())
         logger.info("Datos externos generales obtenidos correctamente")
         return result
     except Exception as e:
@@ -134,11 +99,11 @@ def format_external_data_for_prompt(data: Dict[str, Any]) -> str:
         if "social" in data and data["social"]:
             result += "TENDENCIAS EN REDES SOCIALES:\n"
             
-            # Tendencias de Twitter
-            if "twitter_trends" in data["social"] and data["social"]["twitter_trends"]:
-                result += "- Tendencias en Twitter:\n"
-                for i, trend in enumerate(data["social"]["twitter_trends"][:3], 1):
-                    result += f"  {i}. {trend.get('name', 'Sin nombre')} ({trend.get('tweet_volume', 0)} tweets)\n"
+            # Publicaciones recientes
+            if "posts" in data["social"] and data["social"]["posts"]:
+                result += "- Publicaciones recientes:\n"
+                for i, post in enumerate(data["social"]["posts"][:3], 1):
+                    result += f"  {i}. {post.get('content', 'Sin contenido')[:140]} ({post.get('platform', 'Red social')})\n"
             
             # Sentimiento
             if "sentiment" in data["social"] and data["social"]["sentiment"]:
@@ -148,14 +113,15 @@ def format_external_data_for_prompt(data: Dict[str, Any]) -> str:
                 result += f"Negativo: {sentiment.get('negative', 0)*100:.1f}%, "
                 result += f"Neutral: {sentiment.get('neutral', 0)*100:.1f}%\n"
             
-            # Monedas tendencia
-            if "trending_coins" in data["social"] and data["social"]["trending_coins"]:
-                result += "- Criptomonedas tendencia:\n"
-                for i, coin in enumerate(data["social"]["trending_coins"][:3], 1):
-                    result += f"  {i}. {coin.get('name', 'Sin nombre')} ({coin.get('symbol', 'N/A')})\n"
-            
             result += "\n"
         
+        # Índice de sentimiento del data-service (noticias y redes con decaimiento temporal)
+        if data.get("sentiment_index"):
+            index = data["sentiment_index"]
+            result += "ÍNDICE DE SENTIMIENTO (noticias y redes, ponderado por antigüedad):\n"
+            result += f"- Puntuación: {index['score']:+.2f} (de -1 a 1), confianza: {index['confidence']:.2f}, "
+            result += f"elementos: {index['items']}\n\n"
+        
         # Formatear eventos económicos
         if "events" in data and data["events"]:
             result += "EVENTOS ECONÓMICOS IMPORTANTES:\n"
@@ -3,6 +3,7 @@ import sys
 import traceback
 import time
 import json
+import asyncio
 from typing import List, Dict, Any, Optional, Tuple
 
 # Importar pandas para cálculos de indicadores
@@ -44,9 +45,9 @@ except ImportError:
     BaseModel = object  # type: ignore
 
 try:
-    from openai import OpenAI  # type: ignore
+    from openai import AsyncOpenAI  # type: ignore
 except ImportError:
-    OpenAI = None  # type: ignore
+    AsyncOpenAI = None  # type: ignore
 
 # Importar sistema de estrategias
 try:
@@ -60,7 +61,7 @@ except ImportError as e:
 
 # Importar servicios de datos externos
 try:
-    from services.external_data.data_integration_service import get_formatted_data_for_prompt
+    from core.external_data.data_integration_service import get_formatted_data_for_prompt
     EXTERNAL_DATA_AVAILABLE = True
     # print("Servicios de datos externos disponibles")
 except ImportError as e:
@@ -70,7 +71,7 @@ except ImportError as e:
         import os
         # Añadir el directorio actual al path
         sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-        from services.external_data.data_integration_service import get_formatted_data_for_prompt
+        from core.external_data.data_integration_service import get_formatted_data_for_prompt
         EXTERNAL_DATA_AVAILABLE = True
         # print("Servicios de datos externos disponibles (importación relativa)")
     except ImportError as e2:
@@ -91,9 +92,18 @@ except ImportError as e:
     BACKEND_AVAILABLE = False
     # print(f"Backend no disponible: {e}")
 
+# Índice de sentimiento (noticias y redes) calculado por el data-service
+try:
+    from core.services.external_data_client import external_data_client
+except ImportError:
+    external_data_client = None
+
 # Configuración de entorno
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
 BACKEND_URL = os.getenv("BACKEND_URL", "http://localhost:8000")
+# Límite de llamadas simultáneas al LLM y timeout por petición (incluye la espera)
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+LLM_REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "30"))
 
 if not OPENAI_API_KEY:
     print("⚠️ OPENAI_API_KEY no encontrada. Funcionará en modo limitado.")
@@ -119,11 +129,11 @@ app.add_middleware(
 USE_ANTHROPIC = False
 client = None
 
-# Inicializar cliente OpenAI
-if OPENAI_API_KEY:
+# Inicializar cliente OpenAI (asíncrono: no bloquea el event loop)
+if OPENAI_API_KEY and AsyncOpenAI:
     try:
         # Usar la API key de OpenAI proporcionada
-        client = OpenAI(api_key=OPENAI_API_KEY)
+        client = AsyncOpenAI(api_key=OPENAI_API_KEY, timeout=LLM_REQUEST_TIMEOUT)
         print("Cliente OpenAI inicializado correctamente.")
         USE_ANTHROPIC = False
     except Exception as e:
@@ -142,6 +152,40 @@ if STRATEGIES_AVAILABLE:
         print(f"❌ Error inicializando sistema de estrategias: {e}")
         signal_generator = None
 
+_llm_semaphore: Optional[asyncio.Semaphore] = None
+
+def _get_llm_semaphore() -> asyncio.Semaphore:
+    """Semáforo creado de forma perezosa dentro del event loop."""
+    global _llm_semaphore
+    if _llm_semaphore is None:
+        _llm_semaphore = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+    return _llm_semaphore
+
+async def chat_completion(
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    model: str = "gpt-3.5-turbo"
+) -> str:
+    """
+    Completion asíncrona con límite de concurrencia y timeout por petición.
+    El timeout cubre también la espera por una plaza del limitador.
+    """
+    async def _call():
+        async with _get_llm_semaphore():
+            return await client.chat.completions.create(
+                model=model,
+                messages=messages,
+                temperature=temperature,
+                max_tokens=max_tokens
+            )
+
+    try:
+        response = await asyncio.wait_for(_call(), timeout=LLM_REQUEST_TIMEOUT)
+    except asyncio.TimeoutError:
+        raise HTTPException(status_code=504, detail="Tiempo de espera agotado en el servicio de IA")
+    return response.choices[0].message.content.strip()
+
 # Modelos de datos
 class AnalyzeRequest(BaseModel):
     symbol: str
@@ -206,7 +250,7 @@ async def fetch_price_backend(symbol: str) -> Optional[float]:
     if not BACKEND_AVAILABLE:
         return None
     try:
-        df = fetch_ohlcv(symbol, timeframe='1m', limit=1)
+        df = await asyncio.to_thread(fetch_ohlcv, symbol, timeframe='1m', limit=1)
         return float(df['close'].iloc[-1])
     except Exception:
         return None
@@ -239,6 +283,14 @@ async def get_current_price(symbol: str) -> float:
             continue
     return FALLBACK_PRICES.get(symbol.upper(), 0.0)
 
+async def get_sentiment_index(symbol: str) -> Optional[Dict[str, Any]]:
+    """
+    Índice de sentimiento del símbolo según el data-service (None si no hay).
+    """
+    if not external_data_client:
+        return None
+    return await external_data_client.get_sentiment_index(symbol)
+
 @app.get('/health')
 async def health() -> Dict[str, str]:
     return {"status": "ok"}
@@ -286,19 +338,21 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
             IMPORTANTE: Mantén esta estructura exacta con los emojis y formato. Usa datos reales y análisis técnico profesional.
             """
             
+            # Sentimiento de noticias y redes, si el data-service tiene índice del símbolo
+            sentiment_line = ""
+            index = await get_sentiment_index(symbol)
+            if index:
+                sentiment_line = (
+                    f"\nSentimiento (noticias y redes, -1 a 1): {index['score']:+.2f} "
+                    f"(confianza {index['confidence']:.2f}, {index['items']} elementos)"
+                )
+            
             messages = [
                 {"role": "system", "content": system_prompt},
-                {"role": "user", "content": f"Análisis solicitado para: {symbol}\nPrecio actual: ${current_price:,.2f}\nTimeframes: {', '.join(req.timeframes)}\n\nConsulta: {req.user_prompt}"}
+                {"role": "user", "content": f"Análisis solicitado para: {symbol}\nPrecio actual: ${current_price:,.2f}\nTimeframes: {', '.join(req.timeframes)}{sentiment_line}\n\nConsulta: {req.user_prompt}"}
             ]
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.6,
-                max_tokens=600
-            )
-            
-            analysis = response.choices[0].message.content.strip()
+            analysis = await chat_completion(messages, temperature=0.6, max_tokens=600)
             
             return {
                 "symbol": symbol,
@@ -307,6 +361,8 @@ async def analyze(req: AnalyzeRequest) -> Dict[str, Any]:
                 "analysis": analysis,
                 "timestamp": time.time()
             }
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"Error en análisis: {e}")
             raise HTTPException(status_code=500, detail="Error procesando análisis")
@@ -336,11 +392,21 @@ async def generate_signal(req: SignalRequest) -> Dict[str, Any]:
         
         # Calcular indicadores técnicos básicos
         indicators = {}
+        strategy_signal = None
         try:
             # Intentar obtener datos históricos para calcular indicadores
             if BACKEND_AVAILABLE:
-                df = fetch_ohlcv(symbol, timeframe=timeframe, limit=100)
+                df = await asyncio.to_thread(fetch_ohlcv, symbol, timeframe=timeframe, limit=100)
                 if not df.empty:
+                    # Señal del motor de estrategias con el sentimiento del data-service
+                    if signal_generator:
+                        ohlcv = {key: df[key].values for key in ('open', 'high', 'low', 'close', 'volume')}
+                        sentiment = await get_sentiment_index(symbol)
+                        strategy_signal = await asyncio.to_thread(
+                            signal_generator.generate_signal, symbol, ohlcv, timeframe,
+                            sentiment=sentiment
+                        )
+                    
                     # Calcular RSI básico
                     delta = df['close'].diff()
                     gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
@@ -368,7 +434,9 @@ async def generate_signal(req: SignalRequest) -> Dict[str, Any]:
         signal = indicators.get('macd', {}).get('signal_line', 0)
         
         direction = "LONG"
-        if rsi < 40 or (macd < 0 and macd < signal):
+        if strategy_signal and strategy_signal.get("signal") in ("BUY", "SELL"):
+            direction = "LONG" if strategy_signal["signal"] == "BUY" else "SHORT"
+        elif rsi < 40 or (macd < 0 and macd < signal):
             direction = "SHORT"
         
         # Calcular niveles de trading
@@ -417,14 +485,7 @@ async def generate_signal(req: SignalRequest) -> Dict[str, Any]:
                 {"role": "user", "content": user_prompt}
             ]
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=150,
-            )
-            
-            explanation = response.choices[0].message.content.strip()
+            explanation = await chat_completion(messages, temperature=0.7, max_tokens=150)
         else:
             explanation = f"Señal {direction} para {symbol} basada en análisis técnico. RSI: {rsi:.2f}"
         
@@ -507,14 +568,7 @@ async def generate(req: AnalyzeRequest) -> Dict[str, Any]:
                 {"role": "user", "content": req.user_prompt}
             ]
             
-            response = client.chat.completions.create(
-                model="gpt-3.5-turbo",
-                messages=messages,
-                temperature=0.7,
-                max_tokens=400
-            )
-            
-            analysis = response.choices[0].message.content.strip()
+            analysis = await chat_completion(messages, temperature=0.7, max_tokens=400)
             
             return {
                 "symbol": symbol,
@@ -556,14 +610,7 @@ async def analyze_prompt(req: FullPromptRequest) -> Dict[str, Any]:
             {"role": "user", "content": req.prompt}
         ]
         
-        response = client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=messages,
-            temperature=0.7,
-            max_tokens=600
-        )
-        
-        analysis = response.choices[0].message.content.strip()
+        analysis = await chat_completion(messages, temperature=0.7, max_tokens=600)
             
         return {
             "prompt": req.prompt,
@@ -571,6 +618,8 @@ async def analyze_prompt(req: FullPromptRequest) -> Dict[str, Any]:
             "timestamp": time.time()
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error en análisis de prompt: {e}")
         raise HTTPException(status_code=500, detail="Error procesando análisis")
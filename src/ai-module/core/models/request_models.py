@@ -27,6 +27,12 @@ class AnalysisType(Enum):
     COMBINED = "combined"
 
 
+class MultiAnalysisMode(Enum):
+    """Modos de ejecución del análisis múltiple."""
+    CONCURRENT = "concurrent"
+    BATCHED = "batched"
+
+
 class SignalType(Enum):
     """Tipos de señales de trading."""
     BUY = "buy"
@@ -264,6 +270,10 @@ class MultiSymbolRequest(BaseRequest):
         True, 
         description="Incluir análisis de correlación"
     )
+    mode: MultiAnalysisMode = Field(
+        MultiAnalysisMode.CONCURRENT,
+        description="concurrent: una completion por símbolo en paralelo; batched: una sola completion estructurada"
+    )
     
     @validator('symbols')
     def validate_symbols(cls, v):
@@ -286,6 +296,20 @@ class MultiSymbolRequest(BaseRequest):
             raise ValueError(e.reason)
 
 
+class IntentClassificationRequest(BaseRequest):
+    """Request para clasificar la intención de un mensaje del bot."""
+    
+    message: str = Field(..., min_length=1, max_length=1000, description="Mensaje del usuario")
+    
+    @validator('message')
+    def validate_message(cls, v):
+        """Validar mensaje."""
+        try:
+            return InputValidator.validate_prompt(v)
+        except InputValidationError as e:
+            raise ValueError(e.reason)
+
+
 class HealthCheckRequest(BaseRequest):
     """Request para verificación de salud del sistema."""
     
@@ -453,6 +477,7 @@ class RequestFactory:
         'signal': TradingSignalRequest,
         'prompt': CustomPromptRequest,
         'multi_symbol': MultiSymbolRequest,
+        'intent': IntentClassificationRequest,
         'health_check': HealthCheckRequest,
         'batch': BatchRequest,
         'advanced_strategy': AdvancedStrategyRequest
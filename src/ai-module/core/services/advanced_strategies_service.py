@@ -3,9 +3,11 @@ Servicio de Estrategias Avanzadas de Trading
 Implementa estrategias especializadas con prompts específicos.
 """
 
+import os
+import asyncio
 import logging
 import re
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List, Tuple, AsyncIterator
 from dataclasses import dataclass
 from enum import Enum
 import pandas as pd
@@ -14,10 +16,29 @@ from fastapi import APIRouter
 
 from ..models.request_models import AdvancedStrategyType
 from .ai_service import AIService
+from .completion_cache import CacheContext, CompletionCache
 from .data_service import DataService
+from .prompt_compiler import compress_numbers, prompt_compiler
+from .single_flight import SingleFlight
+from .structured_output import STRATEGY_SIGNAL_FUNCTION, STRATEGY_SIGNAL_VALIDATOR
 
 logger = logging.getLogger(__name__)
 
+# Inicio del bloque "formato de respuesta" en texto libre de los prompts; con
+# salida estructurada se sustituye por la instrucción JSON. Todas las
+# plantillas terminan con ese bloque (tests/test_strategy_prompts.py)
+_TEXT_FORMAT_MARKER = re.compile(
+    r"^\s*(?:\d\.\s*)?(?:Devuelve (?:tu|el) análisis|Tu análisis debe seguir|"
+    r"RESPONDE ÚNICAMENTE EN ESTE FORMATO|Si SÍ hay una señal clara, responde en este formato)",
+    re.MULTILINE | re.IGNORECASE
+)
+
+STRUCTURED_OUTPUT_INSTRUCTION = (
+    "Responde llamando a la función registrar_senal. Sin señal clara: signal NEUTRAL, "
+    "confidence 0 y precios null. En reasoning resume en pocas frases los indicadores "
+    "que justifican la señal, el ratio R/R y la distancia del stop loss."
+)
+
 @dataclass
 class StrategyResult:
     """Resultado de una estrategia avanzada."""
@@ -32,6 +53,10 @@ class StrategyResult:
 
 class AdvancedStrategiesService:
     """Servicio para estrategias avanzadas de trading."""
+
+    # Segundos entre eventos de progreso de stream_strategy
+    PROGRESS_INTERVAL = 5.0
+
     def __init__(self, ai_service: AIService, data_service: DataService):
         self.ai_service = ai_service
         self.data_service = data_service
@@ -46,6 +71,15 @@ class AdvancedStrategiesService:
             AdvancedStrategyType.SMART_MONEY: self._get_smart_money_prompt,
             AdvancedStrategyType.VOLATILIDAD: self._get_volatilidad_prompt
         }
+        # Peticiones idénticas simultáneas comparten una única ejecución
+        self._single_flight = SingleFlight("advanced_strategy")
+        # Camino rápido: la confluencia de indicadores decide si hay setup y la
+        # IA solo se consulta para explicar setups LONG/SHORT
+        self.fast_path_enabled = os.getenv("STRATEGY_FAST_PATH", "true").lower() == "true"
+        self.fast_path_neutral = 0
+        self.llm_calls = 0
+        # Respuesta de la IA como JSON validado (function-calling) en lugar de texto libre
+        self.structured_output = os.getenv("STRATEGY_STRUCTURED_OUTPUT", "true").lower() == "true"
 
     async def execute_strategy(
         self,
@@ -53,70 +87,263 @@ class AdvancedStrategiesService:
         symbol: str,
         timeframe: str,
         **kwargs
+    ) -> StrategyResult:
+        """
+        Ejecutar una estrategia. Las llamadas concurrentes con los mismos
+        parámetros esperan la misma ejecución (descarga de velas, indicadores
+        y completion) en lugar de repetirla.
+        """
+        strategy_type_str = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
+        key = (
+            strategy_type_str,
+            symbol.upper(),
+            timeframe,
+            tuple(sorted((k, str(v)) for k, v in kwargs.items() if v is not None))
+        )
+        return await self._single_flight.do(
+            key, lambda: self._execute_strategy(strategy_type, symbol, timeframe, **kwargs)
+        )
+
+    async def _prepare_strategy(
+        self,
+        strategy_type: AdvancedStrategyType,
+        symbol: str,
+        timeframe: str,
+        structured: bool = False,
+        **kwargs
+    ) -> Tuple[AdvancedStrategyType, List[Dict[str, str]], Dict[str, Any], CacheContext, Optional[str]]:
+        """
+        Obtiene los datos técnicos y construye el prompt de la estrategia.
+        
+        Con `structured` el bloque de formato en texto libre del prompt se
+        sustituye por la instrucción de salida estructurada.
+        El último elemento es el setup determinista (LONG/SHORT/NEUTRAL) o None
+        si el camino rápido no aplica a esta estrategia.
+        """
+        # Convertir string a enum si es necesario
+        if isinstance(strategy_type, str):
+            try:
+                strategy_type = AdvancedStrategyType(strategy_type)
+            except ValueError:
+                raise ValueError(f"Estrategia no válida: {strategy_type}")
+        
+        technical_data, indicators, prices = await self._get_technical_data(symbol, timeframe, strategy_type, **kwargs)
+        prompt_generator = self._strategy_prompts.get(strategy_type)
+        if not prompt_generator:
+            raise ValueError(f"Estrategia no soportada: {strategy_type}")
+        
+        setup = self._deterministic_setup(strategy_type, indicators)
+        if setup in ("LONG", "SHORT"):
+            long_count = self._confluence_count("LONG", indicators)
+            short_count = self._confluence_count("SHORT", indicators)
+            technical_data += (
+                f"\n\nCONFLUENCIA DE INDICADORES: setup {setup} "
+                f"(LONG {long_count}/6, SHORT {short_count}/6). "
+                f"Evalúa y explica únicamente la operación {setup}."
+            )
+        
+        prompt = prompt_generator()
+        if structured:
+            prompt = self._to_structured_prompt(prompt)
+        formatted_prompt = self._format_prompt(prompt, symbol, timeframe, technical_data, **kwargs)
+
+        # LOG: Imprimir los datos técnicos enviados a la IA
+        logger.info(f"[TRACE] DATOS TÉCNICOS ENVIADOS A LA IA:\n{technical_data}")
+
+        # Misma estrategia, vela, precio e indicadores => misma respuesta. Sin
+        # redondeo: la respuesta cita entrada, SL y TP literalmente
+        cache_context = CacheContext(
+            template=f"{'strategy-json' if structured else 'strategy'}:{strategy_type.value}",
+            symbol=symbol,
+            timeframe=timeframe,
+            fingerprint=CompletionCache.fingerprint({
+                "indicators": indicators,
+                "prices": prices,
+                "params": {k: v for k, v in kwargs.items() if v is not None}
+            }, significant_digits=None)
+        )
+        messages = [{"role": "user", "content": formatted_prompt}]
+        return strategy_type, messages, indicators, cache_context, setup
+
+    @staticmethod
+    def _to_structured_prompt(prompt: str) -> str:
+        """Quitar el formato de respuesta en texto libre y pedir la salida estructurada."""
+        match = _TEXT_FORMAT_MARKER.search(prompt)
+        if match:
+            prompt = prompt[:match.start()].rstrip()
+        return f"{prompt}\n\n{STRUCTURED_OUTPUT_INSTRUCTION}"
+
+    def _deterministic_setup(self, strategy_type: AdvancedStrategyType, indicators: Dict[str, Any]) -> Optional[str]:
+        """
+        Setup según la confluencia de indicadores: LONG o SHORT si esa dirección
+        alcanza el mínimo y supera a la contraria, NEUTRAL en otro caso.
+        None si no aplica (desactivado, divergencia correlacionada o sin indicadores).
+        """
+        if not self.fast_path_enabled or not indicators:
+            return None
+        if strategy_type == AdvancedStrategyType.DIVERGENCIA_CORRELACIONADA:
+            return None
+        
+        long_count = self._confluence_count("LONG", indicators)
+        short_count = self._confluence_count("SHORT", indicators)
+        if long_count >= 3 and long_count > short_count:
+            return "LONG"
+        if short_count >= 3 and short_count > long_count:
+            return "SHORT"
+        return "NEUTRAL"
+
+    def _neutral_setup_result(self, strategy_type: AdvancedStrategyType, indicators: Dict[str, Any]) -> StrategyResult:
+        """Resultado NEUTRAL del camino rápido (sin llamada a la IA)."""
+        self.fast_path_neutral += 1
+        long_count = self._confluence_count("LONG", indicators)
+        short_count = self._confluence_count("SHORT", indicators)
+        return StrategyResult(
+            strategy_type=strategy_type.value,
+            signal="NEUTRAL",
+            confidence=0.0,
+            reasoning=(
+                "No hay oportunidad real de trading en este momento. "
+                f"Sin confluencia clara: LONG {long_count}/6, SHORT {short_count}/6 indicadores"
+            ),
+            metadata={"fast_path": True, "confluence": {"long": long_count, "short": short_count}}
+        )
+
+    def _error_result(self, strategy_type: Any, error: Exception) -> StrategyResult:
+        strategy_type_str = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
+        logger.error(f"Error ejecutando estrategia {strategy_type_str}: {str(error)}")
+        return StrategyResult(
+            strategy_type=strategy_type_str,
+            signal="NEUTRAL",
+            reasoning=f"Error en análisis: {str(error)}"
+        )
+
+    async def _execute_strategy(
+        self,
+        strategy_type: AdvancedStrategyType,
+        symbol: str,
+        timeframe: str,
+        **kwargs
     ) -> StrategyResult:
         try:
             strategy_type_str = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
             logger.info(f"Ejecutando estrategia {strategy_type_str} para {symbol} en {timeframe}")
             
-            # Convertir string a enum si es necesario
-            if isinstance(strategy_type, str):
-                try:
-                    strategy_type = AdvancedStrategyType(strategy_type)
-                except ValueError:
-                    raise ValueError(f"Estrategia no válida: {strategy_type}")
+            strategy_type, messages, indicators, cache_context, setup = await self._prepare_strategy(
+                strategy_type, symbol, timeframe, structured=self.structured_output, **kwargs
+            )
+            if setup == "NEUTRAL":
+                logger.info(f"Estrategia {strategy_type_str} sin setup para {symbol} {timeframe}: IA omitida")
+                return self._neutral_setup_result(strategy_type, indicators)
             
-            technical_data, indicators = await self._get_technical_data(symbol, timeframe, strategy_type, **kwargs)
-            prompt_generator = self._strategy_prompts.get(strategy_type)
-            if not prompt_generator:
-                raise ValueError(f"Estrategia no soportada: {strategy_type}")
+            self.llm_calls += 1
+            if self.structured_output:
+                payload = await self.ai_service.generate_structured_completion(
+                    messages, STRATEGY_SIGNAL_FUNCTION, STRATEGY_SIGNAL_VALIDATOR, cache_context=cache_context
+                )
+                logger.info(f"[TRACE] RESPUESTA ESTRUCTURADA DE LA IA: {payload}")
+                result = self._build_strategy_result(
+                    strategy_type,
+                    payload["signal"],
+                    payload["entry_price"],
+                    payload["stop_loss"],
+                    payload["take_profit"],
+                    payload["confidence"],
+                    payload["reasoning"],
+                    indicators,
+                    expected_signal=setup
+                )
+                logger.info(f"Estrategia {strategy_type_str} completada: {result.signal}")
+                return result
             
-            prompt = prompt_generator()
-            formatted_prompt = self._format_prompt(prompt, symbol, timeframe, technical_data, **kwargs)
-
-            # LOG: Imprimir los datos técnicos enviados a la IA
-            logger.info(f"[TRACE] DATOS TÉCNICOS ENVIADOS A LA IA:\n{technical_data}")
-
-            ai_response = await self.ai_service.generate_custom_completion([{"role": "user", "content": formatted_prompt}])
+            ai_response = await self.ai_service.generate_custom_completion(messages, cache_context=cache_context)
             
             # LOG: Registrar la respuesta cruda de la IA para debugging
             logger.info(f"[TRACE] RESPUESTA CRUDA DE LA IA:\n{ai_response}")
             
-            result = self._parse_strategy_response(ai_response, strategy_type, indicators)
+            result = self._parse_strategy_response(ai_response, strategy_type, indicators, expected_signal=setup)
             
             logger.info(f"Estrategia {strategy_type_str} completada: {result.signal}")
             return result
         except Exception as e:
-            strategy_type_str = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
-            logger.error(f"Error ejecutando estrategia {strategy_type_str}: {str(e)}")
-            return StrategyResult(
-                strategy_type=strategy_type_str,
-                signal="NEUTRAL",
-                reasoning=f"Error en análisis: {str(e)}"
-            )
+            return self._error_result(strategy_type, e)
+
+    async def stream_strategy(
+        self,
+        strategy_type: AdvancedStrategyType,
+        symbol: str,
+        timeframe: str,
+        **kwargs
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Ejecutar una estrategia en streaming.
+        
+        Produce tuplas ("progress", texto) mientras la estrategia se ejecuta y
+        termina con ("result", StrategyResult). La señal sale de execute_strategy
+        (coalescencia y salida estructurada validada): el texto de la IA lleva
+        niveles de entrada, stop y take profit, así que nunca se emite sin validar.
+        """
+        symbol_label = symbol.upper()
+        task = asyncio.ensure_future(self.execute_strategy(strategy_type, symbol, timeframe, **kwargs))
+        try:
+            yield "progress", f"Analizando {symbol_label} en {timeframe}..."
+            while True:
+                done, _ = await asyncio.wait({task}, timeout=self.PROGRESS_INTERVAL)
+                if done:
+                    break
+                yield "progress", f"Analizando {symbol_label} en {timeframe}: calculando la señal..."
+            result = task.result()
+        except Exception as e:
+            result = self._error_result(strategy_type, e)
+        finally:
+            # La ejecución compartida está protegida (SingleFlight); solo se cancela esta espera
+            if not task.done():
+                task.cancel()
+        yield "result", result
+
+    def get_service_status(self) -> Dict[str, Any]:
+        """Estado del servicio de estrategias."""
+        return {
+            "strategies": [s.value for s in self._strategy_prompts],
+            "single_flight": self._single_flight.get_stats(),
+            "structured_output": self.structured_output,
+            "fast_path": {
+                "enabled": self.fast_path_enabled,
+                "neutral_without_llm": self.fast_path_neutral,
+                "llm_calls": self.llm_calls
+            }
+        }
 
-    async def _get_technical_data(self, symbol: str, timeframe: str, strategy_type: AdvancedStrategyType, **kwargs) -> tuple[str, Dict[str, Any]]:
-        """Obtiene y formatea datos técnicos para la estrategia."""
+    async def _get_technical_data(self, symbol: str, timeframe: str, strategy_type: AdvancedStrategyType, **kwargs) -> tuple[str, Dict[str, Any], Dict[str, Any]]:
+        """
+        Obtiene y formatea datos técnicos para la estrategia.
+        
+        El tercer elemento son los precios actuales citados en los datos
+        (símbolo y, en la divergencia, el correlacionado).
+        """
         try:
             # Obtener datos básicos
             data = await self.data_service.get_market_data(symbol, timeframe)
             
             if not data:
-                return "No se pudieron obtener datos del mercado."
+                return "No se pudieron obtener datos del mercado.", {}, {}
+            prices = {symbol.upper(): data.get('current_price')}
             
             # Obtener datos adicionales según la estrategia
             if strategy_type == AdvancedStrategyType.DIVERGENCIA_CORRELACIONADA:
                 correlated_symbol = kwargs.get('correlated_symbol', 'ETH')
                 correlated_data = await self.data_service.get_market_data(correlated_symbol, timeframe)
-                return self._format_correlation_data(data, correlated_symbol, correlated_data), {}
+                if correlated_data:
+                    prices[correlated_symbol.upper()] = correlated_data.get('current_price')
+                return self._format_correlation_data(data, correlated_symbol, correlated_data), {}, prices
             
             # Obtener indicadores técnicos adicionales
             technical_indicators = await self._get_enhanced_technical_indicators(symbol, timeframe)
             
-            return self._format_standard_data(data, technical_indicators), technical_indicators
+            return self._format_standard_data(data, technical_indicators, strategy_type.value), technical_indicators, prices
             
         except Exception as e:
             logger.error(f"Error obteniendo datos técnicos: {str(e)}")
-            return f"Error obteniendo datos: {str(e)}", {}
+            return f"Error obteniendo datos: {str(e)}", {}, {}
 
     async def _get_enhanced_technical_indicators(self, symbol: str, timeframe: str) -> Dict[str, Any]:
         """Obtiene indicadores técnicos mejorados."""
@@ -368,8 +595,12 @@ class AdvancedStrategiesService:
             return "Símbolo correlacionado no especificado"
         return f"Datos de {data.get('symbol', 'N/A')} y {correlated_symbol}\n\nDatos de {correlated_symbol}:\n{self._format_standard_data(correlated_data)}"
 
-    def _format_standard_data(self, data: Dict, indicators: Dict[str, Any] = None) -> str:
-        """Formatea datos estándar con indicadores técnicos y contexto de tendencia/volatilidad."""
+    def _format_standard_data(self, data: Dict, indicators: Dict[str, Any] = None, strategy: Optional[str] = None) -> str:
+        """
+        Formatea datos estándar con indicadores técnicos y contexto de tendencia/volatilidad.
+        Las líneas de indicadores se ordenan por relevancia para `strategy` y se
+        recortan al presupuesto de tokens; los números se compactan.
+        """
         try:
             current_price = data.get('current_price', 0)
             price_change_24h = data.get('price_change_24h', 0)
@@ -390,7 +621,7 @@ class AdvancedStrategiesService:
             # Indicadores técnicos
             indicators_text = ""
             if indicators:
-                indicators_text = "\n\n📊 INDICADORES TÉCNICOS:\n"
+                indicator_lines = []
                 # RSI
                 rsi_values = []
                 for period in [6, 14, 21]:
@@ -398,11 +629,11 @@ class AdvancedStrategiesService:
                     if rsi_key in indicators and indicators[rsi_key] is not None:
                         rsi_values.append(f"RSI({period}): {indicators[rsi_key]:.1f}")
                 if rsi_values:
-                    indicators_text += f"• {' | '.join(rsi_values)}\n"
+                    indicator_lines.append(f"• {' | '.join(rsi_values)}")
                 # MACD
                 if 'macd' in indicators and indicators['macd'] is not None:
                     macd_trend = "ALCISTA" if indicators['macd'] > indicators.get('macd_signal', 0) else "BAJISTA"
-                    indicators_text += f"• MACD: {indicators['macd']:.4f} | Señal: {indicators.get('macd_signal', 0):.4f} | {macd_trend}\n"
+                    indicator_lines.append(f"• MACD: {indicators['macd']:.4f} | Señal: {indicators.get('macd_signal', 0):.4f} | {macd_trend}")
                 # Medias móviles
                 ma_values = []
                 for period in [9, 20, 50, 200]:
@@ -413,39 +644,42 @@ class AdvancedStrategiesService:
                     if ema_key in indicators and indicators[ema_key] is not None:
                         ma_values.append(f"EMA({period}): {indicators[ema_key]:.2f}")
                 if ma_values:
-                    indicators_text += f"• {' | '.join(ma_values[:6])}\n"
+                    indicator_lines.append(f"• {' | '.join(ma_values[:6])}")
                 # Bandas de Bollinger
                 if 'bb_upper' in indicators and indicators['bb_upper'] is not None:
                     bb_position = "SUPERIOR" if current_price > indicators['bb_upper'] else "INFERIOR" if current_price < indicators['bb_lower'] else "MEDIA"
-                    indicators_text += f"• BB: Superior: {indicators['bb_upper']:.2f} | Media: {indicators['bb_middle']:.2f} | Inferior: {indicators['bb_lower']:.2f} | Posición: {bb_position}\n"
+                    indicator_lines.append(f"• BB: Superior: {indicators['bb_upper']:.2f} | Media: {indicators['bb_middle']:.2f} | Inferior: {indicators['bb_lower']:.2f} | Posición: {bb_position}")
                 # Estocástico
                 if 'stoch_k' in indicators and indicators['stoch_k'] is not None:
                     stoch_zone = "SOBRECOMPRA" if indicators['stoch_k'] > 80 else "SOBREVENTA" if indicators['stoch_k'] < 20 else "NEUTRAL"
-                    indicators_text += f"• Estocástico: %K: {indicators['stoch_k']:.1f} | %D: {indicators.get('stoch_d', 0):.1f} | Zona: {stoch_zone}\n"
+                    indicator_lines.append(f"• Estocástico: %K: {indicators['stoch_k']:.1f} | %D: {indicators.get('stoch_d', 0):.1f} | Zona: {stoch_zone}")
                 # Volumen
                 if 'volume_ratio' in indicators and indicators['volume_ratio'] is not None:
                     volume_status = "ALTO" if indicators['volume_ratio'] > 1.5 else "BAJO" if indicators['volume_ratio'] < 0.5 else "NORMAL"
-                    indicators_text += f"• Volumen: {volume_status} (Ratio: {indicators['volume_ratio']:.2f})\n"
+                    indicator_lines.append(f"• Volumen: {volume_status} (Ratio: {indicators['volume_ratio']:.2f})")
                 # ATR
                 if 'atr' in indicators and indicators['atr'] is not None:
-                    indicators_text += f"• ATR: {indicators['atr']:.2f}\n"
+                    indicator_lines.append(f"• ATR: {indicators['atr']:.2f}")
                 # VWAP
                 if 'vwap' in indicators and indicators['vwap'] is not None:
                     vwap_status = indicators.get('vwap_position', 'NEUTRAL')
                     vwap_distance = indicators.get('vwap_distance', 0)
-                    indicators_text += f"• VWAP: {indicators['vwap']:.2f} | Posición: {vwap_status} | Distancia: {vwap_distance:.2f}%\n"
+                    indicator_lines.append(f"• VWAP: {indicators['vwap']:.2f} | Posición: {vwap_status} | Distancia: {vwap_distance:.2f}%")
                 # Soporte y Resistencia
                 if 'support_levels' in indicators and indicators['support_levels']:
                     support_text = ", ".join([f"${level:.2f}" for level in indicators['support_levels'][:2]])
-                    indicators_text += f"• Soporte: {support_text}\n"
+                    indicator_lines.append(f"• Soporte: {support_text}")
                 if 'resistance_levels' in indicators and indicators['resistance_levels']:
                     resistance_text = ", ".join([f"${level:.2f}" for level in indicators['resistance_levels'][:2]])
-                    indicators_text += f"• Resistencia: {resistance_text}\n"
+                    indicator_lines.append(f"• Resistencia: {resistance_text}")
+                indicators_text = "\n\n📊 INDICADORES TÉCNICOS:\n" + "\n".join(
+                    prompt_compiler.compact_lines(indicator_lines, strategy=strategy)
+                ) + "\n"
             # Contexto de tendencia y volatilidad
             tendencia = "ALCISTA" if price_change_24h > 0.5 else "BAJISTA" if price_change_24h < -0.5 else "LATERAL"
             volatilidad = "ALTA" if indicators and indicators.get('atr', 0) > 0.01 * current_price else "BAJA"
             contexto = f"\nTendencia: {tendencia} | Volatilidad: {volatilidad} | Timeframe: {timeframe}"
-            return (
+            return compress_numbers(
                 f"💰 Precio actual: ${current_price:,.2f}\n"
                 f"📈 Cambio 24h: {price_change_24h:+.2f}%\n"
                 f"📊 Volumen 24h: ${volume_24h:,.0f}\n\n"
@@ -465,46 +699,20 @@ class AdvancedStrategiesService:
             **kwargs
         )
 
-    def _parse_strategy_response(self, response: str, strategy_type: AdvancedStrategyType, technical_data: Dict[str, Any] = None) -> StrategyResult:
+    def _parse_strategy_response(self, response: str, strategy_type: AdvancedStrategyType, technical_data: Dict[str, Any] = None,
+                                 expected_signal: Optional[str] = None) -> StrategyResult:
+        """Parsear una respuesta en texto libre (modo no estructurado y streaming)."""
         try:
-            signal = self._extract_signal(response)
-            entry_price = self._extract_price(response, "entrada")
-            stop_loss = self._extract_price(response, "stop")
-            take_profit = self._extract_price(response, "profit")
-            confidence = self._calculate_confidence(response)
-            
-            # Validar coherencia de la señal antes de devolverla
-            is_valid, error_message = self._validate_signal_coherence(
-                signal, entry_price, stop_loss, take_profit, confidence
-            )
-            
-            # Si la señal es válida, validar confluencia de indicadores
-            if is_valid and signal in ["LONG", "SHORT"] and technical_data:
-                confluence_valid, confluence_error = self._validate_indicator_confluence(signal, technical_data)
-                if not confluence_valid:
-                    is_valid = False
-                    error_message = confluence_error
-            
-            # Obtener el valor del enum como string
-            strategy_type_value = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
-            
-            if not is_valid:
-                logger.warning(f"Señal inválida detectada: {error_message}")
-                return StrategyResult(
-                    strategy_type=strategy_type_value,
-                    signal="NEUTRAL",
-                    confidence=0.0,
-                    reasoning=f"No hay oportunidad real de trading en este momento. {error_message}"
-                )
-            
-            return StrategyResult(
-                strategy_type=strategy_type_value,
-                signal=signal,
-                entry_price=entry_price,
-                stop_loss=stop_loss,
-                take_profit=take_profit,
-                confidence=confidence,
-                reasoning=response[:500]
+            return self._build_strategy_result(
+                strategy_type,
+                self._extract_signal(response),
+                self._extract_price(response, "entrada"),
+                self._extract_price(response, "stop"),
+                self._extract_price(response, "profit"),
+                self._calculate_confidence(response),
+                response[:500],
+                technical_data,
+                expected_signal=expected_signal
             )
         except Exception as e:
             logger.error(f"Error parseando respuesta: {str(e)}")
@@ -518,6 +726,51 @@ class AdvancedStrategiesService:
                 reasoning=f"Error parseando respuesta: {str(e)}"
             )
 
+    def _build_strategy_result(self, strategy_type: AdvancedStrategyType, signal: str,
+                               entry_price: Optional[float], stop_loss: Optional[float],
+                               take_profit: Optional[float], confidence: float, reasoning: str,
+                               technical_data: Dict[str, Any] = None,
+                               expected_signal: Optional[str] = None) -> StrategyResult:
+        """Validar los campos de la señal y construir el StrategyResult (NEUTRAL si no es válida)."""
+        # Validar coherencia de la señal antes de devolverla
+        is_valid, error_message = self._validate_signal_coherence(
+            signal, entry_price, stop_loss, take_profit, confidence
+        )
+        
+        # La IA no puede invertir la dirección del setup determinista
+        if is_valid and expected_signal in ("LONG", "SHORT") and signal != expected_signal:
+            is_valid = False
+            error_message = f"La respuesta ({signal}) contradice el setup de los indicadores ({expected_signal})"
+        
+        # Si la señal es válida, validar confluencia de indicadores
+        if is_valid and signal in ["LONG", "SHORT"] and technical_data:
+            confluence_valid, confluence_error = self._validate_indicator_confluence(signal, technical_data)
+            if not confluence_valid:
+                is_valid = False
+                error_message = confluence_error
+        
+        # Obtener el valor del enum como string
+        strategy_type_value = strategy_type.value if hasattr(strategy_type, "value") else str(strategy_type)
+        
+        if not is_valid:
+            logger.warning(f"Señal inválida detectada: {error_message}")
+            return StrategyResult(
+                strategy_type=strategy_type_value,
+                signal="NEUTRAL",
+                confidence=0.0,
+                reasoning=f"No hay oportunidad real de trading en este momento. {error_message}"
+            )
+        
+        return StrategyResult(
+            strategy_type=strategy_type_value,
+            signal=signal,
+            entry_price=entry_price,
+            stop_loss=stop_loss,
+            take_profit=take_profit,
+            confidence=confidence,
+            reasoning=reasoning
+        )
+
     def _extract_signal(self, response: str) -> str:
         response_lower = response.lower()
         if "long" in response_lower:
@@ -598,43 +851,47 @@ class AdvancedStrategiesService:
             confidence = 0.0
         return min(confidence, 1.0)
 
+    def _confluence_count(self, signal: str, technical_data: Dict[str, Any]) -> int:
+        """Número de indicadores (de 6) que confirman la dirección indicada."""
+        rsi_14 = technical_data.get('rsi_14', 50)
+        macd_direction = technical_data.get('macd_direction', 'NEUTRAL')
+        bb_position = technical_data.get('bb_position', 'MEDIA')
+        vwap_position = technical_data.get('vwap_position', 'EN_VWAP')
+        volume_ratio = technical_data.get('volume_ratio', 1.0)
+        atr = technical_data.get('atr', 0)
+        
+        if signal == "LONG":
+            # Para LONG: RSI en sobreventa REAL Y MACD alcista Y (precio cerca de banda inferior O bajo VWAP)
+            rsi_ok = rsi_14 < 30  # Más estricto: sobreventa real
+            macd_ok = macd_direction == "ALCISTA"
+            bb_ok = bb_position in ["INFERIOR", "MEDIA"]
+            vwap_ok = vwap_position == "BAJO_VWAP"
+        elif signal == "SHORT":
+            # Para SHORT: RSI en sobrecompra REAL Y MACD bajista Y (precio cerca de banda superior O sobre VWAP)
+            rsi_ok = rsi_14 > 70  # Más estricto: sobrecompra real
+            macd_ok = macd_direction == "BAJISTA"
+            bb_ok = bb_position in ["SUPERIOR", "MEDIA"]
+            vwap_ok = vwap_position == "SOBRE_VWAP"
+        else:
+            return 0
+        volume_ok = volume_ratio > 1.2  # Volumen superior al promedio
+        atr_ok = atr > 0  # ATR válido
+        return sum([rsi_ok, macd_ok, bb_ok, vwap_ok, volume_ok, atr_ok])
+
     def _validate_indicator_confluence(self, signal: str, technical_data: Dict[str, Any]) -> (bool, str):
         """Valida que los indicadores técnicos confirmen la dirección de la señal."""
         try:
-            rsi_14 = technical_data.get('rsi_14', 50)
-            macd_direction = technical_data.get('macd_direction', 'NEUTRAL')
-            bb_position = technical_data.get('bb_position', 'MEDIA')
-            vwap_position = technical_data.get('vwap_position', 'EN_VWAP')
-            volume_ratio = technical_data.get('volume_ratio', 1.0)
-            atr = technical_data.get('atr', 0)
-            
             if signal == "LONG":
-                # Para LONG: RSI en sobreventa REAL Y MACD alcista Y (precio cerca de banda inferior O bajo VWAP)
-                rsi_ok = rsi_14 < 30  # Más estricto: sobreventa real
-                macd_ok = macd_direction == "ALCISTA"
-                bb_ok = bb_position in ["INFERIOR", "MEDIA"]
-                vwap_ok = vwap_position == "BAJO_VWAP"
-                volume_ok = volume_ratio > 1.2  # Volumen superior al promedio
-                atr_ok = atr > 0  # ATR válido
-                
                 # Mínimo 3 de los 6 indicadores deben confirmar (más estricto)
-                confluence_count = sum([rsi_ok, macd_ok, bb_ok, vwap_ok, volume_ok, atr_ok])
+                confluence_count = self._confluence_count("LONG", technical_data)
                 if confluence_count >= 3:
                     return True, f"Confluencia válida: {confluence_count}/6 indicadores confirmando LONG"
                 else:
                     return False, f"Confluencia insuficiente: {confluence_count}/6 indicadores confirmando LONG (mínimo 3 requeridos)"
                     
             elif signal == "SHORT":
-                # Para SHORT: RSI en sobrecompra REAL Y MACD bajista Y (precio cerca de banda superior O sobre VWAP)
-                rsi_ok = rsi_14 > 70  # Más estricto: sobrecompra real
-                macd_ok = macd_direction == "BAJISTA"
-                bb_ok = bb_position in ["SUPERIOR", "MEDIA"]
-                vwap_ok = vwap_position == "SOBRE_VWAP"
-                volume_ok = volume_ratio > 1.2  # Volumen superior al promedio
-                atr_ok = atr > 0  # ATR válido
-                
                 # Mínimo 3 de los 6 indicadores deben confirmar (más estricto)
-                confluence_count = sum([rsi_ok, macd_ok, bb_ok, vwap_ok, volume_ok, atr_ok])
+                confluence_count = self._confluence_count("SHORT", technical_data)
                 if confluence_count >= 3:
                     return True, f"Confluencia válida: {confluence_count}/6 indicadores confirmando SHORT"
                 else:
@@ -783,26 +1040,26 @@ IMPORTANTE: Usa ÚNICAMENTE los datos técnicos que se te proporcionan a continu
 Datos técnicos actuales:
 {datos_tecnicos}
 
+CRITERIOS PARA SEÑAL VÁLIDA:
+- %K cruza %D desde zona de sobreventa (<20) = señal LONG
+- %K cruza %D desde zona de sobrecompra (>80) = señal SHORT
+- Divergencia entre precio y Estocástico
+- Confirmación con volumen
+
+NO generes señales si no hay evidencia clara en los datos proporcionados.
+NO inventes precios que no estén en los datos reales.
+
 INSTRUCCIONES ESPECÍFICAS:
 1. Analiza los datos proporcionados para detectar señales del Estocástico.
-2. Si NO hay una señal clara (no hay cruces, no está en zonas extremas, no hay divergencias), responde SOLO:
-   "No hay señal de entrada clara según el Estocástico en estos datos."
-
-3. Si SÍ hay una señal clara, responde en este formato exacto:
+2. Si SÍ hay una señal clara, responde en este formato exacto:
    - Dirección: LONG / SHORT
    - Señal técnica: [descripción de la señal]
    - Punto de entrada: $[precio basado en datos reales]
    - Stop loss: $[precio basado en datos reales]
    - Take profit: $[precio basado en datos reales]
 
-CRITERIOS PARA SEÑAL VÁLIDA:
-- %K cruza %D desde zona de sobreventa (<20) = señal LONG
-- %K cruza %D desde zona de sobrecompra (>80) = señal SHORT
-- Divergencia entre precio y Estocástico
-- Confirmación con volumen
-
-NO generes señales si no hay evidencia clara en los datos proporcionados.
-NO inventes precios que no estén en los datos reales.'''
+3. Si NO hay una señal clara (no hay cruces, no está en zonas extremas, no hay divergencias), responde SOLO:
+   "No hay señal de entrada clara según el Estocástico en estos datos."'''
 
     def _get_fvg_prompt(self) -> str:
         return '''Actúa como un analista técnico experto en scalping institucional utilizando Fair Value Gaps (FVG). Analiza el activo {activo} en el timeframe {timeframe}. A continuación se te proporcionan los datos técnicos recientes de velas: {datos_tecnicos}
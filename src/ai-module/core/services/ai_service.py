@@ -3,14 +3,21 @@ Servicio de IA para interacciones con OpenAI.
 Encapsula toda la lógica de generación de texto y manejo de prompts.
 """
 
+import os
+import json
 import logging
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, AsyncIterator, Tuple
 from dataclasses import dataclass
 from enum import Enum
 
 from ..config.security_config import SecurityConfig
 from .technical_indicators_service import TechnicalIndicatorsService
+from .completion_cache import CacheContext, CompletionCache
+from .llm_backends import BackendRouter, LocalLLMBackend, OpenAIBackend
+from .llm_governor import LLMGovernor, LLMGovernorSaturatedError
+from .prompt_compiler import prompt_compiler
+from .structured_output import MULTI_ANALYSIS_FUNCTION, MULTI_ANALYSIS_VALIDATOR, SchemaValidator
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +62,11 @@ class AIService:
     Implementa retry logic y rate limiting.
     """
     
+    # Límite de max_tokens por completion (costes) y reparto del modo batched
+    MAX_COMPLETION_TOKENS = 2000
+    BATCH_TOKENS_PER_SYMBOL = 180
+    BATCH_COMPARISON_TOKENS = 300
+    
     # Templates predefinidos para diferentes tipos de análisis
     ANALYSIS_TEMPLATE = AIPromptTemplate(
         system_prompt="""
@@ -233,6 +245,23 @@ Analiza el impacto macroeconómico en criptomonedas.
         """,
         instruction_template="Analiza el impacto macroeconómico: {instruction}"
     )
+
+    INTENT_TEMPLATE = AIPromptTemplate(
+        system_prompt="""
+Eres un asistente que clasifica solicitudes de trading de criptomonedas.
+Responde SOLO en JSON con los campos:
+- endpoint: "signal", "analyze", "generate" o "macro".
+- symbol: símbolo detectado (ej: "BTC", "ETH", "SOL") o null si no hay.
+- timeframe: timeframe detectado (ej: "1h", "5m", "1d") o null si no hay.
+
+Ejemplo de entrada: "dame una señal de bitcoin en 5 minutos"
+Ejemplo de salida: {"endpoint": "signal", "symbol": "BTC", "timeframe": "5m"}
+        """,
+        context_template='Mensaje del usuario: "{message}"',
+        instruction_template="{instruction}"
+    )
+    
+    INTENT_ENDPOINTS = ("signal", "analyze", "generate", "macro")
     
     def __init__(self):
         self.default_model = ModelType.GPT_3_5_TURBO
@@ -262,8 +291,78 @@ Analiza el impacto macroeconómico en criptomonedas.
             timeout=SecurityConfig.OPENAI_TIMEOUT
         )
         
+        # Caché de completions (nivel semántico opcional para consultas libres)
+        semantic_enabled = os.getenv("AI_SEMANTIC_CACHE_ENABLED", "false").lower() == "true"
+        self.embedding_model = os.getenv("AI_EMBEDDING_MODEL", "text-embedding-3-small")
+        self.completion_cache = CompletionCache(
+            embedder=self._embed_text if semantic_enabled else None
+        )
+        
+        # Concurrencia, ritmo (RPM/TPM) y prioridad de todas las llamadas al LLM
+        self.governor = LLMGovernor()
+        
+        # Backends por tipo de tarea (las tareas baratas pueden ir a un modelo local)
+        self.backends = BackendRouter({
+            "openai": OpenAIBackend(self._generate_completion_with_retry, self.default_model.value),
+            "local": LocalLLMBackend()
+        })
+        
+        # Límite de completions simultáneas en el análisis múltiple concurrente
+        self.multi_analysis_semaphore = asyncio.Semaphore(int(os.getenv("AI_MULTI_ANALYSIS_CONCURRENCY", "12")))
+        
+        # Métricas de salida estructurada
+        self.structured_requests = 0
+        self.structured_retries = 0
+        self.structured_failures = 0
+        
         logger.info("AI Service inicializado correctamente")
     
+    async def _embed_text(self, text: str) -> List[float]:
+        """Embedding de un texto para la caché semántica."""
+        response = await self.async_client.embeddings.create(model=self.embedding_model, input=text)
+        return response.data[0].embedding
+    
+    async def _cached_completion(
+        self,
+        messages: List[Dict[str, str]],
+        cache_context: Optional[CacheContext],
+        task: Optional[str] = None,
+        **kwargs
+    ) -> str:
+        """
+        Completion a través de la caché si hay contexto de caché.
+        
+        Con `task` la llamada la resuelve el backend enrutado para ese tipo de tarea.
+        """
+        if task is None:
+            generate = lambda: self._generate_completion_with_retry(messages, **kwargs)
+            model = self._validate_completion_params(**kwargs)['model']
+            answered_by = None
+        else:
+            # Si el backend de la tarea falla responde el de respaldo: la
+            # respuesta se cachea bajo el modelo que la generó de verdad
+            answered = {}
+            
+            async def generate() -> str:
+                result, used = await self.backends.complete_with_backend(task, messages, **kwargs)
+                answered["model"] = self._backend_cache_model(used, **kwargs)
+                return result
+            
+            model = self._backend_cache_model(self.backends.backend_for(task), **kwargs)
+            answered_by = lambda: answered["model"]
+        
+        if cache_context is None:
+            return await generate()
+        return await self.completion_cache.get_or_generate(
+            model, cache_context, messages, generate, answered_by=answered_by
+        )
+    
+    def _backend_cache_model(self, backend, **kwargs) -> str:
+        """Modelo con el que se cachean las respuestas de un backend."""
+        if backend.name == self.backends.default:
+            return self._validate_completion_params(**kwargs)['model']
+        return f"{backend.name}:{backend.model}"
+    
     def _validate_completion_params(self, **kwargs) -> Dict[str, Any]:
         """Validar y sanitizar parámetros de completion."""
         safe_params = {}
@@ -287,7 +386,7 @@ Analiza el impacto macroeconómico en criptomonedas.
         
         # Max tokens (limitar para evitar costos excesivos)
         max_tokens = kwargs.get('max_tokens', 500)
-        safe_params['max_tokens'] = max(50, min(2000, int(max_tokens)))
+        safe_params['max_tokens'] = max(50, min(self.MAX_COMPLETION_TOKENS, int(max_tokens)))
         
         # Top P
         top_p = kwargs.get('top_p', 1.0)
@@ -303,27 +402,57 @@ Analiza el impacto macroeconómico en criptomonedas.
         
         return safe_params
     
+    @staticmethod
+    def _is_rate_limited(error: Exception) -> bool:
+        return getattr(error, "status_code", None) == 429
+    
+    def _estimate_tokens(self, safe_params: Dict[str, Any]) -> int:
+        """Tokens previstos de una llamada (prompt + máximo de respuesta) para el gobernador."""
+        return prompt_compiler.count_messages(safe_params['messages']) + safe_params['max_tokens']
+    
     async def _generate_completion_with_retry(
         self, 
         messages: List[Dict[str, str]], 
+        function: Optional[Dict[str, Any]] = None,
         **kwargs
     ) -> str:
-        """Generar completion con retry logic."""
+        """
+        Generar completion con retry logic.
+        
+        Con `function` se fuerza la llamada a esa función (function-calling) y se
+        devuelven sus argumentos JSON en lugar del texto del mensaje.
+        """
         if not self.async_client:
             raise RuntimeError("Cliente OpenAI no disponible")
         
         safe_params = self._validate_completion_params(**kwargs)
         safe_params['messages'] = messages
+        if function is not None:
+            safe_params['tools'] = [{"type": "function", "function": function}]
+            safe_params['tool_choice'] = {"type": "function", "function": {"name": function["name"]}}
         
+        estimated_tokens = self._estimate_tokens(safe_params)
         last_error = None
         
         for attempt in range(self.max_retries):
             try:
                 logger.debug(f"Intento {attempt + 1} de completion con modelo {safe_params['model']}")
                 
-                response: ChatCompletion = await self.async_client.chat.completions.create(**safe_params)
+                async with self.governor.slot(estimated_tokens) as slot:
+                    try:
+                        response: ChatCompletion = await self.async_client.chat.completions.create(**safe_params)
+                    except Exception as e:
+                        slot.record(rate_limited=self._is_rate_limited(e))
+                        raise
+                    if getattr(response, "usage", None):
+                        slot.record(tokens_used=response.usage.total_tokens)
                 
                 if response.choices and len(response.choices) > 0:
+                    if function is not None:
+                        tool_calls = response.choices[0].message.tool_calls
+                        if tool_calls and tool_calls[0].function.arguments:
+                            return tool_calls[0].function.arguments
+                        raise ValueError("OpenAI no devolvió la llamada a la función")
                     content = response.choices[0].message.content
                     if content and content.strip():
                         logger.debug(f"Completion exitoso en intento {attempt + 1}")
@@ -331,6 +460,9 @@ Analiza el impacto macroeconómico en criptomonedas.
                 
                 raise ValueError("Respuesta vacía de OpenAI")
                 
+            except LLMGovernorSaturatedError:
+                # Reintentar solo alargaría la cola
+                raise
             except Exception as e:
                 last_error = e
                 logger.warning(f"Error en intento {attempt + 1}: {str(e)}")
@@ -342,6 +474,112 @@ Analiza el impacto macroeconómico en criptomonedas.
         logger.error(f"Todos los intentos de completion fallaron. Último error: {last_error}")
         raise RuntimeError(f"No se pudo generar completion después de {self.max_retries} intentos: {last_error}")
     
+    async def stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        cache_context: Optional[CacheContext] = None,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Generar completion en streaming, devolviendo los fragmentos según llegan.
+        
+        Solo se reintenta si el error ocurre antes del primer fragmento. Una
+        respuesta cacheada se devuelve como un único fragmento.
+        """
+        if not self.async_client:
+            raise RuntimeError("Cliente OpenAI no disponible")
+        
+        for msg in messages:
+            if not isinstance(msg, dict) or 'role' not in msg or 'content' not in msg:
+                raise ValueError("Formato de mensaje inválido")
+        
+        safe_params = self._validate_completion_params(**kwargs)
+        
+        if cache_context is not None:
+            cached = self.completion_cache.lookup(safe_params['model'], cache_context, messages)
+            if cached is not None:
+                yield cached
+                return
+        
+        safe_params['messages'] = messages
+        estimated_tokens = self._estimate_tokens(safe_params)
+        parts: List[str] = []
+        last_error = None
+        
+        for attempt in range(self.max_retries):
+            try:
+                # El permiso se mantiene mientras dura el stream
+                async with self.governor.slot(estimated_tokens) as slot:
+                    try:
+                        stream = await self.async_client.chat.completions.create(stream=True, **safe_params)
+                    except Exception as e:
+                        slot.record(rate_limited=self._is_rate_limited(e))
+                        raise
+                    async for chunk in stream:
+                        if not chunk.choices:
+                            continue
+                        content = chunk.choices[0].delta.content
+                        if content:
+                            parts.append(content)
+                            yield content
+                break
+            except LLMGovernorSaturatedError:
+                raise
+            except Exception as e:
+                if parts:
+                    # Ya se enviaron fragmentos al cliente: no se puede reintentar
+                    logger.error(f"Streaming interrumpido tras {len(parts)} fragmentos: {e}")
+                    raise
+                last_error = e
+                logger.warning(f"Error en intento {attempt + 1} de streaming: {str(e)}")
+                if attempt < self.max_retries - 1:
+                    await asyncio.sleep(self.retry_delay * (2 ** attempt))
+        
+        response = "".join(parts).strip()
+        if not response:
+            raise RuntimeError(f"No se pudo generar completion en streaming: {last_error or 'respuesta vacía'}")
+        
+        if cache_context is not None:
+            self.completion_cache.store(safe_params['model'], cache_context, messages, response)
+    
+    def _build_analysis_request(
+        self,
+        symbol: str,
+        price: float,
+        timeframes: List[str],
+        user_prompt: str = "",
+        **kwargs
+    ) -> Tuple[List[Dict[str, str]], CacheContext]:
+        """Mensajes y contexto de caché para un análisis de criptomoneda."""
+        from datetime import datetime
+        
+        context = {
+            "symbol": symbol,
+            "price": price,
+            "timeframes": ", ".join(timeframes),
+            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
+        }
+        
+        instruction = user_prompt if user_prompt else "Proporciona un análisis técnico completo"
+        messages = self.ANALYSIS_TEMPLATE.format(context, instruction)
+        
+        # El timestamp del prompt no forma parte de la clave: basta con la vela de
+        # cada timeframe. El precio va con precisión completa porque el texto lo cita
+        cache_context = CacheContext(
+            template="analysis",
+            symbol=symbol,
+            timeframe=timeframes[0] if timeframes else None,
+            timeframes=list(timeframes) or None,
+            fingerprint=CompletionCache.fingerprint({
+                "price": float(price),
+                "timeframes": timeframes,
+                "instruction": CompletionCache.normalize_text(instruction),
+                "max_tokens": kwargs.get("max_tokens"),
+                "temperature": kwargs.get("temperature")
+            }, significant_digits=None)
+        )
+        return messages, cache_context
+    
     async def generate_crypto_analysis(
         self, 
         symbol: str, 
@@ -363,19 +601,155 @@ Analiza el impacto macroeconómico en criptomonedas.
         Returns:
             Análisis generado
         """
-        from datetime import datetime
+        messages, cache_context = self._build_analysis_request(symbol, price, timeframes, user_prompt, **kwargs)
+        return await self._cached_completion(messages, cache_context, **kwargs)
+    
+    def stream_crypto_analysis(
+        self,
+        symbol: str,
+        price: float,
+        timeframes: List[str],
+        user_prompt: str = "",
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """Versión en streaming de `generate_crypto_analysis`."""
+        messages, cache_context = self._build_analysis_request(symbol, price, timeframes, user_prompt, **kwargs)
+        return self.stream_completion(messages, cache_context, **kwargs)
+    
+    async def generate_multi_symbol_analysis(
+        self,
+        prices: Dict[str, float],
+        timeframe: str,
+        compare: bool = True,
+        mode: str = "concurrent",
+        **kwargs
+    ) -> Tuple[Dict[str, str], Optional[str]]:
+        """
+        Analizar varios símbolos con un único tiempo de espera del LLM.
         
-        context = {
-            "symbol": symbol,
-            "price": price,
-            "timeframes": ", ".join(timeframes),
-            "timestamp": datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
-        }
+        Modos:
+            concurrent: una completion por símbolo en paralelo (limitadas por
+                        AI_MULTI_ANALYSIS_CONCURRENCY) junto con la comparativa.
+            batched: una sola completion estructurada con todos los símbolos y
+                     la comparativa; la salida JSON se reparte por símbolo.
         
-        instruction = user_prompt if user_prompt else "Proporciona un análisis técnico completo"
-        messages = self.ANALYSIS_TEMPLATE.format(context, instruction)
+        Args:
+            prices: Precio actual de cada símbolo a analizar
+            timeframe: Timeframe común
+            compare: Generar el análisis comparativo
+            mode: "concurrent" o "batched"
+            **kwargs: Parámetros adicionales para el modelo
         
-        return await self._generate_completion_with_retry(messages, **kwargs)
+        Returns:
+            (análisis por símbolo, análisis comparativo o None)
+        """
+        if mode == "batched":
+            return await self._batched_multi_analysis(prices, timeframe, compare, **kwargs)
+        
+        kwargs.setdefault("max_tokens", 400)
+        
+        async def _analyze(symbol: str, price: float) -> str:
+            async with self.multi_analysis_semaphore:
+                return await self.generate_crypto_analysis(
+                    symbol=symbol,
+                    price=price,
+                    timeframes=[timeframe],
+                    user_prompt=f"Análisis para comparación múltiple. Timeframe: {timeframe}",
+                    **kwargs
+                )
+        
+        async def _compare() -> Optional[str]:
+            if not compare:
+                return None
+            # La comparativa solo depende de los precios: se genera a la vez que los análisis
+            async with self.multi_analysis_semaphore:
+                return await self._comparative_analysis(prices, timeframe)
+        
+        symbols = list(prices)
+        results = await asyncio.gather(_compare(), *[_analyze(s, prices[s]) for s in symbols])
+        return dict(zip(symbols, results[1:])), results[0]
+    
+    async def _comparative_analysis(self, prices: Dict[str, float], timeframe: str) -> str:
+        """Análisis comparativo de varios activos en una completion de texto."""
+        symbols_data = ", ".join(f"{symbol}: ${price:,.2f}" for symbol, price in prices.items())
+        comparative_prompt = f"""
+        Compara los siguientes activos: {symbols_data}
+        Timeframe: {timeframe}
+        Proporciona un análisis comparativo conciso destacando fortalezas y debilidades relativas.
+        """
+        return await self.generate_custom_completion([
+            {"role": "user", "content": comparative_prompt}
+        ], max_tokens=500)
+    
+    async def _batched_multi_analysis(
+        self,
+        prices: Dict[str, float],
+        timeframe: str,
+        compare: bool,
+        **kwargs
+    ) -> Tuple[Dict[str, str], Optional[str]]:
+        """
+        Análisis múltiple en una sola completion estructurada.
+        
+        Si la salida de todos los símbolos no cabe en MAX_COMPLETION_TOKENS
+        (el JSON quedaría truncado), se reparte en lotes concurrentes y la
+        comparativa se genera en su propia llamada.
+        """
+        needed = self.BATCH_TOKENS_PER_SYMBOL * len(prices) + (self.BATCH_COMPARISON_TOKENS if compare else 0)
+        if needed > self.MAX_COMPLETION_TOKENS:
+            per_chunk = self.MAX_COMPLETION_TOKENS // self.BATCH_TOKENS_PER_SYMBOL
+            symbols = list(prices)
+            chunks = [
+                {symbol: prices[symbol] for symbol in symbols[i:i + per_chunk]}
+                for i in range(0, len(symbols), per_chunk)
+            ]
+            tasks = [self._batched_multi_analysis(chunk, timeframe, False, **kwargs) for chunk in chunks]
+            if compare:
+                tasks.append(self._comparative_analysis(prices, timeframe))
+            results = await asyncio.gather(*tasks)
+            analyses: Dict[str, str] = {}
+            for chunk_analyses, _ in results[:len(chunks)]:
+                analyses.update(chunk_analyses)
+            return analyses, results[-1] if compare else None
+        
+        symbols_data = "\n".join(f"- {symbol}: ${price:,.2f}" for symbol, price in prices.items())
+        comparison = (
+            "En comparative_analysis compara los activos destacando fortalezas y debilidades relativas."
+            if compare else "Deja comparative_analysis a null."
+        )
+        messages = [
+            {"role": "system", "content": "Eres un analista experto en criptomonedas con amplia experiencia en análisis técnico."},
+            {"role": "user", "content": (
+                f"Timeframe: {timeframe}\nActivos y precio actual:\n{symbols_data}\n\n"
+                "Para cada activo escribe un análisis breve con: dirección (ALCISTA/BAJISTA/LATERAL), "
+                "soporte y resistencia coherentes con el precio actual y escenario probable. "
+                f"{comparison} Responde llamando a la función {MULTI_ANALYSIS_FUNCTION['name']}."
+            )}
+        ]
+        cache_context = CacheContext(
+            template="multi-analysis",
+            timeframe=timeframe,
+            fingerprint=CompletionCache.fingerprint({
+                "prices": {symbol: float(price) for symbol, price in prices.items()},
+                "compare": compare
+            }, significant_digits=None)
+        )
+        kwargs.setdefault("max_tokens", needed)
+        payload = await self.generate_structured_completion(
+            messages, MULTI_ANALYSIS_FUNCTION, MULTI_ANALYSIS_VALIDATOR, cache_context=cache_context, **kwargs
+        )
+        
+        by_symbol = {item["symbol"].upper(): item["analysis"] for item in payload["analyses"]}
+        analyses = {symbol: by_symbol[symbol.upper()] for symbol in prices if symbol.upper() in by_symbol}
+        missing = [symbol for symbol in prices if symbol not in analyses]
+        if missing:
+            # El modelo omitió algún símbolo: completarlo por separado
+            logger.warning(f"Análisis múltiple sin resultado para {missing}, generando individualmente")
+            extra, _ = await self.generate_multi_symbol_analysis(
+                {symbol: prices[symbol] for symbol in missing}, timeframe, compare=False
+            )
+            analyses.update(extra)
+        return analyses, payload["comparative_analysis"] if compare else None
     
     async def generate_trading_signal(
         self,
@@ -518,11 +892,56 @@ Analiza el impacto macroeconómico en criptomonedas.
         instruction = "Generar señal de trading con análisis técnico comprensivo basado en múltiples estrategias"
         messages = self.SIGNAL_TEMPLATE.format(signal_context, instruction)
         
-        return await self._generate_completion_with_retry(messages, **kwargs)
+        # Misma vela, mismo precio y mismos niveles => misma señal. Sin redondeo:
+        # la explicación cita entrada, stop loss y take profit literalmente
+        cache_context = CacheContext(
+            template=f"signal:{strategy}",
+            symbol=symbol,
+            timeframe=timeframe,
+            fingerprint=CompletionCache.fingerprint({
+                "price": float(price),
+                "direction": signal_direction,
+                "confidence": confidence,
+                "levels": [float(level) for level in (entry_price, stop_loss, tp1, tp2)],
+                "context": CompletionCache.normalize_text(context)
+            }, significant_digits=None)
+        )
+        # Los niveles ya están calculados: el LLM solo redacta la explicación
+        return await self._cached_completion(messages, cache_context, task="signal_explanation", **kwargs)
+    
+    async def classify_intent(self, message: str) -> Dict[str, Any]:
+        """
+        Clasificar la intención de un mensaje del bot (endpoint, símbolo y timeframe).
+        
+        Tarea barata enrutada al backend "intent"; si la respuesta no es un JSON
+        válido se devuelve "analyze" sin símbolo ni timeframe.
+        """
+        messages = self.INTENT_TEMPLATE.format({"message": message}, "Clasifica el mensaje.")
+        cache_context = CacheContext(
+            template="intent",
+            timeframe="1d",  # La intención de un mensaje no depende del mercado
+            fingerprint=CompletionCache.fingerprint({"message": CompletionCache.normalize_text(message)})
+        )
+        intent = {"endpoint": "analyze", "symbol": None, "timeframe": None}
+        try:
+            raw = await self._cached_completion(
+                messages, cache_context, task="intent", temperature=0.0, max_tokens=60
+            )
+            parsed = json.loads(raw[raw.find("{"):raw.rfind("}") + 1])
+            if parsed.get("endpoint") in self.INTENT_ENDPOINTS:
+                intent["endpoint"] = parsed["endpoint"]
+            for field in ("symbol", "timeframe"):
+                if isinstance(parsed.get(field), str) and parsed[field].strip():
+                    intent[field] = parsed[field].strip().upper() if field == "symbol" else parsed[field].strip()
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"Clasificación de intención no válida: {e}")
+        intent["user_prompt"] = message
+        return intent
     
     async def generate_custom_completion(
         self,
         messages: List[Dict[str, str]],
+        cache_context: Optional[CacheContext] = None,
         **kwargs
     ) -> str:
         """
@@ -530,6 +949,7 @@ Analiza el impacto macroeconómico en criptomonedas.
         
         Args:
             messages: Lista de mensajes para el chat
+            cache_context: Contexto de caché opcional; sin él no se cachea
             **kwargs: Parámetros adicionales para el modelo
         
         Returns:
@@ -540,7 +960,79 @@ Analiza el impacto macroeconómico en criptomonedas.
             if not isinstance(msg, dict) or 'role' not in msg or 'content' not in msg:
                 raise ValueError("Formato de mensaje inválido")
         
-        return await self._generate_completion_with_retry(messages, **kwargs)
+        return await self._cached_completion(messages, cache_context, **kwargs)
+    
+    async def generate_structured_completion(
+        self,
+        messages: List[Dict[str, str]],
+        function: Dict[str, Any],
+        validator: SchemaValidator,
+        cache_context: Optional[CacheContext] = None,
+        **kwargs
+    ) -> Dict[str, Any]:
+        """
+        Generar una respuesta estructurada mediante function-calling.
+        
+        El modelo está obligado a llamar a `function`, cuyo esquema define la
+        respuesta; los argumentos se validan con `validator`. Si no cumplen el
+        esquema se reintenta una sola vez indicando los errores al modelo.
+        Solo se cachean respuestas válidas.
+        
+        Args:
+            messages: Lista de mensajes para el chat
+            function: Definición de la función (name, description, parameters)
+            validator: Validador compilado del esquema de `parameters`
+            cache_context: Contexto de caché opcional; sin él no se cachea
+            **kwargs: Parámetros adicionales para el modelo
+        
+        Returns:
+            Payload validado
+        """
+        for msg in messages:
+            if not isinstance(msg, dict) or 'role' not in msg or 'content' not in msg:
+                raise ValueError("Formato de mensaje inválido")
+        
+        async def _generate() -> str:
+            self.structured_requests += 1
+            attempt_messages = messages
+            for attempt in range(2):
+                arguments = await self._generate_completion_with_retry(attempt_messages, function=function, **kwargs)
+                try:
+                    validator.parse(arguments)
+                    return arguments
+                except ValueError as e:
+                    error = e
+                    logger.warning(f"Respuesta estructurada inválida (intento {attempt + 1}): {e}")
+                if attempt == 0:
+                    self.structured_retries += 1
+                    # El intento fallido vuelve como llamada a la función y el
+                    # error como su resultado, tal como espera el function-calling
+                    repair_call_id = f"call_{function['name']}_0"
+                    attempt_messages = messages + [
+                        {
+                            "role": "assistant",
+                            "content": None,
+                            "tool_calls": [{
+                                "id": repair_call_id,
+                                "type": "function",
+                                "function": {"name": function["name"], "arguments": arguments}
+                            }]
+                        },
+                        {
+                            "role": "tool",
+                            "tool_call_id": repair_call_id,
+                            "content": f"La respuesta no cumple el esquema: {error}. Vuelve a llamar a la función corrigiéndola."
+                        }
+                    ]
+            self.structured_failures += 1
+            raise ValueError(f"Respuesta estructurada inválida: {error}")
+        
+        if cache_context is None:
+            arguments = await _generate()
+        else:
+            model = self._validate_completion_params(**kwargs)['model']
+            arguments = await self.completion_cache.get_or_generate(model, cache_context, messages, _generate)
+        return validator.parse(arguments)
     
     async def generate_fundamental_analysis(
         self,
@@ -714,5 +1206,14 @@ Analiza el impacto macroeconómico en criptomonedas.
             "model": self.default_model.value,
             "max_retries": self.max_retries,
             "timeout": SecurityConfig.OPENAI_TIMEOUT,
-            "backend_integration": "enabled"
+            "backend_integration": "enabled",
+            "completion_cache": self.completion_cache.get_stats(),
+            "prompt_compiler": prompt_compiler.get_stats(),
+            "governor": self.governor.get_stats(),
+            "llm_backends": self.backends.get_status(),
+            "structured_output": {
+                "requests": self.structured_requests,
+                "retries": self.structured_retries,
+                "failures": self.structured_failures
+            }
         } 
\ No newline at end of file
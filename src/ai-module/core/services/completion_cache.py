@@ -0,0 +1,361 @@
+"""
+Caché de completions del LLM.
+Evita repetir llamadas a OpenAI cuando varios usuarios piden el mismo análisis
+(mismo símbolo, timeframe y vela) con dos niveles:
+
+- Exacto: clave por (modelo, plantilla, símbolo, timeframe, vela, huella de indicadores).
+- Semántico (opcional): similitud de embeddings para consultas libres de /prompt.
+"""
+
+import os
+import json
+import math
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Duración de cada timeframe en segundos
+TIMEFRAME_SECONDS = {
+    "1m": 60, "3m": 180, "5m": 300, "15m": 900, "30m": 1800,
+    "1h": 3600, "2h": 7200, "4h": 14400, "6h": 21600, "8h": 28800,
+    "12h": 43200, "1d": 86400, "3d": 259200, "1w": 604800, "1M": 2592000
+}
+
+
+@dataclass
+class CacheContext:
+    """Contexto que identifica una completion cacheable."""
+    template: str
+    symbol: Optional[str] = None
+    timeframe: Optional[str] = None
+    fingerprint: str = ""
+    # Texto libre de la consulta para el nivel semántico (solo /prompt)
+    query: Optional[str] = None
+    # Varios timeframes (análisis multi-timeframe): la entrada caduca con el
+    # primer cierre de vela de cualquiera de ellos
+    timeframes: Optional[List[str]] = None
+
+    @property
+    def candle_timeframes(self) -> Union[str, List[str], None]:
+        return self.timeframes or self.timeframe
+
+
+@dataclass
+class _CacheEntry:
+    response: str
+    expires_at: float
+    size: int
+    created_at: float = field(default_factory=time.time)
+
+
+@dataclass
+class _SemanticEntry:
+    # Embedding normalizado (norma 1): el coseno es un producto escalar
+    embedding: np.ndarray
+    response: str
+    expires_at: float
+
+
+class CompletionCache:
+    """
+    Caché LRU de completions con TTL ligado al cierre de la vela.
+
+    La clave incluye el bucket de vela (`now // duración_timeframe`), así que una
+    entrada deja de ser válida cuando cierra la vela del timeframe analizado.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = None,
+        max_bytes: int = None,
+        max_ttl: int = None,
+        embedder: Optional[Callable[[str], Awaitable[List[float]]]] = None,
+        similarity_threshold: float = None,
+        max_semantic_entries: int = None
+    ):
+        self.max_entries = max_entries or int(os.getenv("AI_CACHE_MAX_ENTRIES", "2000"))
+        self.max_bytes = max_bytes or int(os.getenv("AI_CACHE_MAX_BYTES", str(20 * 1024 * 1024)))
+        self.max_ttl = max_ttl or int(os.getenv("AI_CACHE_MAX_TTL", "3600"))
+        self.default_timeframe = "1h"
+
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold or float(os.getenv("AI_SEMANTIC_CACHE_THRESHOLD", "0.95"))
+        self.max_semantic_entries = max_semantic_entries or int(os.getenv("AI_SEMANTIC_CACHE_MAX_ENTRIES", "500"))
+
+        self._entries: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._semantic: Dict[str, "OrderedDict[str, _SemanticEntry]"] = {}
+        self._bytes = 0
+
+        self.hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # ========================================
+    # CLAVES
+    # ========================================
+
+    @staticmethod
+    def normalize_text(text: str) -> str:
+        """Normalizar texto libre (minúsculas y espacios colapsados)."""
+        return " ".join((text or "").lower().split())
+
+    @staticmethod
+    def fingerprint(values: Any, significant_digits: Optional[int] = 3) -> str:
+        """
+        Huella estable de un conjunto de valores (p.ej. indicadores).
+        Los floats se redondean a `significant_digits` cifras significativas
+        para que variaciones mínimas dentro de la vela no cambien la huella.
+        Con `significant_digits=None` se usan con precisión completa: es lo
+        necesario para precios y niveles que el texto generado cita literalmente.
+        """
+        def _round(value: Any) -> Any:
+            if isinstance(value, bool) or value is None:
+                return value
+            if isinstance(value, float) and significant_digits is not None:
+                if value == 0 or math.isnan(value) or math.isinf(value):
+                    return 0.0 if value == 0 else str(value)
+                digits = significant_digits - int(math.floor(math.log10(abs(value)))) - 1
+                return round(value, digits)
+            if isinstance(value, dict):
+                return {str(k): _round(v) for k, v in value.items()}
+            if isinstance(value, (list, tuple)):
+                return [_round(v) for v in value]
+            return value
+
+        payload = json.dumps(_round(values), sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+    def _timeframe_seconds(self, timeframe: Optional[str]) -> int:
+        return TIMEFRAME_SECONDS.get(timeframe or self.default_timeframe, TIMEFRAME_SECONDS[self.default_timeframe])
+
+    def _bucket_and_ttl(self, timeframes: Union[str, Sequence[str], None]) -> Tuple[str, float]:
+        """
+        Bucket de vela actual y segundos hasta su cierre (limitado a max_ttl).
+
+        Con varios timeframes el bucket combina el de cada uno y el TTL llega
+        hasta el primer cierre de vela.
+        """
+        if isinstance(timeframes, str) or timeframes is None:
+            timeframes = [timeframes]
+        now = time.time()
+        buckets = []
+        remaining = float(self.max_ttl)
+        for timeframe in timeframes or [None]:
+            seconds = self._timeframe_seconds(timeframe)
+            bucket = int(now // seconds)
+            buckets.append(str(bucket))
+            remaining = min(remaining, (bucket + 1) * seconds - now)
+        return "-".join(buckets), remaining
+
+    def build_key(self, model: str, context: CacheContext, messages: List[Dict[str, str]] = None) -> str:
+        """Construir la clave exacta de caché."""
+        bucket, _ = self._bucket_and_ttl(context.candle_timeframes)
+        parts = [
+            model,
+            context.template,
+            (context.symbol or "").upper(),
+            ",".join(context.timeframes) if context.timeframes else context.timeframe or "",
+            bucket,
+            context.fingerprint
+        ]
+        if messages is not None:
+            parts.append(self.fingerprint([[m.get("role"), self.normalize_text(m.get("content", ""))] for m in messages]))
+        return "|".join(parts)
+
+    def _semantic_scope(self, model: str, context: CacheContext) -> str:
+        bucket, _ = self._bucket_and_ttl(context.candle_timeframes)
+        return "|".join([model, context.template, (context.symbol or "").upper(), bucket, context.fingerprint])
+
+    # ========================================
+    # NIVEL EXACTO
+    # ========================================
+
+    def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at <= time.time():
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry.response
+
+    def set(self, key: str, response: str, timeframe: Union[str, Sequence[str], None] = None) -> None:
+        _, ttl = self._bucket_and_ttl(timeframe)
+        if ttl <= 0:
+            return
+        if key in self._entries:
+            self._remove(key)
+        size = len(response.encode("utf-8"))
+        self._entries[key] = _CacheEntry(response=response, expires_at=time.time() + ttl, size=size)
+        self._bytes += size
+        self._evict()
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry:
+            self._bytes -= entry.size
+
+    def _evict(self) -> None:
+        now = time.time()
+        # Primero las entradas caducadas, después por LRU
+        for key in [k for k, e in self._entries.items() if e.expires_at <= now]:
+            self._remove(key)
+        while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self.evictions += 1
+
+    # ========================================
+    # NIVEL SEMÁNTICO
+    # ========================================
+
+    @staticmethod
+    def _normalize(embedding: Sequence[float]) -> Optional[np.ndarray]:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    @staticmethod
+    def _best_match(query: np.ndarray, entries: List[Tuple[str, _SemanticEntry]]) -> Tuple[Optional[str], float]:
+        """Entrada más similar (coseno) en una sola multiplicación matriz-vector."""
+        matrix = np.stack([entry.embedding for _, entry in entries])
+        scores = matrix @ query
+        best = int(np.argmax(scores))
+        return entries[best][0], float(scores[best])
+
+    async def _semantic_lookup(self, scope: str, query: str) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        entries = self._semantic.get(scope)
+        try:
+            embedding = self._normalize(await self.embedder(self.normalize_text(query)))
+        except Exception as e:
+            logger.warning(f"Error generando embedding para caché semántica: {e}")
+            return None, None
+
+        if embedding is None or not entries:
+            return None, embedding
+
+        now = time.time()
+        for key in [k for k, e in entries.items() if e.expires_at <= now]:
+            del entries[key]
+        if not entries:
+            return None, embedding
+
+        best_key, best_score = self._best_match(embedding, list(entries.items()))
+        if best_score >= self.similarity_threshold:
+            entries.move_to_end(best_key)
+            return entries[best_key].response, embedding
+        return None, embedding
+
+    def _semantic_store(self, scope: str, key: str, embedding: np.ndarray, response: str,
+                        timeframe: Union[str, Sequence[str], None]) -> None:
+        _, ttl = self._bucket_and_ttl(timeframe)
+        entries = self._semantic.setdefault(scope, OrderedDict())
+        entries[key] = _SemanticEntry(
+            embedding=embedding,
+            response=response,
+            expires_at=time.time() + ttl
+        )
+        while len(entries) > self.max_semantic_entries:
+            entries.popitem(last=False)
+            self.evictions += 1
+        # Eliminar scopes de velas ya cerradas
+        now = time.time()
+        for stale in [s for s, e in self._semantic.items() if s != scope and all(v.expires_at <= now for v in e.values())]:
+            del self._semantic[stale]
+
+    # ========================================
+    # API PRINCIPAL
+    # ========================================
+
+    async def get_or_generate(
+        self,
+        model: str,
+        context: CacheContext,
+        messages: List[Dict[str, str]],
+        generate: Callable[[], Awaitable[str]],
+        answered_by: Optional[Callable[[], str]] = None
+    ) -> str:
+        """
+        Devolver la completion cacheada o generarla y guardarla.
+
+        Args:
+            model: Modelo que genera la respuesta
+            context: Contexto de caché (plantilla, símbolo, timeframe, huella)
+            messages: Mensajes enviados al modelo (forman parte de la clave exacta
+                      salvo en plantillas estructuradas, donde basta la huella)
+            generate: Corrutina que produce la completion en caso de fallo
+            answered_by: Devuelve, tras `generate`, el modelo que respondió si
+                         puede diferir de `model` (respaldo entre backends); la
+                         respuesta se guarda bajo la clave de ese modelo
+        """
+        key = self.build_key(model, context, messages if context.query is not None else None)
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.debug(f"Completion servida desde caché ({context.template} {context.symbol} {context.timeframe})")
+            return cached
+
+        embedding = None
+        scope = None
+        if self.embedder and context.query:
+            scope = self._semantic_scope(model, context)
+            cached, embedding = await self._semantic_lookup(scope, context.query)
+            if cached is not None:
+                self.semantic_hits += 1
+                self.set(key, cached, context.candle_timeframes)
+                return cached
+
+        self.misses += 1
+        response = await generate()
+        if answered_by is not None and answered_by() != model:
+            model = answered_by()
+            key = self.build_key(model, context, messages if context.query is not None else None)
+            scope = self._semantic_scope(model, context) if scope is not None else None
+        self.set(key, response, context.candle_timeframes)
+        if embedding is not None and scope is not None:
+            self._semantic_store(scope, key, embedding, response, context.candle_timeframes)
+        return response
+
+    def lookup(self, model: str, context: CacheContext, messages: List[Dict[str, str]]) -> Optional[str]:
+        """Consulta solo del nivel exacto (para respuestas en streaming)."""
+        cached = self.get(self.build_key(model, context, messages if context.query is not None else None))
+        if cached is not None:
+            self.hits += 1
+        return cached
+
+    def store(self, model: str, context: CacheContext, messages: List[Dict[str, str]], response: str) -> None:
+        """Guardar una respuesta generada fuera de `get_or_generate` (streaming)."""
+        self.misses += 1
+        key = self.build_key(model, context, messages if context.query is not None else None)
+        self.set(key, response, context.candle_timeframes)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._semantic.clear()
+        self._bytes = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de la caché."""
+        total = self.hits + self.semantic_hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "semantic_enabled": self.embedder is not None,
+            "semantic_entries": sum(len(e) for e in self._semantic.values()),
+            "hits": self.hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.semantic_hits) / total, 4) if total else 0.0
+        }
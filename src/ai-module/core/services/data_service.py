@@ -3,14 +3,17 @@ Servicio de datos para obtener información de criptomonedas.
 Maneja múltiples fuentes de datos con caching.
 """
 
+import os
 import logging
 import asyncio
 import time
 from typing import Dict, List, Optional, Tuple, Any
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from enum import Enum
 
 from ..config.security_config import SecurityConfig
+from .cache_backends import create_backend
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 
 logger = logging.getLogger(__name__)
 
@@ -96,6 +99,16 @@ class DataService:
         
         self.cache: Dict[str, MarketData] = {}
         self.cache_ttl = 300  # 5 minutos
+        # Nivel compartido entre workers (opcional, AI_CACHE_BACKEND)
+        self.shared_cache = create_backend(
+            os.getenv("AI_CACHE_BACKEND", "none"),
+            os.getenv("AI_CACHE_NAMESPACE", "ai"),
+            url=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+            timeout=float(os.getenv("AI_CACHE_REDIS_TIMEOUT", "0.5"))
+        )
+        self.shared_cache_stats = {"hits": 0, "misses": 0, "errors": 0}
+        # Un circuito por endpoint: uno caído se salta en lugar de esperar su timeout
+        self.circuits = CircuitBreaker()
         self.request_timeout = SecurityConfig.HTTP_TIMEOUT
         self.max_retries = 3
         self.retry_delay = 1.0
@@ -112,6 +125,41 @@ class DataService:
         
         return age < self.cache_ttl
     
+    async def _get_shared_market_data(self, symbol: str) -> Optional[MarketData]:
+        """Datos de mercado publicados por otro worker en la caché compartida."""
+        if self.shared_cache is None:
+            return None
+        try:
+            item = await self.shared_cache.get(f"prices:{symbol}")
+        except Exception as e:
+            # Un fallo del servidor compartido cuenta como fallo de caché
+            self.shared_cache_stats["errors"] += 1
+            logger.warning(f"Error leyendo la caché compartida ({symbol}): {e}")
+            return None
+        if item is None or item[1] <= time.time():
+            self.shared_cache_stats["misses"] += 1
+            return None
+        self.shared_cache_stats["hits"] += 1
+        payload, expires_at = item
+        market_data = MarketData(
+            symbol=symbol,
+            prices={source: PriceData(**price) for source, price in payload["prices"].items()},
+            # Conservar la antigüedad real para que L1 caduque a la vez que L2
+            last_updated=expires_at - self.cache_ttl
+        )
+        self.cache[symbol] = market_data
+        return market_data
+    
+    async def _set_shared_market_data(self, market_data: MarketData) -> None:
+        if self.shared_cache is None:
+            return
+        payload = {"prices": {source: asdict(price) for source, price in market_data.prices.items()}}
+        try:
+            await self.shared_cache.set(f"prices:{market_data.symbol}", payload, self.cache_ttl)
+        except Exception as e:
+            self.shared_cache_stats["errors"] += 1
+            logger.warning(f"Error escribiendo la caché compartida ({market_data.symbol}): {e}")
+    
     async def _fetch_from_coingecko(self, symbol: str) -> Optional[PriceData]:
         """Obtener precio de CoinGecko."""
         if not httpx:
@@ -139,22 +187,25 @@ class DataService:
             
             timeout = Timeout(self.request_timeout)
             
-            async with AsyncClient(timeout=timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            with self.circuits.guard("coingecko:simple_price"):
+                async with AsyncClient(timeout=timeout) as client:
+                    response = await client.get(url, params=params)
+                    response.raise_for_status()
+                    data = response.json()
                 
-                if coin_id in data:
-                    coin_data = data[coin_id]
-                    return PriceData(
-                        symbol=symbol.upper(),
-                        price=float(coin_data.get("usd", 0)),
-                        source=DataSource.COINGECKO.value,
-                        volume_24h=coin_data.get("usd_24h_vol"),
-                        change_24h=coin_data.get("usd_24h_change"),
-                        market_cap=coin_data.get("usd_market_cap")
-                    )
-        
+                    if coin_id in data:
+                        coin_data = data[coin_id]
+                        return PriceData(
+                            symbol=symbol.upper(),
+                            price=float(coin_data.get("usd", 0)),
+                            source=DataSource.COINGECKO.value,
+                            volume_24h=coin_data.get("usd_24h_vol"),
+                            change_24h=coin_data.get("usd_24h_change"),
+                            market_cap=coin_data.get("usd_market_cap")
+                        )
+        
+        except CircuitOpenError as e:
+            logger.debug(f"CoinGecko omitido para {symbol}: {e}")
         except Exception as e:
             logger.warning(f"Error obteniendo datos de CoinGecko para {symbol}: {e}")
         
@@ -175,41 +226,45 @@ class DataService:
             
             timeout = Timeout(self.request_timeout)
             
-            async with AsyncClient(timeout=timeout) as client:
-                # Obtener precio y estadísticas en paralelo
-                price_task = client.get(price_url, params={"symbol": pair_symbol})
-                stats_task = client.get(stats_url, params={"symbol": pair_symbol})
+            with self.circuits.guard("binance:ticker"):
+                async with AsyncClient(timeout=timeout) as client:
+                    # Obtener precio y estadísticas en paralelo
+                    price_task = client.get(price_url, params={"symbol": pair_symbol})
+                    stats_task = client.get(stats_url, params={"symbol": pair_symbol})
                 
-                price_response, stats_response = await asyncio.gather(
-                    price_task, stats_task, return_exceptions=True
-                )
+                    price_response, stats_response = await asyncio.gather(
+                        price_task, stats_task, return_exceptions=True
+                    )
                 
-                price_data = None
-                volume_24h = None
-                change_24h = None
+                    price_data = None
+                    volume_24h = None
+                    change_24h = None
                 
-                # Procesar respuesta de precio
-                if not isinstance(price_response, Exception):
+                    # Procesar respuesta de precio (su fallo cuenta para el circuito)
+                    if isinstance(price_response, Exception):
+                        raise price_response
                     price_response.raise_for_status()
                     price_json = price_response.json()
                     price_data = float(price_json.get("price", 0))
                 
-                # Procesar respuesta de estadísticas
-                if not isinstance(stats_response, Exception):
-                    stats_response.raise_for_status()
-                    stats_json = stats_response.json()
-                    volume_24h = float(stats_json.get("volume", 0))
-                    change_24h = float(stats_json.get("priceChangePercent", 0))
+                    # Procesar respuesta de estadísticas
+                    if not isinstance(stats_response, Exception):
+                        stats_response.raise_for_status()
+                        stats_json = stats_response.json()
+                        volume_24h = float(stats_json.get("volume", 0))
+                        change_24h = float(stats_json.get("priceChangePercent", 0))
                 
-                if price_data and price_data > 0:
-                    return PriceData(
-                        symbol=symbol.upper(),
-                        price=price_data,
-                        source=DataSource.BINANCE.value,
-                        volume_24h=volume_24h,
-                        change_24h=change_24h
-                    )
-        
+                    if price_data and price_data > 0:
+                        return PriceData(
+                            symbol=symbol.upper(),
+                            price=price_data,
+                            source=DataSource.BINANCE.value,
+                            volume_24h=volume_24h,
+                            change_24h=change_24h
+                        )
+        
+        except CircuitOpenError as e:
+            logger.debug(f"Binance omitido para {symbol}: {e}")
         except Exception as e:
             logger.warning(f"Error obteniendo datos de Binance para {symbol}: {e}")
         
@@ -226,22 +281,25 @@ class DataService:
             
             timeout = Timeout(self.request_timeout)
             
-            async with AsyncClient(timeout=timeout) as client:
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            with self.circuits.guard("coinbase:ticker"):
+                async with AsyncClient(timeout=timeout) as client:
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    data = response.json()
                 
-                price = float(data.get("price", 0))
-                volume = float(data.get("volume", 0))
+                    price = float(data.get("price", 0))
+                    volume = float(data.get("volume", 0))
                 
-                if price > 0:
-                    return PriceData(
-                        symbol=symbol.upper(),
-                        price=price,
-                        source=DataSource.COINBASE.value,
-                        volume_24h=volume
-                    )
-        
+                    if price > 0:
+                        return PriceData(
+                            symbol=symbol.upper(),
+                            price=price,
+                            source=DataSource.COINBASE.value,
+                            volume_24h=volume
+                        )
+        
+        except CircuitOpenError as e:
+            logger.debug(f"Coinbase omitido para {symbol}: {e}")
         except Exception as e:
             logger.warning(f"Error obteniendo datos de Coinbase para {symbol}: {e}")
         
@@ -301,6 +359,14 @@ class DataService:
                 logger.debug(f"Precio de {symbol} obtenido del cache: ${best_price.price}")
                 return best_price.price
         
+        # Después, el nivel compartido entre workers
+        market_data = await self._get_shared_market_data(symbol)
+        if market_data:
+            best_price = market_data.get_best_price()
+            if best_price:
+                logger.debug(f"Precio de {symbol} obtenido de la caché compartida: ${best_price.price}")
+                return best_price.price
+        
         # Obtener datos frescos
         logger.debug(f"Obteniendo datos frescos para {symbol}")
         
@@ -310,6 +376,7 @@ class DataService:
             # Actualizar cache
             market_data = MarketData(symbol=symbol, prices=prices)
             self.cache[symbol] = market_data
+            await self._set_shared_market_data(market_data)
             
             best_price = market_data.get_best_price()
             if best_price:
@@ -338,10 +405,11 @@ class DataService:
         url = "https://api.binance.com/api/v3/klines"
         params = {"symbol": pair_symbol, "interval": interval, "limit": limit}
         try:
-            async with AsyncClient(timeout=self.request_timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                return response.json()
+            with self.circuits.guard("binance:klines"):
+                async with AsyncClient(timeout=self.request_timeout) as client:
+                    response = await client.get(url, params=params)
+                    response.raise_for_status()
+                    return response.json()
         except Exception as e:
             logger.warning(f"Error obteniendo OHLCV de Binance para {symbol}: {e}")
             return []
@@ -365,13 +433,14 @@ class DataService:
                 url = "https://api.binance.com/api/v3/ticker/24hr"
                 timeout = Timeout(self.request_timeout)
                 
-                async with AsyncClient(timeout=timeout) as client:
-                    response = await client.get(url, params={"symbol": pair_symbol})
-                    response.raise_for_status()
-                    data = response.json()
+                with self.circuits.guard("binance:ticker_24hr"):
+                    async with AsyncClient(timeout=timeout) as client:
+                        response = await client.get(url, params={"symbol": pair_symbol})
+                        response.raise_for_status()
+                        data = response.json()
                     
-                    price_change_24h = float(data.get("priceChangePercent", 0))
-                    volume_24h = float(data.get("volume", 0)) * current_price  # Convertir a USD
+                        price_change_24h = float(data.get("priceChangePercent", 0))
+                        volume_24h = float(data.get("volume", 0)) * current_price  # Convertir a USD
             except Exception as e:
                 logger.warning(f"Error obteniendo datos 24h para {symbol}: {e}")
             
@@ -425,24 +494,25 @@ class DataService:
             
             timeout = Timeout(self.request_timeout)
             
-            async with AsyncClient(timeout=timeout) as client:
-                response = await client.get(url, params=params)
-                response.raise_for_status()
-                data = response.json()
+            with self.circuits.guard("binance:klines"):
+                async with AsyncClient(timeout=timeout) as client:
+                    response = await client.get(url, params=params)
+                    response.raise_for_status()
+                    data = response.json()
                 
-                # Convertir a formato numérico
-                ohlcv = []
-                for candle in data:
-                    ohlcv.append([
-                        int(candle[0]),  # timestamp
-                        float(candle[1]),  # open
-                        float(candle[2]),  # high
-                        float(candle[3]),  # low
-                        float(candle[4]),  # close
-                        float(candle[5])   # volume
-                    ])
+                    # Convertir a formato numérico
+                    ohlcv = []
+                    for candle in data:
+                        ohlcv.append([
+                            int(candle[0]),  # timestamp
+                            float(candle[1]),  # open
+                            float(candle[2]),  # high
+                            float(candle[3]),  # low
+                            float(candle[4]),  # close
+                            float(candle[5])   # volume
+                        ])
                 
-                return ohlcv
+                    return ohlcv
                 
         except Exception as e:
             logger.error(f"Error obteniendo datos OHLCV para {symbol}: {e}")
@@ -502,7 +572,8 @@ class DataService:
             "total_entries": total_entries,
             "valid_entries": valid_entries,
             "cache_ttl_seconds": self.cache_ttl,
-            "cached_symbols": list(self.cache.keys())
+            "cached_symbols": list(self.cache.keys()),
+            "shared_cache": {**self.shared_cache.get_status(), **self.shared_cache_stats} if self.shared_cache else None
         }
     
     def get_service_status(self) -> Dict[str, Any]:
@@ -512,5 +583,6 @@ class DataService:
             "timeout": self.request_timeout,
             "max_retries": self.max_retries,
             "cache_stats": self.get_cache_stats(),
+            "circuits": self.circuits.get_stats(),
             "available_sources": [source.value for source in DataSource]
         } 
\ No newline at end of file
@@ -0,0 +1,301 @@
+"""
+Cliente de los datos externos integrados del data-service.
+
+En lugar de consultar y parsear por su cuenta noticias, redes y calendario
+económico, el módulo de IA lee los datos integrados (/integration/{símbolo}) y
+el calendario (/economic) del data-service con una conexión HTTP reutilizada. Cada respuesta se
+guarda en un caché L1 en memoria: mientras está fresca (EXTERNAL_DATA_L1_TTL)
+se sirve sin red; después se revalida con If-None-Match y un 304 renueva la
+entrada sin volver a transferir ni decodificar el cuerpo. Las peticiones
+idénticas simultáneas comparten una sola llamada y, si el data-service falla,
+se sirve la última copia disponible.
+"""
+
+import os
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+DATA_SERVICE_URL = os.getenv("DATA_SERVICE_URL", "http://localhost:8002").rstrip("/")
+DATA_SERVICE_API_PREFIX = os.getenv("DATA_SERVICE_API_PREFIX", "/api/v1")
+EXTERNAL_DATA_L1_TTL = float(os.getenv("EXTERNAL_DATA_L1_TTL", "60"))
+EXTERNAL_DATA_L1_MAX_ENTRIES = int(os.getenv("EXTERNAL_DATA_L1_MAX_ENTRIES", "256"))
+EXTERNAL_DATA_TIMEOUT = float(os.getenv("EXTERNAL_DATA_TIMEOUT", "10"))
+EXTERNAL_DATA_MAX_CONNECTIONS = int(os.getenv("EXTERNAL_DATA_MAX_CONNECTIONS", "20"))
+# Umbrales del índice del data-service para clasificar el sentimiento general
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+
+@dataclass
+class _L1Entry:
+    """Respuesta en caché con su ETag."""
+    data: Any
+    etag: Optional[str]
+    fetched_at: float
+
+
+class ExternalDataClient:
+    """Cliente con conexión reutilizada, caché L1 y peticiones condicionales."""
+
+    def __init__(
+        self,
+        base_url: str = None,
+        ttl: float = None,
+        max_entries: int = None,
+        timeout: float = None
+    ):
+        """
+        Inicializa el cliente (la conexión se abre en la primera petición).
+
+        Args:
+            base_url: URL del data-service incluido el prefijo de la API
+            ttl: Segundos que una respuesta se sirve sin revalidar
+            max_entries: Entradas máximas del caché L1
+            timeout: Timeout de cada petición en segundos
+        """
+        self.base_url = base_url or f"{DATA_SERVICE_URL}{DATA_SERVICE_API_PREFIX}"
+        self.ttl = EXTERNAL_DATA_L1_TTL if ttl is None else ttl
+        self.max_entries = max_entries or EXTERNAL_DATA_L1_MAX_ENTRIES
+        self.timeout = timeout or EXTERNAL_DATA_TIMEOUT
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._l1: "OrderedDict[str, _L1Entry]" = OrderedDict()
+        self._flight = SingleFlight("external_data")
+
+        # Métricas
+        self.hits = 0
+        self.not_modified = 0
+        self.downloads = 0
+        self.stale_served = 0
+        self.errors = 0
+
+    def _get_client(self) -> httpx.AsyncClient:
+        """Cliente HTTP compartido (pool de conexiones keep-alive)."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                limits=httpx.Limits(
+                    max_connections=EXTERNAL_DATA_MAX_CONNECTIONS,
+                    max_keepalive_connections=EXTERNAL_DATA_MAX_CONNECTIONS
+                ),
+                headers={"Accept": "application/json"}
+            )
+        return self._client
+
+    # ============================================================================
+    # CACHÉ L1
+    # ============================================================================
+
+    def _store(self, path: str, entry: _L1Entry) -> None:
+        self._l1[path] = entry
+        self._l1.move_to_end(path)
+        while len(self._l1) > self.max_entries:
+            self._l1.popitem(last=False)
+
+    async def get_json(self, path: str) -> Any:
+        """
+        Obtiene un recurso JSON del data-service pasando por el caché L1.
+
+        Args:
+            path: Ruta relativa al prefijo de la API (p. ej. "/integration/BTC")
+
+        Returns:
+            Contenido JSON decodificado
+
+        Raises:
+            httpx.HTTPError: Si el data-service falla y no hay copia en caché
+        """
+        entry = self._l1.get(path)
+        if entry and time.time() - entry.fetched_at < self.ttl:
+            self.hits += 1
+            self._l1.move_to_end(path)
+            return entry.data
+        return await self._flight.do(path, lambda: self._revalidate(path))
+
+    async def _revalidate(self, path: str) -> Any:
+        """Descarga o revalida (If-None-Match) una ruta y actualiza el L1."""
+        entry = self._l1.get(path)
+        headers = {"If-None-Match": entry.etag} if entry and entry.etag else {}
+        try:
+            response = await self._get_client().get(path, headers=headers)
+            if response.status_code == 304 and entry:
+                self.not_modified += 1
+                entry.fetched_at = time.time()
+                self._l1.move_to_end(path)
+                return entry.data
+            response.raise_for_status()
+            data = response.json()
+        except (httpx.HTTPError, ValueError) as e:
+            self.errors += 1
+            if entry:
+                self.stale_served += 1
+                logger.warning(f"Data-service no disponible para {path}, se sirve la copia en caché: {e}")
+                return entry.data
+            raise
+
+        self.downloads += 1
+        self._store(path, _L1Entry(data=data, etag=response.headers.get("ETag"), fetched_at=time.time()))
+        return data
+
+    # ============================================================================
+    # API
+    # ============================================================================
+
+    async def get_integrated(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Datos integrados (noticias, redes, eventos e índice de sentimiento).
+
+        Args:
+            symbol: Símbolo de la criptomoneda (None para todo el mercado)
+
+        Returns:
+            Datos integrados tal como los devuelve el data-service
+        """
+        path = f"/integration/{symbol.upper()}" if symbol else "/integration/all"
+        return await self.get_json(path)
+
+    async def get_economic_events(self, symbol: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Calendario económico del data-service.
+
+        Args:
+            symbol: Símbolo de la criptomoneda (None para el calendario general)
+
+        Returns:
+            Eventos tal como los devuelve el data-service (high_impact_events,
+            upcoming_events y, por símbolo, symbol_events)
+        """
+        path = f"/economic/{symbol.upper()}" if symbol else "/economic/all"
+        return await self.get_json(path)
+
+    async def get_sentiment_index(self, symbol: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Índice de sentimiento (noticias y redes) calculado por el data-service.
+
+        Usa la misma entrada del L1 que los datos integrados.
+
+        Args:
+            symbol: Símbolo de la criptomoneda (None para todo el mercado)
+
+        Returns:
+            Índice con score, confidence e items, o None si no está disponible
+        """
+        try:
+            data = await self.get_integrated(symbol)
+        except (httpx.HTTPError, ValueError) as e:
+            logger.warning(f"Índice de sentimiento no disponible para {symbol or 'el mercado'}: {e}")
+            return None
+        return data.get("sentiment_index") or None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del caché L1 y de las peticiones."""
+        requests = self.not_modified + self.downloads
+        return {
+            "base_url": self.base_url,
+            "l1_entries": len(self._l1),
+            "l1_ttl": self.ttl,
+            "hits": self.hits,
+            "not_modified": self.not_modified,
+            "downloads": self.downloads,
+            "not_modified_ratio": round(self.not_modified / requests, 4) if requests else 0.0,
+            "stale_served": self.stale_served,
+            "errors": self.errors,
+            "single_flight": self._flight.get_stats()
+        }
+
+    async def aclose(self) -> None:
+        """Cierra la conexión compartida."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+
+def _sentiment_from_index(index: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Sentimiento en el formato de los servicios locales a partir del índice del data-service."""
+    if not index:
+        return {}
+    score = index.get("score", 0)
+    return {
+        "positive": round(index.get("positive", 0), 2),
+        "negative": round(index.get("negative", 0), 2),
+        "neutral": round(index.get("neutral", 0), 2),
+        "overall": "positive" if score > POSITIVE_THRESHOLD else "negative" if score < NEGATIVE_THRESHOLD else "neutral",
+        "volume": index.get("items", 0),
+        "score": score,
+        "confidence": index.get("confidence"),
+        "source": "Data-service (índice de noticias y redes)"
+    }
+
+
+def adapt_integrated_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Convierte los datos integrados del data-service a la estructura que usa
+    core.external_data (news/social/events).
+
+    Args:
+        data: Respuesta de /integration
+
+    Returns:
+        Diccionario con symbol, news, social, events y sentiment_index
+    """
+    news = data.get("news") or {}
+    social = data.get("social") or {}
+    result = {
+        "news": {
+            "crypto_news": news.get("crypto_news") or news.get("news", []),
+            "economic_events": news.get("economic_events", []),
+            "political_events": news.get("political_events", [])
+        },
+        "social": {
+            "posts": social.get("posts", []),
+            "sentiment": social.get("sentiment") or _sentiment_from_index(data.get("sentiment_index"))
+        },
+        "events": data.get("events") or {},
+        "sentiment_index": data.get("sentiment_index")
+    }
+    if data.get("symbol"):
+        result = {"symbol": data["symbol"], **result}
+    if data.get("partial"):
+        result["partial"] = True
+    return result
+
+
+def adapt_economic_events(data: Dict[str, Any], days: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Convierte el calendario del data-service a la estructura de los análisis
+    macroeconómicos, limitado a los próximos `days` días.
+
+    Args:
+        data: Respuesta de /economic
+        days: Días hacia adelante que se incluyen
+
+    Returns:
+        Diccionario con high_impact_events, medium_impact_events y crypto_events
+    """
+    last_day = (datetime.now() + timedelta(days=days)).strftime("%Y-%m-%d")
+
+    def upcoming(events: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        return [event for event in events if str(event.get("date", ""))[:10] <= last_day][:5]
+
+    return {
+        "high_impact_events": upcoming(data.get("high_impact_events", [])),
+        "medium_impact_events": upcoming(
+            [event for event in data.get("upcoming_events", []) if event.get("impact") == "medium"]
+        ),
+        "crypto_events": upcoming(data.get("symbol_events", []))
+    }
+
+
+# Instancia global del cliente
+external_data_client = ExternalDataClient()
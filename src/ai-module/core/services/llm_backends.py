@@ -0,0 +1,235 @@
+"""
+Backends de LLM intercambiables.
+AIService usa OpenAI para los análisis; las tareas baratas (clasificar la
+intención de un mensaje, redactar la explicación de una señal ya calculada)
+pueden enrutarse a un modelo local en CPU:
+
+- llama.cpp en proceso (llama-cpp-python) con un modelo GGUF cuantizado.
+- Un servidor local compatible con la API de OpenAI (llama.cpp server, Ollama, vLLM...).
+
+Las rutas por tipo de tarea se configuran con LLM_TASK_ROUTES
+(p.ej. "intent=local,signal_explanation=local"); si el backend local no está
+disponible o falla se usa OpenAI.
+"""
+
+import os
+import time
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Importaciones condicionales
+try:
+    from openai import AsyncOpenAI
+except ImportError:
+    AsyncOpenAI = None
+
+try:
+    from llama_cpp import Llama
+except ImportError:
+    Llama = None
+
+# Tareas conocidas y su backend por defecto
+DEFAULT_TASK_ROUTES = {
+    "intent": "local",
+    "signal_explanation": "local",
+}
+
+
+class LLMBackend:
+    """Interfaz común de los backends."""
+
+    name = "base"
+
+    def is_available(self) -> bool:
+        return True
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float = 0.6,
+                       max_tokens: int = 500, **kwargs) -> str:
+        raise NotImplementedError
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"available": self.is_available()}
+
+
+class OpenAIBackend(LLMBackend):
+    """
+    Backend remoto de OpenAI.
+
+    Delega en la función de completion de AIService para conservar los
+    reintentos, la validación de parámetros y el gobernador de llamadas.
+    """
+
+    name = "openai"
+
+    def __init__(self, completion_fn: Callable[..., Awaitable[str]], model: str):
+        self.completion_fn = completion_fn
+        self.model = model
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float = 0.6,
+                       max_tokens: int = 500, **kwargs) -> str:
+        return await self.completion_fn(messages, temperature=temperature, max_tokens=max_tokens, **kwargs)
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"available": self.is_available(), "model": self.model}
+
+
+class LocalLLMBackend(LLMBackend):
+    """
+    Modelo local en CPU.
+
+    Con LOCAL_LLM_MODEL_PATH se carga el GGUF con llama-cpp-python (la carga es
+    perezosa y las inferencias se serializan en un hilo aparte). Con
+    LOCAL_LLM_BASE_URL se usa un servidor local compatible con OpenAI.
+    """
+
+    name = "local"
+
+    def __init__(self, model_path: str = None, base_url: str = None, model: str = None,
+                 n_threads: int = None, n_ctx: int = None, timeout: float = None):
+        self.model_path = model_path or os.getenv("LOCAL_LLM_MODEL_PATH")
+        self.base_url = base_url or os.getenv("LOCAL_LLM_BASE_URL")
+        self.model = model or os.getenv("LOCAL_LLM_MODEL", "qwen2.5-1.5b-instruct-q4_k_m")
+        self.n_threads = n_threads or int(os.getenv("LOCAL_LLM_THREADS", str(os.cpu_count() or 4)))
+        self.n_ctx = n_ctx or int(os.getenv("LOCAL_LLM_CONTEXT", "2048"))
+        self.timeout = timeout or float(os.getenv("LOCAL_LLM_TIMEOUT", "20"))
+
+        self._llama = None
+        self._load_error: Optional[str] = None
+        # Una sola instancia del modelo: las inferencias van de una en una
+        self._lock = threading.Lock()
+        self._client = None
+        if self.base_url and AsyncOpenAI:
+            self._client = AsyncOpenAI(base_url=self.base_url, api_key=os.getenv("LOCAL_LLM_API_KEY", "local"),
+                                       timeout=self.timeout)
+
+        self.calls = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+    @property
+    def mode(self) -> Optional[str]:
+        if self._client is not None:
+            return "server"
+        if self.model_path and Llama is not None:
+            return "llama_cpp"
+        return None
+
+    def is_available(self) -> bool:
+        return self.mode is not None and self._load_error is None
+
+    def _get_llama(self):
+        if self._llama is None:
+            logger.info(f"Cargando modelo local {self.model_path} ({self.n_threads} hilos)")
+            try:
+                self._llama = Llama(model_path=self.model_path, n_ctx=self.n_ctx,
+                                    n_threads=self.n_threads, verbose=False)
+            except (OSError, ValueError) as e:
+                # El modelo no se pudo cargar (fichero ausente o GGUF inválido): no
+                # volver a intentarlo. Un timeout de la primera carga no llega aquí
+                self._load_error = str(e)
+                raise
+        return self._llama
+
+    def _complete_sync(self, messages: List[Dict[str, str]], temperature: float, max_tokens: int) -> str:
+        with self._lock:
+            result = self._get_llama().create_chat_completion(
+                messages=messages, temperature=temperature, max_tokens=max_tokens
+            )
+        return (result["choices"][0]["message"]["content"] or "").strip()
+
+    async def complete(self, messages: List[Dict[str, str]], temperature: float = 0.6,
+                       max_tokens: int = 500, **kwargs) -> str:
+        started = time.monotonic()
+        self.calls += 1
+        try:
+            if self._client is not None:
+                response = await self._client.chat.completions.create(
+                    model=self.model, messages=messages, temperature=temperature, max_tokens=max_tokens
+                )
+                return (response.choices[0].message.content or "").strip()
+
+            return await asyncio.wait_for(
+                asyncio.to_thread(self._complete_sync, messages, temperature, max_tokens),
+                timeout=self.timeout
+            )
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.total_latency += time.monotonic() - started
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "available": self.is_available(),
+            "mode": self.mode,
+            "model": self.model_path or self.model,
+            "load_error": self._load_error,
+            "calls": self.calls,
+            "errors": self.errors,
+            "avg_latency_ms": round(self.total_latency / self.calls * 1000, 1) if self.calls else 0.0
+        }
+
+
+class BackendRouter:
+    """Elige el backend de cada tipo de tarea, con OpenAI como respaldo."""
+
+    def __init__(self, backends: Dict[str, LLMBackend], default: str = "openai", routes: Dict[str, str] = None):
+        self.backends = backends
+        self.default = default
+        self.routes = dict(DEFAULT_TASK_ROUTES)
+        self.routes.update(routes if routes is not None else self._routes_from_env())
+        self.fallbacks = 0
+        self._routed: Dict[str, Dict[str, int]] = {}
+
+    @staticmethod
+    def _routes_from_env() -> Dict[str, str]:
+        routes = {}
+        for item in os.getenv("LLM_TASK_ROUTES", "").split(","):
+            if "=" in item:
+                task, backend = item.split("=", 1)
+                routes[task.strip()] = backend.strip()
+        return routes
+
+    def backend_for(self, task: str) -> LLMBackend:
+        name = self.routes.get(task, self.default)
+        backend = self.backends.get(name)
+        if backend is None or not backend.is_available():
+            backend = self.backends[self.default]
+        return backend
+
+    async def complete(self, task: str, messages: List[Dict[str, str]], **params) -> str:
+        """Completar con el backend de la tarea; si falla, con el backend por defecto."""
+        result, _ = await self.complete_with_backend(task, messages, **params)
+        return result
+
+    async def complete_with_backend(self, task: str, messages: List[Dict[str, str]],
+                                    **params) -> Tuple[str, LLMBackend]:
+        """Como `complete`, devolviendo además el backend que respondió."""
+        backend = self.backend_for(task)
+        counts = self._routed.setdefault(task, {})
+        try:
+            result = await backend.complete(messages, **params)
+            if not result:
+                raise ValueError("Respuesta vacía")
+            counts[backend.name] = counts.get(backend.name, 0) + 1
+            return result, backend
+        except Exception as e:
+            default = self.backends[self.default]
+            if backend is default:
+                raise
+            logger.warning(f"Backend {backend.name} falló en la tarea {task} ({e}); usando {default.name}")
+            self.fallbacks += 1
+            counts[default.name] = counts.get(default.name, 0) + 1
+            return await default.complete(messages, **params), default
+
+    def get_status(self) -> Dict[str, Any]:
+        return {
+            "routes": self.routes,
+            "backends": {name: backend.get_status() for name, backend in self.backends.items()},
+            "routed": self._routed,
+            "fallbacks": self.fallbacks
+        }
@@ -0,0 +1,270 @@
+"""
+Gobernador de llamadas al LLM.
+Controla el acceso a OpenAI desde AIService:
+
+- Presupuestos de peticiones y tokens por minuto (ventana deslizante de 60 s).
+- Cola por prioridad: las peticiones interactivas del bot pasan antes que
+  los escaneos y alertas en segundo plano.
+- Concurrencia adaptativa AIMD: sube de uno en uno mientras la latencia es
+  buena y se reduce a la mitad ante un 429 o latencias por encima del objetivo.
+"""
+
+import os
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from collections import deque
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Orden de atención por prioridad (menor = antes)
+PRIORITY_RANK = {"critical": 0, "high": 1, "normal": 2, "low": 3}
+
+# Prioridad de la petición en curso (la fija cada endpoint)
+_request_priority: ContextVar[str] = ContextVar("llm_request_priority", default="normal")
+
+_WINDOW_SECONDS = 60.0
+
+
+class LLMGovernorSaturatedError(RuntimeError):
+    """La cola del gobernador está llena o la espera superó el límite."""
+
+
+def set_request_priority(priority: Any) -> None:
+    """Fijar la prioridad LLM de la petición actual (RequestPriority o str)."""
+    value = getattr(priority, "value", priority) or "normal"
+    _request_priority.set(value if value in PRIORITY_RANK else "normal")
+
+
+def get_request_priority() -> str:
+    return _request_priority.get()
+
+
+class _Slot:
+    """Permiso concedido; el llamante informa aquí del resultado de la llamada."""
+
+    def __init__(self, estimated_tokens: int):
+        self.estimated_tokens = estimated_tokens
+        self.tokens_used: Optional[int] = None
+        self.rate_limited = False
+
+    def record(self, tokens_used: Optional[int] = None, rate_limited: bool = False) -> None:
+        if tokens_used is not None:
+            self.tokens_used = tokens_used
+        self.rate_limited = self.rate_limited or rate_limited
+
+
+class LLMGovernor:
+    """Limitador de concurrencia y ritmo para las llamadas al LLM."""
+
+    def __init__(
+        self,
+        requests_per_minute: int = None,
+        tokens_per_minute: int = None,
+        max_concurrency: int = None,
+        min_concurrency: int = None,
+        latency_target: float = None,
+        max_queue: int = None,
+        queue_timeout: float = None
+    ):
+        self.requests_per_minute = requests_per_minute or int(os.getenv("LLM_RPM_LIMIT", "500"))
+        self.tokens_per_minute = tokens_per_minute or int(os.getenv("LLM_TPM_LIMIT", "90000"))
+        self.max_concurrency = max_concurrency or int(os.getenv("LLM_GOVERNOR_MAX_CONCURRENCY", "16"))
+        self.min_concurrency = min_concurrency or int(os.getenv("LLM_GOVERNOR_MIN_CONCURRENCY", "1"))
+        self.latency_target = latency_target or float(os.getenv("LLM_LATENCY_TARGET", "20"))
+        self.max_queue = max_queue or int(os.getenv("LLM_GOVERNOR_MAX_QUEUE", "200"))
+        self.queue_timeout = queue_timeout or float(os.getenv("LLM_GOVERNOR_QUEUE_TIMEOUT", "60"))
+
+        # Límite de concurrencia actual (AIMD); fraccionario para el aumento aditivo
+        self.concurrency_limit = float(self.max_concurrency)
+        self.in_flight = 0
+
+        self._queue: List[Tuple[int, int, asyncio.Future, int]] = []
+        self._sequence = itertools.count()
+        self._requests: Deque[float] = deque()
+        self._tokens: Deque[Tuple[float, int]] = deque()
+        self._tokens_in_window = 0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        self._last_decrease = 0.0
+
+        self.granted = 0
+        self.rejected = 0
+        self.rate_limited = 0
+        self.decreases = 0
+        self.max_queue_depth = 0
+        self._wait_times: Deque[float] = deque(maxlen=200)
+        self._granted_by_priority: Dict[str, int] = {p: 0 for p in PRIORITY_RANK}
+
+    # ========================================
+    # PRESUPUESTOS
+    # ========================================
+
+    def _prune(self, now: float) -> None:
+        while self._requests and now - self._requests[0] >= _WINDOW_SECONDS:
+            self._requests.popleft()
+        while self._tokens and now - self._tokens[0][0] >= _WINDOW_SECONDS:
+            self._tokens_in_window -= self._tokens.popleft()[1]
+
+    def _budget_wait(self, tokens: int, now: float) -> float:
+        """Segundos hasta que haya presupuesto para una petición de `tokens` (0 si ya lo hay)."""
+        self._prune(now)
+        waits = [0.0]
+        if len(self._requests) >= self.requests_per_minute:
+            waits.append(self._requests[0] + _WINDOW_SECONDS - now)
+        # Con la ventana vacía se admite aunque la petición supere el presupuesto sola
+        if self._tokens and self._tokens_in_window + tokens > self.tokens_per_minute:
+            waits.append(self._tokens[0][0] + _WINDOW_SECONDS - now)
+        return max(waits)
+
+    def _charge(self, tokens: int, now: float) -> None:
+        self._requests.append(now)
+        self._tokens.append((now, tokens))
+        self._tokens_in_window += tokens
+
+    # ========================================
+    # COLA
+    # ========================================
+
+    def _dispatch(self) -> None:
+        """Conceder permisos a los primeros de la cola mientras haya hueco y presupuesto."""
+        self._wakeup = None
+        now = time.monotonic()
+        while self._queue and self.in_flight < int(self.concurrency_limit):
+            rank, _, future, tokens = self._queue[0]
+            if future.done():
+                heapq.heappop(self._queue)
+                continue
+            wait = self._budget_wait(tokens, now)
+            if wait > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+            heapq.heappop(self._queue)
+            self._charge(tokens, now)
+            self.in_flight += 1
+            future.set_result(None)
+
+    async def acquire(self, estimated_tokens: int, priority: Optional[str] = None) -> None:
+        """Esperar turno según prioridad, concurrencia y presupuestos."""
+        priority = priority or get_request_priority()
+        if len(self._queue) >= self.max_queue:
+            self.rejected += 1
+            raise LLMGovernorSaturatedError(f"Cola del LLM llena ({len(self._queue)} peticiones en espera)")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (PRIORITY_RANK.get(priority, 2), next(self._sequence), future, estimated_tokens)
+        heapq.heappush(self._queue, entry)
+        self.max_queue_depth = max(self.max_queue_depth, len(self._queue))
+        if self._wakeup is None:
+            self._dispatch()
+
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # El permiso ya se había concedido: devolverlo
+                self._release()
+            else:
+                future.cancel()
+                self._abandon(entry)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.rejected += 1
+            raise LLMGovernorSaturatedError(f"Sin turno para el LLM tras {self.queue_timeout:.0f}s en cola")
+
+        self.granted += 1
+        self._granted_by_priority[priority] = self._granted_by_priority.get(priority, 0) + 1
+        self._wait_times.append(time.monotonic() - started)
+
+    def _abandon(self, entry: Tuple[int, int, asyncio.Future, int]) -> None:
+        """Sacar de la cola a un llamante que dejó de esperar, para que no cuente en `max_queue`."""
+        was_first = self._queue[0] is entry
+        self._queue.remove(entry)
+        heapq.heapify(self._queue)
+        # La espera programada era para el presupuesto del que se va: recalcular con el siguiente
+        if was_first and self._wakeup is not None:
+            self._wakeup.cancel()
+            self._dispatch()
+
+    def _release(self) -> None:
+        self.in_flight -= 1
+        if self._wakeup is None:
+            self._dispatch()
+
+    # ========================================
+    # AIMD
+    # ========================================
+
+    def _on_result(self, slot: _Slot, latency: float) -> None:
+        now = time.monotonic()
+        # Ajustar el consumo de tokens estimado con el real
+        if slot.tokens_used is not None and slot.tokens_used != slot.estimated_tokens:
+            self._tokens.append((now, slot.tokens_used - slot.estimated_tokens))
+            self._tokens_in_window += slot.tokens_used - slot.estimated_tokens
+
+        if slot.rate_limited:
+            self.rate_limited += 1
+        if slot.rate_limited or latency > self.latency_target:
+            # Disminución multiplicativa, como mucho una vez por segundo
+            if now - self._last_decrease >= 1.0:
+                self._last_decrease = now
+                self.decreases += 1
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+                logger.warning(f"LLM saturado: concurrencia reducida a {int(self.concurrency_limit)}")
+        else:
+            # Aumento aditivo: +1 por cada `limit` llamadas correctas
+            self.concurrency_limit = min(float(self.max_concurrency),
+                                         self.concurrency_limit + 1.0 / self.concurrency_limit)
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: Optional[str] = None) -> AsyncIterator[_Slot]:
+        """
+        Permiso para una llamada al LLM.
+
+        Uso:
+            async with governor.slot(tokens) as slot:
+                response = await client.chat.completions.create(...)
+                slot.record(tokens_used=response.usage.total_tokens)
+        """
+        await self.acquire(estimated_tokens, priority)
+        slot = _Slot(estimated_tokens)
+        started = time.monotonic()
+        try:
+            yield slot
+        finally:
+            self._on_result(slot, time.monotonic() - started)
+            self._release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas del gobernador (profundidad de cola, concurrencia y presupuestos)."""
+        now = time.monotonic()
+        self._prune(now)
+        depth = {p: 0 for p in PRIORITY_RANK}
+        ranks = {rank: name for name, rank in PRIORITY_RANK.items()}
+        for rank, _, future, _ in self._queue:
+            if not future.done():
+                depth[ranks.get(rank, "normal")] += 1
+        waits = sorted(self._wait_times)
+        return {
+            "queue_depth": sum(depth.values()),
+            "queue_depth_by_priority": depth,
+            "max_queue_depth": self.max_queue_depth,
+            "in_flight": self.in_flight,
+            "concurrency_limit": int(self.concurrency_limit),
+            "max_concurrency": self.max_concurrency,
+            "requests_last_minute": len(self._requests),
+            "tokens_last_minute": self._tokens_in_window,
+            "rpm_limit": self.requests_per_minute,
+            "tpm_limit": self.tokens_per_minute,
+            "granted": self.granted,
+            "granted_by_priority": self._granted_by_priority,
+            "rejected": self.rejected,
+            "rate_limited": self.rate_limited,
+            "concurrency_decreases": self.decreases,
+            "p95_queue_wait_ms": round(waits[min(len(waits) - 1, int(len(waits) * 0.95))] * 1000, 1) if waits else 0.0
+        }
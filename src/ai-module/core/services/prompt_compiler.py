@@ -0,0 +1,204 @@
+"""
+Compilador de prompts con presupuesto de tokens.
+Reduce el tamaño de los bloques de datos técnicos y del historial antes de
+enviarlos al LLM:
+
+- Cuenta tokens con el tokenizador local del modelo (tiktoken, si está instalado).
+- Ordena las líneas de indicadores por relevancia para la estrategia.
+- Compacta los números (sin separadores de miles y con cifras significativas limitadas).
+- Recorta el historial de conversación a un presupuesto de tokens.
+"""
+
+import os
+import re
+import math
+import logging
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Importaciones condicionales
+try:
+    import tiktoken
+except ImportError:
+    logger.warning("tiktoken no está instalado: el conteo de tokens será aproximado")
+    tiktoken = None
+
+# Palabras clave (inicio de línea) por orden de relevancia para cada estrategia
+STRATEGY_RELEVANCE: Dict[str, List[str]] = {
+    "scalping": ["rsi", "macd", "vwap", "bb", "bollinger", "estocástico", "volumen", "atr", "soporte", "resistencia", "ema", "sma"],
+    "estocastico": ["estocástico", "rsi", "volumen", "macd", "soporte", "resistencia", "bb", "bollinger", "atr"],
+    "scalping_estocastico": ["estocástico", "rsi", "volumen", "macd", "vwap", "soporte", "resistencia", "atr"],
+    "rsi": ["rsi", "connors rsi", "macd", "soporte", "resistencia", "volumen", "estocástico", "atr"],
+    "volatilidad": ["atr", "bb", "bollinger", "keltner", "donchian", "volumen", "adx", "soporte", "resistencia"],
+    "intradia": ["ema", "sma", "macd", "vwap", "soporte", "resistencia", "adx", "supertrend", "rsi", "volumen"],
+    "smart_money": ["soporte", "resistencia", "volumen", "vwap", "obv", "cmf", "atr", "ema"],
+    "fair_value_gap": ["soporte", "resistencia", "atr", "volumen", "vwap", "ema"],
+}
+
+DEFAULT_RELEVANCE = [
+    "rsi", "macd", "ema", "sma", "bb", "bollinger", "vwap", "volumen",
+    "atr", "estocástico", "adx", "soporte", "resistencia"
+]
+
+# Números con decimales o separadores de miles (los enteros simples no se tocan)
+_NUMBER_PATTERN = re.compile(r"(?<![\w.,])(\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+\.\d+)(?![\w.])")
+
+# Tokens fijos por mensaje en el formato de chat de OpenAI
+_TOKENS_PER_MESSAGE = 4
+
+
+@lru_cache(maxsize=8)
+def _get_encoding(model: str):
+    """
+    Codificación de tiktoken para el modelo, o None para contar de forma aproximada.
+
+    tiktoken descarga el fichero BPE en el primer uso: si falla (sin red, p.ej.)
+    el None queda en caché, así que no se reintenta en cada conteo y se avisa una vez.
+    """
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        logger.warning(f"Tokenizador de {model} no disponible, el conteo de tokens será aproximado: {e}")
+        return None
+
+
+def compact_number(value: float, significant_digits: int = 6) -> str:
+    """Número con como mucho `significant_digits` cifras significativas y sin ceros finales."""
+    if value == 0 or math.isnan(value) or math.isinf(value):
+        return "0" if value == 0 else str(value)
+    decimals = max(significant_digits - int(math.floor(math.log10(abs(value)))) - 1, 0)
+    text = f"{round(value, decimals):.{decimals}f}"
+    return text.rstrip("0").rstrip(".") if "." in text else text
+
+
+def compress_numbers(text: str, significant_digits: int = 6) -> str:
+    """Compactar todos los números decimales de un texto."""
+    def _replace(match: "re.Match") -> str:
+        try:
+            return compact_number(float(match.group(1).replace(",", "")), significant_digits)
+        except ValueError:
+            return match.group(1)
+    return _NUMBER_PATTERN.sub(_replace, text)
+
+
+class PromptCompiler:
+    """Compacta bloques de datos e historial según un presupuesto de tokens."""
+
+    def __init__(self, model: str = None, technical_budget: int = None, history_budget: int = None):
+        self.model = model or os.getenv("PROMPT_TOKENIZER_MODEL", "gpt-3.5-turbo")
+        self.technical_budget = technical_budget or int(os.getenv("PROMPT_TECHNICAL_TOKEN_BUDGET", "350"))
+        self.history_budget = history_budget or int(os.getenv("PROMPT_HISTORY_TOKEN_BUDGET", "1000"))
+
+        self.blocks_compiled = 0
+        self.tokens_before = 0
+        self.tokens_after = 0
+        self.lines_dropped = 0
+        self.history_messages_dropped = 0
+
+    # ========================================
+    # CONTEO DE TOKENS
+    # ========================================
+
+    def count_tokens(self, text: str) -> int:
+        """Tokens de un texto con el tokenizador local (o aproximación si no hay)."""
+        if not text:
+            return 0
+        encoding = _get_encoding(self.model)
+        if encoding is None:
+            # ~3.5 caracteres por token en español
+            return int(math.ceil(len(text) / 3.5))
+        return len(encoding.encode(text))
+
+    def count_messages(self, messages: List[Dict[str, Any]]) -> int:
+        """Tokens de una lista de mensajes de chat (incluidos los argumentos de tool_calls)."""
+        total = 2
+        for m in messages:
+            total += self.count_tokens(str(m.get("content") or "")) + _TOKENS_PER_MESSAGE
+            for call in m.get("tool_calls") or []:
+                total += self.count_tokens(call["function"]["arguments"])
+        return total
+
+    # ========================================
+    # COMPACTACIÓN
+    # ========================================
+
+    @staticmethod
+    def _relevance(line: str, keywords: List[str]) -> int:
+        key = line.lstrip("•- ").lower()
+        for rank, keyword in enumerate(keywords):
+            if key.startswith(keyword):
+                return rank
+        return len(keywords)
+
+    def compact_lines(
+        self,
+        lines: List[str],
+        strategy: Optional[str] = None,
+        budget: Optional[int] = None,
+        max_lines: Optional[int] = None
+    ) -> List[str]:
+        """
+        Compactar líneas de indicadores: números comprimidos, ordenadas por
+        relevancia para `strategy` y recortadas al presupuesto de tokens.
+        El orden relativo de líneas igual de relevantes se conserva.
+        """
+        budget = budget or self.technical_budget
+        keywords = STRATEGY_RELEVANCE.get(strategy or "", DEFAULT_RELEVANCE)
+
+        compressed = [compress_numbers(line) for line in lines if line]
+        ranked = sorted(compressed, key=lambda line: self._relevance(line, keywords))
+
+        selected: List[str] = []
+        used = 0
+        for line in ranked:
+            if max_lines is not None and len(selected) >= max_lines:
+                break
+            tokens = self.count_tokens(line) + 1
+            if selected and used + tokens > budget:
+                break
+            selected.append(line)
+            used += tokens
+
+        self.blocks_compiled += 1
+        self.tokens_before += sum(self.count_tokens(line) + 1 for line in lines if line)
+        self.tokens_after += used
+        self.lines_dropped += len(compressed) - len(selected)
+        return selected
+
+    def trim_history(self, messages: List[Dict[str, Any]], budget: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Conservar los mensajes más recientes del historial que caben en el presupuesto."""
+        budget = budget or self.history_budget
+        kept: List[Dict[str, Any]] = []
+        used = 0
+        for message in reversed(messages):
+            tokens = self.count_tokens(str(message.get("content", ""))) + _TOKENS_PER_MESSAGE
+            if used + tokens > budget:
+                break
+            kept.append(message)
+            used += tokens
+        self.history_messages_dropped += len(messages) - len(kept)
+        return list(reversed(kept))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de compactación."""
+        return {
+            "tokenizer": "tiktoken" if _get_encoding(self.model) is not None else "approx",
+            "technical_budget": self.technical_budget,
+            "history_budget": self.history_budget,
+            "blocks_compiled": self.blocks_compiled,
+            "tokens_before": self.tokens_before,
+            "tokens_after": self.tokens_after,
+            "lines_dropped": self.lines_dropped,
+            "history_messages_dropped": self.history_messages_dropped
+        }
+
+
+# Instancia compartida por los servicios del módulo
+prompt_compiler = PromptCompiler()
@@ -0,0 +1,61 @@
+"""
+Coalescencia de peticiones idénticas en curso (single-flight).
+Las llamadas concurrentes con la misma clave esperan una única ejecución
+compartida y reciben su resultado (o su excepción).
+"""
+
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+logger = logging.getLogger(__name__)
+
+
+class SingleFlight:
+    """Grupo single-flight para corrutinas asyncio."""
+
+    def __init__(self, name: str = "single_flight"):
+        self.name = name
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+        self.executions = 0
+        self.coalesced = 0
+        self.max_fanout = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Ejecutar `fn` una sola vez por clave mientras haya una ejecución en curso.
+
+        La ejecución corre en su propia tarea: si la petición que la inició se
+        cancela (p.ej. el cliente se desconecta), el resto sigue esperándola.
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            self.executions += 1
+            task = asyncio.get_running_loop().create_task(fn())
+            self._inflight[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda _t, k=key: self._finish(k))
+        else:
+            self.coalesced += 1
+            logger.debug(f"[{self.name}] Petición coalescida para {key}")
+
+        self._waiters[key] += 1
+        self.max_fanout = max(self.max_fanout, self._waiters[key])
+        return await asyncio.shield(task)
+
+    def _finish(self, key: Hashable) -> None:
+        self._inflight.pop(key, None)
+        self._waiters.pop(key, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Métricas de coalescencia."""
+        total = self.executions + self.coalesced
+        return {
+            "in_flight": len(self._inflight),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / total, 4) if total else 0.0,
+            "max_fanout": self.max_fanout
+        }
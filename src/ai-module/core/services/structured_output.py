@@ -0,0 +1,165 @@
+"""
+Salida estructurada del LLM.
+Esquemas JSON que se piden al modelo en modo function-calling y un validador
+compilado una sola vez que comprueba la respuesta sin pasar por regex.
+"""
+
+import json
+from typing import Any, Callable, Dict, List
+
+# Esquema de la señal de una estrategia avanzada
+STRATEGY_SIGNAL_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "signal": {"type": "string", "enum": ["LONG", "SHORT", "NEUTRAL"]},
+        "confidence": {"type": "number", "minimum": 0, "maximum": 1},
+        "entry_price": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "stop_loss": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "take_profit": {"type": ["number", "null"], "exclusiveMinimum": 0},
+        "reasoning": {"type": "string", "maxLength": 600}
+    },
+    "required": ["signal", "confidence", "entry_price", "stop_loss", "take_profit", "reasoning"],
+    "additionalProperties": False
+}
+
+STRATEGY_SIGNAL_FUNCTION = {
+    "name": "registrar_senal",
+    "description": "Registra la señal de trading resultante del análisis.",
+    "parameters": STRATEGY_SIGNAL_SCHEMA
+}
+
+# Esquema del análisis de varios símbolos en una sola llamada
+MULTI_ANALYSIS_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "analyses": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "symbol": {"type": "string"},
+                    "analysis": {"type": "string"}
+                },
+                "required": ["symbol", "analysis"],
+                "additionalProperties": False
+            }
+        },
+        "comparative_analysis": {"type": ["string", "null"]}
+    },
+    "required": ["analyses", "comparative_analysis"],
+    "additionalProperties": False
+}
+
+MULTI_ANALYSIS_FUNCTION = {
+    "name": "registrar_analisis_multiple",
+    "description": "Registra el análisis de cada símbolo y la comparativa entre ellos.",
+    "parameters": MULTI_ANALYSIS_SCHEMA
+}
+
+_JSON_TYPES = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+    "null": lambda v: v is None
+}
+
+
+class SchemaValidator:
+    """
+    Validador de un subconjunto de JSON Schema (type, enum, minimum, maximum,
+    exclusiveMinimum, maxLength, items, required, additionalProperties).
+
+    El esquema se compila a una lista de comprobaciones al crear el validador,
+    así validar una respuesta es recorrer esa lista.
+    """
+
+    def __init__(self, schema: Dict[str, Any]):
+        self.schema = schema
+        self._check = self._compile(schema, "$")
+
+    def _compile(self, schema: Dict[str, Any], path: str) -> Callable[[Any, List[str]], None]:
+        checks: List[Callable[[Any, List[str]], None]] = []
+
+        types = schema.get("type")
+        if types:
+            types = [types] if isinstance(types, str) else list(types)
+            predicates = [_JSON_TYPES[t] for t in types]
+
+            def check_type(value, errors, types=types, predicates=predicates):
+                if not any(p(value) for p in predicates):
+                    errors.append(f"{path}: se esperaba {'/'.join(types)}")
+            checks.append(check_type)
+
+        if "enum" in schema:
+            allowed = schema["enum"]
+            checks.append(lambda v, e: v in allowed or e.append(f"{path}: valor no permitido {v!r}"))
+
+        number = _JSON_TYPES["number"]
+        if "minimum" in schema:
+            low = schema["minimum"]
+            checks.append(lambda v, e: not number(v) or v >= low or e.append(f"{path}: menor que {low}"))
+        if "maximum" in schema:
+            high = schema["maximum"]
+            checks.append(lambda v, e: not number(v) or v <= high or e.append(f"{path}: mayor que {high}"))
+        if "exclusiveMinimum" in schema:
+            bound = schema["exclusiveMinimum"]
+            checks.append(lambda v, e: not number(v) or v > bound or e.append(f"{path}: debe ser mayor que {bound}"))
+        if "maxLength" in schema:
+            length = schema["maxLength"]
+            checks.append(lambda v, e: not isinstance(v, str) or len(v) <= length
+                          or e.append(f"{path}: más de {length} caracteres"))
+
+        if "items" in schema:
+            item_check = self._compile(schema["items"], f"{path}[]")
+
+            def check_items(value, errors):
+                if isinstance(value, list):
+                    for item in value:
+                        item_check(item, errors)
+            checks.append(check_items)
+
+        properties = {name: self._compile(sub, f"{path}.{name}") for name, sub in schema.get("properties", {}).items()}
+        required = schema.get("required", [])
+        closed = schema.get("additionalProperties", True) is False
+        if properties or required or closed:
+            def check_object(value, errors):
+                if not isinstance(value, dict):
+                    return
+                for name in required:
+                    if name not in value:
+                        errors.append(f"{path}.{name}: campo requerido")
+                for name, item in value.items():
+                    if name in properties:
+                        properties[name](item, errors)
+                    elif closed:
+                        errors.append(f"{path}.{name}: campo no permitido")
+            checks.append(check_object)
+
+        def check(value, errors):
+            for c in checks:
+                c(value, errors)
+        return check
+
+    def validate(self, payload: Any) -> List[str]:
+        """Lista de errores de validación (vacía si el payload es válido)."""
+        errors: List[str] = []
+        self._check(payload, errors)
+        return errors
+
+    def parse(self, raw: str) -> Dict[str, Any]:
+        """Decodificar y validar; lanza ValueError con los errores encontrados."""
+        try:
+            payload = json.loads(raw)
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"JSON inválido: {e}")
+        errors = self.validate(payload)
+        if errors:
+            raise ValueError("; ".join(errors))
+        return payload
+
+
+STRATEGY_SIGNAL_VALIDATOR = SchemaValidator(STRATEGY_SIGNAL_SCHEMA)
+MULTI_ANALYSIS_VALIDATOR = SchemaValidator(MULTI_ANALYSIS_SCHEMA)
@@ -8,6 +8,8 @@ import os
 from typing import Dict, Any, Optional, List
 from datetime import datetime
 
+from .prompt_compiler import prompt_compiler
+
 logger = logging.getLogger(__name__)
 
 class TechnicalIndicatorsService:
@@ -190,12 +192,13 @@ class TechnicalIndicatorsService:
                 logger.error(error_msg)
                 raise Exception(error_msg)
     
-    def format_indicators_for_analysis(self, indicators: Dict[str, Any]) -> str:
+    def format_indicators_for_analysis(self, indicators: Dict[str, Any], strategy: Optional[str] = None) -> str:
         """
         Formatear indicadores técnicos para incluir en el análisis.
         
         Args:
             indicators: Diccionario con indicadores técnicos
+            strategy: Estrategia para ordenar los indicadores por relevancia
             
         Returns:
             String formateado con los indicadores técnicos
@@ -207,7 +210,10 @@ class TechnicalIndicatorsService:
             return "⚠️ No se pudieron obtener indicadores técnicos del backend"
         
         # Formatear todos los indicadores disponibles
-        formatted_indicators = self._format_all_indicators(indicators_data)
+        # Los más relevantes primero, recortados al presupuesto de tokens
+        formatted_indicators = prompt_compiler.compact_lines(
+            self._format_all_indicators(indicators_data), strategy=strategy, max_lines=15
+        )
         
         if formatted_indicators:
             # Agregar información sobre el estado de los datos
@@ -488,8 +494,7 @@ class TechnicalIndicatorsService:
             jma = indicators_data["jma"]
             formatted.append(f"JMA: ${jma:,.2f}")
         
-        # Limitar a los más relevantes para evitar saturación
-        return formatted[:15] if len(formatted) > 15 else formatted
+        return formatted
     
     def extract_trading_levels(self, indicators: Dict[str, Any], current_price: float) -> Dict[str, float]:
         """
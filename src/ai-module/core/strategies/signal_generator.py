@@ -19,7 +19,8 @@ class SignalGenerator:
         self.logger = logging.getLogger(__name__)
     
     def generate_signal(self, symbol: str, ohlcv_data: Dict[str, Any], 
-                       timeframe: str = "1h", strategy_type: str = "comprehensive") -> Dict[str, Any]:
+                       timeframe: str = "1h", strategy_type: str = "comprehensive",
+                       sentiment: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """
         Genera una señal de trading completa
         
@@ -28,6 +29,7 @@ class SignalGenerator:
             ohlcv_data: Datos OHLCV (open, high, low, close, volume)
             timeframe: Marco temporal (1m, 5m, 15m, 1h, 4h, 1d)
             strategy_type: Tipo de estrategia a usar
+            sentiment: Índice de sentimiento del símbolo (score y confidence), opcional
         
         Returns:
             Dict con la señal generada y detalles
@@ -36,9 +38,15 @@ class SignalGenerator:
             # Preparar los datos
             prepared_data = self.strategy_engine.prepare_data(ohlcv_data)
             
+            # El sentimiento solo entra en la señal comprensiva
+            sentiment_score = sentiment.get("score") if sentiment else None
+            sentiment_confidence = sentiment.get("confidence") if sentiment else None
+            
             # Generar la señal según el tipo de estrategia
             if strategy_type == "comprehensive":
-                signal_result = self.strategy_engine.generate_comprehensive_signal(prepared_data, timeframe)
+                signal_result = self.strategy_engine.generate_comprehensive_signal(
+                    prepared_data, timeframe, sentiment_score, sentiment_confidence
+                )
             elif strategy_type == "trend_following":
                 signal_result = self.strategy_engine.generate_trend_following_signal(prepared_data)
             elif strategy_type == "mean_reversion":
@@ -51,7 +59,9 @@ class SignalGenerator:
                 signal_result = self.strategy_engine.generate_volume_signal(prepared_data)
             else:
                 # Por defecto usar comprensiva
-                signal_result = self.strategy_engine.generate_comprehensive_signal(prepared_data, timeframe)
+                signal_result = self.strategy_engine.generate_comprehensive_signal(
+                    prepared_data, timeframe, sentiment_score, sentiment_confidence
+                )
             
             # Calcular niveles técnicos
             current_price = float(prepared_data['close'][-1])
@@ -11,6 +11,13 @@ from enum import Enum
 import logging
 
 
+# Peso del sentimiento en la señal comprensiva (el resto se reparte entre las técnicas)
+SENTIMENT_WEIGHT = 0.10
+
+# Por debajo de este valor absoluto el sentimiento se considera neutral
+SENTIMENT_DEAD_ZONE = 0.05
+
+
 class StrategyType(Enum):
     """Tipos de estrategia disponibles"""
     TREND_FOLLOWING = "trend_following"
@@ -239,8 +246,29 @@ class StrategyEngine:
         
         return self._consolidate_signals(signals, volume_factor, "VOLUME_BASED")
     
-    def generate_comprehensive_signal(self, data: Dict[str, np.ndarray], timeframe: str = "1h") -> SignalResult:
-        """Genera una señal comprensiva usando todas las estrategias"""
+    def generate_sentiment_signal(self, sentiment: float, confidence: float = 0.6) -> SignalResult:
+        """
+        Genera señal a partir de un índice de sentimiento
+        
+        Args:
+            sentiment: Puntuación de sentimiento en [-1, 1]
+            confidence: Confianza del índice en [0, 1]
+        """
+        if abs(sentiment) < SENTIMENT_DEAD_ZONE:
+            return SignalResult("HOLD", 0.0, confidence=confidence)
+        # Un índice de ±0.5 ya es un sentimiento claramente marcado
+        strength = min(abs(sentiment) / 0.5, 1.0)
+        return SignalResult("BUY" if sentiment > 0 else "SELL", strength, confidence=confidence)
+    
+    def generate_comprehensive_signal(self, data: Dict[str, np.ndarray], timeframe: str = "1h",
+                                      sentiment: Optional[float] = None,
+                                      sentiment_confidence: Optional[float] = None) -> SignalResult:
+        """
+        Genera una señal comprensiva usando todas las estrategias
+        
+        Si se indica `sentiment` (índice en [-1, 1]) entra como una señal más
+        con peso SENTIMENT_WEIGHT.
+        """
         try:
             # Generar señales de cada categoría
             trend_signal = self.generate_trend_following_signal(data)
@@ -287,6 +315,16 @@ class StrategyEngine:
                 (volume_signal, weights['volume'])
             ]
             
+            sentiment_signal = None
+            if sentiment is not None:
+                sentiment_signal = self.generate_sentiment_signal(
+                    sentiment, 0.6 if sentiment_confidence is None else sentiment_confidence
+                )
+                weights = {name: weight * (1 - SENTIMENT_WEIGHT) for name, weight in weights.items()}
+                weights['sentiment'] = SENTIMENT_WEIGHT
+                signals_data = [(signal, weight * (1 - SENTIMENT_WEIGHT)) for signal, weight in signals_data]
+                signals_data.append((sentiment_signal, SENTIMENT_WEIGHT))
+            
             buy_score = 0.0
             sell_score = 0.0
             total_confidence = 0.0
@@ -301,6 +339,9 @@ class StrategyEngine:
                 'timeframe': timeframe,
                 'weights_used': weights
             }
+            if sentiment_signal is not None:
+                details['sentiment_signal'] = sentiment_signal.signal
+                details['sentiment_score'] = round(float(sentiment), 4)
             
             for signal, weight in signals_data:
                 if signal.signal == "BUY":
@@ -409,7 +450,8 @@ class StrategyEngine:
                 ('mean_reversion_signal', 'Reversión'),
                 ('momentum_signal', 'Momentum'),
                 ('volatility_signal', 'Volatilidad'),
-                ('volume_signal', 'Volumen')
+                ('volume_signal', 'Volumen'),
+                ('sentiment_signal', 'Sentimiento')
             ]
             
             explanation += "🔍 **Señales individuales**:\n"
@@ -7,8 +7,9 @@ import os
 import sys
 import logging
 import asyncio
+import json
 import uuid
-from typing import Dict, Any
+from typing import Dict, Any, AsyncIterator, Tuple, List
 from contextlib import asynccontextmanager
 from datetime import datetime
 
@@ -47,7 +48,7 @@ try:
     from fastapi.middleware.cors import CORSMiddleware
     from fastapi.middleware.trustedhost import TrustedHostMiddleware
     from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-    from fastapi.responses import JSONResponse
+    from fastapi.responses import JSONResponse, StreamingResponse
     logger.info("✅ FastAPI importado correctamente")
 except ImportError:
     logger.error("❌ FastAPI no disponible")
@@ -58,10 +59,15 @@ from core.config.security_config import SecurityConfig
 from core.middleware.rate_limiter import rate_limiter
 from core.validation.input_validator import InputValidator, InputValidationError
 from core.services.ai_service import AIService
+from core.services.completion_cache import CacheContext, CompletionCache
+from core.services.llm_governor import set_request_priority
+from core.services.prompt_compiler import compress_numbers, prompt_compiler
 from core.services.data_service import DataService
+from core.services.external_data_client import external_data_client, adapt_economic_events
+from core.external_data.data_integration_service import get_external_data_for_symbol, get_all_external_data
 from core.models.request_models import (
     CryptoAnalysisRequest, TradingSignalRequest, CustomPromptRequest,
-    MultiSymbolRequest, HealthCheckRequest, RequestFactory,
+    MultiSymbolRequest, HealthCheckRequest, IntentClassificationRequest, RequestFactory,
     AdvancedStrategyRequest, AdvancedStrategyType
 )
 from core.services.advanced_strategies_service import AdvancedStrategiesService, StrategyResult, test_router
@@ -115,6 +121,7 @@ async def lifespan(app: FastAPI):
         raise
     finally:
         logger.info("🛑 Cerrando módulo AI...")
+        await external_data_client.aclose()
 
 
 # Crear aplicación FastAPI
@@ -211,6 +218,7 @@ async def detailed_health_check(token: str = Depends(verify_token)):
         # Verificar estado de servicios
         ai_status = ai_service.get_service_status() if ai_service else {"status": "not_initialized"}
         data_status = data_service.get_service_status() if data_service else {"status": "not_initialized"}
+        strategies_status = advanced_strategies_service.get_service_status() if advanced_strategies_service else {"status": "not_initialized"}
         rate_limiter_status = rate_limiter.get_global_stats()
         
         return {
@@ -220,7 +228,9 @@ async def detailed_health_check(token: str = Depends(verify_token)):
             "services": {
                 "ai_service": ai_status,
                 "data_service": data_status,
-                "rate_limiter": rate_limiter_status
+                "advanced_strategies": strategies_status,
+                "rate_limiter": rate_limiter_status,
+                "external_data": external_data_client.get_stats()
             },
             "configuration": {
                 "environment": "development" if not SecurityConfig.is_production() else "production",
@@ -245,6 +255,7 @@ async def analyze_crypto(
     """Analizar criptomoneda con IA."""
     # Rate limiting
     await rate_limit_middleware(request)
+    set_request_priority(req.priority)
     
     request_id = req.request_id or str(uuid.uuid4())
     client_ip = get_client_ip(request)
@@ -297,6 +308,136 @@ async def analyze_crypto(
         )
 
 
+# Instrucciones fijas de /prompt (mensaje de sistema, sin datos variables)
+PROMPT_SYSTEM_PREFIX = """Eres un experto analista de criptomonedas. Responde de manera DETALLADA y ESTRUCTURADA a la CONSULTA del usuario.
+
+REGLAS:
+1. Máximo 350 palabras
+2. INCLUYE SOLO las secciones esenciales
+3. Usa emojis clave (⚠️ 📊 💰 🔄 📈 💡)
+4. Estructura SIMPLIFICADA:
+   - 💰 Precio actual de la cripto (línea inicial)
+   - ⚠️ Advertencia legal
+   - 📊 Análisis de Rentabilidad (con cálculos específicos)
+   - 💰 Cálculo de ROI y Ganancias
+   - 🔄 Evaluación de la Estrategia
+   - 📈 Contexto Técnico Actual (interpretación relevante para tu situación)
+   - 💡 Recomendaciones Accionables
+5. Para ROI: Muestra solo los resultados finales sin fórmulas
+6. Para múltiples compras: Calcula ROI individual por cada compra y luego promedio ponderado
+7. Para indicadores técnicos, explica qué significan para la situación específica del usuario (no solo definiciones)
+8. Incluye cálculos específicos y números exactos
+9. Mantén un tono profesional pero accesible
+10. Para cada compra: Muestra solo el resultado final
+11. NO incluir: Gestión de Riesgo, Comandos útiles, ni texto de cierre
+12. SIEMPRE incluir el precio actual de la cripto en la primera línea
+13. USA SALTOS DE LÍNEA para separar cada sección (\\n\\n)
+14. En Contexto Técnico: Explica qué significan los indicadores para tu inversión específica, no solo definiciones generales
+
+Formato con saltos de línea:
+💰 Precio actual: $XXX.XX
+
+⚠️ Advertencia legal
+
+📊 Análisis de Rentabilidad
+
+💰 Cálculo de ROI
+
+🔄 Evaluación de la Estrategia
+
+📈 Contexto Técnico
+
+💡 Recomendaciones Accionables"""
+
+
+async def _build_prompt_request(
+    req: CustomPromptRequest,
+    token: str
+) -> Tuple[List[Dict[str, str]], Dict[str, Any], CacheContext]:
+    """Construir mensajes, parámetros y contexto de caché para /prompt."""
+    # Extraer símbolo de la consulta si es una pregunta sobre inversión
+    import re
+    symbol_match = re.search(r'\b(BTC|ETH|SOL|ADA|DOT|LINK|UNI|AVAX|MATIC|JASMY|DOGE|SHIB|PEPE|WIF|BONK)\b', req.prompt.upper())
+    symbol = symbol_match.group(1) if symbol_match else None
+    
+    # Obtener precio actual y datos técnicos si se menciona un símbolo
+    current_price = None
+    technical_data = ""
+    if symbol:
+        try:
+            # Obtener precio actual del símbolo
+            current_price = await data_service.get_current_price(symbol)
+            
+            import httpx
+            async with httpx.AsyncClient() as client:
+                # Obtener indicadores técnicos del backend
+                backend_url = "http://localhost:8000"
+                headers = {"Authorization": f"Bearer {token}"}
+                
+                # Obtener RSI, MACD, y otros indicadores
+                ta_response = await client.get(
+                    f"{backend_url}/indicators?symbol={symbol}-USD&tf=1h&limit=100&profile=basic",
+                    headers=headers,
+                    timeout=10.0
+                )
+                
+                if ta_response.status_code == 200:
+                    ta_data = ta_response.json()
+                    indicators = ta_data.get('indicators', {})
+                    indicator_lines = [
+                        f"- {label}: {indicators[key]}"
+                        for label, key in (
+                            ("RSI", "RSI"), ("MACD", "MACD"), ("SMA 20", "SMA_20"), ("SMA 50", "SMA_50"),
+                            ("EMA 12", "EMA_12"), ("Bollinger Superior", "Bollinger_Upper"),
+                            ("Bollinger Inferior", "Bollinger_Lower")
+                        )
+                        if indicators.get(key) is not None
+                    ]
+                    technical_data = compress_numbers(
+                        f"PRECIO ACTUAL DE {symbol}: ${current_price:,.2f}\n"
+                        f"DATOS TÉCNICOS DE {symbol} (1H):\n"
+                    ) + "\n".join(prompt_compiler.compact_lines(indicator_lines))
+                else:
+                    technical_data = compress_numbers(
+                        f"PRECIO ACTUAL DE {symbol}: ${current_price:,.2f}\n"
+                        f"⚠️ No se pudieron obtener datos técnicos para {symbol}"
+                    )
+                    
+        except Exception as e:
+            logger.warning(f"Error obteniendo datos para {symbol}: {e}")
+            technical_data = f"⚠️ Error obteniendo datos para {symbol}: {str(e)}"
+    
+    # Instrucciones de sistema, historial recortado al presupuesto y consulta al final
+    history = prompt_compiler.trim_history(req.conversation_history or [])
+    messages = [{"role": "system", "content": PROMPT_SYSTEM_PREFIX}]
+    messages.extend(history)
+    messages.append({"role": "user", "content": f"CONSULTA: {req.prompt}\n\n{technical_data}".strip()})
+    
+    # Parámetros del modelo
+    model_params = req.model_parameters or {}
+    model_params.update({
+        "temperature": req.creativity_level,
+        "max_tokens": req.expected_response_length
+    })
+    
+    # Contexto de caché: la consulta libre habilita el nivel semántico,
+    # acotado al mismo historial y precio exacto (la respuesta lo cita)
+    cache_context = CacheContext(
+        template="prompt",
+        symbol=symbol,
+        timeframe="1h",
+        fingerprint=CompletionCache.fingerprint({
+            "history": history,
+            "price": float(current_price) if current_price else None,
+            "temperature": req.creativity_level,
+            "max_tokens": req.expected_response_length
+        }, significant_digits=None),
+        query=req.prompt
+    )
+    
+    return messages, model_params, cache_context
+
+
 @app.post("/prompt")
 async def custom_prompt(
     request: Request,
@@ -305,6 +446,7 @@ async def custom_prompt(
 ):
     """Procesar prompt personalizado."""
     await rate_limit_middleware(request)
+    set_request_priority(req.priority)
     
     request_id = req.request_id or str(uuid.uuid4())
     client_ip = get_client_ip(request)
@@ -312,124 +454,12 @@ async def custom_prompt(
     logger.info(f"Prompt personalizado - ID: {request_id}, IP: {client_ip}")
     
     try:
-        # Extraer símbolo de la consulta si es una pregunta sobre inversión
-        import re
-        symbol_match = re.search(r'\b(BTC|ETH|SOL|ADA|DOT|LINK|UNI|AVAX|MATIC|JASMY|DOGE|SHIB|PEPE|WIF|BONK)\b', req.prompt.upper())
-        symbol = symbol_match.group(1) if symbol_match else None
-        
-        # Obtener precio actual y datos técnicos si se menciona un símbolo
-        current_price = None
-        technical_data = ""
-        if symbol:
-            try:
-                # Obtener precio actual del símbolo
-                current_price = await data_service.get_current_price(symbol)
-                
-                import httpx
-                async with httpx.AsyncClient() as client:
-                    # Obtener indicadores técnicos del backend
-                    backend_url = "http://localhost:8000"
-                    headers = {"Authorization": f"Bearer {token}"}
-                    
-                    # Obtener RSI, MACD, y otros indicadores
-                    ta_response = await client.get(
-                        f"{backend_url}/indicators?symbol={symbol}-USD&tf=1h&limit=100&profile=basic",
-                        headers=headers,
-                        timeout=10.0
-                    )
-                    
-                    if ta_response.status_code == 200:
-                        ta_data = ta_response.json()
-                        indicators = ta_data.get('indicators', {})
-                        technical_data = f"""
-                        PRECIO ACTUAL DE {symbol}: ${current_price:,.2f}
-                        
-                        DATOS TÉCNICOS ACTUALES DE {symbol} (TIMEFRAME 1H):
-                        - RSI: {indicators.get('RSI', 'N/A')}
-                        - MACD: {indicators.get('MACD', 'N/A')}
-                        - Media Móvil 20: {indicators.get('SMA_20', 'N/A')}
-                        - Media Móvil 50: {indicators.get('SMA_50', 'N/A')}
-                        - EMA 12: {indicators.get('EMA_12', 'N/A')}
-                        - Bollinger Superior: {indicators.get('Bollinger_Upper', 'N/A')}
-                        - Bollinger Inferior: {indicators.get('Bollinger_Lower', 'N/A')}
-                        """
-                    else:
-                        technical_data = f"""
-                        PRECIO ACTUAL DE {symbol}: ${current_price:,.2f}
-                        ⚠️ No se pudieron obtener datos técnicos para {symbol}
-                        """
-                        
-            except Exception as e:
-                logger.warning(f"Error obteniendo datos para {symbol}: {e}")
-                technical_data = f"⚠️ Error obteniendo datos para {symbol}: {str(e)}"
-        
-        # Preparar mensajes para el modelo
-        messages = []
-        
-        # Agregar historial de conversación si existe
-        if req.conversation_history:
-            messages.extend(req.conversation_history)
-        
-        # Crear prompt optimizado con datos técnicos
-        enhanced_prompt = f"""
-        Eres un experto analista de criptomonedas. Responde de manera DETALLADA y ESTRUCTURADA:
-
-        CONSULTA: {req.prompt}
-
-        {technical_data}
-
-        REGLAS:
-        1. Máximo 350 palabras
-        2. INCLUYE SOLO las secciones esenciales
-        3. Usa emojis clave (⚠️ 📊 💰 🔄 📈 💡)
-        4. Estructura SIMPLIFICADA:
-           - 💰 Precio actual de la cripto (línea inicial)
-           - ⚠️ Advertencia legal
-           - 📊 Análisis de Rentabilidad (con cálculos específicos)
-           - 💰 Cálculo de ROI y Ganancias
-           - 🔄 Evaluación de la Estrategia
-           - 📈 Contexto Técnico Actual (interpretación relevante para tu situación)
-           - 💡 Recomendaciones Accionables
-        5. Para ROI: Muestra solo los resultados finales sin fórmulas
-        6. Para múltiples compras: Calcula ROI individual por cada compra y luego promedio ponderado
-        7. Para indicadores técnicos, explica qué significan para la situación específica del usuario (no solo definiciones)
-        8. Incluye cálculos específicos y números exactos
-        9. Mantén un tono profesional pero accesible
-        10. Para cada compra: Muestra solo el resultado final
-        11. NO incluir: Gestión de Riesgo, Comandos útiles, ni texto de cierre
-        12. SIEMPRE incluir el precio actual de la cripto en la primera línea
-        13. USA SALTOS DE LÍNEA para separar cada sección (\\n\\n)
-        14. En Contexto Técnico: Explica qué significan los indicadores para tu inversión específica, no solo definiciones generales
-
-        Formato con saltos de línea:
-        💰 Precio actual: $XXX.XX
-
-        ⚠️ Advertencia legal
-
-        📊 Análisis de Rentabilidad
-
-        💰 Cálculo de ROI
-
-        🔄 Evaluación de la Estrategia
-
-        📈 Contexto Técnico
-
-        💡 Recomendaciones Accionables
-        """
-        
-        # Agregar prompt mejorado
-        messages.append({"role": "user", "content": enhanced_prompt})
-        
-        # Parámetros del modelo
-        model_params = req.model_parameters or {}
-        model_params.update({
-            "temperature": req.creativity_level,
-            "max_tokens": req.expected_response_length
-        })
+        messages, model_params, cache_context = await _build_prompt_request(req, token)
         
         # Generar respuesta
         response_text = await ai_service.generate_custom_completion(
             messages=messages,
+            cache_context=cache_context,
             **model_params
         )
         
@@ -468,6 +498,7 @@ async def multi_symbol_analysis(
 ):
     """Análisis de múltiples símbolos."""
     await rate_limit_middleware(request)
+    set_request_priority(req.priority)
     
     request_id = req.request_id or str(uuid.uuid4())
     client_ip = get_client_ip(request)
@@ -477,41 +508,20 @@ async def multi_symbol_analysis(
     try:
         # Obtener precios de todos los símbolos en paralelo
         prices = await data_service.get_multiple_prices(req.symbols)
+        valid_prices = {symbol: prices.get(symbol, 0) for symbol in req.symbols if prices.get(symbol, 0) > 0}
         
-        # Generar análisis individual para cada símbolo
-        analyses = {}
-        for symbol in req.symbols:
-            price = prices.get(symbol, 0)
-            if price > 0:
-                analysis = await ai_service.generate_crypto_analysis(
-                    symbol=symbol,
-                    price=price,
-                    timeframes=[req.timeframe],
-                    user_prompt=f"Análisis para comparación múltiple. Timeframe: {req.timeframe}",
-                    max_tokens=400
-                )
-                analyses[symbol] = {
-                    "price": price,
-                    "analysis": analysis
-                }
-        
-        # Generar análisis comparativo si se solicita
-        comparative_analysis = None
-        if req.compare_symbols and len(analyses) > 1:
-            symbols_data = ", ".join([
-                f"{symbol}: ${data['price']:,.2f}" 
-                for symbol, data in analyses.items()
-            ])
-            
-            comparative_prompt = f"""
-            Compara los siguientes activos: {symbols_data}
-            Timeframe: {req.timeframe}
-            Proporciona un análisis comparativo conciso destacando fortalezas y debilidades relativas.
-            """
-            
-            comparative_analysis = await ai_service.generate_custom_completion([
-                {"role": "user", "content": comparative_prompt}
-            ], max_tokens=500)
+        # Análisis individuales y comparativa en un único tiempo de espera del LLM
+        mode = req.mode.value if hasattr(req.mode, "value") else req.mode
+        texts, comparative_analysis = await ai_service.generate_multi_symbol_analysis(
+            valid_prices,
+            req.timeframe,
+            compare=req.compare_symbols and len(valid_prices) > 1,
+            mode=mode
+        )
+        analyses = {
+            symbol: {"price": valid_prices[symbol], "analysis": texts[symbol]}
+            for symbol in valid_prices if symbol in texts
+        }
         
         response = {
             "request_id": request_id,
@@ -523,7 +533,8 @@ async def multi_symbol_analysis(
             "metadata": {
                 "generated_at": req.timestamp.isoformat(),
                 "symbols_analyzed": len(analyses),
-                "include_comparison": req.compare_symbols
+                "include_comparison": req.compare_symbols,
+                "mode": mode
             }
         }
         
@@ -540,6 +551,37 @@ async def multi_symbol_analysis(
         )
 
 
+@app.post("/classify-intent")
+async def classify_intent(
+    request: Request,
+    req: IntentClassificationRequest,
+    token: str = Depends(verify_token)
+):
+    """Clasificar la intención de un mensaje (endpoint, símbolo y timeframe)."""
+    await rate_limit_middleware(request)
+    set_request_priority(req.priority)
+    
+    request_id = req.request_id or str(uuid.uuid4())
+    
+    try:
+        intent = await ai_service.classify_intent(req.message)
+        return {
+            "request_id": request_id,
+            "intent": intent,
+            "metadata": {
+                "generated_at": req.timestamp.isoformat(),
+                "backend": ai_service.backends.backend_for("intent").name
+            }
+        }
+        
+    except Exception as e:
+        logger.error(f"Error clasificando intención - ID: {request_id}, Error: {e}")
+        raise HTTPException(
+            status_code=500,
+            detail="Error interno clasificando intención"
+        )
+
+
 @app.post("/fundamental_analysis")
 async def fundamental_analysis(req: CryptoAnalysisRequest):
     """Generar análisis fundamental de una criptomoneda."""
@@ -551,7 +593,6 @@ async def fundamental_analysis(req: CryptoAnalysisRequest):
         current_price = await data_service.get_current_price(req.symbol)
         
         # Obtener datos externos (noticias, eventos económicos, etc.)
-        from core.external_data.data_integration_service import get_external_data_for_symbol
         external_data = await get_external_data_for_symbol(req.symbol)
         
         # Generar análisis fundamental
@@ -582,10 +623,8 @@ async def fundamental_analysis(req: CryptoAnalysisRequest):
 async def get_economic_calendar(days: int = 7):
     """Obtener calendario de eventos económicos."""
     try:
-        from core.external_data.economic_calendar_service import get_economic_events
-        
-        # Obtener eventos económicos
-        events = await get_economic_events(days)
+        # Obtener eventos económicos del data-service
+        events = adapt_economic_events(await external_data_client.get_economic_events(), days)
         
         return {
             "period_days": days,
@@ -608,13 +647,10 @@ async def macro_analysis(req: dict):
         if not query:
             raise ValueError("Query is required")
         
-        # Obtener eventos económicos
-        from core.external_data.economic_calendar_service import get_economic_events
-        events = await get_economic_events(days)
-        
-        # Obtener noticias relevantes
-        from core.external_data.news_service import get_all_relevant_news
-        news = await get_all_relevant_news()
+        # Obtener eventos económicos y noticias relevantes del data-service
+        events = adapt_economic_events(await external_data_client.get_economic_events(), days)
+        external_data = await get_all_external_data()
+        news = external_data["news"].get("crypto_news", [])
         
         # Generar análisis macroeconómico
         analysis = await ai_service.generate_macro_analysis(
@@ -641,17 +677,8 @@ async def macro_analysis(req: dict):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/advanced-strategy")
-async def advanced_strategy(
-    request: Request,
-    req: dict = Body(...),
-    token: str = Depends(verify_token)
-):
-    """Ejecutar una estrategia avanzada de trading o señal simple."""
-    await rate_limit_middleware(request)
-    request_id = req.get("request_id") or str(uuid.uuid4())
-    client_ip = get_client_ip(request)
-
+def _parse_advanced_strategy_request(req: Dict[str, Any]) -> AdvancedStrategyRequest:
+    """Convertir el body de /advanced-strategy (estrategia avanzada o señal simple)."""
     # Detectar tipo de request y convertir si es necesario
     if "strategy_type" in req:
         # Es AdvancedStrategyRequest
@@ -688,8 +715,24 @@ async def advanced_strategy(
             user_prompt=f"Generar señal de trading con {strategy_type} para {req['symbol']}",
             include_risk_analysis=True,
             include_price_targets=True,
-            timestamp=timestamp
+            timestamp=timestamp,
+            priority=req.get("priority") or "normal"
         )
+    return advanced_req
+
+
+@app.post("/advanced-strategy")
+async def advanced_strategy(
+    request: Request,
+    req: dict = Body(...),
+    token: str = Depends(verify_token)
+):
+    """Ejecutar una estrategia avanzada de trading o señal simple."""
+    await rate_limit_middleware(request)
+    request_id = req.get("request_id") or str(uuid.uuid4())
+    client_ip = get_client_ip(request)
+    advanced_req = _parse_advanced_strategy_request(req)
+    set_request_priority(advanced_req.priority)
     logger.info(f"Estrategia avanzada - ID: {request_id}, IP: {client_ip}, Estrategia: {advanced_req.strategy_type}")
     try:
         result: StrategyResult = await advanced_strategies_service.execute_strategy(
@@ -749,6 +792,163 @@ async def generate_endpoint(
         )
 
 
+# ============================================
+# STREAMING (SSE)
+# ============================================
+
+def _sse_event(event: Dict[str, Any]) -> str:
+    """Serializar un evento Server-Sent Events."""
+    return f"data: {json.dumps(event, ensure_ascii=False, default=str)}\n\n"
+
+
+def _sse_response(events: AsyncIterator[Dict[str, Any]], request_id: str) -> StreamingResponse:
+    """
+    Respuesta SSE: eventos {"type": "chunk", "content"} con los fragmentos,
+    y un evento final {"type": "done", "data"} con el mismo cuerpo que la
+    versión no streaming, o {"type": "error", "detail"} si algo falla.
+    """
+    async def _stream():
+        try:
+            async for event in events:
+                yield _sse_event(event)
+        except HTTPException as e:
+            yield _sse_event({"type": "error", "status_code": e.status_code, "detail": e.detail})
+        except Exception as e:
+            logger.error(f"Error en streaming - ID: {request_id}, Error: {e}")
+            yield _sse_event({"type": "error", "status_code": 500, "detail": "Error interno en streaming"})
+
+    return StreamingResponse(
+        _stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/analyze/stream")
+async def analyze_crypto_stream(
+    request: Request,
+    req: CryptoAnalysisRequest,
+    token: str = Depends(verify_token)
+):
+    """Versión en streaming de /analyze."""
+    await rate_limit_middleware(request)
+    set_request_priority(req.priority)
+    request_id = req.request_id or str(uuid.uuid4())
+    logger.info(f"Análisis en streaming - ID: {request_id}, IP: {get_client_ip(request)}, Símbolo: {req.symbol}")
+
+    async def _events():
+        current_price = await data_service.get_current_price(req.symbol)
+        if current_price <= 0:
+            raise HTTPException(status_code=503, detail=f"No se pudo obtener precio para {req.symbol}")
+
+        parts = []
+        async for chunk in ai_service.stream_crypto_analysis(
+            symbol=req.symbol,
+            price=current_price,
+            timeframes=req.timeframes,
+            user_prompt=req.user_prompt or "",
+            max_tokens=800 if req.include_risk_analysis else 500
+        ):
+            parts.append(chunk)
+            yield {"type": "chunk", "content": chunk}
+
+        yield {"type": "done", "data": {
+            "request_id": request_id,
+            "symbol": req.symbol,
+            "current_price": current_price,
+            "timeframes": req.timeframes,
+            "analysis_type": req.analysis_type,
+            "analysis": "".join(parts).strip(),
+            "metadata": {
+                "generated_at": req.timestamp.isoformat(),
+                "include_risk_analysis": req.include_risk_analysis,
+                "include_price_targets": req.include_price_targets
+            }
+        }}
+
+    return _sse_response(_events(), request_id)
+
+
+@app.post("/prompt/stream")
+async def custom_prompt_stream(
+    request: Request,
+    req: CustomPromptRequest,
+    token: str = Depends(verify_token)
+):
+    """Versión en streaming de /prompt."""
+    await rate_limit_middleware(request)
+    set_request_priority(req.priority)
+    request_id = req.request_id or str(uuid.uuid4())
+    logger.info(f"Prompt en streaming - ID: {request_id}, IP: {get_client_ip(request)}")
+
+    async def _events():
+        messages, model_params, cache_context = await _build_prompt_request(req, token)
+        parts = []
+        async for chunk in ai_service.stream_completion(messages, cache_context, **model_params):
+            parts.append(chunk)
+            yield {"type": "chunk", "content": chunk}
+
+        yield {"type": "done", "data": {
+            "request_id": request_id,
+            "prompt": req.prompt,
+            "response": "".join(parts).strip(),
+            "parameters": {
+                "creativity_level": req.creativity_level,
+                "expected_length": req.expected_response_length,
+                "conversation_length": len(req.conversation_history)
+            },
+            "metadata": {
+                "generated_at": req.timestamp.isoformat()
+            }
+        }}
+
+    return _sse_response(_events(), request_id)
+
+
+@app.post("/advanced-strategy/stream")
+async def advanced_strategy_stream(
+    request: Request,
+    req: dict = Body(...),
+    token: str = Depends(verify_token)
+):
+    """
+    Versión en streaming de /advanced-strategy.
+
+    Solo emite eventos de progreso; el evento final lleva la señal validada.
+    """
+    await rate_limit_middleware(request)
+    request_id = req.get("request_id") or str(uuid.uuid4())
+    advanced_req = _parse_advanced_strategy_request(req)
+    set_request_priority(advanced_req.priority)
+    logger.info(f"Estrategia avanzada en streaming - ID: {request_id}, Estrategia: {advanced_req.strategy_type}")
+
+    async def _events():
+        async for kind, payload in advanced_strategies_service.stream_strategy(
+            strategy_type=advanced_req.strategy_type,
+            symbol=advanced_req.symbol,
+            timeframe=advanced_req.timeframe,
+            correlated_symbol=advanced_req.secondary_symbol
+        ):
+            if kind == "progress":
+                yield {"type": "progress", "content": payload}
+                continue
+
+            strategy_type_value = advanced_req.strategy_type.value if hasattr(advanced_req.strategy_type, 'value') else str(advanced_req.strategy_type)
+            yield {"type": "done", "data": {
+                "request_id": request_id,
+                "strategy_type": strategy_type_value,
+                "symbol": advanced_req.symbol,
+                "secondary_symbol": advanced_req.secondary_symbol,
+                "timeframe": advanced_req.timeframe,
+                "result": payload.__dict__,
+                "metadata": {
+                    "generated_at": advanced_req.timestamp.isoformat() if advanced_req.timestamp else None
+                }
+            }}
+
+    return _sse_response(_events(), request_id)
+
+
 # ============================================
 # MANEJO DE ERRORES
 # ============================================
@@ -1,2 +0,0 @@
-# Paquete para servicios de datos externos
-# Incluye servicios para obtener noticias, eventos económicos y tendencias de redes sociales
@@ -0,0 +1,3 @@
+"""
+Tests del módulo de IA.
+"""
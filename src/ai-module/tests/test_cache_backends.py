@@ -0,0 +1,89 @@
+"""
+Caché compartida (copia de data-service/core/cache_backends.py) contra un
+servidor Redis falso.
+"""
+
+import asyncio
+import time
+
+from core.services.cache_backends import InProcessBackend, RedisBackend, serialize
+
+
+class FakeRedis:
+    """Subconjunto asíncrono de redis.asyncio usado por RedisBackend."""
+
+    def __init__(self):
+        self.data = {}
+        self.closed = False
+
+    async def get(self, key):
+        item = self.data.get(key)
+        if item is None or item[1] <= time.time():
+            return None
+        return item[0]
+
+    async def set(self, key, value, px=None):
+        self.data[key] = (value, time.time() + px / 1000)
+
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+    async def scan_iter(self, match=None, count=None):
+        prefix = match.rstrip("*")
+        for key in list(self.data):
+            if key.startswith(prefix):
+                yield key
+
+    async def close(self):
+        self.closed = True
+
+
+def test_round_trip_keeps_value_and_expiry():
+    async def scenario():
+        backend = RedisBackend("redis://fake", "ai", client=FakeRedis())
+        await backend.set("prices:BTC", {"prices": {"binance": 65000.5}}, ttl=60)
+        return await backend.get("prices:BTC")
+
+    value, expires_at = asyncio.run(scenario())
+    assert value == {"prices": {"binance": 65000.5}}
+    assert 55 < expires_at - time.time() <= 60
+
+
+def test_undecodable_entry_is_a_miss():
+    async def scenario():
+        client = FakeRedis()
+        backend = RedisBackend("redis://fake", "ai", client=client)
+        await client.set("ai:corrupt", b"\xff\x00not-a-cache-entry", px=60000)
+        await client.set("ai:not-a-pair", serialize({"value": 1}), px=60000)
+        return await backend.get("corrupt"), await backend.get("not-a-pair")
+
+    assert asyncio.run(scenario()) == (None, None)
+
+
+def test_clear_only_touches_its_namespace():
+    async def scenario():
+        client = FakeRedis()
+        ai = RedisBackend("redis://fake", "ai", client=client)
+        data = RedisBackend("redis://fake", "data", client=client)
+        await ai.set("k", 1, ttl=60)
+        await data.set("k", 2, ttl=60)
+        await ai.clear()
+        return await ai.get("k"), await data.get("k")
+
+    missing, kept = asyncio.run(scenario())
+    assert missing is None
+    assert kept[0] == 2
+
+
+def test_in_process_backend_expires_entries():
+    async def scenario():
+        backend = InProcessBackend("ai")
+        await backend.set("k", "v", ttl=0.05)
+        fresh = await backend.get("k")
+        await asyncio.sleep(0.1)
+        return fresh, await backend.get("k")
+
+    fresh, expired = asyncio.run(scenario())
+    assert fresh[0] == "v"
+    assert expired is None
@@ -0,0 +1,79 @@
+"""
+Cliente de datos externos contra un data-service simulado con httpx.MockTransport.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+
+from core.services.external_data_client import ExternalDataClient, adapt_economic_events, adapt_integrated_data
+
+INTEGRATED_BTC = {
+    "symbol": "BTC",
+    "news": {"news": [{"title": "BTC rallies"}], "count": 1, "timestamp": "2026-10-19T10:00:00"},
+    "social": {"posts": [{"platform": "twitter", "content": "BTC to the moon"}], "count": 1, "timestamp": "2026-10-19T10:00:00"},
+    "events": {},
+    "sentiment_index": {"symbol": "BTC", "score": 0.42, "confidence": 0.6, "items": 12},
+    "sources": ["news", "social", "events"],
+    "partial": False,
+    "timestamp": "2026-10-19T10:00:00",
+}
+
+
+def make_client(handler) -> ExternalDataClient:
+    client = ExternalDataClient(base_url="http://data-service/api/v1", ttl=60)
+    client._client = httpx.AsyncClient(base_url=client.base_url, transport=httpx.MockTransport(handler))
+    return client
+
+
+def test_sentiment_index_comes_from_the_integrated_payload():
+    paths = []
+
+    def handler(request):
+        paths.append(request.url.path)
+        return httpx.Response(200, json=INTEGRATED_BTC)
+
+    async def scenario():
+        client = make_client(handler)
+        index = await client.get_sentiment_index("btc")
+        # La segunda lectura sale del L1 compartido con los datos integrados
+        await client.get_integrated("BTC")
+        return index
+
+    index = asyncio.run(scenario())
+    assert index["score"] == 0.42
+    assert paths == ["/api/v1/integration/BTC"]
+
+
+def test_sentiment_index_is_none_when_the_data_service_fails():
+    def handler(request):
+        return httpx.Response(503)
+
+    index = asyncio.run(make_client(handler).get_sentiment_index("BTC"))
+    assert index is None
+
+
+def test_adapted_social_data_keeps_the_posts():
+    social = adapt_integrated_data(INTEGRATED_BTC)["social"]
+
+    assert social["posts"] == [{"platform": "twitter", "content": "BTC to the moon"}]
+    assert social["sentiment"]["overall"] == "positive"
+
+
+def test_economic_events_are_limited_to_the_requested_days():
+    today = datetime.now()
+    soon = (today + timedelta(days=2)).strftime("%Y-%m-%d")
+    later = (today + timedelta(days=20)).strftime("%Y-%m-%d")
+    data = {
+        "high_impact_events": [{"title": "FOMC", "date": soon, "impact": "high"},
+                               {"title": "CPI", "date": later, "impact": "high"}],
+        "upcoming_events": [{"title": "PMI", "date": soon, "impact": "medium"},
+                            {"title": "Claims", "date": soon, "impact": "low"}],
+    }
+
+    events = adapt_economic_events(data, days=7)
+
+    assert [event["title"] for event in events["high_impact_events"]] == ["FOMC"]
+    assert [event["title"] for event in events["medium_impact_events"]] == ["PMI"]
+    assert events["crypto_events"] == []
@@ -0,0 +1,96 @@
+"""
+Backend local: qué fallos desactivan el modelo y bajo qué clave se cachea
+una respuesta que vino del respaldo.
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from core.services import llm_backends
+from core.services.ai_service import AIService, ModelType
+from core.services.completion_cache import CacheContext, CompletionCache
+from core.services.llm_backends import LocalLLMBackend
+
+
+class _SlowLlama:
+    def __init__(self, **kwargs):
+        time.sleep(0.2)
+
+    def create_chat_completion(self, **kwargs):
+        return {"choices": [{"message": {"content": "local"}}]}
+
+
+class _BrokenLlama:
+    def __init__(self, **kwargs):
+        raise ValueError("GGUF inválido")
+
+
+def _local_backend(monkeypatch, llama_cls, timeout=5.0) -> LocalLLMBackend:
+    monkeypatch.setattr(llm_backends, "Llama", llama_cls)
+    return LocalLLMBackend(model_path="/modelo.gguf", base_url="", timeout=timeout)
+
+
+def test_slow_first_load_does_not_disable_backend(monkeypatch):
+    backend = _local_backend(monkeypatch, _SlowLlama, timeout=0.05)
+    messages = [{"role": "user", "content": "hola"}]
+
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(backend.complete(messages))
+    assert backend.is_available()
+
+    time.sleep(0.3)  # la carga termina en su hilo
+    assert asyncio.run(backend.complete(messages)) == "local"
+
+
+def test_invalid_model_disables_backend(monkeypatch):
+    backend = _local_backend(monkeypatch, _BrokenLlama)
+
+    with pytest.raises(ValueError):
+        asyncio.run(backend.complete([{"role": "user", "content": "hola"}]))
+    assert not backend.is_available()
+    assert backend.get_status()["load_error"] == "GGUF inválido"
+
+
+class _FallbackRouter:
+    """Router cuyo backend local falla y responde el de respaldo (OpenAI)."""
+
+    default = "openai"
+
+    def __init__(self):
+        self.openai = SimpleNamespace(name="openai", model="gpt-3.5-turbo")
+        self.local = SimpleNamespace(name="local", model="modelo.gguf")
+        self.calls = []
+
+    def backend_for(self, task):
+        return self.local
+
+    async def complete_with_backend(self, task, messages, **params):
+        self.calls.append(task)
+        return "openai", self.openai
+
+
+def _ai_service(router) -> AIService:
+    # Sin clientes de OpenAI: la tarea la resuelve el router
+    service = AIService.__new__(AIService)
+    service.default_model = ModelType.GPT_3_5_TURBO
+    service.completion_cache = CompletionCache()
+    service.backends = router
+    return service
+
+
+def test_fallback_answer_is_cached_under_the_answering_backend():
+    router = _FallbackRouter()
+    service = _ai_service(router)
+    context = CacheContext(template="intent", fingerprint="hola")
+    messages = [{"role": "user", "content": "hola"}]
+
+    result = asyncio.run(service._cached_completion(messages, context, task="intent"))
+
+    cache = service.completion_cache
+    assert result == "openai"
+    assert router.calls == ["intent"]
+    assert cache.get(cache.build_key("local:modelo.gguf", context)) is None
+    assert cache.get(cache.build_key("gpt-3.5-turbo", context)) == "openai"
@@ -0,0 +1,53 @@
+"""
+Cola del gobernador del LLM: los llamantes que dejan de esperar salen de la cola.
+"""
+
+import asyncio
+
+import pytest
+
+from core.services.llm_governor import LLMGovernor, LLMGovernorSaturatedError
+
+
+def make_governor(**kwargs) -> LLMGovernor:
+    return LLMGovernor(max_concurrency=1, max_queue=1, queue_timeout=0.05, **kwargs)
+
+
+def test_timed_out_waiter_frees_its_queue_place():
+    async def scenario():
+        governor = make_governor()
+        async with governor.slot(10):
+            with pytest.raises(LLMGovernorSaturatedError, match="tras"):
+                await governor.acquire(10)
+            assert governor.get_stats()["queue_depth"] == 0
+
+            # El hueco de la cola vuelve a estar libre: se espera turno, no se rechaza por cola llena
+            waiter = asyncio.ensure_future(governor.acquire(10))
+            await asyncio.sleep(0)
+            assert not waiter.done()
+        await waiter
+        return governor
+
+    governor = asyncio.run(scenario())
+    assert governor.in_flight == 1
+    assert governor._queue == []
+
+
+def test_cancelled_waiter_frees_its_queue_place():
+    async def scenario():
+        governor = LLMGovernor(max_concurrency=1, max_queue=1, queue_timeout=10)
+        async with governor.slot(10):
+            waiter = asyncio.ensure_future(governor.acquire(10))
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+            replacement = asyncio.ensure_future(governor.acquire(10))
+            await asyncio.sleep(0)
+        await replacement
+        return governor
+
+    governor = asyncio.run(scenario())
+    assert governor.in_flight == 1
+    assert governor.rejected == 0
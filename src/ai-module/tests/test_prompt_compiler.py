@@ -0,0 +1,82 @@
+"""
+Compactación de números, líneas de indicadores e historial del compilador de prompts.
+"""
+
+from core.services import prompt_compiler as compiler_module
+from core.services.prompt_compiler import PromptCompiler, compact_number, compress_numbers
+
+
+class CharEncoding:
+    """Codificación falsa: un token por carácter."""
+
+    def encode(self, text):
+        return list(text)
+
+
+def test_compact_number_limits_significant_digits():
+    assert compact_number(65432.123456) == "65432.1"
+    assert compact_number(0.000012345678) == "0.0000123457"
+    assert compact_number(1.50) == "1.5"
+    assert compact_number(100.0) == "100"
+    assert compact_number(0.0) == "0"
+
+
+def test_compress_numbers_drops_separators_and_keeps_plain_integers():
+    text = "Precio: $65,432.123456, RSI 14: 55.123456789, velas 100"
+
+    assert compress_numbers(text) == "Precio: $65432.1, RSI 14: 55.1235, velas 100"
+
+
+def test_compact_lines_ranks_by_strategy_and_respects_the_budget():
+    compiler = PromptCompiler(technical_budget=1000)
+    lines = ["• SMA 20: 100.123456789", "• Volumen: 1,234,567.891", "• RSI 14: 55.123456789", ""]
+
+    ranked = compiler.compact_lines(lines, strategy="rsi")
+    assert ranked == ["• RSI 14: 55.1235", "• Volumen: 1234568", "• SMA 20: 100.123"]
+
+    # El presupuesto corta por el final del ranking, pero siempre queda una línea
+    first_tokens = compiler.count_tokens(ranked[0]) + 1
+    assert compiler.compact_lines(lines, strategy="rsi", budget=first_tokens) == ranked[:1]
+    assert compiler.compact_lines(lines, strategy="rsi", budget=1) == ranked[:1]
+    assert compiler.compact_lines(lines, strategy="rsi", max_lines=2) == ranked[:2]
+
+
+def test_trim_history_keeps_the_most_recent_messages_that_fit(monkeypatch):
+    monkeypatch.setattr(compiler_module, "_get_encoding", lambda model: CharEncoding())
+    compiler = PromptCompiler()
+    history = [
+        {"role": "user", "content": "a" * 10},
+        {"role": "assistant", "content": "b" * 10},
+        {"role": "user", "content": "c" * 10},
+    ]
+
+    # 14 tokens por mensaje (10 de contenido + 4 fijos)
+    assert compiler.trim_history(history, budget=30) == history[1:]
+    assert compiler.trim_history(history, budget=13) == []
+    assert compiler.trim_history(history, budget=100) == history
+    assert compiler.history_messages_dropped == 4
+
+
+def test_unavailable_tokenizer_falls_back_once(monkeypatch):
+    attempts = []
+
+    class OfflineTiktoken:
+        """tiktoken sin acceso a red: la descarga del BPE falla."""
+
+        def encoding_for_model(self, model):
+            attempts.append(model)
+            raise ConnectionError("no route to openaipublic.blob.core.windows.net")
+
+    monkeypatch.setattr(compiler_module, "tiktoken", OfflineTiktoken())
+    compiler_module._get_encoding.cache_clear()
+    try:
+        compiler = PromptCompiler(model="offline-model")
+        counts = [compiler.count_tokens("x" * 35) for _ in range(3)]
+        trimmed = compiler.trim_history([{"role": "user", "content": "hola"}])
+    finally:
+        compiler_module._get_encoding.cache_clear()
+
+    assert counts == [10, 10, 10]
+    assert trimmed == [{"role": "user", "content": "hola"}]
+    assert attempts == ["offline-model"]
+    assert compiler.get_stats()["tokenizer"] == "approx"
@@ -0,0 +1,64 @@
+"""
+Las plantillas de estrategia deben perder su formato de respuesta en texto
+libre al pasar a salida estructurada.
+"""
+
+import asyncio
+
+import pytest
+
+from core.services.advanced_strategies_service import (
+    STRUCTURED_OUTPUT_INSTRUCTION,
+    AdvancedStrategiesService,
+    AdvancedStrategyType,
+)
+
+SERVICE = AdvancedStrategiesService(ai_service=None, data_service=None)
+# Restos del bloque de formato en texto libre de alguna plantilla
+TEXT_FORMAT_FRAGMENTS = ("formato", "Punto de entrada:", "SIGNAL:", "Dirección:", "responde SOLO")
+
+
+@pytest.mark.parametrize("strategy_type", list(AdvancedStrategyType))
+def test_every_strategy_has_a_template(strategy_type):
+    assert strategy_type in SERVICE._strategy_prompts
+
+
+@pytest.mark.parametrize("strategy_type", list(AdvancedStrategyType))
+def test_structured_prompt_drops_text_format(strategy_type):
+    template = SERVICE._strategy_prompts[strategy_type]()
+    structured = SERVICE._to_structured_prompt(template)
+    body = structured[:-len(STRUCTURED_OUTPUT_INSTRUCTION)]
+
+    assert structured.endswith(STRUCTURED_OUTPUT_INSTRUCTION)
+    assert len(structured) < len(template)
+    for fragment in TEXT_FORMAT_FRAGMENTS:
+        assert fragment.lower() not in body.lower(), fragment
+    # Las instrucciones de análisis y los datos se conservan
+    assert "{datos_tecnicos" in body
+
+
+class PriceDataService:
+    """Datos de mercado con un precio fijo y sin velas (sin indicadores)."""
+
+    def __init__(self, price):
+        self.price = price
+
+    async def get_market_data(self, symbol, timeframe):
+        return {"current_price": self.price, "price_change_24h": 1.0, "volume_24h": 1000.0}
+
+    async def get_ohlcv_data(self, symbol, timeframe, limit=100):
+        return []
+
+
+def _strategy_fingerprint(price):
+    service = AdvancedStrategiesService(ai_service=None, data_service=PriceDataService(price))
+    _, _, _, cache_context, _ = asyncio.run(
+        service._prepare_strategy(AdvancedStrategyType.SCALPING, "BTC", "1h")
+    )
+    return cache_context.fingerprint
+
+
+def test_strategy_cache_key_uses_the_exact_price():
+    # 3 cifras significativas dejarían 65012 y 65049 en la misma huella
+    assert _strategy_fingerprint(65012.0) != _strategy_fingerprint(65049.0)
+    assert _strategy_fingerprint(65012.0) == _strategy_fingerprint(65012.0)
@@ -0,0 +1,45 @@
+"""
+El streaming de estrategias solo emite progreso y la señal validada de
+execute_strategy, nunca texto de la IA sin validar.
+"""
+
+import asyncio
+
+from core.services.advanced_strategies_service import (
+    AdvancedStrategiesService,
+    AdvancedStrategyType,
+    StrategyResult,
+)
+
+
+class FailingAIService:
+    """Cualquier llamada directa a la IA desde el streaming es un error."""
+
+    def stream_completion(self, *args, **kwargs):
+        raise AssertionError("stream_strategy no debe llamar a stream_completion")
+
+
+def test_stream_yields_progress_then_the_executed_result():
+    service = AdvancedStrategiesService(ai_service=FailingAIService(), data_service=None)
+    service.PROGRESS_INTERVAL = 0.01
+    expected = StrategyResult(strategy_type="scalping", signal="LONG", entry_price=100.0,
+                              stop_loss=98.0, take_profit=104.0, confidence=0.7)
+    calls = []
+
+    async def fake_execute(strategy_type, symbol, timeframe, **kwargs):
+        calls.append((strategy_type, symbol, timeframe))
+        await asyncio.sleep(0.05)
+        return expected
+
+    service.execute_strategy = fake_execute
+
+    async def collect():
+        return [event async for event in service.stream_strategy(AdvancedStrategyType.SCALPING, "btc", "1h")]
+
+    events = asyncio.run(collect())
+
+    kinds = [kind for kind, _ in events]
+    assert calls == [(AdvancedStrategyType.SCALPING, "btc", "1h")]
+    assert kinds[-1] == "result" and events[-1][1] is expected
+    assert set(kinds[:-1]) == {"progress"} and len(kinds) > 2
+    assert all("100" not in text for kind, text in events[:-1])
@@ -0,0 +1,15 @@
+"""
+Las copias de módulos compartidos deben coincidir con su original
+(scripts/sync_vendored_modules.py).
+"""
+
+import os
+import sys
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+sys.path.insert(0, os.path.join(REPO_ROOT, "scripts"))
+from sync_vendored_modules import stale_copies  # noqa: E402
+
+
+def test_vendored_copies_are_in_sync():
+    assert stale_copies() == []
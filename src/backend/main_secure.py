@@ -14,6 +14,9 @@ import time
 import json
 import httpx
 import asyncio
+from urllib.parse import urlparse
+
+from core.circuit_breaker import CircuitBreaker, CircuitOpenError
 
 # Comentado temporalmente para compatibilidad con Python 3.13
 # from sqlalchemy.orm import Session
@@ -91,6 +94,11 @@ class CoinGeckoRateLimiter:
 
 coingecko_limiter = CoinGeckoRateLimiter()
 
+# Un circuito por endpoint de precios: uno caído o lento se salta al momento
+# en lugar de costar un timeout de 15 s en cada petición. Solo la llamada HTTP
+# cuenta para el circuito; un símbolo desconocido no lo abre
+price_circuits = CircuitBreaker()
+
 # Cliente HTTP para obtener precios con múltiples endpoints
 async def get_price_from_binance(symbol: str) -> float:
     """Obtener precio desde Binance con múltiples endpoints."""
@@ -98,17 +106,22 @@ async def get_price_from_binance(symbol: str) -> float:
     
     for endpoint in BINANCE_ENDPOINTS:
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                params = {"symbol": f"{symbol.upper()}USDT"}
-                response = await client.get(endpoint, params=params)
-                response.raise_for_status()
-                data = response.json()
-                price = float(data.get("price", 0))
-                if price > 0:
-                    logger.info(f"✅ Precio obtenido de Binance ({endpoint}) para {symbol}: ${price:,.2f}")
-                    return price
-                else:
-                    raise Exception("Precio inválido recibido de Binance")
+            with price_circuits.guard(f"binance:{urlparse(endpoint).netloc}"):
+                async with httpx.AsyncClient(timeout=15.0) as client:
+                    params = {"symbol": f"{symbol.upper()}USDT"}
+                    response = await client.get(endpoint, params=params)
+                    response.raise_for_status()
+                    data = response.json()
+            price = float(data.get("price", 0))
+            if price > 0:
+                logger.info(f"✅ Precio obtenido de Binance ({endpoint}) para {symbol}: ${price:,.2f}")
+                return price
+            else:
+                raise Exception("Precio inválido recibido de Binance")
+        except CircuitOpenError as e:
+            last_error = e
+            logger.info(f"⏭️ Endpoint Binance omitido ({endpoint}): {e}")
+            continue
         except Exception as e:
             last_error = e
             logger.warning(f"⚠️ Endpoint Binance falló ({endpoint}): {e}")
@@ -131,28 +144,34 @@ async def get_price_from_coingecko(symbol: str) -> float:
         
         coin_id = symbol_mapping.get(symbol.upper(), symbol.lower())
         
+        # Con el circuito abierto no tiene sentido esperar al rate limit
+        circuit = price_circuits.get_circuit("coingecko")
+        if circuit.is_open():
+            raise CircuitOpenError("coingecko", circuit.retry_after())
+
         # Esperar si es necesario para respetar rate limit
         await coingecko_limiter.wait_if_needed()
         
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            url = "https://api.coingecko.com/api/v3/simple/price"
-            params = {
-                "ids": coin_id,
-                "vs_currencies": "usd"
-            }
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        with price_circuits.guard("coingecko"):
+            async with httpx.AsyncClient(timeout=15.0) as client:
+                url = "https://api.coingecko.com/api/v3/simple/price"
+                params = {
+                    "ids": coin_id,
+                    "vs_currencies": "usd"
+                }
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                data = response.json()
             
-            if coin_id in data:
-                price = float(data[coin_id].get("usd", 0))
-                if price > 0:
-                    logger.info(f"✅ Precio obtenido de CoinGecko para {symbol}: ${price:,.2f}")
-                    return price
-                else:
-                    raise Exception("Precio inválido recibido de CoinGecko")
+        if coin_id in data:
+            price = float(data[coin_id].get("usd", 0))
+            if price > 0:
+                logger.info(f"✅ Precio obtenido de CoinGecko para {symbol}: ${price:,.2f}")
+                return price
             else:
-                raise Exception(f"ID de moneda {coin_id} no encontrado en CoinGecko")
+                raise Exception("Precio inválido recibido de CoinGecko")
+        else:
+            raise Exception(f"ID de moneda {coin_id} no encontrado en CoinGecko")
     except Exception as e:
         logger.error(f"Error obteniendo precio de CoinGecko para {symbol}: {e}")
         raise Exception(f"CoinGecko no disponible para {symbol}: {str(e)}")
@@ -161,42 +180,44 @@ async def get_price_from_alternative_apis(symbol: str) -> float:
     """Obtener precio desde APIs alternativas como último recurso."""
     try:
         # Intentar CryptoCompare
-        async with httpx.AsyncClient(timeout=15.0) as client:
-            url = "https://min-api.cryptocompare.com/data/price"
-            params = {
-                "fsym": symbol.upper(),
-                "tsyms": "USD"
-            }
-            response = await client.get(url, params=params)
-            response.raise_for_status()
-            data = response.json()
+        with price_circuits.guard("cryptocompare"):
+            async with httpx.AsyncClient(timeout=15.0) as client:
+                url = "https://min-api.cryptocompare.com/data/price"
+                params = {
+                    "fsym": symbol.upper(),
+                    "tsyms": "USD"
+                }
+                response = await client.get(url, params=params)
+                response.raise_for_status()
+                data = response.json()
             
-            if "USD" in data:
-                price = float(data["USD"])
-                if price > 0:
-                    logger.info(f"✅ Precio obtenido de CryptoCompare para {symbol}: ${price:,.2f}")
-                    return price
+        if "USD" in data:
+            price = float(data["USD"])
+            if price > 0:
+                logger.info(f"✅ Precio obtenido de CryptoCompare para {symbol}: ${price:,.2f}")
+                return price
             
-            raise Exception("Precio inválido de CryptoCompare")
+        raise Exception("Precio inválido de CryptoCompare")
             
     except Exception as e:
         logger.warning(f"⚠️ CryptoCompare falló para {symbol}: {e}")
         
         # Intentar CoinPaprika
         try:
-            async with httpx.AsyncClient(timeout=15.0) as client:
-                url = f"https://api.coinpaprika.com/v1/tickers/{symbol.lower()}-{symbol.lower()}"
-                response = await client.get(url)
-                response.raise_for_status()
-                data = response.json()
+            with price_circuits.guard("coinpaprika"):
+                async with httpx.AsyncClient(timeout=15.0) as client:
+                    url = f"https://api.coinpaprika.com/v1/tickers/{symbol.lower()}-{symbol.lower()}"
+                    response = await client.get(url)
+                    response.raise_for_status()
+                    data = response.json()
                 
-                if "quotes" in data and "USD" in data["quotes"]:
-                    price = float(data["quotes"]["USD"]["price"])
-                    if price > 0:
-                        logger.info(f"✅ Precio obtenido de CoinPaprika para {symbol}: ${price:,.2f}")
-                        return price
+            if "quotes" in data and "USD" in data["quotes"]:
+                price = float(data["quotes"]["USD"]["price"])
+                if price > 0:
+                    logger.info(f"✅ Precio obtenido de CoinPaprika para {symbol}: ${price:,.2f}")
+                    return price
                 
-                raise Exception("Precio inválido de CoinPaprika")
+            raise Exception("Precio inválido de CoinPaprika")
                 
         except Exception as e2:
             logger.warning(f"⚠️ CoinPaprika también falló para {symbol}: {e2}")
@@ -306,7 +327,8 @@ async def health_detailed():
         "apis": {
             "binance": "enabled",
             "coingecko": "enabled"
-        }
+        },
+        "circuits": price_circuits.get_stats()
     }
 
 @app.get("/health/price-apis")
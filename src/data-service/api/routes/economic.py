@@ -44,6 +44,8 @@ async def get_events(
     Returns:
         Dictionary with economic events
     """
+    # Cached by argument: /btc and /BTC share the warm BTC entry
+    symbol = symbol.upper()
     try:
         logger.info(f"Getting economic events for {symbol}")
         events = await get_economic_events_for_symbol(symbol)
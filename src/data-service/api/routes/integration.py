@@ -4,9 +4,10 @@ Data integration API routes for the External Data Service.
 import logging
 from typing import Dict, Any
 
-from fastapi import APIRouter, HTTPException, Path, Query
+from fastapi import APIRouter, HTTPException, Path, Query, Request, Response
 from fastapi.responses import JSONResponse
 
+from core.http_cache import conditional_response
 from services.data_integration_service import get_integrated_data, get_formatted_data
 from models.schemas import ExternalDataResponse, FormattedDataResponse
 
@@ -16,75 +17,88 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/all", response_model=Dict[str, Any], summary="Get all integrated data")
-async def get_all_integrated() -> Dict[str, Any]:
+async def get_all_integrated(request: Request) -> Response:
     """
     Get all integrated data for the cryptocurrency market.
     
+    Supports conditional requests: a matching If-None-Match gets a 304.
+    
     Returns:
         Dictionary with integrated data
     """
     try:
         logger.info("Getting all integrated data")
         data = await get_integrated_data()
-        return data
+        return conditional_response(request, data)
     except Exception as e:
         logger.error(f"Error getting all integrated data: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting all integrated data: {str(e)}")
 
 @router.get("/{symbol}", response_model=Dict[str, Any], summary="Get integrated data for a specific cryptocurrency")
 async def get_integrated(
+    request: Request,
     symbol: str = Path(..., description="Cryptocurrency symbol", example="BTC")
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get integrated data for a specific cryptocurrency.
     
+    Supports conditional requests: a matching If-None-Match gets a 304.
+    
     Args:
         symbol: Cryptocurrency symbol
         
     Returns:
         Dictionary with integrated data
     """
+    # Cached by argument: /btc and /BTC share the warm BTC entry
+    symbol = symbol.upper()
     try:
         logger.info(f"Getting integrated data for {symbol}")
         data = await get_integrated_data(symbol)
-        return data
+        return conditional_response(request, data)
     except Exception as e:
         logger.error(f"Error getting integrated data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting integrated data for {symbol}: {str(e)}")
 
 @router.get("/formatted/all", response_model=FormattedDataResponse, summary="Get formatted data for all cryptocurrencies")
-async def get_all_formatted() -> Dict[str, Any]:
+async def get_all_formatted(request: Request) -> Response:
     """
     Get formatted data for all cryptocurrencies.
     
+    Supports conditional requests: a matching If-None-Match gets a 304.
+    
     Returns:
         Formatted data
     """
     try:
         logger.info("Getting formatted data for all cryptocurrencies")
         formatted = await get_formatted_data()
-        return {"formatted_data": formatted}
+        return conditional_response(request, {"formatted_data": formatted})
     except Exception as e:
         logger.error(f"Error getting formatted data for all cryptocurrencies: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting formatted data for all cryptocurrencies: {str(e)}")
 
 @router.get("/formatted/{symbol}", response_model=FormattedDataResponse, summary="Get formatted data for a specific cryptocurrency")
 async def get_formatted(
+    request: Request,
     symbol: str = Path(..., description="Cryptocurrency symbol", example="BTC")
-) -> Dict[str, Any]:
+) -> Response:
     """
     Get formatted data for a specific cryptocurrency.
     
+    Supports conditional requests: a matching If-None-Match gets a 304.
+    
     Args:
         symbol: Cryptocurrency symbol
         
     Returns:
         Formatted data
     """
+    symbol = symbol.upper()
     try:
         logger.info(f"Getting formatted data for {symbol}")
         formatted = await get_formatted_data(symbol)
-        return {"formatted_data": formatted}
+        return conditional_response(request, {"formatted_data": formatted})
     except Exception as e:
         logger.error(f"Error getting formatted data for {symbol}: {e}")
         raise HTTPException(status_code=500, detail=f"Error getting formatted data for {symbol}: {str(e)}")
@@ -3,12 +3,15 @@ News API routes for the External Data Service.
 Incluye validaciones de seguridad robustas.
 """
 import logging
-from typing import Dict, Any
+import time
+from datetime import datetime
+from typing import Dict, Any, Optional
 
 from fastapi import APIRouter, HTTPException, Path, Query, Request, Depends
 from fastapi.responses import JSONResponse
 
 from services.news_service import get_news_for_symbol, get_all_relevant_news
+from services.news_store import news_store
 from models.schemas import NewsResponse
 from core.auth import has_scope
 from core.security import (
@@ -86,6 +89,112 @@ async def get_all_news(
             detail="Error retrieving news. Please try again later."
         )
 
+@router.get("/search", summary="Search news with keywords")
+async def search_news(
+    request: Request,
+    query: Optional[str] = Query(None, min_length=3, max_length=100, description="Search query"),
+    symbol: Optional[str] = Query(None, max_length=10, description="Only news tagged with this symbol", example="BTC"),
+    since: Optional[datetime] = Query(None, description="Published at or after (ISO 8601)"),
+    until: Optional[datetime] = Query(None, description="Published before (ISO 8601)"),
+    limit: int = Query(10, ge=1, le=25, description="Number of results"),
+    current_user=Depends(has_scope(["read:news"]))
+) -> Dict[str, Any]:
+    """
+    Buscar noticias con palabras clave con validaciones de seguridad.
+    
+    Los resultados salen del índice local de noticias (SQLite FTS5),
+    ordenados por relevancia y después por fecha.
+    
+    Args:
+        request: Request object
+        query: Consulta de búsqueda (3-100 caracteres)
+        symbol: Símbolo de la criptomoneda (opcional)
+        since: Inicio del rango de fechas (opcional)
+        until: Fin del rango de fechas (opcional)
+        limit: Límite de resultados (1-25)
+        current_user: Usuario autenticado
+        
+    Returns:
+        Dictionary with search results
+    """
+    client_ip = getattr(request.state, 'client_ip', 'unknown')
+    
+    if not query and not symbol:
+        raise HTTPException(
+            status_code=400,
+            detail="A search query or a symbol is required"
+        )
+    
+    # Sanitizar query de búsqueda
+    clean_query = input_sanitizer.sanitize_string(query) if query else None
+    
+    # Verificar intentos de inyección
+    if clean_query and input_sanitizer.detect_injection_attempts(clean_query):
+        secure_logger.safe_log(f"Injection attempt in news search from IP: {client_ip}")
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid search query format"
+        )
+    
+    # Validar símbolo (solo letras y números, máx 10 caracteres)
+    clean_symbol = input_sanitizer.sanitize_string(symbol.upper()) if symbol else None
+    if clean_symbol is not None and (not clean_symbol.isalnum() or len(clean_symbol) > 10):
+        secure_logger.safe_log(f"Invalid symbol format in news search from IP: {client_ip}")
+        raise HTTPException(
+            status_code=400,
+            detail="Invalid symbol format. Only alphanumeric characters allowed, max 10 chars."
+        )
+    
+    if since and until and since >= until:
+        raise HTTPException(
+            status_code=400,
+            detail="'since' must be earlier than 'until'"
+        )
+    
+    # Rate limiting para búsquedas
+    search_key = f"news_search:{client_ip}"
+    if not rate_limiter.is_allowed(search_key, max_requests=15, window_minutes=1):
+        secure_logger.safe_log(f"Rate limit exceeded for news search from IP: {client_ip}")
+        raise HTTPException(
+            status_code=429,
+            detail="Too many search requests. Please slow down.",
+            headers={"Retry-After": "60"}
+        )
+    
+    try:
+        # Log búsqueda segura
+        secure_logger.safe_log(
+            f"News search query: '{clean_query}' symbol: {clean_symbol} - User: {current_user.username} "
+            f"IP: {client_ip} Limit: {limit}"
+        )
+        
+        started = time.perf_counter()
+        results = await news_store.search(
+            query=clean_query,
+            symbol=clean_symbol,
+            since=since,
+            until=until,
+            limit=limit
+        )
+        
+        return {
+            "query": clean_query,
+            "symbol": clean_symbol,
+            "total_results": results["total_results"],
+            "articles": results["articles"],
+            "took_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+        
+    except Exception as e:
+        secure_logger.safe_log(f"Error in news search from IP: {client_ip}")
+        logger.error(f"Error in news search: {e}")
+        
+        raise HTTPException(
+            status_code=500,
+            detail="Error performing news search. Please try again later."
+        )
+
+
 @router.get("/{symbol}", response_model=NewsResponse, summary="Get news for a specific cryptocurrency")
 async def get_news(
     request: Request,
@@ -183,72 +292,3 @@ async def get_news(
             status_code=500,
             detail=f"Error retrieving news for {clean_symbol}. Please try again later."
         )
-
-
-@router.get("/search", summary="Search news with keywords")
-async def search_news(
-    request: Request,
-    query: str = Query(..., min_length=3, max_length=100, description="Search query"),
-    limit: int = Query(10, ge=1, le=25, description="Number of results"),
-    current_user=Depends(has_scope(["read:news"]))
-) -> Dict[str, Any]:
-    """
-    Buscar noticias con palabras clave con validaciones de seguridad.
-    
-    Args:
-        request: Request object
-        query: Consulta de búsqueda (3-100 caracteres)
-        limit: Límite de resultados (1-25)
-        current_user: Usuario autenticado
-        
-    Returns:
-        Dictionary with search results
-    """
-    client_ip = getattr(request.state, 'client_ip', 'unknown')
-    
-    # Sanitizar query de búsqueda
-    clean_query = input_sanitizer.sanitize_string(query)
-    
-    # Verificar intentos de inyección
-    if input_sanitizer.detect_injection_attempts(clean_query):
-        secure_logger.safe_log(f"Injection attempt in news search from IP: {client_ip}")
-        raise HTTPException(
-            status_code=400,
-            detail="Invalid search query format"
-        )
-    
-    # Rate limiting para búsquedas
-    search_key = f"news_search:{client_ip}"
-    if not rate_limiter.is_allowed(search_key, max_requests=15, window_minutes=1):
-        secure_logger.safe_log(f"Rate limit exceeded for news search from IP: {client_ip}")
-        raise HTTPException(
-            status_code=429,
-            detail="Too many search requests. Please slow down.",
-            headers={"Retry-After": "60"}
-        )
-    
-    try:
-        # Log búsqueda segura
-        secure_logger.safe_log(
-            f"News search query: '{clean_query}' - User: {current_user.username} "
-            f"IP: {client_ip} Limit: {limit}"
-        )
-        
-        # Simular búsqueda (implementar con servicio real)
-        search_results = {
-            "query": clean_query,
-            "total_results": 0,
-            "articles": [],
-            "message": "Search functionality will be implemented with actual news service integration"
-        }
-        
-        return search_results
-        
-    except Exception as e:
-        secure_logger.safe_log(f"Error in news search from IP: {client_ip}")
-        logger.error(f"Error in news search: {e}")
-        
-        raise HTTPException(
-            status_code=500,
-            detail="Error performing news search. Please try again later."
-        )
@@ -44,6 +44,8 @@ async def get_social(
     Returns:
         Dictionary with social media data
     """
+    # Cached by argument: /btc and /BTC share the warm BTC entry
+    symbol = symbol.upper()
     try:
         logger.info(f"Getting social media data for {symbol}")
         social_data = await get_social_data_for_symbol(symbol)
@@ -65,6 +67,7 @@ async def get_sentiment(
     Returns:
         Sentiment analysis
     """
+    symbol = symbol.upper()
     try:
         logger.info(f"Getting sentiment analysis for {symbol}")
         sentiment = await get_sentiment_analysis(symbol)
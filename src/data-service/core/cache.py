@@ -1,118 +1,493 @@
 """
 Cache implementation for the External Data Service.
+
+In-memory LRU cache bounded by entry count and approximate size, with a
+background sweep of expired entries, per-key in-flight coalescing (only one
+refresh per key at a time) and stale-while-revalidate serving.
+
+With CACHE_BACKEND set, this cache is the L1 tier of a two-tier lookup and a
+shared backend (core/cache_backends.py) is the L2 tier common to all workers.
 """
 import json
+import asyncio
+import hashlib
 import logging
 import time
 import functools
-from typing import Any, Dict, Optional, Callable
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, Optional
 
+from core.cache_backends import CacheBackend, create_backend
 from core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class _CacheEntry:
+    """Cached value with its freshness and staleness deadlines."""
+    value: Any
+    expires_at: float
+    stale_until: float
+    size: int
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate size in bytes of a cached value (its JSON representation)."""
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return len(repr(value))
+
+
+def make_key(prefix: str, func: Callable, args: tuple, kwargs: Dict[str, Any]) -> str:
+    """
+    Build a cache key from a prefix, the function and its arguments.
+
+    Args:
+        prefix: Cache key prefix
+        func: Cached function
+        args: Positional arguments
+        kwargs: Keyword arguments
+
+    Returns:
+        Cache key
+    """
+    if not args and not kwargs:
+        return f"{prefix}:{func.__qualname__}"
+    raw = json.dumps([args, kwargs], default=str, sort_keys=True)
+    digest = hashlib.sha1(raw.encode()).hexdigest()[:16]
+    return f"{prefix}:{func.__qualname__}:{digest}"
+
+
 class Cache:
-    """Simple in-memory cache with TTL."""
-    
-    def __init__(self):
-        """Initialize the cache."""
-        self._cache: Dict[str, Dict[str, Any]] = {}
-    
+    """Bounded in-memory cache with TTL, LRU eviction and stampede protection."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        sweep_interval: Optional[int] = None,
+        l2: Optional[CacheBackend] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries: Maximum number of entries (defaults to CACHE_MAX_ENTRIES)
+            max_bytes: Maximum approximate size in bytes (defaults to CACHE_MAX_BYTES)
+            stale_ttl: Seconds an expired entry may still be served while it is
+                refreshed (defaults to CACHE_STALE_TTL)
+            sweep_interval: Seconds between expiry sweeps (defaults to CACHE_SWEEP_INTERVAL)
+            l2: Shared backend used as second tier (None for in-process only)
+        """
+        self.max_entries = max_entries or settings.CACHE_MAX_ENTRIES
+        self.max_bytes = max_bytes or settings.CACHE_MAX_BYTES
+        self.stale_ttl = settings.CACHE_STALE_TTL if stale_ttl is None else stale_ttl
+        self.sweep_interval = sweep_interval or settings.CACHE_SWEEP_INTERVAL
+        self.l2 = l2
+
+        self._cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._sweeper: Optional[asyncio.Task] = None
+
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "refreshes": 0,
+            "refresh_errors": 0,
+            "l2_hits": 0,
+            "l2_misses": 0,
+            "l2_errors": 0,
+        }
+
+    # ========================================
+    # STORAGE
+    # ========================================
+
+    def _remove(self, key: str) -> None:
+        entry = self._cache.pop(key, None)
+        if entry is not None:
+            self._size -= entry.size
+
+    def _lookup(self, key: str, allow_stale: bool = False) -> Optional[_CacheEntry]:
+        """Return the entry for a key if it is fresh (or stale and allowed)."""
+        entry = self._cache.get(key)
+        if entry is None:
+            return None
+
+        now = time.time()
+        if now > entry.stale_until or (now > entry.expires_at and not allow_stale):
+            if now > entry.stale_until:
+                logger.debug(f"Cache item {key} expired")
+                self._remove(key)
+                self._stats["expirations"] += 1
+            return None
+
+        self._cache.move_to_end(key)
+        return entry
+
+    def _store(self, key: str, value: Any, ttl: Optional[int], stale_ttl: Optional[int]) -> None:
+        if ttl is None:
+            ttl = settings.CACHE_TTL
+        if stale_ttl is None:
+            stale_ttl = self.stale_ttl
+
+        self._remove(key)
+        now = time.time()
+        entry = _CacheEntry(value, now + ttl, now + ttl + stale_ttl, _estimate_size(value))
+        self._cache[key] = entry
+        self._size += entry.size
+
+        # LRU eviction (never evict the entry just stored)
+        while len(self._cache) > 1 and (len(self._cache) > self.max_entries or self._size > self.max_bytes):
+            oldest = next(iter(self._cache))
+            self._remove(oldest)
+            self._stats["evictions"] += 1
+            logger.debug(f"Cache evicted {oldest}")
+
+        self._ensure_sweeper()
+        logger.debug(f"Cache set for {key}, expires in {ttl} seconds")
+
+    # ========================================
+    # SHARED TIER (L2)
+    # ========================================
+
+    async def _l2_get(self, key: str, min_remaining: float = 0) -> Optional[Any]:
+        """Fresh value from L2 (at least `min_remaining` seconds left), copied into L1."""
+        if self.l2 is None:
+            return None
+        try:
+            item = await self.l2.get(key)
+        except Exception as e:
+            self._stats["l2_errors"] += 1
+            logger.warning(f"Shared cache read failed for {key}: {e}")
+            return None
+
+        remaining = item[1] - time.time() if item is not None else 0
+        if remaining <= max(min_remaining, 0):
+            self._stats["l2_misses"] += 1
+            return None
+        self._stats["l2_hits"] += 1
+        self._store(key, item[0], remaining, None)
+        return item[0]
+
+    async def _l2_set(self, key: str, value: Any, ttl: Optional[int]) -> None:
+        if self.l2 is None:
+            return
+        try:
+            await self.l2.set(key, value, settings.CACHE_TTL if ttl is None else ttl)
+        except Exception as e:
+            self._stats["l2_errors"] += 1
+            logger.warning(f"Shared cache write failed for {key}: {e}")
+
+    # ========================================
+    # PUBLIC API
+    # ========================================
+
     async def get(self, key: str) -> Optional[Any]:
         """
         Get a value from the cache.
-        
+
         Args:
             key: Cache key
-            
+
         Returns:
             Cached value or None if not found or expired
         """
-        if key not in self._cache:
-            return None
-        
-        cache_item = self._cache[key]
-        
-        # Check if expired
-        if time.time() > cache_item["expires_at"]:
-            logger.debug(f"Cache item {key} expired")
-            del self._cache[key]
-            return None
-        
+        entry = self._lookup(key)
+        if entry is None:
+            value = await self._l2_get(key)
+            if value is None:
+                self._stats["misses"] += 1
+            return value
+
+        self._stats["hits"] += 1
         logger.debug(f"Cache hit for {key}")
-        return cache_item["value"]
-    
-    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        return entry.value
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None, stale_ttl: Optional[int] = None) -> None:
         """
         Set a value in the cache.
-        
+
         Args:
             key: Cache key
             value: Value to cache
             ttl: Time to live in seconds (defaults to CACHE_TTL from settings)
+            stale_ttl: Extra seconds the value may be served stale (defaults to CACHE_STALE_TTL)
+        """
+        self._store(key, value, ttl, stale_ttl)
+        await self._l2_set(key, value, ttl)
+
+    async def get_or_set(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None
+    ) -> Any:
+        """
+        Get a value from the cache or compute it with `factory`.
+
+        Concurrent callers for the same missing key share a single call to
+        `factory`. An expired entry still within its stale window is returned
+        immediately while one background refresh runs. Refreshes look in the
+        shared tier first, so a value fetched by another worker is reused.
+        None results are not cached.
+
+        Args:
+            key: Cache key
+            factory: Coroutine function that produces the value
+            ttl: Time to live in seconds (defaults to CACHE_TTL from settings)
+            stale_ttl: Extra seconds the value may be served stale (defaults to CACHE_STALE_TTL)
+
+        Returns:
+            Cached or freshly computed value
+        """
+        entry = self._lookup(key, allow_stale=True)
+        if entry is not None:
+            if time.time() <= entry.expires_at:
+                self._stats["hits"] += 1
+                return entry.value
+
+            # Stale: serve it and refresh in the background
+            self._stats["stale_hits"] += 1
+            if key not in self._inflight:
+                self._start_refresh(key, factory, ttl, stale_ttl, background=True)
+            return entry.value
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self._stats["coalesced"] += 1
+        else:
+            self._stats["misses"] += 1
+            task = self._start_refresh(key, factory, ttl, stale_ttl, background=False)
+        return await asyncio.shield(task)
+
+    def _start_refresh(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: Optional[int],
+        stale_ttl: Optional[int],
+        background: bool,
+        min_remaining: float = 0
+    ) -> asyncio.Task:
+        async def _refresh() -> Any:
+            value = await self._l2_get(key, min_remaining)
+            if value is not None:
+                return value
+
+            self._stats["refreshes"] += 1
+            try:
+                value = await factory()
+            except Exception as e:
+                self._stats["refresh_errors"] += 1
+                if background:
+                    logger.warning(f"Background refresh of {key} failed: {e}")
+                    return None
+                raise
+            if value is not None:
+                self._store(key, value, ttl, stale_ttl)
+                await self._l2_set(key, value, ttl)
+            return value
+
+        task = asyncio.ensure_future(_refresh())
+        self._inflight[key] = task
+        task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return task
+
+    async def refresh(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        ttl: Optional[int] = None,
+        stale_ttl: Optional[int] = None,
+        min_remaining: float = 0
+    ) -> Any:
+        """
+        Recompute a value even if the cached one is still fresh.
+
+        Used by the refresh scheduler to replace entries ahead of expiry. Joins
+        an in-flight refresh of the same key instead of starting another one,
+        and adopts a shared-tier value with more than `min_remaining` seconds
+        left (written by another worker) instead of calling `factory`.
+
+        Args:
+            key: Cache key
+            factory: Coroutine function that produces the value
+            ttl: Time to live in seconds (defaults to CACHE_TTL from settings)
+            stale_ttl: Extra seconds the value may be served stale (defaults to CACHE_STALE_TTL)
+            min_remaining: Minimum remaining TTL of a shared-tier value to adopt it
+
+        Returns:
+            Fresh value
+        """
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._start_refresh(key, factory, ttl, stale_ttl, background=False, min_remaining=min_remaining)
+        return await asyncio.shield(task)
+
+    def touch(self, key: str, ttl: Optional[int] = None) -> bool:
+        """
+        Extend the freshness of an existing entry (e.g. while its upstream is down).
+
+        Args:
+            key: Cache key
+            ttl: New time to live in seconds (defaults to CACHE_TTL from settings)
+
+        Returns:
+            True if the entry existed
         """
+        entry = self._cache.get(key)
+        if entry is None:
+            return False
         if ttl is None:
             ttl = settings.CACHE_TTL
-        
-        expires_at = time.time() + ttl
-        
-        self._cache[key] = {
-            "value": value,
-            "expires_at": expires_at
-        }
-        
-        logger.debug(f"Cache set for {key}, expires in {ttl} seconds")
-    
+        now = time.time()
+        entry.stale_until = max(entry.stale_until, now + ttl + (entry.stale_until - entry.expires_at))
+        entry.expires_at = max(entry.expires_at, now + ttl)
+        return True
+
     async def delete(self, key: str) -> None:
         """
         Delete a value from the cache.
-        
+
         Args:
             key: Cache key
         """
         if key in self._cache:
-            del self._cache[key]
+            self._remove(key)
             logger.debug(f"Cache deleted for {key}")
-    
+        if self.l2 is not None:
+            try:
+                await self.l2.delete(key)
+            except Exception as e:
+                self._stats["l2_errors"] += 1
+                logger.warning(f"Shared cache delete failed for {key}: {e}")
+
     async def clear(self) -> None:
         """Clear all cache entries."""
         self._cache.clear()
+        self._size = 0
+        if self.l2 is not None:
+            try:
+                await self.l2.clear()
+            except Exception as e:
+                self._stats["l2_errors"] += 1
+                logger.warning(f"Shared cache clear failed: {e}")
         logger.debug("Cache cleared")
 
+    # ========================================
+    # BACKGROUND SWEEP
+    # ========================================
+
+    def sweep(self) -> int:
+        """
+        Remove entries past their stale window.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        expired = [key for key, entry in self._cache.items() if now > entry.stale_until]
+        for key in expired:
+            self._remove(key)
+        self._stats["expirations"] += len(expired)
+        return len(expired)
+
+    def _ensure_sweeper(self) -> None:
+        if self._sweeper is not None and not self._sweeper.done():
+            return
+        try:
+            self._sweeper = asyncio.get_running_loop().create_task(self._sweep_loop())
+        except RuntimeError:
+            # No running loop (sync context): expiry stays lazy
+            self._sweeper = None
+
+    async def _sweep_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval)
+            removed = self.sweep()
+            if removed:
+                logger.debug(f"Cache sweep removed {removed} expired entries")
 
-# Create a singleton cache instance
-cache = Cache()
+    async def close(self) -> None:
+        """Stop the background sweep and wait for in-flight refreshes."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+        if self._inflight:
+            await asyncio.gather(*self._inflight.values(), return_exceptions=True)
+        if self.l2 is not None:
+            await self.l2.close()
 
-def cached(prefix: str, ttl: Optional[int] = None):
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dictionary with sizes and hit/miss/eviction counters
+        """
+        lookups = self._stats["hits"] + self._stats["stale_hits"] + self._stats["misses"] + self._stats["coalesced"]
+        return {
+            "entries": len(self._cache),
+            "max_entries": self.max_entries,
+            "bytes": self._size,
+            "max_bytes": self.max_bytes,
+            "in_flight": len(self._inflight),
+            "l2": self.l2.get_status() if self.l2 is not None else None,
+            "hit_rate": round((self._stats["hits"] + self._stats["stale_hits"]) / lookups, 3) if lookups else 0.0,
+            **self._stats
+        }
+
+
+# Create a singleton cache instance (L1 + optional shared L2)
+cache = Cache(l2=create_backend(
+    settings.CACHE_BACKEND,
+    settings.CACHE_NAMESPACE,
+    url=settings.REDIS_URL,
+    timeout=settings.CACHE_REDIS_TIMEOUT
+))
+
+def cached(prefix: str, ttl: Optional[int] = None, stale_ttl: Optional[int] = None):
     """
     Decorator to cache function results.
-    
+
+    The key includes the function arguments, so per-symbol calls are cached
+    separately. Concurrent calls for the same key share one execution. The
+    wrapper also exposes `cache_key(*args)` and `refresh(*args, ttl=...)` for
+    the refresh scheduler.
+
     Args:
         prefix: Cache key prefix
         ttl: Time to live in seconds (defaults to CACHE_TTL from settings)
-        
+        stale_ttl: Extra seconds a stale result may be served while it is refreshed
+
     Returns:
         Decorated function
     """
     def decorator(func: Callable):
         @functools.wraps(func)
         async def wrapper(*args, **kwargs):
-            # Create a cache key based on function name, args, and kwargs
-            key = f"{prefix}_{func.__name__}"
-            
-            # Try to get from cache
-            cached_result = await cache.get(key)
-            if cached_result is not None:
-                logger.debug(f"Cache hit for {key}")
-                return cached_result
-            
-            # Call the function
-            result = await func(*args, **kwargs)
-            
-            # Cache the result
-            await cache.set(key, result, ttl)
-            
-            return result
+            key = make_key(prefix, func, args, kwargs)
+            return await cache.get_or_set(key, lambda: func(*args, **kwargs), ttl, stale_ttl)
+
+        def cache_key(*args, **kwargs) -> str:
+            return make_key(prefix, func, args, kwargs)
+
+        async def refresh(*args, ttl: Optional[int] = ttl, min_remaining: float = 0, **kwargs):
+            key = make_key(prefix, func, args, kwargs)
+            return await cache.refresh(key, lambda: func(*args, **kwargs), ttl, stale_ttl, min_remaining)
+
+        wrapper.cache_key = cache_key
+        wrapper.refresh = refresh
         return wrapper
     return decorator
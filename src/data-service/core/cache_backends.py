@@ -0,0 +1,250 @@
+"""
+Shared cache backends (L2 tier common to all workers).
+
+Each worker keeps its own in-process L1 (core/cache.py in the data-service,
+the market data cache of DataService in the AI module); a backend from this
+module is the optional L2 tier shared by all workers:
+
+- InProcessBackend: dictionary with TTL (single worker, local development).
+- RedisBackend: any Redis-protocol server (Redis, KeyDB, Dragonfly...).
+
+Values are serialized with msgpack (JSON if msgpack is not installed) and
+stored under a namespace prefix so several services can share one server.
+An entry that cannot be decoded is treated as a miss.
+
+This module is the source of truth for the AI module's copy; it must not
+import service-specific code (configuration comes in as arguments). After
+editing it, run scripts/sync_vendored_modules.py.
+"""
+import json
+import time
+import logging
+from datetime import date, datetime
+from typing import Any, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Optional imports
+try:
+    import msgpack
+except ImportError:
+    logger.warning("msgpack is not installed: shared cache will use JSON serialization")
+    msgpack = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+
+def _to_primitive(value: Any) -> Any:
+    """Convert values msgpack/JSON cannot encode (models, dates) to primitives."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if hasattr(value, "dict"):
+        return value.dict()
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def serialize(value: Any) -> bytes:
+    """
+    Serialize a cached value.
+
+    Args:
+        value: Value to serialize
+
+    Returns:
+        Encoded bytes
+    """
+    if msgpack is not None:
+        return msgpack.packb(value, default=_to_primitive, use_bin_type=True)
+    return json.dumps(value, default=_to_primitive, separators=(",", ":")).encode()
+
+
+def deserialize(data: bytes) -> Any:
+    """
+    Deserialize a cached value.
+
+    Args:
+        data: Encoded bytes
+
+    Returns:
+        Decoded value
+    """
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+class CacheBackend:
+    """Interface of the shared (L2) cache tier."""
+
+    name = "base"
+
+    def __init__(self, namespace: str):
+        self.namespace = namespace
+
+    def _key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _decode(self, key: str, data: bytes) -> Optional[Tuple[Any, float]]:
+        """Decode a stored [value, expires_at] pair; undecodable entries are a miss."""
+        try:
+            value, expires_at = deserialize(data)
+            return value, float(expires_at)
+        except (ValueError, TypeError) as e:
+            # Corrupt entry or written by an incompatible serializer (msgpack vs JSON)
+            logger.warning(f"Undecodable shared cache entry {self._key(key)}: {e}")
+            return None
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """
+        Get a value and its expiry timestamp.
+
+        Args:
+            key: Cache key (without namespace)
+
+        Returns:
+            (value, expires_at) or None if not found
+        """
+        raise NotImplementedError
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key (without namespace)
+            value: Value to store
+            ttl: Time to live in seconds
+        """
+        raise NotImplementedError
+
+    async def delete(self, key: str) -> None:
+        """Delete a value."""
+        raise NotImplementedError
+
+    async def clear(self) -> None:
+        """Delete every key of the namespace."""
+        raise NotImplementedError
+
+    async def close(self) -> None:
+        """Release connections."""
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"backend": self.name, "namespace": self.namespace}
+
+
+class InProcessBackend(CacheBackend):
+    """Dictionary backend; values are stored serialized, like in a shared server."""
+
+    name = "memory"
+
+    def __init__(self, namespace: str):
+        super().__init__(namespace)
+        self._data: Dict[str, Tuple[bytes, float]] = {}
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        item = self._data.get(self._key(key))
+        if item is None:
+            return None
+        if time.time() > item[1]:
+            self._data.pop(self._key(key), None)
+            return None
+        return self._decode(key, item[0])
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        self._data[self._key(key)] = (serialize([value, expires_at]), expires_at)
+
+    async def delete(self, key: str) -> None:
+        self._data.pop(self._key(key), None)
+
+    async def clear(self) -> None:
+        prefix = f"{self.namespace}:"
+        for key in [k for k in self._data if k.startswith(prefix)]:
+            del self._data[key]
+
+
+class RedisBackend(CacheBackend):
+    """Redis-protocol backend shared by all workers."""
+
+    name = "redis"
+
+    def __init__(self, url: str, namespace: str, client: Any = None, timeout: float = 0.5):
+        """
+        Initialize the backend.
+
+        Args:
+            url: Server URL
+            namespace: Key prefix
+            client: Already built async client (e.g. a fake server in tests)
+            timeout: Socket timeout in seconds
+        """
+        super().__init__(namespace)
+        self.url = url
+        if client is None:
+            if aioredis is None:
+                raise ImportError("redis is required for the Redis cache backend")
+            client = aioredis.from_url(self.url, socket_timeout=timeout)
+        self._client = client
+
+    async def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        data = await self._client.get(self._key(key))
+        if data is None:
+            return None
+        # The expiry travels with the value so L1 keeps the remaining TTL
+        return self._decode(key, data)
+
+    async def set(self, key: str, value: Any, ttl: float) -> None:
+        expires_at = time.time() + ttl
+        await self._client.set(self._key(key), serialize([value, expires_at]), px=max(int(ttl * 1000), 1))
+
+    async def delete(self, key: str) -> None:
+        await self._client.delete(self._key(key))
+
+    async def clear(self) -> None:
+        batch = []
+        async for key in self._client.scan_iter(match=f"{self.namespace}:*", count=500):
+            batch.append(key)
+            if len(batch) >= 500:
+                await self._client.delete(*batch)
+                batch = []
+        if batch:
+            await self._client.delete(*batch)
+
+    async def close(self) -> None:
+        await self._client.close()
+
+    def get_status(self) -> Dict[str, Any]:
+        return {"backend": self.name, "namespace": self.namespace, "url": self.url.split("@")[-1]}
+
+
+def create_backend(backend: str, namespace: str, url: Optional[str] = None,
+                   timeout: float = 0.5) -> Optional[CacheBackend]:
+    """
+    Build a shared cache backend.
+
+    Args:
+        backend: "none", "memory" or "redis"
+        namespace: Key prefix
+        url: Redis URL (only for "redis")
+        timeout: Redis socket timeout in seconds
+
+    Returns:
+        Backend instance, or None when only the in-process L1 is used
+    """
+    backend = backend.lower()
+    if backend == "redis":
+        try:
+            return RedisBackend(url or "redis://localhost:6379/0", namespace, timeout=timeout)
+        except ImportError as e:
+            logger.warning(f"Shared cache disabled: {e}")
+            return None
+    if backend == "memory":
+        return InProcessBackend(namespace)
+    return None
@@ -1,16 +1,35 @@
 """
-Circuit breaker implementation for the External Data Service.
+Sliding-window circuit breaker for calls to external endpoints.
+
+Each circuit keeps the outcomes of the last CIRCUIT_BREAKER_WINDOW seconds
+in one-second buckets and opens when, with enough calls in the window, the
+failure rate or the slow-call rate crosses its threshold. After the recovery
+timeout a bounded number of probe calls is admitted (HALF_OPEN); the circuit
+closes once they all succeed and reopens on the first failed or slow probe.
+Circuits are independent, so a name can cover a service or a single endpoint
+(e.g. "binance:api1.binance.com"). State transitions and rejections are
+counted for the health endpoint.
+
+This module is the source of truth for the copies in the AI module and the
+backend; it must not import service-specific code. After editing it, run
+scripts/sync_vendored_modules.py. The data-service helpers built on top of
+it (shared instance, decorator, fallbacks) live in core/circuits.py.
 """
+import os
 import logging
+import threading
 import time
-import functools
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
 from enum import Enum
-from typing import Any, Callable, Dict, Optional
-
-from core.config import settings
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
 
 logger = logging.getLogger(__name__)
 
+# Transitions kept per circuit for the health endpoint
+TRANSITION_HISTORY = 20
+
 
 class CircuitState(Enum):
     """Circuit breaker states."""
@@ -19,208 +38,300 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"  # Testing if the service is back to normal
 
 
-class CircuitBreaker:
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected by an open circuit."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"Circuit {name} is open (retry in {retry_after:.0f}s)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+def is_endpoint_failure(error: Exception) -> bool:
     """
-    Circuit breaker implementation to prevent repeated calls to failing services.
+    Whether an error counts against the endpoint.
+
+    HTTP 4xx answers (other than 408 and 429) mean the endpoint is up and
+    rejected this particular request, so they don't trip the circuit.
     """
-    
-    def __init__(self):
-        """Initialize the circuit breaker."""
-        self._circuits: Dict[str, Dict[str, Any]] = {}
-    
-    def _get_circuit(self, name: str) -> Dict[str, Any]:
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return not (isinstance(status, int) and 400 <= status < 500 and status not in (408, 429))
+
+
+@dataclass
+class CircuitConfig:
+    """Thresholds of a circuit."""
+    window: float = 60.0  # seconds of outcomes considered
+    min_calls: int = 5  # calls in the window before rates are evaluated
+    failure_rate: float = 0.5  # fraction of failed calls that opens the circuit
+    slow_call_duration: float = 5.0  # seconds after which a call counts as slow
+    slow_call_rate: float = 0.8  # fraction of slow calls that opens the circuit
+    recovery_timeout: float = 30.0  # seconds open before probing
+    half_open_max_calls: int = 2  # concurrent probes, all must succeed to close
+
+    @classmethod
+    def from_env(cls) -> "CircuitConfig":
+        """Build the default configuration from the CIRCUIT_BREAKER_* variables."""
+        return cls(
+            window=float(os.getenv("CIRCUIT_BREAKER_WINDOW", "60")),
+            min_calls=int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")),
+            failure_rate=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+            slow_call_duration=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_DURATION", "5")),
+            slow_call_rate=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8")),
+            recovery_timeout=float(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "30")),
+            half_open_max_calls=int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "2"))
+        )
+
+
+class Circuit:
+    """State and sliding-window statistics of a single circuit."""
+
+    def __init__(self, name: str, config: CircuitConfig):
         """
-        Get or create a circuit.
-        
+        Initialize a closed circuit.
+
         Args:
             name: Circuit name
-            
+            config: Thresholds
+        """
+        self.name = name
+        self.config = config
+        self.state = CircuitState.CLOSED
+        self.opened_at = 0.0
+
+        self._lock = threading.Lock()
+        # [second, calls, failures, slow calls]
+        self._buckets: Deque[List[int]] = deque()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+        # Metrics
+        self.calls = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.rejected = 0
+        self.transitions: Dict[str, int] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=TRANSITION_HISTORY)
+
+    def _transition(self, state: CircuitState, reason: str) -> None:
+        key = f"{self.state.value}->{state.value}"
+        self.transitions[key] = self.transitions.get(key, 0) + 1
+        self.history.append({"from": self.state.value, "to": state.value, "reason": reason, "at": time.time()})
+        log = logger.warning if state == CircuitState.OPEN else logger.info
+        log(f"Circuit {self.name} is now {state.name} ({reason})")
+
+        self.state = state
+        if state == CircuitState.OPEN:
+            self.opened_at = time.monotonic()
+        elif state == CircuitState.CLOSED:
+            self._buckets.clear()
+        self._probes_in_flight = 0
+        self._probe_successes = 0
+
+    def _window_totals(self, now: float) -> List[int]:
+        """Drop buckets older than the window and sum the rest."""
+        oldest = int(now - self.config.window)
+        while self._buckets and self._buckets[0][0] <= oldest:
+            self._buckets.popleft()
+        totals = [0, 0, 0]
+        for _, calls, failures, slow in self._buckets:
+            totals[0] += calls
+            totals[1] += failures
+            totals[2] += slow
+        return totals
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit admits probes."""
+        return max(0.0, self.config.recovery_timeout - (time.monotonic() - self.opened_at))
+
+    def is_open(self) -> bool:
+        """True while the circuit rejects calls (does not change the state)."""
+        with self._lock:
+            return self.state == CircuitState.OPEN and self.retry_after() > 0
+
+    def acquire(self) -> bool:
+        """
+        Ask permission for a call.
+
         Returns:
-            Circuit data
-        """
-        if name not in self._circuits:
-            self._circuits[name] = {
-                "state": CircuitState.CLOSED,
-                "failure_count": 0,
-                "last_failure_time": 0,
-                "recovery_timeout": settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
-                "failure_threshold": settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD
+            True if the call may proceed; it must be followed by `record` or `release`
+        """
+        with self._lock:
+            if self.state == CircuitState.OPEN:
+                if self.retry_after() > 0:
+                    self.rejected += 1
+                    return False
+                self._transition(CircuitState.HALF_OPEN, "recovery timeout elapsed")
+
+            if self.state == CircuitState.HALF_OPEN:
+                if self._probes_in_flight >= self.config.half_open_max_calls:
+                    self.rejected += 1
+                    return False
+                self._probes_in_flight += 1
+            return True
+
+    def release(self) -> None:
+        """Give back a permission without an outcome (e.g. a cancelled call)."""
+        with self._lock:
+            if self.state == CircuitState.HALF_OPEN and self._probes_in_flight:
+                self._probes_in_flight -= 1
+
+    def record(self, duration: float, failed: bool) -> None:
+        """
+        Record the outcome of an admitted call.
+
+        Args:
+            duration: Call duration in seconds
+            failed: Whether the call raised
+        """
+        slow = duration >= self.config.slow_call_duration
+        with self._lock:
+            self.calls += 1
+            self.failures += failed
+            self.slow_calls += slow
+
+            if self.state == CircuitState.HALF_OPEN:
+                self._probes_in_flight = max(0, self._probes_in_flight - 1)
+                if failed or slow:
+                    self._transition(CircuitState.OPEN, "probe failed" if failed else "probe too slow")
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.config.half_open_max_calls:
+                    self._transition(CircuitState.CLOSED, "probes succeeded")
+                return
+
+            if self.state != CircuitState.CLOSED:
+                # Outcome of a call admitted before the circuit opened
+                return
+
+            now = time.time()
+            second = int(now)
+            if self._buckets and self._buckets[-1][0] == second:
+                bucket = self._buckets[-1]
+            else:
+                bucket = [second, 0, 0, 0]
+                self._buckets.append(bucket)
+            bucket[1] += 1
+            bucket[2] += failed
+            bucket[3] += slow
+
+            calls, failures, slow_calls = self._window_totals(now)
+            if calls < self.config.min_calls:
+                return
+            if failures / calls >= self.config.failure_rate:
+                self._transition(CircuitState.OPEN, f"failure rate {failures}/{calls}")
+            elif slow_calls / calls >= self.config.slow_call_rate:
+                self._transition(CircuitState.OPEN, f"slow call rate {slow_calls}/{calls}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get circuit statistics.
+
+        Returns:
+            Dictionary with state, window rates and counters
+        """
+        with self._lock:
+            calls, failures, slow_calls = self._window_totals(time.time())
+            return {
+                "state": self.state.value,
+                "retry_after": round(self.retry_after(), 1) if self.state == CircuitState.OPEN else None,
+                "window_calls": calls,
+                "window_failure_rate": round(failures / calls, 3) if calls else None,
+                "window_slow_call_rate": round(slow_calls / calls, 3) if calls else None,
+                "calls": self.calls,
+                "failures": self.failures,
+                "slow_calls": self.slow_calls,
+                "rejected": self.rejected,
+                "transitions": dict(self.transitions),
+                "history": list(self.history)
             }
-        
-        return self._circuits[name]
-    
-    def _record_success(self, name: str) -> None:
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker implementation to prevent repeated calls to failing services.
+    """
+
+    def __init__(self, config: Optional[CircuitConfig] = None):
+        """
+        Initialize the circuit breaker.
+
+        Args:
+            config: Default thresholds for new circuits (defaults to the environment)
+        """
+        self.config = config or CircuitConfig.from_env()
+        self._circuits: Dict[str, Circuit] = {}
+        self._lock = threading.Lock()
+
+    def get_circuit(self, name: str, config: Optional[CircuitConfig] = None) -> Circuit:
         """
-        Record a successful call.
-        
+        Get or create a circuit.
+
         Args:
             name: Circuit name
+            config: Thresholds used if the circuit is created
+
+        Returns:
+            Circuit
         """
-        circuit = self._get_circuit(name)
-        
-        if circuit["state"] == CircuitState.HALF_OPEN:
-            # If the circuit is half-open and the call succeeded, close it
-            circuit["state"] = CircuitState.CLOSED
-            circuit["failure_count"] = 0
-            logger.info(f"Circuit {name} is now CLOSED")
-    
-    def _record_failure(self, name: str) -> None:
-        """
-        Record a failed call.
-        
+        circuit = self._circuits.get(name)
+        if circuit is None:
+            with self._lock:
+                circuit = self._circuits.setdefault(name, Circuit(name, config or self.config))
+        return circuit
+
+    @contextmanager
+    def guard(self, name: str, is_failure: Callable[[Exception], bool] = is_endpoint_failure) -> Iterator[Circuit]:
+        """
+        Protect a block of code (sync or async) with a circuit.
+
+        Usage:
+            with breaker.guard("binance:api.binance.com"):
+                response = await client.get(url)
+
         Args:
             name: Circuit name
+            is_failure: Decides whether an exception raised in the block counts as a failure
+
+        Raises:
+            CircuitOpenError: If the circuit rejects the call
         """
-        circuit = self._get_circuit(name)
-        
-        circuit["failure_count"] += 1
-        circuit["last_failure_time"] = time.time()
-        
-        if circuit["state"] == CircuitState.CLOSED and circuit["failure_count"] >= circuit["failure_threshold"]:
-            # If the circuit is closed and we've reached the failure threshold, open it
-            circuit["state"] = CircuitState.OPEN
-            logger.warning(f"Circuit {name} is now OPEN")
-        elif circuit["state"] == CircuitState.HALF_OPEN:
-            # If the circuit is half-open and the call failed, open it again
-            circuit["state"] = CircuitState.OPEN
-            logger.warning(f"Circuit {name} is now OPEN (after half-open failure)")
-    
-    def _check_circuit(self, name: str) -> bool:
-        """
-        Check if a circuit is closed or can be tested.
-        
+        circuit = self.get_circuit(name)
+        if not circuit.acquire():
+            raise CircuitOpenError(name, circuit.retry_after())
+        started = time.monotonic()
+        try:
+            yield circuit
+        except Exception as e:
+            circuit.record(time.monotonic() - started, failed=is_failure(e))
+            raise
+        except BaseException:
+            # Cancelled: no outcome, just free the probe slot
+            circuit.release()
+            raise
+        else:
+            circuit.record(time.monotonic() - started, failed=False)
+
+    def is_open(self, name: str) -> bool:
+        """
+        Check if a circuit is open and still within its recovery timeout.
+
+        Unlike `guard`, this does not change the circuit state.
+
         Args:
             name: Circuit name
-            
+
         Returns:
-            True if the circuit is closed or can be tested, False otherwise
+            True if calls through the circuit would be rejected
         """
-        circuit = self._get_circuit(name)
-        
-        if circuit["state"] == CircuitState.CLOSED:
-            # Circuit is closed, allow the call
-            return True
-        
-        if circuit["state"] == CircuitState.OPEN:
-            # Check if the recovery timeout has elapsed
-            elapsed = time.time() - circuit["last_failure_time"]
-            
-            if elapsed >= circuit["recovery_timeout"]:
-                # Recovery timeout has elapsed, allow one test call
-                circuit["state"] = CircuitState.HALF_OPEN
-                logger.info(f"Circuit {name} is now HALF_OPEN")
-                return True
-            
-            # Circuit is open and recovery timeout hasn't elapsed, don't allow the call
-            logger.warning(f"Circuit {name} is OPEN, call rejected")
-            return False
-        
-        # Circuit is half-open, allow one test call
-        return True
-
-
-# Create a singleton circuit breaker instance
-_circuit_breaker = CircuitBreaker()
-
-async def with_circuit_breaker(name: str, func: Callable) -> Any:
-    """
-    Execute a function with circuit breaker protection.
-    
-    Args:
-        name: Circuit name
-        func: Function to execute
-        
-    Returns:
-        Function result
-    """
-    # Check if the circuit is closed or can be tested
-    if not _circuit_breaker._check_circuit(name):
-        # Circuit is open, return a fallback value or raise an exception
-        logger.warning(f"Circuit {name} is open, using fallback")
-        
-        # For economic calendar service, return empty data
-        if "economic" in name:
-            if "symbol" in name:
-                return {
-                    "high_impact_events": [],
-                    "upcoming_events": [],
-                    "symbol_events": []
-                }
-            else:
-                return {
-                    "high_impact_events": [],
-                    "upcoming_events": []
-                }
-        
-        # For other services, return empty data
-        return []
-    
-    try:
-        # Call the function
-        result = await func()
-        
-        # Record success
-        _circuit_breaker._record_success(name)
-        
-        return result
-    except Exception as e:
-        # Record failure
-        _circuit_breaker._record_failure(name)
-        
-        # Re-raise the exception
-        raise e
-
-
-def circuit_breaker(name: str) -> Callable:
-    """
-    Circuit breaker decorator.
-    
-    Args:
-        name: Circuit name
-        
-    Returns:
-        Decorated function
-    """
-    def decorator(func: Callable) -> Callable:
-        @functools.wraps(func)
-        async def wrapper(*args: Any, **kwargs: Any) -> Any:
-            # Check if the circuit is closed or can be tested
-            if not _circuit_breaker._check_circuit(name):
-                # Circuit is open, return a fallback value or raise an exception
-                logger.warning(f"Circuit {name} is open, using fallback")
-                
-                # For economic calendar service, return empty data
-                if "economic" in name:
-                    if "symbol" in name:
-                        return {
-                            "high_impact_events": [],
-                            "upcoming_events": [],
-                            "symbol_events": []
-                        }
-                    else:
-                        return {
-                            "high_impact_events": [],
-                            "upcoming_events": []
-                        }
-                
-                # For other services, return empty data
-                return []
-            
-            try:
-                # Call the function
-                result = await func(*args, **kwargs)
-                
-                # Record success
-                _circuit_breaker._record_success(name)
-                
-                return result
-            except Exception as e:
-                # Record failure
-                _circuit_breaker._record_failure(name)
-                
-                # Re-raise the exception
-                raise e
-        
-        return wrapper
-    
-    return decorator
+        circuit = self._circuits.get(name)
+        return circuit is not None and circuit.is_open()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get statistics of all circuits.
+
+        Returns:
+            Dictionary of circuit name to statistics
+        """
+        return {name: circuit.get_stats() for name, circuit in list(self._circuits.items())}
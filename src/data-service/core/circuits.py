@@ -0,0 +1,108 @@
+"""
+Shared circuit breaker of the External Data Service.
+
+One CircuitBreaker (core/circuit_breaker.py) configured from settings, with
+the helpers the services use: a decorator and a wrapper that return empty
+data while a circuit is open, and read-only checks for the scheduler and the
+health endpoint.
+"""
+import logging
+import functools
+from typing import Any, Callable, Dict
+
+from core.circuit_breaker import CircuitBreaker, CircuitConfig, CircuitOpenError
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+# Create a singleton circuit breaker instance
+_circuit_breaker = CircuitBreaker(CircuitConfig(
+    window=settings.CIRCUIT_BREAKER_WINDOW,
+    min_calls=settings.CIRCUIT_BREAKER_FAILURE_THRESHOLD,
+    failure_rate=settings.CIRCUIT_BREAKER_FAILURE_RATE,
+    slow_call_duration=settings.CIRCUIT_BREAKER_SLOW_CALL_DURATION,
+    slow_call_rate=settings.CIRCUIT_BREAKER_SLOW_CALL_RATE,
+    recovery_timeout=settings.CIRCUIT_BREAKER_RECOVERY_TIMEOUT,
+    half_open_max_calls=settings.CIRCUIT_BREAKER_HALF_OPEN_CALLS
+))
+
+def is_circuit_open(name: str) -> bool:
+    """
+    Check if a circuit is currently rejecting calls.
+
+    Args:
+        name: Circuit name
+
+    Returns:
+        True if the circuit is open
+    """
+    return _circuit_breaker.is_open(name)
+
+
+def get_circuit_stats() -> Dict[str, Any]:
+    """
+    Get statistics of all circuits.
+
+    Returns:
+        Dictionary of circuit name to statistics
+    """
+    return _circuit_breaker.get_stats()
+
+
+def _fallback_value(name: str) -> Any:
+    """Empty data returned while a circuit is open."""
+    # For economic calendar service, return empty data
+    if "economic" in name:
+        if "symbol" in name:
+            return {
+                "high_impact_events": [],
+                "upcoming_events": [],
+                "symbol_events": []
+            }
+        return {
+            "high_impact_events": [],
+            "upcoming_events": []
+        }
+
+    # For other services, return empty data
+    return []
+
+
+async def with_circuit_breaker(name: str, func: Callable) -> Any:
+    """
+    Execute a function with circuit breaker protection.
+
+    Args:
+        name: Circuit name
+        func: Function to execute
+
+    Returns:
+        Function result, or empty data if the circuit is open
+    """
+    try:
+        with _circuit_breaker.guard(name):
+            return await func()
+    except CircuitOpenError:
+        logger.warning(f"Circuit {name} is open, using fallback")
+        return _fallback_value(name)
+
+
+def circuit_breaker(name: str) -> Callable:
+    """
+    Circuit breaker decorator.
+
+    Args:
+        name: Circuit name
+
+    Returns:
+        Decorated function
+    """
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            return await with_circuit_breaker(name, lambda: func(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
@@ -33,10 +33,60 @@ class Settings(BaseModel):
     
     # Cache settings
     CACHE_TTL: int = 300  # seconds
+    CACHE_STALE_TTL: int = 120  # seconds an expired entry may be served while refreshing
+    CACHE_MAX_ENTRIES: int = 1000
+    CACHE_MAX_BYTES: int = 50 * 1024 * 1024
+    CACHE_SWEEP_INTERVAL: int = 60  # seconds
+    CACHE_BACKEND: str = "none"  # shared L2 tier: none, memory or redis
+    CACHE_NAMESPACE: str = "data"
+    REDIS_URL: str = "redis://localhost:6379/0"
+    CACHE_REDIS_TIMEOUT: float = 0.5  # seconds
+    
+    # Integration settings (per-source deadlines in seconds)
+    INTEGRATION_NEWS_TIMEOUT: float = 5.0
+    INTEGRATION_SOCIAL_TIMEOUT: float = 5.0
+    INTEGRATION_EVENTS_TIMEOUT: float = 8.0
+    
+    # Background refresh scheduler (intervals in seconds)
+    SCHEDULER_ENABLED: bool = True
+    SCHEDULER_SYMBOLS: List[str] = ["BTC", "ETH", "SOL"]
+    SCHEDULER_NEWS_INTERVAL: float = 240
+    SCHEDULER_SOCIAL_INTERVAL: float = 120
+    SCHEDULER_ECONOMIC_INTERVAL: float = 900
+    SCHEDULER_MAX_CONCURRENCY: int = 3
+    SCHEDULER_JITTER: float = 0.1
+    SCHEDULER_JOB_TIMEOUT: float = 60
+    
+    @validator("SCHEDULER_SYMBOLS", pre=True)
+    @classmethod
+    def assemble_scheduler_symbols(cls, v: str | List[str]) -> List[str]:
+        """Parse scheduler symbols from a comma-separated string or list."""
+        if isinstance(v, str):
+            return [i.strip().upper() for i in v.split(",") if i.strip()]
+        return v
+    
+    # Local news store (SQLite FTS5)
+    NEWS_STORE_PATH: str = "services/news_store.db"
+    NEWS_STORE_RETENTION_DAYS: int = 400  # 0 keeps everything
+    
+    # Fallback cache files (append-only JSON-lines segments)
+    FALLBACK_CACHE_DIR: str = "services/fallback_cache"
+    FALLBACK_SEGMENT_BYTES: int = 1024 * 1024
+    FALLBACK_MAX_SEGMENTS: int = 8
+    FALLBACK_RETENTION: int = 7 * 24 * 3600  # seconds, 0 keeps everything
+    FALLBACK_READ_LIMIT: int = 200  # newest items returned by a fallback read
+    
+    # Local sentiment indexes
+    SENTIMENT_HALF_LIFE: float = 6 * 3600  # seconds after which an item counts half
     
     # Circuit breaker settings
-    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5
+    CIRCUIT_BREAKER_FAILURE_THRESHOLD: int = 5  # calls in the window before rates are evaluated
     CIRCUIT_BREAKER_RECOVERY_TIMEOUT: int = 30  # seconds
+    CIRCUIT_BREAKER_WINDOW: float = 60  # seconds
+    CIRCUIT_BREAKER_FAILURE_RATE: float = 0.5
+    CIRCUIT_BREAKER_SLOW_CALL_DURATION: float = 5  # seconds
+    CIRCUIT_BREAKER_SLOW_CALL_RATE: float = 0.8
+    CIRCUIT_BREAKER_HALF_OPEN_CALLS: int = 2
     
     # External API settings (con valores por defecto)
     NEWS_API_URL: str = "https://newsapi.org/v2"
@@ -69,6 +119,39 @@ def load_settings():
         TWITTER_BEARER_TOKEN=os.getenv("TWITTER_BEARER_TOKEN", "demo_bearer_token"),
         ECONOMIC_CALENDAR_API_KEY=os.getenv("ECONOMIC_CALENDAR_API_KEY", "demo_economic_key"),
         SECRET_KEY=os.getenv("SECRET_KEY", "your-secret-key-change-in-production"),
+        CACHE_TTL=int(os.getenv("CACHE_TTL", "300")),
+        CACHE_STALE_TTL=int(os.getenv("CACHE_STALE_TTL", "120")),
+        CACHE_MAX_ENTRIES=int(os.getenv("CACHE_MAX_ENTRIES", "1000")),
+        CACHE_MAX_BYTES=int(os.getenv("CACHE_MAX_BYTES", str(50 * 1024 * 1024))),
+        CACHE_SWEEP_INTERVAL=int(os.getenv("CACHE_SWEEP_INTERVAL", "60")),
+        CACHE_BACKEND=os.getenv("CACHE_BACKEND", "none"),
+        CACHE_NAMESPACE=os.getenv("CACHE_NAMESPACE", "data"),
+        REDIS_URL=os.getenv("REDIS_URL", "redis://localhost:6379/0"),
+        CACHE_REDIS_TIMEOUT=float(os.getenv("CACHE_REDIS_TIMEOUT", "0.5")),
+        INTEGRATION_NEWS_TIMEOUT=float(os.getenv("INTEGRATION_NEWS_TIMEOUT", "5")),
+        INTEGRATION_SOCIAL_TIMEOUT=float(os.getenv("INTEGRATION_SOCIAL_TIMEOUT", "5")),
+        INTEGRATION_EVENTS_TIMEOUT=float(os.getenv("INTEGRATION_EVENTS_TIMEOUT", "8")),
+        SCHEDULER_ENABLED=os.getenv("SCHEDULER_ENABLED", "true").lower() == "true",
+        SCHEDULER_SYMBOLS=os.getenv("SCHEDULER_SYMBOLS", "BTC,ETH,SOL"),
+        SCHEDULER_NEWS_INTERVAL=float(os.getenv("SCHEDULER_NEWS_INTERVAL", "240")),
+        SCHEDULER_SOCIAL_INTERVAL=float(os.getenv("SCHEDULER_SOCIAL_INTERVAL", "120")),
+        SCHEDULER_ECONOMIC_INTERVAL=float(os.getenv("SCHEDULER_ECONOMIC_INTERVAL", "900")),
+        SCHEDULER_MAX_CONCURRENCY=int(os.getenv("SCHEDULER_MAX_CONCURRENCY", "3")),
+        NEWS_STORE_PATH=os.getenv("NEWS_STORE_PATH", "services/news_store.db"),
+        NEWS_STORE_RETENTION_DAYS=int(os.getenv("NEWS_STORE_RETENTION_DAYS", "400")),
+        FALLBACK_CACHE_DIR=os.getenv("FALLBACK_CACHE_DIR", "services/fallback_cache"),
+        FALLBACK_SEGMENT_BYTES=int(os.getenv("FALLBACK_SEGMENT_BYTES", str(1024 * 1024))),
+        FALLBACK_MAX_SEGMENTS=int(os.getenv("FALLBACK_MAX_SEGMENTS", "8")),
+        FALLBACK_RETENTION=int(os.getenv("FALLBACK_RETENTION", str(7 * 24 * 3600))),
+        FALLBACK_READ_LIMIT=int(os.getenv("FALLBACK_READ_LIMIT", "200")),
+        SENTIMENT_HALF_LIFE=float(os.getenv("SENTIMENT_HALF_LIFE", str(6 * 3600))),
+        CIRCUIT_BREAKER_FAILURE_THRESHOLD=int(os.getenv("CIRCUIT_BREAKER_FAILURE_THRESHOLD", "5")),
+        CIRCUIT_BREAKER_RECOVERY_TIMEOUT=int(os.getenv("CIRCUIT_BREAKER_RECOVERY_TIMEOUT", "30")),
+        CIRCUIT_BREAKER_WINDOW=float(os.getenv("CIRCUIT_BREAKER_WINDOW", "60")),
+        CIRCUIT_BREAKER_FAILURE_RATE=float(os.getenv("CIRCUIT_BREAKER_FAILURE_RATE", "0.5")),
+        CIRCUIT_BREAKER_SLOW_CALL_DURATION=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_DURATION", "5")),
+        CIRCUIT_BREAKER_SLOW_CALL_RATE=float(os.getenv("CIRCUIT_BREAKER_SLOW_CALL_RATE", "0.8")),
+        CIRCUIT_BREAKER_HALF_OPEN_CALLS=int(os.getenv("CIRCUIT_BREAKER_HALF_OPEN_CALLS", "2")),
     )
 
 settings = load_settings()
@@ -0,0 +1,92 @@
+"""
+Conditional GET support (ETag / If-None-Match) for the External Data Service.
+
+Responses carry a weak ETag computed over their content minus the fields that
+change on every request (generation timestamp, per-source latencies), so a
+client that already holds the same data gets a bodyless 304 instead of the
+whole payload.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Iterable, Optional
+
+from fastapi import Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+# Fields left out of the ETag, at the top level and in nested sections
+VOLATILE_FIELDS = ("timestamp", "sources")
+
+# Fields of a sentiment index that describe its content (the rest drift with time)
+SENTIMENT_INDEX_FIELDS = ("score", "items")
+
+
+def _strip_volatile(content: Any, volatile: Iterable[str]) -> Any:
+    """
+    Drop volatile fields from a dict and from the dicts nested in it.
+
+    Sections such as news/social/events carry their own generation timestamp.
+    List items are kept whole: their timestamps date the item itself.
+    """
+    if not isinstance(content, dict):
+        return content
+    return {key: _strip_volatile(value, volatile) for key, value in content.items() if key not in volatile}
+
+
+def _etag_source(content: Any, volatile: Iterable[str]) -> Any:
+    """Content reduced to the fields that identify it."""
+    if not isinstance(content, dict):
+        return content
+    source: Dict[str, Any] = _strip_volatile(content, volatile)
+    index = content.get("sentiment_index")
+    if isinstance(index, dict):
+        source["sentiment_index"] = {key: index.get(key) for key in SENTIMENT_INDEX_FIELDS}
+    return source
+
+
+def compute_etag(content: Any, volatile: Iterable[str] = VOLATILE_FIELDS) -> str:
+    """
+    Compute the weak ETag of a response content.
+
+    Args:
+        content: JSON-encodable content
+        volatile: Fields ignored at any dict level
+
+    Returns:
+        Quoted weak ETag
+    """
+    encoded = json.dumps(_etag_source(content, tuple(volatile)), sort_keys=True, separators=(",", ":"), default=str)
+    return f'W/"{hashlib.sha1(encoded.encode()).hexdigest()}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of If-None-Match against an ETag."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if (candidate[2:] if candidate.startswith("W/") else candidate) == opaque:
+            return True
+    return False
+
+
+def conditional_response(request: Request, content: Any, volatile: Iterable[str] = VOLATILE_FIELDS) -> Response:
+    """
+    Build a JSON response, or a 304 if the client already has this content.
+
+    Args:
+        request: Incoming request
+        content: Response content
+        volatile: Fields ignored by the ETag at any dict level
+
+    Returns:
+        304 Not Modified or 200 JSON response, both with the ETag header
+    """
+    encoded = jsonable_encoder(content)
+    etag = compute_etag(encoded, volatile)
+    if _matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    return JSONResponse(content=encoded, headers={"ETag": etag})
@@ -0,0 +1,179 @@
+"""
+Background refresh scheduler for the External Data Service.
+
+Keeps cached datasets warm: each job refreshes its cache entry on its own
+cadence (with jitter) before the entry expires, so request handlers read a
+prepared snapshot instead of paying upstream latency. Jobs share a
+concurrency limit, skip runs while their upstream circuit is open (keeping
+the last snapshot alive) and back off after failures.
+"""
+import asyncio
+import logging
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from core.cache import cache
+from core.circuits import is_circuit_open
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class RefreshJob:
+    """A dataset refreshed periodically into the cache."""
+    name: str
+    refresh: Callable[..., Awaitable[Any]]  # `refresh` attribute of a @cached function
+    interval: float
+    args: tuple = ()
+    circuits: List[str] = field(default_factory=list)
+    ttl: Optional[int] = None
+
+    # Runtime state
+    runs: int = 0
+    failures: int = 0
+    consecutive_failures: int = 0
+    skipped: int = 0
+    last_run: Optional[float] = None
+    last_duration: Optional[float] = None
+    last_error: Optional[str] = None
+
+    @property
+    def cache_ttl(self) -> int:
+        """TTL of the snapshot: long enough to survive until the next run."""
+        return self.ttl or int(self.interval * 2)
+
+
+class RefreshScheduler:
+    """Runs refresh jobs in the background with jitter and a concurrency limit."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        jitter: Optional[float] = None,
+        job_timeout: Optional[float] = None
+    ):
+        """
+        Initialize the scheduler.
+
+        Args:
+            max_concurrency: Jobs running at the same time (defaults to SCHEDULER_MAX_CONCURRENCY)
+            jitter: Fraction of the interval used as random jitter (defaults to SCHEDULER_JITTER)
+            job_timeout: Maximum seconds per run (defaults to SCHEDULER_JOB_TIMEOUT)
+        """
+        self.max_concurrency = max_concurrency or settings.SCHEDULER_MAX_CONCURRENCY
+        self.jitter = settings.SCHEDULER_JITTER if jitter is None else jitter
+        self.job_timeout = job_timeout or settings.SCHEDULER_JOB_TIMEOUT
+
+        self._jobs: Dict[str, RefreshJob] = {}
+        self._tasks: List[asyncio.Task] = []
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    def register(self, job: RefreshJob) -> None:
+        """
+        Register a job (before `start`).
+
+        Args:
+            job: Refresh job
+        """
+        self._jobs[job.name] = job
+
+    def _jittered(self, interval: float) -> float:
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _retry_delay(self, job: RefreshJob) -> float:
+        """Exponential backoff after failures, never longer than the interval."""
+        return min(job.interval, 15 * 2 ** (job.consecutive_failures - 1))
+
+    async def _execute(self, job: RefreshJob) -> float:
+        """
+        Run one refresh of a job.
+
+        Returns:
+            Seconds until the next run
+        """
+        open_circuits = [name for name in job.circuits if is_circuit_open(name)]
+        if open_circuits:
+            # Upstream is down: keep serving the last snapshot
+            job.skipped += 1
+            cache.touch(job.refresh.cache_key(*job.args), job.cache_ttl)
+            logger.info(f"Refresh {job.name} skipped, circuit open: {', '.join(open_circuits)}")
+            return self._jittered(job.interval)
+
+        async with self._semaphore:
+            started = time.monotonic()
+            try:
+                # A snapshot written by another worker during the last half
+                # interval is adopted instead of fetching again
+                await asyncio.wait_for(
+                    job.refresh(*job.args, ttl=job.cache_ttl, min_remaining=job.cache_ttl - job.interval / 2),
+                    timeout=self.job_timeout
+                )
+                job.consecutive_failures = 0
+                job.last_error = None
+            except Exception as e:
+                job.failures += 1
+                job.consecutive_failures += 1
+                job.last_error = str(e) or type(e).__name__
+                logger.warning(f"Refresh {job.name} failed ({job.consecutive_failures} in a row): {job.last_error}")
+            finally:
+                job.runs += 1
+                job.last_run = time.time()
+                job.last_duration = time.monotonic() - started
+
+        if job.consecutive_failures:
+            return self._jittered(self._retry_delay(job))
+        return self._jittered(job.interval)
+
+    async def _run(self, job: RefreshJob) -> None:
+        # Stagger the initial warm-up so jobs don't all start at once
+        delay = random.uniform(0, job.interval * self.jitter)
+        while True:
+            await asyncio.sleep(delay)
+            delay = await self._execute(job)
+
+    def start(self) -> None:
+        """Start a background loop per registered job."""
+        if self._tasks:
+            return
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        loop = asyncio.get_running_loop()
+        self._tasks = [loop.create_task(self._run(job), name=f"refresh:{job.name}") for job in self._jobs.values()]
+        logger.info(f"Refresh scheduler started with {len(self._tasks)} jobs")
+
+    async def stop(self) -> None:
+        """Cancel all job loops."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get scheduler statistics.
+
+        Returns:
+            Dictionary with per-job state
+        """
+        return {
+            "running": bool(self._tasks),
+            "max_concurrency": self.max_concurrency,
+            "jobs": {
+                job.name: {
+                    "interval": job.interval,
+                    "runs": job.runs,
+                    "failures": job.failures,
+                    "skipped": job.skipped,
+                    "last_run": job.last_run,
+                    "last_duration_ms": round(job.last_duration * 1000, 1) if job.last_duration is not None else None,
+                    "last_error": job.last_error
+                }
+                for job in self._jobs.values()
+            }
+        }
+
+
+# Create a singleton scheduler instance
+scheduler = RefreshScheduler()
@@ -0,0 +1,325 @@
+"""
+Append-only JSON-lines segment store for the fallback cache files.
+
+Items are appended as one JSON line per record to the active segment of a
+directory; when it grows past a size limit a new segment is started, and when
+there are too many segments the older ones are compacted (latest record per
+key, expired records dropped) into a single segment written to a temporary
+file and renamed into place. Reads memory-map each segment and skip lines
+that cannot contain the requested symbol before decoding them. All file I/O
+runs in a worker thread so fallback paths never block the event loop.
+
+The store does not import service-specific code: its configuration comes in
+as arguments.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+import mmap
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+SEGMENT_PREFIX = "seg-"
+SEGMENT_SUFFIX = ".jsonl"
+
+DEFAULT_SEGMENT_BYTES = 1024 * 1024
+DEFAULT_MAX_SEGMENTS = 8
+DEFAULT_RETENTION = 7 * 24 * 3600
+
+
+def content_key(item: Any) -> str:
+    """Hash of an item's content, for items without identity fields."""
+    content = json.dumps(item, sort_keys=True, separators=(",", ":"), default=str)
+    return "sha1:" + hashlib.sha1(content.encode()).hexdigest()
+
+
+def default_key(item: Dict[str, Any]) -> str:
+    """Identity of an item: id, then url, then title, then a hash of its content."""
+    key = item.get("id") or item.get("url") or item.get("title")
+    # Without identity fields the content is the identity: distinct items
+    # must not all collapse into one key
+    return str(key) if key else content_key(item)
+
+
+def default_symbols(item: Dict[str, Any]) -> List[str]:
+    """Symbols an item is tagged with."""
+    symbols = item.get("symbols") or []
+    return [symbols] if isinstance(symbols, str) else list(symbols)
+
+
+class SegmentStore:
+    """Directory of append-only JSON-lines segments."""
+
+    def __init__(
+        self,
+        directory: str,
+        key: Callable[[Dict[str, Any]], str] = default_key,
+        symbols: Callable[[Dict[str, Any]], List[str]] = default_symbols,
+        max_segment_bytes: int = DEFAULT_SEGMENT_BYTES,
+        max_segments: int = DEFAULT_MAX_SEGMENTS,
+        retention: Optional[float] = DEFAULT_RETENTION,
+        legacy_file: Optional[str] = None
+    ):
+        """
+        Initialize the store (the directory is created on first write).
+
+        Args:
+            directory: Directory holding the segments
+            key: Function returning the identity of an item (latest record wins)
+            symbols: Function returning the symbols of an item
+            max_segment_bytes: Size at which a new segment is started
+            max_segments: Segments kept before compacting
+            retention: Seconds a record is kept (0 or None keeps everything)
+            legacy_file: JSON list file imported once if the store is empty
+        """
+        self.directory = directory
+        self.key = key
+        self.symbols = symbols
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segments = max_segments
+        self.retention = retention
+        self.legacy_file = legacy_file
+
+        self._lock = threading.Lock()
+        self.compactions = 0
+
+    # ------------------------------------------------------------------
+    # Segments
+    # ------------------------------------------------------------------
+
+    def _segments(self) -> List[str]:
+        """Segment paths, oldest first."""
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return []
+        return [
+            os.path.join(self.directory, name)
+            for name in sorted(names)
+            if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX)
+        ]
+
+    def _segment_path(self, number: int) -> str:
+        return os.path.join(self.directory, f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}")
+
+    @staticmethod
+    def _segment_number(path: str) -> int:
+        return int(os.path.basename(path)[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+
+    def _active_segment(self) -> str:
+        """Segment to append to, rotating when the current one is full."""
+        segments = self._segments()
+        if not segments:
+            os.makedirs(self.directory, exist_ok=True)
+            return self._segment_path(1)
+        current = segments[-1]
+        if os.path.getsize(current) < self.max_segment_bytes:
+            return current
+        return self._segment_path(self._segment_number(current) + 1)
+
+    def _iter_records(self, path: str, needle: Optional[bytes] = None) -> Iterator[Dict[str, Any]]:
+        """Decode the records of a segment, skipping lines without `needle`."""
+        try:
+            with open(path, "rb") as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    for line in iter(mm.readline, b""):
+                        if needle is not None and needle not in line:
+                            continue
+                        try:
+                            yield json.loads(line)
+                        except ValueError:
+                            # Truncated last line of an interrupted append
+                            continue
+        except FileNotFoundError:
+            return
+
+    @staticmethod
+    def _record_key(record: Dict[str, Any]) -> str:
+        """Key of a stored record; records written with an empty key fall back to their content."""
+        return record.get("k") or content_key(record.get("d"))
+
+    @staticmethod
+    def _write_atomic(path: str, records: Iterable[Dict[str, Any]]) -> None:
+        """Write a whole segment to a temporary file and rename it into place."""
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.writelines(json.dumps(record, separators=(",", ":")).encode() + b"\n" for record in records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    # ------------------------------------------------------------------
+    # Sync operations (run in a worker thread)
+    # ------------------------------------------------------------------
+
+    def append_sync(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append items to the active segment.
+
+        Args:
+            items: Items to persist
+
+        Returns:
+            Number of records written
+        """
+        now = time.time()
+        lines = [
+            json.dumps(
+                {"t": now, "k": self.key(item), "s": self.symbols(item), "d": item},
+                separators=(",", ":"), default=str
+            ).encode() + b"\n"
+            for item in items
+        ]
+        if not lines:
+            return 0
+
+        with self._lock:
+            # A single write of whole lines; readers skip a truncated tail
+            with open(self._active_segment(), "ab") as f:
+                f.write(b"".join(lines))
+            if len(self._segments()) > self.max_segments:
+                self._compact_locked()
+        return len(lines)
+
+    def read_sync(self, symbol: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read the latest version of each item, newest first.
+
+        Args:
+            symbol: Only items tagged with this symbol
+            limit: Maximum number of items
+
+        Returns:
+            List of items
+        """
+        with self._lock:
+            segments = self._segments()
+            if not segments and self.legacy_file:
+                segments = self._import_legacy_locked()
+
+            needle = json.dumps(symbol).encode() if symbol else None
+            cutoff = time.time() - self.retention if self.retention else 0
+            latest: Dict[str, Dict[str, Any]] = {}
+            for path in segments:
+                for record in self._iter_records(path, needle):
+                    if record.get("t", 0) < cutoff:
+                        continue
+                    if symbol and symbol not in record.get("s", []):
+                        continue
+                    latest[self._record_key(record)] = record
+
+        records = sorted(latest.values(), key=lambda record: record.get("t", 0), reverse=True)
+        if limit is not None:
+            records = records[:limit]
+        return [record["d"] for record in records]
+
+    def compact_sync(self) -> None:
+        """Merge all segments into one (latest record per key, expired records dropped)."""
+        with self._lock:
+            self._compact_locked(include_active=True)
+
+    def _compact_locked(self, include_active: bool = False) -> None:
+        segments = self._segments()
+        merged = segments if include_active else segments[:-1]
+        if len(merged) < (1 if include_active else 2):
+            return
+
+        cutoff = time.time() - self.retention if self.retention else 0
+        latest: Dict[str, Dict[str, Any]] = {}
+        for path in merged:
+            for record in self._iter_records(path):
+                if record.get("t", 0) >= cutoff:
+                    latest[self._record_key(record)] = record
+
+        # The result takes the name of the newest merged segment, so segment
+        # order is preserved; leftovers of a crash here only hold older
+        # versions of the same keys, which reads already resolve
+        target = merged[-1]
+        self._write_atomic(target, latest.values())
+        for path in merged[:-1]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self.compactions += 1
+        logger.debug(f"Compacted {len(merged)} segments in {self.directory}: {len(latest)} records")
+
+    def _import_legacy_locked(self) -> List[str]:
+        """Import the old single-file JSON cache into a first segment."""
+        try:
+            with open(self.legacy_file, "r") as f:
+                items = json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Error importing legacy cache file {self.legacy_file}: {e}")
+            return []
+
+        if not isinstance(items, list):
+            return []
+        os.makedirs(self.directory, exist_ok=True)
+        mtime = os.path.getmtime(self.legacy_file)
+        path = self._segment_path(1)
+        self._write_atomic(path, (
+            {"t": mtime, "k": self.key(item), "s": self.symbols(item), "d": item}
+            for item in items if isinstance(item, dict)
+        ))
+        logger.info(f"Imported {len(items)} items from {self.legacy_file}")
+        return [path]
+
+    # ------------------------------------------------------------------
+    # Async API
+    # ------------------------------------------------------------------
+
+    async def append(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Append items without blocking the event loop.
+
+        Args:
+            items: Items to persist
+
+        Returns:
+            Number of records written
+        """
+        return await asyncio.to_thread(self.append_sync, list(items))
+
+    async def read(self, symbol: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Read items without blocking the event loop.
+
+        Args:
+            symbol: Only items tagged with this symbol
+            limit: Maximum number of items
+
+        Returns:
+            List of items, newest first
+        """
+        return await asyncio.to_thread(self.read_sync, symbol, limit)
+
+    async def compact(self) -> None:
+        """Compact all segments without blocking the event loop."""
+        await asyncio.to_thread(self.compact_sync)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with segment count and size
+        """
+        with self._lock:
+            segments = self._segments()
+            size = sum(os.path.getsize(path) for path in segments)
+        return {
+            "directory": self.directory,
+            "segments": len(segments),
+            "bytes": size,
+            "compactions": self.compactions
+        }
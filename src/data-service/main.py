@@ -13,7 +13,13 @@ import uvicorn
 import uuid
 
 from api.routes import api_router
+from core.cache import cache
 from core.config import settings
+from core.circuits import get_circuit_stats
+from core.scheduler import scheduler
+from services.refresh_jobs import register_refresh_jobs
+from services.news_store import news_store
+from services.sentiment_service import sentiment_pipeline
 from core.logging import setup_logging, get_logger
 from core.security import SecurityMiddleware, SecurityHeaders, secure_logger
 
@@ -188,6 +194,11 @@ async def detailed_health_check():
             "memory_percent": psutil.virtual_memory().percent,
             "disk_percent": psutil.disk_usage('/').percent
         },
+        "cache": cache.get_stats(),
+        "scheduler": scheduler.get_stats(),
+        "news_store": news_store.get_stats(),
+        "sentiment": sentiment_pipeline.get_stats(),
+        "circuits": get_circuit_stats(),
         "security": {
             "rate_limiter": "active",
             "input_validation": "active",
@@ -271,6 +282,11 @@ async def startup_event():
     if "*" in settings.BACKEND_CORS_ORIGINS:
         logger.warning("⚠️ CORS permite todos los orígenes - no recomendado para producción")
     
+    # Keep news, social and economic snapshots warm in the background
+    if settings.SCHEDULER_ENABLED:
+        register_refresh_jobs(scheduler)
+        scheduler.start()
+    
     logger.info("✅ External Data Service started successfully with security features")
 
 @app.on_event("shutdown")
@@ -279,6 +295,9 @@ async def shutdown_event():
     Eventos de cierre con limpieza de recursos.
     """
     logger.info("🛑 Shutting down External Data Service...")
+    await scheduler.stop()
+    await cache.close()
+    news_store.close()
     logger.info("✅ External Data Service shutdown complete")
 
 # ============================================
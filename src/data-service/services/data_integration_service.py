@@ -4,73 +4,94 @@ Data integration service for the External Data Service.
 import os
 import json
 import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Awaitable, Dict, Any, Optional, Tuple
 from datetime import datetime
 
 from core.cache import cache
-from core.circuit_breaker import circuit_breaker
 from core.config import settings
 from services.news_service import get_news_for_symbol, get_all_relevant_news
 from services.social_media_service import get_social_data_for_symbol, get_all_social_data
 from services.economic_calendar_service import get_economic_events_for_symbol, get_all_economic_events
+from services.sentiment_service import sentiment_pipeline
 
 logger = logging.getLogger(__name__)
 
+# Deadline per source (seconds); a slow source is reported as timed out
+# while its fetch keeps running in the background and warms its own cache
+SOURCE_TIMEOUTS = {
+    "news": settings.INTEGRATION_NEWS_TIMEOUT,
+    "social": settings.INTEGRATION_SOCIAL_TIMEOUT,
+    "events": settings.INTEGRATION_EVENTS_TIMEOUT,
+}
+
+async def _fetch_source(name: str, fetch: Awaitable[Dict[str, Any]]) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """
+    Fetch one source within its deadline.
+    
+    Args:
+        name: Source name
+        fetch: Source coroutine
+        
+    Returns:
+        Source data (empty on failure) and its status
+    """
+    started = time.monotonic()
+    try:
+        data = await asyncio.wait_for(fetch, timeout=SOURCE_TIMEOUTS[name])
+        status = {"status": "ok"}
+    except asyncio.TimeoutError:
+        logger.warning(f"Source {name} exceeded its {SOURCE_TIMEOUTS[name]}s deadline")
+        data, status = {}, {"status": "timeout"}
+    except Exception as e:
+        logger.error(f"Error getting {name} data: {e}")
+        data, status = {}, {"status": "error", "error": str(e)}
+    status["latency_ms"] = round((time.monotonic() - started) * 1000, 1)
+    return data, status
+
 async def get_integrated_data(symbol: Optional[str] = None) -> Dict[str, Any]:
     """
     Get integrated external data.
     
+    Sources are fetched concurrently, each within its own deadline and cached
+    independently, so the response takes as long as the slowest source. When a
+    source fails or times out the result is partial and flagged per source.
+    
     Args:
         symbol: Cryptocurrency symbol (optional)
         
     Returns:
         Integrated external data
     """
-    cache_key = f"integrated_{symbol}" if symbol else "integrated_all"
-    
-    # Try to get from cache
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        logger.info(f"Using cached integrated data for {symbol or 'all cryptocurrencies'}")
-        return cached_data
-    
-    try:
-        # Fetch data
-        if symbol:
-            logger.info(f"Getting integrated data for {symbol}")
-            news = await get_news_for_symbol(symbol)
-            social = await get_social_data_for_symbol(symbol)
-            events = await get_economic_events_for_symbol(symbol)
-        else:
-            logger.info("Getting integrated data for all cryptocurrencies")
-            news = await get_all_relevant_news()
-            social = await get_all_social_data()
-            events = await get_all_economic_events()
-        
-        # Prepare response
-        result = {
-            "symbol": symbol,
-            "news": news,
-            "social": social,
-            "events": events,
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    if symbol:
+        logger.info(f"Getting integrated data for {symbol}")
+        fetches = {
+            "news": get_news_for_symbol(symbol),
+            "social": get_social_data_for_symbol(symbol),
+            "events": get_economic_events_for_symbol(symbol),
         }
-        
-        # Cache the result
-        await cache.set(cache_key, result)
-        
-        return result
-    except Exception as e:
-        logger.error(f"Error getting integrated data: {e}")
-        return {
-            "symbol": symbol,
-            "news": {},
-            "social": {},
-            "events": {},
-            "error": str(e),
-            "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    else:
+        logger.info("Getting integrated data for all cryptocurrencies")
+        fetches = {
+            "news": get_all_relevant_news(),
+            "social": get_all_social_data(),
+            "events": get_all_economic_events(),
         }
+    
+    results = await asyncio.gather(*(_fetch_source(name, fetch) for name, fetch in fetches.items()))
+    
+    result = {"symbol": symbol}
+    sources = {}
+    for name, (data, status) in zip(fetches, results):
+        result[name] = data
+        sources[name] = status
+    # Time-decayed index over every item seen so far, including this fetch
+    result["sentiment_index"] = sentiment_pipeline.get_index(symbol)
+    result["sources"] = sources
+    result["partial"] = any(status["status"] != "ok" for status in sources.values())
+    result["timestamp"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return result
 
 async def get_formatted_data(symbol: Optional[str] = None) -> str:
     """
@@ -97,8 +118,9 @@ async def get_formatted_data(symbol: Optional[str] = None) -> str:
         # Format data
         formatted = format_data_for_prompt(data)
         
-        # Cache the result
-        await cache.set(cache_key, formatted)
+        # Partial data is not cached: the next request retries the missing sources
+        if not data.get("partial"):
+            await cache.set(cache_key, formatted)
         
         return formatted
     except Exception as e:
@@ -130,6 +152,7 @@ def format_data_for_prompt(data: Dict[str, Any]) -> str:
         twitter_trends = social_data.get("twitter_trends", [])
         sentiment = social_data.get("sentiment", {})
         trending_coins = social_data.get("trending_coins", [])
+        sentiment_index = data.get("sentiment_index")
         
         # Format events
         events_data = data.get("events", {})
@@ -161,6 +184,15 @@ def format_data_for_prompt(data: Dict[str, Any]) -> str:
             lines.append(f"Positive: {positive:.2f}, Negative: {negative:.2f}, Neutral: {neutral:.2f}")
             lines.append("")
         
+        # Sentiment index (news and social, time-decayed)
+        if sentiment_index:
+            lines.append("## Sentiment Index")
+            lines.append(
+                f"Score: {sentiment_index['score']:+.2f} (-1 to 1), Confidence: {sentiment_index['confidence']:.2f}, "
+                f"Items: {sentiment_index['items']}, Half-life: {sentiment_index['half_life'] / 3600:.0f}h"
+            )
+            lines.append("")
+        
         # Crypto News
         if crypto_news:
             lines.append("## Cryptocurrency News")
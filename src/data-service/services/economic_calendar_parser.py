@@ -0,0 +1,276 @@
+"""
+Streaming parser for the Investing.com economic calendar.
+
+The page is fed chunk by chunk into an lxml HTML parser with a SAX-style
+target, so no document tree is built: only the rows of the calendar table
+(`#economicCalendarData`) are collected as compact tuples, and parsing stops
+as soon as that table closes. A snapshot of the previous scrape lets
+unchanged rows reuse their already built event dicts.
+"""
+import re
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from lxml import etree
+
+logger = logging.getLogger(__name__)
+
+CALENDAR_TABLE_ID = "economicCalendarData"
+EVENT_ROW_CLASS = "js-event-item"
+BULL_ICON_CLASS = "grayFullBullishIcon"
+FLAG_CLASS = "flagCur"
+
+# "2025-06-19T14:30:00+0000" or "2025/06/19 14:30:00"
+_DATE_PATTERN = re.compile(r"(\d{4})[-/](\d{2})[-/](\d{2})")
+_WHITESPACE = re.compile(r"\s+")
+
+
+class CalendarRow(NamedTuple):
+    """Raw fields of a calendar row, as scraped."""
+    row_id: str
+    datetime_attr: str
+    time: str
+    country: Optional[str]
+    bulls: int
+    title: str
+    title_attr: Optional[str]
+
+
+@lru_cache(maxsize=512)
+def parse_event_date(value: str) -> Optional[str]:
+    """
+    Normalize a `data-event-datetime` attribute to YYYY-MM-DD.
+
+    Args:
+        value: Attribute value
+
+    Returns:
+        Date string or None if it cannot be parsed
+    """
+    match = _DATE_PATTERN.match(value)
+    if not match:
+        return None
+    return f"{match.group(1)}-{match.group(2)}-{match.group(3)}"
+
+
+def _has_class(attrib: Dict[str, str], name: str) -> bool:
+    return name in attrib.get("class", "").split()
+
+
+class _CalendarTarget:
+    """lxml parser target that collects the event rows of the calendar table."""
+
+    def __init__(self):
+        self.rows: List[CalendarRow] = []
+        self.done = False
+        self._table_depth = 0  # nesting depth inside the calendar table (0 = outside)
+        self._row: Optional[Dict[str, Any]] = None
+        self._cells: List[Dict[str, Any]] = []
+        self._cell: Optional[Dict[str, Any]] = None
+
+    def start(self, tag: str, attrib: Dict[str, str]) -> None:
+        if self.done:
+            return
+        if tag == "table":
+            if self._table_depth:
+                self._table_depth += 1
+            elif attrib.get("id") == CALENDAR_TABLE_ID:
+                self._table_depth = 1
+            return
+        if not self._table_depth:
+            return
+
+        if tag == "tr":
+            if _has_class(attrib, EVENT_ROW_CLASS):
+                self._row = {"id": attrib.get("id", ""), "datetime": attrib.get("data-event-datetime", "")}
+                self._cells = []
+        elif self._row is not None:
+            if tag == "td":
+                self._cell = {
+                    "text": [], "title": attrib.get("title"), "bulls": 0, "flag": None,
+                    "flag_cell": _has_class(attrib, FLAG_CLASS)
+                }
+            elif self._cell is not None:
+                if tag == "i" and BULL_ICON_CLASS in attrib.get("class", ""):
+                    self._cell["bulls"] += 1
+                elif tag == "span" and self._cell["flag"] is None and (
+                    _has_class(attrib, FLAG_CLASS) or (self._cell["flag_cell"] and attrib.get("title"))
+                ):
+                    # Country flag: <span class="flagCur" title=...> or a titled span in the flagCur cell
+                    self._cell["flag"] = attrib.get("title")
+
+    def data(self, text: str) -> None:
+        if self._cell is not None:
+            self._cell["text"].append(text)
+
+    def end(self, tag: str) -> None:
+        if self.done or not self._table_depth:
+            return
+        if tag == "table":
+            self._table_depth -= 1
+            if not self._table_depth:
+                # Calendar table closed: nothing else on the page is needed
+                self.done = True
+        elif tag == "td" and self._cell is not None:
+            self._cells.append(self._cell)
+            self._cell = None
+        elif tag == "tr" and self._row is not None:
+            self._finish_row()
+
+    def _finish_row(self) -> None:
+        cells, row = self._cells, self._row
+        self._row, self._cells, self._cell = None, [], None
+        if len(cells) < 5:
+            return
+        text = lambda cell: _WHITESPACE.sub(" ", "".join(cell["text"])).strip()
+        self.rows.append(CalendarRow(
+            row_id=row["id"],
+            datetime_attr=row["datetime"],
+            time=text(cells[0]),
+            country=cells[1]["flag"],
+            bulls=cells[2]["bulls"],
+            title=text(cells[3]),
+            title_attr=cells[3]["title"]
+        ))
+
+    def close(self) -> List[CalendarRow]:
+        return self.rows
+
+
+class CalendarStreamParser:
+    """
+    Incremental parser: feed body chunks as they arrive.
+
+    Usage:
+        parser = CalendarStreamParser()
+        async for chunk in response.content.iter_chunked(16384):
+            parser.feed(chunk)
+            if parser.done:
+                break
+        rows = parser.close()
+    """
+
+    def __init__(self):
+        self._target = _CalendarTarget()
+        self._parser = etree.HTMLParser(target=self._target, encoding="utf-8")
+        self.bytes_read = 0
+        self.found_table = False
+
+    @property
+    def done(self) -> bool:
+        """True once the calendar table has been fully read."""
+        return self._target.done
+
+    def feed(self, chunk: bytes) -> None:
+        if self._target.done:
+            return
+        self.bytes_read += len(chunk)
+        self._parser.feed(chunk)
+        self.found_table = self.found_table or self._target._table_depth > 0 or self._target.done
+
+    def close(self) -> List[CalendarRow]:
+        try:
+            self._parser.close()
+        except etree.XMLSyntaxError:
+            # Truncated or empty body: keep the rows read so far
+            pass
+        return self._target.rows
+
+
+def parse_calendar_html(chunks: Iterable[bytes]) -> List[CalendarRow]:
+    """
+    Parse a calendar page from an iterable of byte chunks.
+
+    Args:
+        chunks: Body chunks (a single bytes object may be passed in a list)
+
+    Returns:
+        Calendar rows
+    """
+    parser = CalendarStreamParser()
+    for chunk in chunks:
+        parser.feed(chunk)
+        if parser.done:
+            break
+    return parser.close()
+
+
+def build_event(row: CalendarRow, today: str) -> Dict[str, Any]:
+    """
+    Build an event dict from a raw row.
+
+    Args:
+        row: Calendar row
+        today: Fallback date (YYYY-MM-DD)
+
+    Returns:
+        Event dict
+    """
+    date_str = parse_event_date(row.datetime_attr) if row.datetime_attr else None
+    if date_str is None:
+        if row.datetime_attr:
+            logger.warning(f"Failed to parse date: {row.datetime_attr}, using current date")
+        date_str = today
+
+    country = row.country or "Global"
+    if row.bulls == 3:
+        impact = "high"
+    elif row.bulls == 2:
+        impact = "medium"
+    else:
+        impact = "low"
+
+    description = row.title_attr if row.title_attr is not None else f"Economic event: {row.title}"
+    if not description:
+        description = f"Economic event: {row.title} for {country}"
+
+    return {
+        "title": row.title,
+        "date": date_str,
+        "time": row.time,
+        "impact": impact,
+        "country": country,
+        "description": description
+    }
+
+
+class CalendarSnapshot:
+    """Last scraped rows and their events; unchanged rows are not rebuilt."""
+
+    def __init__(self):
+        self._events: Dict[Tuple, Tuple[CalendarRow, Dict[str, Any]]] = {}
+        self.last_diff = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+
+    @staticmethod
+    def _key(row: CalendarRow) -> Tuple:
+        return (row.row_id,) if row.row_id else (row.datetime_attr, row.time, row.country, row.title)
+
+    def apply(self, rows: List[CalendarRow], today: str) -> List[Dict[str, Any]]:
+        """
+        Replace the snapshot with new rows.
+
+        Args:
+            rows: Rows of the latest scrape
+            today: Fallback date for rows without a parsable date
+
+        Returns:
+            Events for all rows, in page order
+        """
+        events: Dict[Tuple, Tuple[CalendarRow, Dict[str, Any]]] = {}
+        diff = {"added": 0, "changed": 0, "unchanged": 0, "removed": 0}
+        for row in rows:
+            key = self._key(row)
+            previous = self._events.get(key)
+            if previous is not None and previous[0] == row:
+                event = previous[1]
+                diff["unchanged"] += 1
+            else:
+                event = build_event(row, today)
+                diff["changed" if previous is not None else "added"] += 1
+            events[key] = (row, event)
+        diff["removed"] = sum(1 for key in self._events if key not in events)
+
+        self._events = events
+        self.last_diff = diff
+        return [event for _, event in events.values()]
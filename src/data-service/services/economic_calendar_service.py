@@ -10,16 +10,16 @@ import random
 import asyncio
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
-import re
 
 import aiohttp
 from bs4 import BeautifulSoup
 import pytz
 
-from core.cache import cache
-from core.circuit_breaker import circuit_breaker
+from core.cache import cached
+from core.circuits import circuit_breaker
 from core.config import settings
 from models.schemas import EconomicEventsResponse
+from services.economic_calendar_parser import CalendarSnapshot, CalendarStreamParser
 
 logger = logging.getLogger(__name__)
 
@@ -33,137 +33,59 @@ HEADERS = {
 
 # Note: We're using web scraping instead of an API, so we don't need API keys
 
+PARSER_CHUNK_SIZE = 16384
+
+# Rows of the last scrape, to skip rebuilding unchanged events
+_calendar_snapshot = CalendarSnapshot()
+
 @circuit_breaker("economic_calendar_api")
 async def fetch_economic_events() -> Dict[str, List[Dict[str, Any]]]:
     """
     Fetch economic events from Investing.com using web scraping.
     
+    Failures raise, so the circuit breaker records them and the cache keeps
+    serving the last good snapshot instead of storing an empty one.
+    
     Returns:
         Dictionary with economic events
-    """
-    try:
-        # Fetch the economic calendar page
-        async with aiohttp.ClientSession() as session:
-            async with session.get(INVESTING_CALENDAR_URL, headers=HEADERS) as response:
-                if response.status != 200:
-                    logger.error(f"Failed to fetch economic calendar: {response.status}")
-                    return {"high_impact_events": [], "upcoming_events": []}
-                
-                html = await response.text()
-        
-        # Parse the HTML
-        soup = BeautifulSoup(html, 'lxml')
         
-        # Find the economic events table
-        events_table = soup.find('table', {'id': 'economicCalendarData'})
-        if not events_table:
-            logger.error("Could not find economic events table")
-            return {"high_impact_events": [], "upcoming_events": []}
-        
-        # Extract events
-        high_impact_events = []
-        upcoming_events = []
-        
-        # Current date for reference
-        now = datetime.now()
-        
-        # Process event rows
-        event_rows = events_table.find_all('tr', {'class': 'js-event-item'})
-        for row in event_rows:
-            try:
-                # Skip if row doesn't have enough data
-                cells = row.find_all('td')
-                if len(cells) < 5:
-                    continue
-                
-                # Extract event time
-                time_cell = cells[0]
-                event_time = time_cell.text.strip()
-                
-                # Extract event date (from data attribute or parent row)
-                date_str = row.get('data-event-datetime', '')
-                if date_str:
-                    try:
-                        # Try different date formats
-                        if 'T' in date_str:
-                            # Format: 2025-06-19T14:30:00+0000
-                            event_date = datetime.strptime(date_str.split('T')[0], '%Y-%m-%d')
-                        elif '/' in date_str:
-                            # Format: 2025/06/19 14:30:00
-                            event_date = datetime.strptime(date_str.split(' ')[0], '%Y/%m/%d')
-                        else:
-                            # Use current date as fallback
-                            event_date = now
-                        
-                        date_str = event_date.strftime('%Y-%m-%d')
-                    except ValueError:
-                        # Use current date as fallback if parsing fails
-                        logger.warning(f"Failed to parse date: {date_str}, using current date")
-                        date_str = now.strftime('%Y-%m-%d')
-                else:
-                    # Use current date as fallback
-                    date_str = now.strftime('%Y-%m-%d')
-                
-                # Extract country
-                country_cell = cells[1]
-                country_span = country_cell.find('span', {'class': 'flagCur'})
-                country = country_span.get('title', 'Global') if country_span else 'Global'
-                
-                # Extract impact (bull icons indicate importance)
-                impact_cell = cells[2]
-                impact_icons = impact_cell.find_all('i', {'class': re.compile('grayFullBullishIcon')})
-                if len(impact_icons) == 3:
-                    impact = "high"
-                elif len(impact_icons) == 2:
-                    impact = "medium"
-                else:
-                    impact = "low"
-                
-                # Extract title
-                title_cell = cells[3]
-                title = title_cell.text.strip()
-                
-                # Extract description (tooltip or title text)
-                description = title_cell.get('title', f"Economic event: {title}")
-                if not description:
-                    description = f"Economic event: {title} for {country}"
-                
-                # Create event object
-                event = {
-                    "title": title,
-                    "date": date_str,
-                    "time": event_time,
-                    "impact": impact,
-                    "country": country,
-                    "description": description
-                }
-                
-                # Categorize event based on impact
-                if impact == "high":
-                    high_impact_events.append(event)
-                else:
-                    upcoming_events.append(event)
-                
-            except Exception as e:
-                logger.warning(f"Error parsing event row: {e}")
-                continue
-        
-        # Sort events by date and time
-        high_impact_events.sort(key=lambda x: (x["date"], x["time"]))
-        upcoming_events.sort(key=lambda x: (x["date"], x["time"]))
-        
-        logger.info(f"Scraped {len(high_impact_events)} high impact events and {len(upcoming_events)} upcoming events")
-        
-        return {
-            "high_impact_events": high_impact_events,
-            "upcoming_events": upcoming_events
-        }
-    except Exception as e:
-        logger.error(f"Error scraping economic events: {e}")
-        return {
-            "high_impact_events": [],
-            "upcoming_events": []
-        }
+    Raises:
+        aiohttp.ClientError: If the page cannot be fetched (including non-200)
+        ValueError: If the page has no economic events table
+    """
+    # Stream the page into the incremental parser; stop reading once the
+    # calendar table has closed
+    parser = CalendarStreamParser()
+    async with aiohttp.ClientSession() as session:
+        async with session.get(INVESTING_CALENDAR_URL, headers=HEADERS) as response:
+            response.raise_for_status()
+            
+            async for chunk in response.content.iter_chunked(PARSER_CHUNK_SIZE):
+                parser.feed(chunk)
+                if parser.done:
+                    break
+    
+    rows = parser.close()
+    if not parser.found_table:
+        raise ValueError("Could not find economic events table")
+    
+    # Only rows that changed since the last scrape are rebuilt
+    events = _calendar_snapshot.apply(rows, datetime.now().strftime('%Y-%m-%d'))
+    logger.debug(f"Calendar diff: {_calendar_snapshot.last_diff} ({parser.bytes_read} bytes read)")
+    
+    high_impact_events = [event for event in events if event["impact"] == "high"]
+    upcoming_events = [event for event in events if event["impact"] != "high"]
+    
+    # Sort events by date and time
+    high_impact_events.sort(key=lambda x: (x["date"], x["time"]))
+    upcoming_events.sort(key=lambda x: (x["date"], x["time"]))
+    
+    logger.info(f"Scraped {len(high_impact_events)} high impact events and {len(upcoming_events)} upcoming events")
+    
+    return {
+        "high_impact_events": high_impact_events,
+        "upcoming_events": upcoming_events
+    }
 
 @circuit_breaker("crypto_economic_events_api")
 async def fetch_crypto_economic_events(symbol: str) -> List[Dict[str, Any]]:
@@ -346,9 +268,13 @@ def get_full_name(symbol: str) -> str:
     
     return crypto_names.get(symbol.upper(), symbol)
 
-async def get_economic_events_for_symbol(symbol: str) -> Dict[str, Any]:
+@cached("economic")
+async def load_economic_events_for_symbol(symbol: str) -> Dict[str, Any]:
     """
-    Get economic events for a cryptocurrency.
+    Load economic events for a cryptocurrency (cached, raises on failure).
+    
+    The market-wide calendar comes from the cached `load_all_economic_events`,
+    so every symbol shares one Investing.com scrape.
     
     Args:
         symbol: Cryptocurrency symbol
@@ -356,30 +282,36 @@ async def get_economic_events_for_symbol(symbol: str) -> Dict[str, Any]:
     Returns:
         Dictionary with economic events
     """
-    cache_key = f"economic_{symbol}"
+    events = await load_all_economic_events()
+    symbol_events = await fetch_crypto_economic_events(symbol)
+    return {
+        "high_impact_events": events.get("high_impact_events", []),
+        "upcoming_events": events.get("upcoming_events", []),
+        "symbol_events": symbol_events
+    }
+
+@cached("economic")
+async def load_all_economic_events() -> Dict[str, Any]:
+    """
+    Load all economic events (cached, raises on failure).
     
-    # Try to get from cache
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        logger.info(f"Using cached economic events for {symbol}")
-        return cached_data
+    Returns:
+        Dictionary with economic events
+    """
+    return await fetch_economic_events()
+
+async def get_economic_events_for_symbol(symbol: str) -> Dict[str, Any]:
+    """
+    Get economic events for a cryptocurrency.
     
-    try:
-        # Fetch events
-        events = await fetch_economic_events()
-        symbol_events = await fetch_crypto_economic_events(symbol)
-        
-        # Prepare response
-        result = {
-            "high_impact_events": events.get("high_impact_events", []),
-            "upcoming_events": events.get("upcoming_events", []),
-            "symbol_events": symbol_events
-        }
-        
-        # Cache the result
-        await cache.set(cache_key, result)
+    Args:
+        symbol: Cryptocurrency symbol
         
-        return result
+    Returns:
+        Dictionary with economic events
+    """
+    try:
+        return await load_economic_events_for_symbol(symbol)
     except Exception as e:
         logger.error(f"Error getting economic events for {symbol}: {e}")
         return {
@@ -395,22 +327,8 @@ async def get_all_economic_events() -> Dict[str, Any]:
     Returns:
         Dictionary with economic events
     """
-    cache_key = "economic_all"
-    
-    # Try to get from cache
-    cached_data = await cache.get(cache_key)
-    if cached_data:
-        logger.info("Using cached economic events")
-        return cached_data
-    
     try:
-        # Fetch events
-        events = await fetch_economic_events()
-        
-        # Cache the result
-        await cache.set(cache_key, events)
-        
-        return events
+        return await load_all_economic_events()
     except Exception as e:
         logger.error(f"Error getting all economic events: {e}")
         return {
@@ -1,7 +1,6 @@
 """
 News service for the External Data Service.
 """
-import json
 import logging
 import os
 from datetime import datetime
@@ -13,14 +12,26 @@ from fastapi import HTTPException
 
 from core.config import settings
 from core.cache import cached
-from core.circuit_breaker import with_circuit_breaker
+from core.segment_store import SegmentStore
+from core.circuits import with_circuit_breaker
 from models.schemas import NewsItem, NewsResponse
+from services.news_store import news_store
+from services.sentiment_service import sentiment_pipeline
 
 logger = logging.getLogger(__name__)
 
-# Cache file path
+# Legacy single-file cache, imported once into the segment store
 NEWS_CACHE_FILE = "services/news_cache.json"
 
+# Fallback cache (append-only JSON-lines segments)
+news_fallback = SegmentStore(
+    os.path.join(settings.FALLBACK_CACHE_DIR, "news"),
+    max_segment_bytes=settings.FALLBACK_SEGMENT_BYTES,
+    max_segments=settings.FALLBACK_MAX_SEGMENTS,
+    retention=settings.FALLBACK_RETENTION,
+    legacy_file=NEWS_CACHE_FILE
+)
+
 
 async def _fetch_news_from_api(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
     """
@@ -47,35 +58,51 @@ async def _fetch_news_from_api(symbol: Optional[str] = None) -> List[Dict[str, A
     # Use circuit breaker
     try:
         result = await with_circuit_breaker("news_api", _fetch)
-        return result
     except Exception as e:
         logger.error(f"Error fetching news from API: {e}")
         # Try to get from cache file as fallback
-        return await _get_from_cache_file(symbol)
+        result = await _get_from_cache_file(symbol)
+        _score_sentiment(result, symbol)
+        return result
+    
+    # Index new items for /news/search (already stored URLs are skipped)
+    try:
+        if isinstance(result, list):
+            await news_store.ingest(result)
+    except Exception as e:
+        logger.error(f"Error indexing news: {e}")
+    
+    _score_sentiment(result, symbol)
+    return result
+
+
+def _score_sentiment(news: List[Dict[str, Any]], symbol: Optional[str] = None) -> None:
+    """
+    Fold news into the sentiment indexes (items already counted are skipped).
+    
+    Args:
+        news: List of news items
+        symbol: Symbol the news were requested for
+    """
+    try:
+        if isinstance(news, list):
+            sentiment_pipeline.ingest(news, symbol=symbol)
+    except Exception as e:
+        logger.error(f"Error scoring news sentiment: {e}")
 
 
 async def _get_from_cache_file(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Get news from cache file.
+    Get news from the fallback cache.
     
     Args:
         symbol: Cryptocurrency symbol
         
     Returns:
-        List of news items
+        List of news items, newest first
     """
     try:
-        if not os.path.exists(NEWS_CACHE_FILE):
-            return []
-        
-        with open(NEWS_CACHE_FILE, "r") as f:
-            cache = json.load(f)
-        
-        if symbol:
-            # Filter by symbol
-            return [item for item in cache if symbol in item.get("symbols", [])]
-        
-        return cache
+        return await news_fallback.read(symbol=symbol, limit=settings.FALLBACK_READ_LIMIT)
     except Exception as e:
         logger.error(f"Error reading from cache file: {e}")
         return []
@@ -83,19 +110,15 @@ async def _get_from_cache_file(symbol: Optional[str] = None) -> List[Dict[str, A
 
 async def _save_to_cache_file(news: List[Dict[str, Any]]) -> None:
     """
-    Save news to cache file.
+    Append news to the fallback cache.
     
     Args:
         news: List of news items
     """
     try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(NEWS_CACHE_FILE), exist_ok=True)
-        
-        with open(NEWS_CACHE_FILE, "w") as f:
-            json.dump(news, f)
-        
-        logger.debug(f"Saved news to cache file: {NEWS_CACHE_FILE}")
+        if isinstance(news, list):
+            await news_fallback.append(news)
+            logger.debug(f"Saved news to cache: {news_fallback.directory}")
     except Exception as e:
         logger.error(f"Error saving to cache file: {e}")
 
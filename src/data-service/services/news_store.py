@@ -0,0 +1,400 @@
+"""
+Local indexed news store for the External Data Service.
+
+News items are ingested incrementally into SQLite, deduplicated by a hash of
+their normalized URL, and indexed with FTS5 over title, body and symbols.
+A symbol/time table serves symbol-only and time-range queries without
+scanning, so keyword + symbol + time-range searches over a year of headlines
+stay in the millisecond range. SQLite calls are blocking and run in a worker
+thread; a single connection is shared behind a lock.
+"""
+import asyncio
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Title matches weigh more than symbol tags, which weigh more than the body
+RANK_FUNCTION = "bm25(news_fts, 10.0, 1.0, 5.0)"
+SEARCH_CANDIDATES = 1000  # newest matches ranked per keyword query
+MAX_QUERY_TERMS = 8
+PRUNE_INTERVAL = 3600  # seconds between retention sweeps
+
+_TERM_PATTERN = re.compile(r"\w+", re.UNICODE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS news (
+    id INTEGER PRIMARY KEY,
+    url_hash TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL DEFAULT '',
+    title TEXT NOT NULL,
+    body TEXT NOT NULL DEFAULT '',
+    source TEXT NOT NULL DEFAULT '',
+    symbols TEXT NOT NULL DEFAULT '',
+    sentiment TEXT,
+    published_at REAL NOT NULL,
+    ingested_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_news_published_at ON news (published_at);
+
+CREATE TABLE IF NOT EXISTS news_symbols (
+    symbol TEXT NOT NULL,
+    published_at REAL NOT NULL,
+    news_id INTEGER NOT NULL,
+    PRIMARY KEY (symbol, published_at, news_id)
+) WITHOUT ROWID;
+
+CREATE VIRTUAL TABLE IF NOT EXISTS news_fts USING fts5(
+    title, body, symbols,
+    content='news', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER IF NOT EXISTS news_after_insert AFTER INSERT ON news BEGIN
+    INSERT INTO news_fts (rowid, title, body, symbols) VALUES (new.id, new.title, new.body, new.symbols);
+END;
+
+CREATE TRIGGER IF NOT EXISTS news_after_delete AFTER DELETE ON news BEGIN
+    INSERT INTO news_fts (news_fts, rowid, title, body, symbols)
+    VALUES ('delete', old.id, old.title, old.body, old.symbols);
+END;
+"""
+
+
+def url_hash(item: Dict[str, Any]) -> str:
+    """
+    Deduplication key of a news item.
+
+    The URL is normalized (lowercase scheme and host, no fragment, no trailing
+    slash); items without a URL are keyed by source and title.
+
+    Args:
+        item: Raw news item
+
+    Returns:
+        Hex digest
+    """
+    url = (item.get("url") or "").strip()
+    if url:
+        parts = urlsplit(url)
+        key = urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+    else:
+        key = f"{item.get('source', '')}|{(item.get('title') or '').strip().lower()}"
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+def _parse_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds from an ISO string, a datetime or a number."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        dt = value
+    else:
+        try:
+            dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def _item_symbols(item: Dict[str, Any]) -> List[str]:
+    symbols = item.get("symbols") or []
+    if isinstance(symbols, str):
+        symbols = symbols.replace(",", " ").split()
+    return sorted({str(s).strip().upper() for s in symbols if str(s).strip().isalnum()})
+
+
+def match_expression(query: str) -> Optional[str]:
+    """
+    Build an FTS5 MATCH expression from free text.
+
+    Every term is quoted (so user input cannot inject FTS syntax) and all of
+    them must match; the last one also matches as a prefix.
+
+    Args:
+        query: User query
+
+    Returns:
+        MATCH expression, or None if the query has no searchable terms
+    """
+    terms = _TERM_PATTERN.findall(query.lower())[:MAX_QUERY_TERMS]
+    if not terms:
+        return None
+    quoted = [f'"{term}"' for term in terms]
+    quoted[-1] += "*"
+    return " ".join(quoted)
+
+
+class NewsStore:
+    """SQLite/FTS5 news store with incremental, deduplicated ingestion."""
+
+    def __init__(self, path: Optional[str] = None, retention_days: Optional[int] = None):
+        """
+        Initialize the store (the database is opened on first use).
+
+        Args:
+            path: Database file, or ":memory:" (defaults to NEWS_STORE_PATH)
+            retention_days: Days of news kept (defaults to NEWS_STORE_RETENTION_DAYS, 0 keeps everything)
+        """
+        self.path = path or settings.NEWS_STORE_PATH
+        self.retention_days = settings.NEWS_STORE_RETENTION_DAYS if retention_days is None else retention_days
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._last_prune = 0.0
+
+        self.ingested = 0
+        self.duplicates = 0
+        self.searches = 0
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            logger.info(f"News store opened: {self.path}")
+        return self._conn
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def ingest_sync(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert news items, skipping those already stored.
+
+        Args:
+            items: Raw news items (title, url, description, source, symbols, published_at, sentiment)
+
+        Returns:
+            Number of new items
+        """
+        now = time.time()
+        inserted = 0
+        with self._lock:
+            conn = self._connection()
+            with conn:
+                for item in items:
+                    title = (item.get("title") or "").strip()
+                    if not title:
+                        continue
+                    symbols = _item_symbols(item)
+                    published_at = _parse_timestamp(item.get("published_at") or item.get("publishedAt")) or now
+                    sentiment = item.get("sentiment")
+                    source = item.get("source") or ""
+                    if isinstance(source, dict):
+                        source = source.get("name") or ""
+                    cursor = conn.execute(
+                        "INSERT OR IGNORE INTO news "
+                        "(url_hash, url, title, body, source, symbols, sentiment, published_at, ingested_at) "
+                        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                        (
+                            url_hash(item), item.get("url") or "", title,
+                            item.get("description") or item.get("body") or "",
+                            str(source), " ".join(symbols),
+                            None if sentiment is None else str(sentiment),
+                            published_at, now
+                        )
+                    )
+                    if not cursor.rowcount:
+                        self.duplicates += 1
+                        continue
+                    inserted += 1
+                    conn.executemany(
+                        "INSERT OR IGNORE INTO news_symbols (symbol, published_at, news_id) VALUES (?, ?, ?)",
+                        [(symbol, published_at, cursor.lastrowid) for symbol in symbols]
+                    )
+                if self.retention_days and now - self._last_prune > PRUNE_INTERVAL:
+                    self._last_prune = now
+                    cutoff = now - self.retention_days * 86400
+                    conn.execute("DELETE FROM news_symbols WHERE published_at < ?", (cutoff,))
+                    conn.execute("DELETE FROM news WHERE published_at < ?", (cutoff,))
+        self.ingested += inserted
+        return inserted
+
+    async def ingest(self, items: Iterable[Dict[str, Any]]) -> int:
+        """
+        Insert news items without blocking the event loop.
+
+        Args:
+            items: Raw news items
+
+        Returns:
+            Number of new items
+        """
+        return await asyncio.to_thread(self.ingest_sync, list(items))
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search_sync(
+        self,
+        query: Optional[str] = None,
+        symbol: Optional[str] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        limit: int = 10
+    ) -> Dict[str, Any]:
+        """
+        Search stored news.
+
+        With a query, the newest matches are ranked by BM25 (title > symbols >
+        body) and then by recency; without one, the newest items come first.
+
+        Args:
+            query: Keywords
+            symbol: Only items tagged with this symbol
+            since: Published at or after
+            until: Published before
+            limit: Maximum number of results
+
+        Returns:
+            Dictionary with total_results and articles
+        """
+        expression = match_expression(query) if query else None
+        if query and expression is None:
+            return {"total_results": 0, "articles": []}
+
+        time_conditions, time_params = [], []
+        if since is not None:
+            time_conditions.append("published_at >= ?")
+            time_params.append(_parse_timestamp(since))
+        if until is not None:
+            time_conditions.append("published_at < ?")
+            time_params.append(_parse_timestamp(until))
+
+        with self._lock:
+            conn = self._connection()
+            if expression is not None:
+                if symbol:
+                    expression = f'({expression}) AND symbols : "{symbol.lower()}"'
+                total, rows = self._keyword_search(conn, expression, time_conditions, time_params, limit)
+            else:
+                if symbol:
+                    source, conditions, params = "news_symbols s JOIN news n ON n.id = s.news_id", ["s.symbol = ?"], [symbol.upper()]
+                    conditions += [f"s.{condition}" for condition in time_conditions]
+                    order = "s.published_at DESC"
+                else:
+                    source, conditions, params = "news n", [f"n.{condition}" for condition in time_conditions], []
+                    order = "n.published_at DESC"
+                params += time_params
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                total = conn.execute(f"SELECT count(*) FROM {source} {where}", params).fetchone()[0]
+                rows = conn.execute(
+                    f"SELECT n.*, NULL AS score FROM {source} {where} ORDER BY {order} LIMIT ?",
+                    params + [limit]
+                ).fetchall()
+        self.searches += 1
+
+        return {"total_results": total, "articles": [self._to_article(row) for row in rows]}
+
+    @staticmethod
+    def _keyword_search(
+        conn: sqlite3.Connection,
+        expression: str,
+        time_conditions: List[str],
+        time_params: List[float],
+        limit: int
+    ) -> Tuple[int, List[sqlite3.Row]]:
+        """
+        Run a full-text query.
+
+        BM25 is only computed for the newest SEARCH_CANDIDATES matches (FTS5
+        walks its rowids, i.e. ingestion order, backwards), so broad queries
+        don't pay for ranking every matching headline of the year.
+        """
+        if time_conditions:
+            source = "news_fts JOIN news n ON n.id = news_fts.rowid"
+            where = " AND ".join(["news_fts MATCH ?"] + [f"n.{condition}" for condition in time_conditions])
+        else:
+            source, where = "news_fts", "news_fts MATCH ?"
+        params = [expression] + time_params
+
+        total = conn.execute(f"SELECT count(*) FROM {source} WHERE {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT n.*, c.score FROM ("
+            f"SELECT news_fts.rowid AS id, {RANK_FUNCTION} AS score FROM {source} WHERE {where} "
+            f"ORDER BY news_fts.rowid DESC LIMIT {SEARCH_CANDIDATES}"
+            f") c JOIN news n ON n.id = c.id ORDER BY c.score, n.published_at DESC LIMIT ?",
+            params + [limit]
+        ).fetchall()
+        return total, rows
+
+    async def search(self, **kwargs) -> Dict[str, Any]:
+        """
+        Search stored news without blocking the event loop.
+
+        Args:
+            **kwargs: Arguments of `search_sync`
+
+        Returns:
+            Dictionary with total_results and articles
+        """
+        return await asyncio.to_thread(self.search_sync, **kwargs)
+
+    @staticmethod
+    def _to_article(row: sqlite3.Row) -> Dict[str, Any]:
+        published = datetime.fromtimestamp(row["published_at"], tz=timezone.utc)
+        return {
+            "title": row["title"],
+            "date": published.strftime("%Y-%m-%d"),
+            "published_at": published.isoformat(),
+            "source": row["source"],
+            "url": row["url"],
+            "summary": row["body"],
+            "sentiment": row["sentiment"],
+            "symbols": row["symbols"].split(),
+            "score": round(-row["score"], 4) if row["score"] is not None else None
+        }
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dictionary with store statistics
+        """
+        documents = None
+        if self._conn is not None:
+            with self._lock:
+                documents = self._conn.execute("SELECT count(*) FROM news").fetchone()[0]
+        return {
+            "path": self.path,
+            "documents": documents,
+            "ingested": self.ingested,
+            "duplicates": self.duplicates,
+            "searches": self.searches,
+            "retention_days": self.retention_days
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+# Create a singleton store instance
+news_store = NewsStore()
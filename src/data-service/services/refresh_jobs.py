@@ -0,0 +1,46 @@
+"""
+Refresh jobs for the background scheduler of the External Data Service.
+"""
+import logging
+
+from core.config import settings
+from core.scheduler import RefreshJob, RefreshScheduler
+from services.news_service import get_all_relevant_news, get_news_for_symbol
+from services.social_media_service import get_all_social_data, get_social_data_for_symbol
+from services.economic_calendar_service import load_all_economic_events, load_economic_events_for_symbol
+
+logger = logging.getLogger(__name__)
+
+
+def register_refresh_jobs(scheduler: RefreshScheduler) -> None:
+    """
+    Register the datasets kept warm by the scheduler.
+    
+    Market-wide datasets are always refreshed; per-symbol datasets only for
+    the symbols listed in SCHEDULER_SYMBOLS.
+    
+    Args:
+        scheduler: Scheduler to register the jobs in
+    """
+    news_interval = settings.SCHEDULER_NEWS_INTERVAL
+    social_interval = settings.SCHEDULER_SOCIAL_INTERVAL
+    economic_interval = settings.SCHEDULER_ECONOMIC_INTERVAL
+    economic_circuits = ["economic_calendar_api"]
+    
+    scheduler.register(RefreshJob("news:all", get_all_relevant_news.refresh, news_interval, circuits=["news_api"]))
+    scheduler.register(RefreshJob("social:all", get_all_social_data.refresh, social_interval, circuits=["twitter_api"]))
+    scheduler.register(RefreshJob("economic:all", load_all_economic_events.refresh, economic_interval, circuits=economic_circuits))
+    
+    for symbol in settings.SCHEDULER_SYMBOLS:
+        scheduler.register(RefreshJob(
+            f"news:{symbol}", get_news_for_symbol.refresh, news_interval, args=(symbol,), circuits=["news_api"]
+        ))
+        scheduler.register(RefreshJob(
+            f"social:{symbol}", get_social_data_for_symbol.refresh, social_interval, args=(symbol,), circuits=["twitter_api"]
+        ))
+        scheduler.register(RefreshJob(
+            f"economic:{symbol}", load_economic_events_for_symbol.refresh, economic_interval, args=(symbol,),
+            circuits=economic_circuits + ["crypto_economic_events_api"]
+        ))
+    
+    logger.info(f"Registered refresh jobs for market data and {len(settings.SCHEDULER_SYMBOLS)} symbols")
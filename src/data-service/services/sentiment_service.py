@@ -0,0 +1,462 @@
+"""
+Local sentiment pipeline for the External Data Service.
+
+News headlines and social posts are scored in batches with a crypto/finance
+lexicon (no network calls): the whole batch is tokenized in a single regex
+pass, tokens are mapped to lexicon ids and negation, intensifiers and per-item
+sums are computed with numpy over the flat token array. Scores feed per-symbol
+sentiment indexes that decay exponentially with the age of each item
+(SENTIMENT_HALF_LIFE) and are updated incrementally as new items arrive;
+items already seen (same id/url/title, or same content) are not counted twice.
+"""
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from core.config import settings
+from core.segment_store import content_key
+
+logger = logging.getLogger(__name__)
+
+# Index updated by every item regardless of its symbols
+MARKET = "MARKET"
+
+# Scores above / below these bounds count as positive / negative
+POSITIVE_THRESHOLD = 0.05
+NEGATIVE_THRESHOLD = -0.05
+
+# Normalization of the raw lexicon sum into [-1, 1]: s / sqrt(s^2 + ALPHA)
+NORMALIZATION_ALPHA = 15.0
+
+# A negated term keeps this fraction of its valence, with the opposite sign
+NEGATION_SCALAR = -0.74
+
+# Tokens after a negator that it still applies to (within the same clause)
+NEGATION_SCOPE = 3
+
+# Decayed item weight at which an index reaches ~63 % confidence
+CONFIDENCE_SCALE = 5.0
+
+# Item keys remembered to skip items that were already counted
+SEEN_KEYS = 50000
+
+LEXICON: Dict[str, float] = {
+    # Market direction
+    "bullish": 2.5, "bull": 1.5, "bulls": 1.5, "rally": 2.0, "rallies": 2.0, "rallied": 2.0,
+    "surge": 2.2, "surges": 2.2, "surged": 2.2, "soar": 2.4, "soars": 2.4, "soared": 2.4,
+    "jump": 1.5, "jumps": 1.5, "jumped": 1.5, "gain": 1.5, "gains": 1.5, "gained": 1.5,
+    "rise": 1.2, "rises": 1.2, "rising": 1.2, "rose": 1.2, "climb": 1.3, "climbs": 1.3,
+    "breakout": 2.0, "moon": 2.0, "mooning": 2.2, "pump": 1.2, "pumping": 1.2,
+    "high": 0.8, "highs": 1.5, "ath": 2.5, "recover": 1.5, "recovers": 1.5, "recovery": 1.5,
+    "rebound": 1.5, "rebounds": 1.5, "uptrend": 1.8, "outperform": 1.8, "outperforms": 1.8,
+    "bearish": -2.5, "bear": -1.5, "bears": -1.5, "crash": -3.0, "crashes": -3.0, "crashed": -3.0,
+    "plunge": -2.8, "plunges": -2.8, "plunged": -2.8, "tumble": -2.3, "tumbles": -2.3,
+    "drop": -1.5, "drops": -1.5, "dropped": -1.5, "fall": -1.3, "falls": -1.3, "fell": -1.3,
+    "decline": -1.4, "declines": -1.4, "slump": -2.2, "slumps": -2.2, "sink": -1.8, "sinks": -1.8,
+    "selloff": -2.3, "dump": -2.0, "dumping": -2.0, "dumped": -2.0, "correction": -1.0,
+    "downtrend": -1.8, "lows": -1.5, "underperform": -1.8, "capitulation": -2.5,
+    "liquidation": -1.8, "liquidations": -1.8, "liquidated": -2.0, "rekt": -2.5,
+    # Fundamentals and events
+    "adoption": 1.8, "approve": 1.8, "approves": 1.8, "approved": 2.0, "approval": 2.0,
+    "partnership": 1.6, "launch": 1.0, "launches": 1.0, "upgrade": 1.4, "integration": 1.2,
+    "inflow": 1.5, "inflows": 1.5, "accumulate": 1.3, "accumulation": 1.4, "buy": 0.8,
+    "buying": 0.9, "demand": 0.8, "support": 0.6, "strong": 1.3, "growth": 1.5, "profit": 1.5,
+    "profits": 1.5, "record": 1.0, "optimism": 2.0, "optimistic": 2.0, "confidence": 1.3,
+    "win": 1.8, "wins": 1.8, "success": 2.0, "successful": 2.0, "boost": 1.7, "boosts": 1.7,
+    "reject": -1.8, "rejects": -1.8, "rejected": -1.8, "rejection": -1.8, "ban": -2.5,
+    "bans": -2.5, "banned": -2.5, "crackdown": -2.5, "lawsuit": -2.0, "sues": -2.0, "sued": -2.0,
+    "hack": -3.0, "hacked": -3.0, "hackers": -2.5, "exploit": -2.8, "exploited": -2.8,
+    "scam": -3.0, "fraud": -3.0, "rug": -2.5, "bankrupt": -3.0, "bankruptcy": -3.0,
+    "insolvent": -3.0, "outflow": -1.5, "outflows": -1.5, "sell": -0.8, "selling": -0.9,
+    "weak": -1.3, "loss": -1.6, "losses": -1.6, "fear": -2.0, "fears": -2.0, "panic": -2.5,
+    "uncertainty": -1.4, "risk": -0.8, "risks": -0.8, "warning": -1.5, "warns": -1.5,
+    "delay": -1.2, "delays": -1.2, "delayed": -1.2, "investigation": -1.6, "probe": -1.3,
+    "fined": -1.8, "halt": -1.8, "halts": -1.8, "outage": -2.0,
+    "volatile": -0.6, "volatility": -0.4, "concern": -1.3, "concerns": -1.3, "fud": -2.0,
+    # Spanish
+    "alcista": 2.5, "sube": 1.3, "suben": 1.3, "subida": 1.3, "dispara": 2.2, "disparan": 2.2,
+    "repunte": 1.6, "repunta": 1.6, "máximo": 1.2, "máximos": 1.5, "ganancia": 1.5,
+    "ganancias": 1.5, "aprobación": 2.0, "aprueba": 1.8, "aprobado": 2.0, "adopción": 1.8,
+    "optimismo": 2.0, "recuperación": 1.5, "fuerte": 1.0, "compra": 0.8, "entradas": 1.2,
+    "bajista": -2.5, "baja": -1.3, "bajan": -1.3, "caída": -1.8, "cae": -1.6, "caen": -1.6,
+    "desplome": -2.8, "desploma": -2.8, "hundimiento": -2.6, "pérdida": -1.6, "pérdidas": -1.6,
+    "mínimos": -1.5, "rechaza": -1.8, "rechazo": -1.8, "prohíbe": -2.5, "prohibición": -2.5,
+    "demanda": -0.3, "hackeo": -3.0, "estafa": -3.0, "fraude": -3.0, "quiebra": -3.0,
+    "miedo": -2.0, "pánico": -2.5, "incertidumbre": -1.4, "riesgo": -0.8, "venta": -0.8,
+    "salidas": -1.2, "débil": -1.3, "liquidaciones": -1.8,
+    # Emojis
+    "🚀": 2.0, "📈": 1.5, "🐂": 1.2, "💎": 1.0, "🔥": 0.8, "✅": 0.8,
+    "📉": -1.5, "🐻": -1.2, "💀": -1.5, "🩸": -1.8, "⚠️": -0.8, "❌": -0.8,
+}
+
+NEGATORS = {
+    "not", "no", "never", "neither", "nor", "without", "cannot", "isn't", "aren't", "wasn't",
+    "weren't", "don't", "doesn't", "didn't", "won't", "can't", "couldn't", "shouldn't",
+    "nunca", "sin", "ni", "tampoco",
+}
+
+BOOSTERS: Dict[str, float] = {
+    "very": 1.3, "extremely": 1.5, "massive": 1.4, "huge": 1.4, "major": 1.2, "sharp": 1.3,
+    "sharply": 1.3, "strongly": 1.3, "significant": 1.2, "biggest": 1.4, "record": 1.2,
+    "muy": 1.3, "enorme": 1.4, "fuerte": 1.3, "fuertemente": 1.3, "histórico": 1.3,
+    "slightly": 0.6, "somewhat": 0.7, "marginally": 0.6, "modest": 0.7, "ligeramente": 0.6,
+    "leve": 0.7,
+}
+
+# Clause punctuation: negation and boosters do not reach across it
+BOUNDARIES = ".,;!?"
+
+# Item separator, clause punctuation (not a decimal point or thousands
+# separator), a letter-initial word (apostrophes allowed) or a pictograph
+TOKEN_PATTERN = re.compile(r"\x00|(?<!\d)[.,](?!\d)|[;!?]|[^\W\d_][\w']*|[\U0001F300-\U0001FAFF☀-➿]️?")
+
+
+class LexiconScorer:
+    """Vectorized lexicon scorer."""
+
+    def __init__(
+        self,
+        lexicon: Optional[Dict[str, float]] = None,
+        negators: Optional[Iterable[str]] = None,
+        boosters: Optional[Dict[str, float]] = None
+    ):
+        """
+        Build the vocabulary and the per-token lookup arrays.
+
+        Args:
+            lexicon: Term valences (defaults to LEXICON)
+            negators: Terms that flip the valence of the following terms
+            boosters: Multipliers applied to the valence of the next term
+        """
+        lexicon = LEXICON if lexicon is None else lexicon
+        negators = NEGATORS if negators is None else set(negators)
+        boosters = BOOSTERS if boosters is None else boosters
+
+        # Id 0 is any unknown token, id 1 the item separator, id 2 a clause boundary
+        self.vocabulary: Dict[str, int] = {"\x00": 1, **{mark: 2 for mark in BOUNDARIES}}
+        next_id = 3
+        for term in list(lexicon) + list(negators) + list(boosters):
+            if term not in self.vocabulary:
+                self.vocabulary[term] = next_id
+                next_id += 1
+
+        size = next_id
+        self._valence = np.zeros(size)
+        self._negator = np.zeros(size, dtype=bool)
+        self._booster = np.ones(size)
+        for term, value in lexicon.items():
+            self._valence[self.vocabulary[term]] = value
+        for term in negators:
+            self._negator[self.vocabulary[term]] = True
+        for term, value in boosters.items():
+            self._booster[self.vocabulary[term]] = value
+
+    def score_batch(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Score a batch of texts.
+
+        Args:
+            texts: Headlines, posts or any short texts
+
+        Returns:
+            Array of scores in [-1, 1], one per text
+        """
+        count = len(texts)
+        if not count:
+            return np.zeros(0)
+
+        corpus = "".join("\x00" + (text or "") for text in texts).lower()
+        tokens = TOKEN_PATTERN.findall(corpus)
+        lookup = self.vocabulary.get
+        ids = np.fromiter((lookup(token, 0) for token in tokens), dtype=np.int32, count=len(tokens))
+
+        separator = ids == 1
+        item = np.cumsum(separator) - 1
+        # Clauses split items at punctuation ("not bullish, crash fears")
+        clause = np.cumsum(separator | (ids == 2))
+        valence = self._valence[ids]
+
+        # A term is negated when a negator of the same clause precedes it within NEGATION_SCOPE tokens
+        negator = self._negator[ids]
+        negated = np.zeros(len(ids), dtype=bool)
+        for shift in range(1, NEGATION_SCOPE + 1):
+            negated[shift:] |= negator[:-shift] & (clause[:-shift] == clause[shift:])
+        valence = np.where(negated, valence * NEGATION_SCALAR, valence)
+
+        # Intensifier/dampener on the previous token of the same clause
+        booster = np.ones(len(ids))
+        booster[1:] = np.where(clause[:-1] == clause[1:], self._booster[ids[:-1]], 1.0)
+        valence *= booster
+
+        totals = np.bincount(item[~separator], weights=valence[~separator], minlength=count)
+        return totals / np.sqrt(totals * totals + NORMALIZATION_ALPHA)
+
+    def score(self, text: str) -> float:
+        """Score a single text."""
+        return float(self.score_batch([text])[0])
+
+
+def _timestamp(value: Any, default: float) -> float:
+    """Epoch seconds of an item date (ISO string, datetime or epoch)."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, datetime):
+        return value.timestamp() if value.tzinfo else value.replace(tzinfo=timezone.utc).timestamp()
+    if isinstance(value, str) and value:
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+            return parsed.timestamp() if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            pass
+    return default
+
+
+def _item_key(item: Dict[str, Any]) -> str:
+    """Identity of an item: id, then url, then title/content, then a hash of the item."""
+    key = item.get("id") or item.get("url") or item.get("title") or item.get("content")
+    return str(key) if key else content_key(item)
+
+
+def _item_symbols(item: Dict[str, Any]) -> List[str]:
+    """Symbols an item is tagged with."""
+    symbols = item.get("symbols") or item.get("currencies") or []
+    if isinstance(symbols, str):
+        symbols = [symbols]
+    return [str(symbol).upper() for symbol in symbols if symbol]
+
+
+def _item_text(item: Dict[str, Any]) -> str:
+    """Text scored for an item."""
+    return " ".join(str(item[field]) for field in ("title", "summary", "description", "content") if item.get(field))
+
+
+class SentimentIndex:
+    """Per-symbol exponentially time-decayed sentiment aggregates."""
+
+    def __init__(self, half_life: float):
+        """
+        Initialize an empty index.
+
+        Args:
+            half_life: Seconds after which an item counts half as much
+        """
+        self.half_life = half_life
+        self._decay = math.log(2) / half_life
+        self._lock = threading.Lock()
+        # symbol -> [reference time, weighted score, weight, positive, negative, neutral, items]
+        self._state: Dict[str, List[float]] = {}
+
+    def update(self, symbol: str, scores: np.ndarray, timestamps: np.ndarray, weights: np.ndarray) -> None:
+        """
+        Fold a batch of scored items into the index of a symbol.
+
+        The sums are kept relative to the newest item time, so items may
+        arrive in any order.
+
+        Args:
+            symbol: Index to update
+            scores: Item scores
+            timestamps: Item times (epoch seconds)
+            weights: Item weights (e.g. engagement)
+        """
+        if not len(scores):
+            return
+        with self._lock:
+            state = self._state.get(symbol)
+            newest = float(timestamps.max())
+            if state is None:
+                state = [newest, 0.0, 0.0, 0.0, 0.0, 0.0, 0]
+                self._state[symbol] = state
+            reference = max(state[0], newest)
+            carried = math.exp(-self._decay * (reference - state[0]))
+            decayed = weights * np.exp(-self._decay * (reference - timestamps))
+
+            state[0] = reference
+            state[1] = state[1] * carried + float(decayed @ scores)
+            state[2] = state[2] * carried + float(decayed.sum())
+            state[3] = state[3] * carried + float(decayed[scores > POSITIVE_THRESHOLD].sum())
+            state[4] = state[4] * carried + float(decayed[scores < NEGATIVE_THRESHOLD].sum())
+            state[5] = state[5] * carried + float(
+                decayed[(scores >= NEGATIVE_THRESHOLD) & (scores <= POSITIVE_THRESHOLD)].sum()
+            )
+            state[6] += len(scores)
+
+    def get(self, symbol: str, now: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Current value of an index.
+
+        Args:
+            symbol: Index name
+            now: Evaluation time (defaults to the current time)
+
+        Returns:
+            Index snapshot, or None if no item was counted for the symbol
+        """
+        with self._lock:
+            state = self._state.get(symbol)
+            if state is None or state[2] <= 0:
+                return None
+            reference, weighted, weight, positive, negative, neutral, items = state
+
+        age = max(0.0, (now or time.time()) - reference)
+        effective_weight = weight * math.exp(-self._decay * age)
+        return {
+            "symbol": symbol,
+            "score": round(weighted / weight, 4),
+            "confidence": round(1 - math.exp(-effective_weight / CONFIDENCE_SCALE), 4),
+            "effective_weight": round(effective_weight, 3),
+            "positive": round(positive / weight, 4),
+            "negative": round(negative / weight, 4),
+            "neutral": round(neutral / weight, 4),
+            "items": int(items),
+            "last_item_age": round(age, 1),
+            "half_life": self.half_life
+        }
+
+    def symbols(self) -> List[str]:
+        """Symbols with an index."""
+        with self._lock:
+            return list(self._state)
+
+
+class SentimentPipeline:
+    """Batch scoring of news and social items into per-symbol indexes."""
+
+    def __init__(self, scorer: Optional[LexiconScorer] = None, half_life: Optional[float] = None):
+        """
+        Initialize the pipeline.
+
+        Args:
+            scorer: Text scorer (defaults to the lexicon scorer)
+            half_life: Index half-life in seconds (defaults to SENTIMENT_HALF_LIFE)
+        """
+        self.scorer = scorer or LexiconScorer()
+        self.index = SentimentIndex(half_life or settings.SENTIMENT_HALF_LIFE)
+        self._seen: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.items_scored = 0
+        self.duplicates = 0
+        self.batches = 0
+        self.scoring_seconds = 0.0
+
+    def score_texts(self, texts: Sequence[str]) -> np.ndarray:
+        """
+        Score texts without updating any index.
+
+        Args:
+            texts: Texts to score
+
+        Returns:
+            Array of scores in [-1, 1]
+        """
+        return self.scorer.score_batch(texts)
+
+    def ingest(
+        self,
+        items: Iterable[Dict[str, Any]],
+        symbol: Optional[str] = None,
+        weight: Optional[Callable[[Dict[str, Any]], float]] = None
+    ) -> Dict[str, float]:
+        """
+        Score new items and fold them into the indexes of their symbols.
+
+        Items are also counted in the MARKET index. Items seen before are
+        skipped.
+
+        Args:
+            items: News or social items
+            symbol: Symbol for items that carry no symbols of their own
+            weight: Function returning the weight of an item (defaults to 1)
+
+        Returns:
+            Score of each newly ingested item, by item key
+        """
+        with self._lock:
+            fresh = []
+            for item in items:
+                if not isinstance(item, dict):
+                    continue
+                key = _item_key(item)
+                if key in self._seen:
+                    self.duplicates += 1
+                    continue
+                self._seen[key] = None
+                if len(self._seen) > SEEN_KEYS:
+                    self._seen.popitem(last=False)
+                fresh.append((key, item))
+        if not fresh:
+            return {}
+
+        started = time.perf_counter()
+        scores = self.scorer.score_batch([_item_text(item) for _, item in fresh])
+        self.scoring_seconds += time.perf_counter() - started
+        self.items_scored += len(fresh)
+        self.batches += 1
+
+        now = time.time()
+        timestamps = np.array([
+            min(now, _timestamp(item.get("published_at") or item.get("date"), now)) for _, item in fresh
+        ])
+        weights = np.array([weight(item) if weight else 1.0 for _, item in fresh])
+
+        by_symbol: Dict[str, List[int]] = {}
+        for position, (_, item) in enumerate(fresh):
+            for item_symbol in _item_symbols(item) or ([symbol.upper()] if symbol else []):
+                by_symbol.setdefault(item_symbol, []).append(position)
+        for item_symbol, positions in by_symbol.items():
+            self.index.update(item_symbol, scores[positions], timestamps[positions], weights[positions])
+        self.index.update(MARKET, scores, timestamps, weights)
+
+        return {key: float(score) for (key, _), score in zip(fresh, scores)}
+
+    def get_index(self, symbol: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Current sentiment index of a symbol.
+
+        Args:
+            symbol: Cryptocurrency symbol (None for the whole market)
+
+        Returns:
+            Index snapshot, or None if no item was counted
+        """
+        return self.index.get(symbol.upper() if symbol else MARKET)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get pipeline statistics.
+
+        Returns:
+            Dictionary with scoring counters and indexed symbols
+        """
+        return {
+            "items_scored": self.items_scored,
+            "duplicates": self.duplicates,
+            "batches": self.batches,
+            "scoring_ms": round(self.scoring_seconds * 1000, 1),
+            "symbols": self.index.symbols(),
+            "half_life": self.index.half_life
+        }
+
+
+def engagement_weight(item: Dict[str, Any]) -> float:
+    """Weight of a social post: 1 plus the log of its engagement."""
+    engagement = item.get("engagement")
+    if engagement is None:
+        engagement = sum(item.get(field) or 0 for field in ("likes", "shares", "comments"))
+    try:
+        return 1.0 + math.log1p(max(0.0, float(engagement)))
+    except (TypeError, ValueError):
+        return 1.0
+
+
+# Shared pipeline instance
+sentiment_pipeline = SentimentPipeline()
@@ -1,7 +1,6 @@
 """
 Social media service for the External Data Service.
 """
-import json
 import logging
 import os
 from datetime import datetime
@@ -13,14 +12,25 @@ from fastapi import HTTPException
 
 from core.config import settings
 from core.cache import cached
-from core.circuit_breaker import with_circuit_breaker
+from core.segment_store import SegmentStore
+from core.circuits import with_circuit_breaker
+from services.sentiment_service import sentiment_pipeline, engagement_weight, POSITIVE_THRESHOLD, NEGATIVE_THRESHOLD
 from models.schemas import SocialMediaItem, SocialMediaResponse
 
 logger = logging.getLogger(__name__)
 
-# Cache file path
+# Legacy single-file cache, imported once into the segment store
 SOCIAL_MEDIA_CACHE_FILE = "services/social_media_cache.json"
 
+# Fallback cache (append-only JSON-lines segments)
+social_media_fallback = SegmentStore(
+    os.path.join(settings.FALLBACK_CACHE_DIR, "social_media"),
+    max_segment_bytes=settings.FALLBACK_SEGMENT_BYTES,
+    max_segments=settings.FALLBACK_MAX_SEGMENTS,
+    retention=settings.FALLBACK_RETENTION,
+    legacy_file=SOCIAL_MEDIA_CACHE_FILE
+)
+
 
 async def _fetch_social_data_from_api(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
     """
@@ -49,35 +59,34 @@ async def _fetch_social_data_from_api(symbol: Optional[str] = None) -> List[Dict
     
     # Use circuit breaker
     try:
-        return await with_circuit_breaker("twitter_api", _fetch)
+        result = await with_circuit_breaker("twitter_api", _fetch)
     except Exception as e:
         logger.error(f"Error fetching social media data from API: {e}")
         # Try to get from cache file as fallback
-        return await _get_from_cache_file(symbol)
+        result = await _get_from_cache_file(symbol)
+    
+    # Fold new posts into the sentiment indexes, weighted by engagement
+    try:
+        if isinstance(result, list):
+            sentiment_pipeline.ingest(result, symbol=symbol, weight=engagement_weight)
+    except Exception as e:
+        logger.error(f"Error scoring social media sentiment: {e}")
+    
+    return result
 
 
 async def _get_from_cache_file(symbol: Optional[str] = None) -> List[Dict[str, Any]]:
     """
-    Get social media data from cache file.
+    Get social media from the fallback cache.
     
     Args:
         symbol: Cryptocurrency symbol
         
     Returns:
-        List of social media items
+        List of social media items, newest first
     """
     try:
-        if not os.path.exists(SOCIAL_MEDIA_CACHE_FILE):
-            return []
-        
-        with open(SOCIAL_MEDIA_CACHE_FILE, "r") as f:
-            cache = json.load(f)
-        
-        if symbol:
-            # Filter by symbol
-            return [item for item in cache if symbol in item.get("symbols", [])]
-        
-        return cache
+        return await social_media_fallback.read(symbol=symbol, limit=settings.FALLBACK_READ_LIMIT)
     except Exception as e:
         logger.error(f"Error reading from cache file: {e}")
         return []
@@ -85,19 +94,15 @@ async def _get_from_cache_file(symbol: Optional[str] = None) -> List[Dict[str, A
 
 async def _save_to_cache_file(data: List[Dict[str, Any]]) -> None:
     """
-    Save social media data to cache file.
+    Append social media to the fallback cache.
     
     Args:
         data: List of social media items
     """
     try:
-        # Create directory if it doesn't exist
-        os.makedirs(os.path.dirname(SOCIAL_MEDIA_CACHE_FILE), exist_ok=True)
-        
-        with open(SOCIAL_MEDIA_CACHE_FILE, "w") as f:
-            json.dump(data, f)
-        
-        logger.debug(f"Saved social media data to cache file: {SOCIAL_MEDIA_CACHE_FILE}")
+        if isinstance(data, list):
+            await social_media_fallback.append(data)
+            logger.debug(f"Saved social media to cache: {social_media_fallback.directory}")
     except Exception as e:
         logger.error(f"Error saving to cache file: {e}")
 
@@ -205,6 +210,10 @@ async def get_sentiment_analysis(symbol: str) -> Dict[str, Any]:
     """
     Get sentiment analysis for a specific cryptocurrency.
     
+    Current posts are scored locally in one batch; `sentiment_index` is the
+    time-decayed index built from every news item and post seen for the
+    symbol (None until one has been seen).
+    
     Args:
         symbol: Cryptocurrency symbol
         
@@ -212,20 +221,20 @@ async def get_sentiment_analysis(symbol: str) -> Dict[str, Any]:
         Sentiment analysis
     """
     try:
-        # Fetch social media data for the symbol
+        # Fetch social media data for the symbol (also updates the indexes)
         social_data = await get_social_data_for_symbol(symbol)
         
         # Extract posts
         posts = social_data.get("posts", [])
         
-        # Calculate average sentiment
-        sentiments = [post.sentiment for post in posts if post.sentiment is not None]
-        avg_sentiment = sum(sentiments) / len(sentiments) if sentiments else 0
+        # Score the posts in a single batch
+        sentiments = sentiment_pipeline.score_texts([post.content for post in posts])
+        avg_sentiment = float(sentiments.mean()) if len(sentiments) else 0
         
         # Count positive, negative, and neutral posts
-        positive_count = sum(1 for s in sentiments if s > 0.2)
-        negative_count = sum(1 for s in sentiments if s < -0.2)
-        neutral_count = sum(1 for s in sentiments if -0.2 <= s <= 0.2)
+        positive_count = int((sentiments > POSITIVE_THRESHOLD).sum())
+        negative_count = int((sentiments < NEGATIVE_THRESHOLD).sum())
+        neutral_count = len(sentiments) - positive_count - negative_count
         
         # Create response
         response = {
@@ -235,6 +244,7 @@ async def get_sentiment_analysis(symbol: str) -> Dict[str, Any]:
             "negative_count": negative_count,
             "neutral_count": neutral_count,
             "total_posts": len(posts),
+            "sentiment_index": sentiment_pipeline.get_index(symbol),
             "timestamp": datetime.now(),
         }
         
@@ -0,0 +1,55 @@
+"""
+Tests for the cached economic calendar loaders.
+"""
+import asyncio
+
+import pytest
+
+from core.cache import cache
+from services import economic_calendar_service as calendar
+
+GOOD = {"high_impact_events": [{"title": "FOMC", "date": "2026-10-20", "time": "18:00", "impact": "high"}],
+        "upcoming_events": []}
+
+
+@pytest.fixture
+def scrapes(monkeypatch):
+    calls = []
+
+    async def fake_fetch():
+        calls.append(1)
+        return GOOD
+
+    async def fake_crypto_events(symbol):
+        return [{"title": f"{symbol} upgrade"}]
+
+    monkeypatch.setattr(calendar, "fetch_economic_events", fake_fetch)
+    monkeypatch.setattr(calendar, "fetch_crypto_economic_events", fake_crypto_events)
+    asyncio.run(cache.clear())
+    yield calls
+    asyncio.run(cache.clear())
+
+
+def test_symbols_share_one_calendar_scrape(scrapes):
+    async def scenario():
+        return [await calendar.load_economic_events_for_symbol(symbol) for symbol in ("BTC", "ETH", "SOL")]
+
+    results = asyncio.run(scenario())
+
+    assert len(scrapes) == 1
+    assert [r["symbol_events"][0]["title"] for r in results] == ["BTC upgrade", "ETH upgrade", "SOL upgrade"]
+    assert all(r["high_impact_events"] == GOOD["high_impact_events"] for r in results)
+
+
+def test_failed_scrape_keeps_the_last_snapshot(scrapes, monkeypatch):
+    async def failing_fetch():
+        raise ValueError("Could not find economic events table")
+
+    async def scenario():
+        await calendar.load_all_economic_events()
+        monkeypatch.setattr(calendar, "fetch_economic_events", failing_fetch)
+        with pytest.raises(ValueError):
+            await calendar.load_all_economic_events.refresh(ttl=60)
+        return await calendar.get_all_economic_events()
+
+    assert asyncio.run(scenario()) == GOOD
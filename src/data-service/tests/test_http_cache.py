@@ -0,0 +1,31 @@
+"""
+Tests for the ETag of conditional responses.
+"""
+from core.http_cache import compute_etag
+
+
+def integrated(generated_at, news_title="BTC rallies", post_time="2026-10-19T09:00:00"):
+    return {
+        "symbol": "BTC",
+        "news": {"news": [{"title": news_title}], "count": 1, "timestamp": generated_at},
+        "social": {"posts": [{"content": "to the moon", "timestamp": post_time}], "count": 1, "timestamp": generated_at},
+        "events": {"high_impact_events": []},
+        "sentiment_index": {"score": 0.4, "items": 2, "last_item_age": 12.5},
+        "sources": {"news": 0.12},
+        "timestamp": generated_at,
+    }
+
+
+def test_section_timestamps_do_not_change_the_etag():
+    first = compute_etag(integrated("2026-10-19T10:00:00"))
+    second = compute_etag(integrated("2026-10-19T10:05:00"))
+
+    assert first == second
+
+
+def test_content_changes_change_the_etag():
+    base = compute_etag(integrated("2026-10-19T10:00:00"))
+
+    assert compute_etag(integrated("2026-10-19T10:00:00", news_title="BTC dips")) != base
+    # A list item's timestamp dates the item itself
+    assert compute_etag(integrated("2026-10-19T10:00:00", post_time="2026-10-19T09:30:00")) != base
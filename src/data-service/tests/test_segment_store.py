@@ -0,0 +1,50 @@
+"""
+Tests for the append-only segment store.
+"""
+import json
+import os
+import time
+
+from core.segment_store import SegmentStore, default_key
+
+
+def test_items_without_identity_are_kept_apart(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    store.append_sync([{"text": "btc up"}, {"text": "eth down"}, {"text": "btc up"}])
+
+    items = store.read_sync()
+
+    assert sorted(item["text"] for item in items) == ["btc up", "eth down"]
+    assert default_key({"text": "btc up"}) != default_key({"text": "eth down"})
+
+
+def test_identity_fields_take_precedence(tmp_path):
+    store = SegmentStore(str(tmp_path))
+    store.append_sync([{"url": "https://a", "title": "old"}])
+    store.append_sync([{"url": "https://a", "title": "new"}])
+
+    assert store.read_sync() == [{"url": "https://a", "title": "new"}]
+
+
+def test_records_stored_with_an_empty_key_are_not_collapsed(tmp_path):
+    # Segments written before key-less items were hashed hold "k": ""
+    with open(os.path.join(str(tmp_path), "seg-000001.jsonl"), "w") as f:
+        for text in ("a", "b"):
+            f.write(json.dumps({"t": time.time(), "k": "", "s": [], "d": {"text": text}}) + "\n")
+    store = SegmentStore(str(tmp_path))
+
+    assert len(store.read_sync()) == 2
+    store.compact_sync()
+    assert len(store.read_sync()) == 2
+
+
+def test_compaction_keeps_latest_record_per_key(tmp_path):
+    store = SegmentStore(str(tmp_path), max_segment_bytes=1, max_segments=2)
+    for version in range(5):
+        store.append_sync([{"id": "n1", "version": version}, {"id": f"other-{version}"}])
+
+    items = store.read_sync()
+
+    assert store.compactions > 0
+    assert [item for item in items if item["id"] == "n1"] == [{"id": "n1", "version": 4}]
+    assert len(items) == 6
@@ -0,0 +1,51 @@
+"""
+Tests for the lexicon scorer and the sentiment pipeline.
+"""
+import pytest
+
+from services.sentiment_service import LexiconScorer, SentimentPipeline
+
+scorer = LexiconScorer()
+
+
+@pytest.mark.parametrize("text", [
+    "not bullish, crash fears",
+    "no gains. crash",
+    "never a rally; panic selling",
+    "no recovery! bankruptcy",
+])
+def test_negation_stops_at_clause_punctuation(text):
+    assert scorer.score(text) < 0
+
+
+def test_negation_applies_within_a_clause():
+    assert scorer.score("not bullish") < 0
+    assert scorer.score("BTC does not crash") > 0
+
+
+def test_numbers_do_not_split_clauses():
+    assert scorer.score("BTC at 65,000 not bullish") == pytest.approx(scorer.score("not bullish"))
+    assert scorer.score("up 1.5 not bullish") == pytest.approx(scorer.score("not bullish"))
+
+
+def test_booster_does_not_cross_punctuation():
+    assert scorer.score("very, bullish") == pytest.approx(scorer.score("bullish"))
+    assert scorer.score("very bullish") > scorer.score("bullish")
+
+
+def test_batch_matches_single_scores():
+    texts = ["not bullish, crash fears", "", "ETF approval 🚀", "no gains. crash"]
+    batch = scorer.score_batch(texts)
+    assert list(batch) == pytest.approx([scorer.score(text) for text in texts])
+
+
+def test_items_without_identity_fields_are_not_duplicates():
+    pipeline = SentimentPipeline()
+    items = [
+        {"summary": "ETF approval, BTC rallies", "symbols": ["BTC"]},
+        {"summary": "exchange hacked, panic selling", "symbols": ["BTC"]},
+    ]
+
+    assert len(pipeline.ingest(items)) == 2
+    assert pipeline.ingest([dict(items[0])]) == {}
+    assert pipeline.duplicates == 1
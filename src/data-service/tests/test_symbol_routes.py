@@ -0,0 +1,34 @@
+"""
+Symbol routes normalize the symbol before calling the cached services, so
+a lower-case request reuses the entry warmed for the upper-case symbol.
+"""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from api.routes import economic, integration, social
+
+ROUTES = [
+    (social, "get_social_data_for_symbol", "/social/btc"),
+    (social, "get_sentiment_analysis", "/social/sentiment/btc"),
+    (economic, "get_economic_events_for_symbol", "/economic/btc"),
+    (integration, "get_integrated_data", "/integration/btc"),
+]
+
+
+@pytest.mark.parametrize("module,service,path", ROUTES)
+def test_symbol_is_upper_cased(monkeypatch, module, service, path):
+    calls = []
+
+    async def fake_service(symbol):
+        calls.append(symbol)
+        return {"symbol": symbol}
+
+    monkeypatch.setattr(module, service, fake_service)
+    app = FastAPI()
+    app.include_router(module.router, prefix=f"/{path.split('/')[1]}")
+
+    response = TestClient(app).get(path)
+
+    assert response.status_code == 200
+    assert calls == ["BTC"]
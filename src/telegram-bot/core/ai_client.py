@@ -0,0 +1,351 @@
+"""
+Cliente del módulo de IA para el bot de Telegram.
+
+- Un único httpx.AsyncClient con pool de conexiones persistentes (keep-alive).
+- Monitor de salud en segundo plano que consulta /ping y mantiene un estado
+  cacheado arriba/abajo al estilo circuit breaker; las llamadas no hacen
+  health check propio y fallan rápido mientras el módulo está caído.
+- Reintentos con backoff exponencial y jitter para timeouts, errores de
+  conexión y respuestas 5xx/429. Un 429 es contrapresión del propio módulo
+  (rate limiter o gobernador del LLM): se respeta Retry-After y no cuenta
+  como caída.
+- Métricas de latencia por endpoint.
+- Consumo de endpoints SSE (respuestas en streaming).
+"""
+
+import os
+import json
+import time
+import random
+import asyncio
+import logging
+from collections import deque
+from email.utils import parsedate_to_datetime
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# Estados del circuito
+STATE_UP = "up"
+STATE_DOWN = "down"
+STATE_PROBING = "probing"
+
+# Respuestas que indican que el módulo no está disponible
+FAILURE_STATUS = {502, 503, 504}
+RETRYABLE_STATUS = FAILURE_STATUS | {429}
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Segundos indicados en la cabecera Retry-After (segundos o fecha HTTP)."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class _EndpointMetrics:
+    """Latencias recientes y contadores de un endpoint."""
+
+    def __init__(self, window: int = 200):
+        self.latencies: Deque[float] = deque(maxlen=window)
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies)
+        if latencies:
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            avg = sum(latencies) / len(latencies)
+        else:
+            p50 = p95 = avg = 0.0
+        return {
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "avg_ms": round(avg * 1000, 1),
+            "p50_ms": round(p50 * 1000, 1),
+            "p95_ms": round(p95 * 1000, 1),
+        }
+
+
+class AIModuleClient:
+    """Cliente compartido del bot hacia el módulo de IA."""
+
+    def __init__(self, base_url: str, api_secret: str, timeout: float,
+                 health_timeout: float, max_retries: int = None,
+                 health_interval: float = None, failure_threshold: int = None,
+                 recovery_timeout: float = None):
+        self.base_url = base_url.rstrip("/")
+        self.api_secret = api_secret
+        self.timeout = timeout
+        self.health_timeout = health_timeout
+        self.max_retries = max_retries or int(os.getenv("AI_CLIENT_MAX_RETRIES", "3"))
+        self.health_interval = health_interval or float(os.getenv("AI_HEALTH_INTERVAL", "15"))
+        self.failure_threshold = failure_threshold or int(os.getenv("AI_CIRCUIT_FAILURE_THRESHOLD", "3"))
+        self.recovery_timeout = recovery_timeout or float(os.getenv("AI_CIRCUIT_RECOVERY_TIMEOUT", "30"))
+        self.backoff_base = float(os.getenv("AI_CLIENT_BACKOFF_BASE", "0.5"))
+        self.backoff_max = float(os.getenv("AI_CLIENT_BACKOFF_MAX", "8"))
+
+        self.state = STATE_UP
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_started_at: Optional[float] = None
+        self.last_health_check: Optional[float] = None
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._monitor_task: Optional[asyncio.Task] = None
+        self._metrics: Dict[str, _EndpointMetrics] = {}
+
+    # ----------------------------------------
+    # Ciclo de vida
+    # ----------------------------------------
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_secret}",
+                    "Content-Type": "application/json",
+                },
+                limits=httpx.Limits(
+                    max_connections=int(os.getenv("AI_CLIENT_MAX_CONNECTIONS", "20")),
+                    max_keepalive_connections=int(os.getenv("AI_CLIENT_MAX_KEEPALIVE", "10")),
+                    keepalive_expiry=60,
+                ),
+            )
+        return self._client
+
+    def _ensure_monitor(self) -> None:
+        if self._monitor_task is None or self._monitor_task.done():
+            self._monitor_task = asyncio.get_running_loop().create_task(self._health_monitor())
+
+    async def close(self) -> None:
+        """Detiene el monitor y cierra las conexiones."""
+        if self._monitor_task:
+            self._monitor_task.cancel()
+            try:
+                await self._monitor_task
+            except asyncio.CancelledError:
+                pass
+            self._monitor_task = None
+        if self._client:
+            await self._client.aclose()
+            self._client = None
+
+    # ----------------------------------------
+    # Circuit breaker / salud
+    # ----------------------------------------
+
+    def _record_success(self) -> None:
+        if self.state != STATE_UP:
+            logger.info("Módulo de IA disponible de nuevo")
+        self.state = STATE_UP
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.probe_started_at = None
+
+    def _record_failure(self) -> None:
+        """Fallo de disponibilidad (timeout, conexión o 502/503/504); nunca un 429."""
+        self.consecutive_failures += 1
+        if self.state == STATE_PROBING or self.consecutive_failures >= self.failure_threshold:
+            if self.state != STATE_DOWN:
+                logger.warning("Módulo de IA marcado como no disponible")
+            self.state = STATE_DOWN
+            self.opened_at = time.monotonic()
+            self.probe_started_at = None
+
+    def is_available(self) -> bool:
+        """
+        Estado cacheado; tras `recovery_timeout` deja pasar una única llamada de prueba.
+
+        Mientras la prueba está en curso el resto de llamadas fallan rápido. Si la
+        prueba no termina (p. ej. se canceló) se admite otra pasado `recovery_timeout`.
+        """
+        if self.state == STATE_UP:
+            return True
+        now = time.monotonic()
+        if self.state == STATE_PROBING:
+            if self.probe_started_at is not None and now - self.probe_started_at < self.recovery_timeout:
+                return False
+        elif self.opened_at is None or now - self.opened_at < self.recovery_timeout:
+            return False
+        self.state = STATE_PROBING
+        self.probe_started_at = now
+        return True
+
+    async def check_health(self) -> bool:
+        """Consulta /ping y actualiza el estado del circuito."""
+        self.last_health_check = time.time()
+        try:
+            response = await self._get_client().get("/ping", timeout=self.health_timeout)
+            response.raise_for_status()
+        except (httpx.HTTPError, OSError):
+            self._record_failure()
+            return False
+        self._record_success()
+        return True
+
+    async def _health_monitor(self) -> None:
+        while True:
+            await self.check_health()
+            # Más frecuente mientras está caído para detectar antes la recuperación
+            interval = self.health_interval if self.state == STATE_UP else min(self.health_interval, 5)
+            await asyncio.sleep(interval)
+
+    # ----------------------------------------
+    # Peticiones
+    # ----------------------------------------
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter: uniforme entre 0 y el backoff exponencial
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    async def post(self, endpoint: str, payload: Dict[str, Any],
+                   timeout: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        POST al módulo de IA. Devuelve el JSON de respuesta o None si falla.
+
+        Los errores 4xx (salvo 429) no se reintentan: son errores del payload.
+        """
+        self._ensure_monitor()
+        endpoint = endpoint.lstrip("/")
+        metrics = self._metrics.setdefault(endpoint, _EndpointMetrics())
+
+        if not self.is_available():
+            metrics.errors += 1
+            logger.warning(f"Módulo de IA no disponible, llamada a {endpoint} omitida")
+            return None
+
+        client = self._get_client()
+        for attempt in range(self.max_retries):
+            started = time.monotonic()
+            delay = self._backoff(attempt)
+            metrics.requests += 1
+            try:
+                response = await client.post(
+                    f"/{endpoint}", json=payload,
+                    timeout=timeout if timeout is not None else self.timeout
+                )
+                metrics.latencies.append(time.monotonic() - started)
+
+                if response.status_code in RETRYABLE_STATUS:
+                    raise httpx.HTTPStatusError(
+                        f"Respuesta {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                self._record_success()
+                return response.json()
+
+            except httpx.HTTPStatusError as e:
+                metrics.errors += 1
+                status = e.response.status_code
+                if status not in FAILURE_STATUS:
+                    # El módulo responde: 4xx y 429 no indican que esté caído
+                    self._record_success()
+                if status not in RETRYABLE_STATUS:
+                    logger.error(f"Error HTTP en {endpoint}: {e}")
+                    return None
+                if status == 429:
+                    retry_after = _retry_after(e.response)
+                    if retry_after is not None:
+                        if retry_after > self.backoff_max:
+                            logger.warning(f"Módulo de IA saturado en {endpoint} (Retry-After {retry_after:.0f}s)")
+                            return None
+                        delay = max(delay, retry_after)
+                else:
+                    self._record_failure()
+                logger.warning(f"Respuesta {status} en {endpoint} (intento {attempt + 1})")
+            except (httpx.TimeoutException, httpx.TransportError) as e:
+                metrics.errors += 1
+                metrics.latencies.append(time.monotonic() - started)
+                self._record_failure()
+                logger.warning(f"{type(e).__name__} en {endpoint} (intento {attempt + 1})")
+            except ValueError as e:
+                metrics.errors += 1
+                logger.error(f"Respuesta no JSON en {endpoint}: {e}")
+                return None
+
+            if attempt == self.max_retries - 1 or not self.is_available():
+                break
+            metrics.retries += 1
+            await asyncio.sleep(delay)
+
+        return None
+
+    async def stream(self, endpoint: str, payload: Dict[str, Any],
+                     timeout: Optional[float] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        POST a un endpoint SSE del módulo de IA; produce los eventos según llegan.
+
+        No hay reintentos: una vez enviado contenido al usuario no se puede
+        repetir. Si la conexión falla antes del primer evento se produce un
+        evento {"type": "error"} para que el llamante use la versión no streaming.
+        La latencia registrada es el tiempo hasta el primer evento.
+        """
+        self._ensure_monitor()
+        endpoint = endpoint.lstrip("/")
+        metrics = self._metrics.setdefault(endpoint, _EndpointMetrics())
+
+        if not self.is_available():
+            metrics.errors += 1
+            yield {"type": "error", "detail": "Módulo de IA no disponible"}
+            return
+
+        started = time.monotonic()
+        first_event = True
+        metrics.requests += 1
+        try:
+            async with self._get_client().stream(
+                "POST", f"/{endpoint}", json=payload,
+                headers={"Accept": "text/event-stream"},
+                # El timeout de lectura aplica entre fragmentos, no al total
+                timeout=timeout if timeout is not None else self.timeout,
+            ) as response:
+                if response.status_code != 200:
+                    metrics.errors += 1
+                    if response.status_code in FAILURE_STATUS:
+                        self._record_failure()
+                    else:
+                        self._record_success()
+                    yield {"type": "error", "status_code": response.status_code}
+                    return
+
+                async for line in response.aiter_lines():
+                    if not line.startswith("data:"):
+                        continue
+                    try:
+                        event = json.loads(line[5:].strip())
+                    except ValueError:
+                        continue
+                    if first_event:
+                        metrics.latencies.append(time.monotonic() - started)
+                        first_event = False
+                    yield event
+            self._record_success()
+        except (httpx.TimeoutException, httpx.TransportError) as e:
+            metrics.errors += 1
+            self._record_failure()
+            logger.warning(f"{type(e).__name__} en streaming de {endpoint}")
+            yield {"type": "error", "detail": type(e).__name__}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estado del circuito y métricas de latencia por endpoint."""
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "last_health_check": self.last_health_check,
+            "endpoints": {name: m.snapshot() for name, m in self._metrics.items()},
+        }
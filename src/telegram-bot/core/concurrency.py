@@ -0,0 +1,159 @@
+"""
+Control de concurrencia del bot de Telegram.
+
+- PerChatUpdateProcessor: procesa updates en paralelo entre chats distintos
+  manteniendo el orden de llegada dentro de cada chat.
+- AIWorkerPool: limita las llamadas simultáneas al módulo de IA y aplica
+  backpressure cuando la cola de espera está llena.
+"""
+
+import os
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import BaseUpdateProcessor
+
+
+class AIModuleSaturatedError(Exception):
+    """El módulo de IA tiene todas las plazas ocupadas y la cola de espera llena."""
+
+
+class PerChatUpdateProcessor(BaseUpdateProcessor):
+    """
+    Procesador de updates concurrente con orden garantizado por chat.
+
+    Cada chat tiene un asyncio.Lock (FIFO): los updates de un mismo chat se
+    ejecutan uno tras otro en orden de llegada, mientras que chats distintos
+    avanzan en paralelo. Esto mantiene coherente el estado de los
+    ConversationHandler aunque la aplicación procese updates concurrentemente.
+    """
+
+    def __init__(self, max_concurrent_updates: int = None):
+        super().__init__(
+            max_concurrent_updates or int(os.getenv("BOT_MAX_CONCURRENT_UPDATES", "256"))
+        )
+        self._chat_locks: Dict[int, asyncio.Lock] = {}
+        self._chat_waiters: Dict[int, int] = {}
+        self.in_flight = 0
+        self.processed = 0
+
+    @staticmethod
+    def _chat_key(update: object) -> Optional[int]:
+        if isinstance(update, Update):
+            if update.effective_chat:
+                return update.effective_chat.id
+            if update.effective_user:
+                return update.effective_user.id
+        return None
+
+    async def do_process_update(self, update: object, coroutine: Awaitable[Any]) -> None:
+        chat_id = self._chat_key(update)
+        self.in_flight += 1
+        try:
+            if chat_id is None:
+                await coroutine
+                return
+
+            lock = self._chat_locks.setdefault(chat_id, asyncio.Lock())
+            self._chat_waiters[chat_id] = self._chat_waiters.get(chat_id, 0) + 1
+            try:
+                async with lock:
+                    await coroutine
+            finally:
+                self._chat_waiters[chat_id] -= 1
+                if self._chat_waiters[chat_id] == 0:
+                    # Nadie más espera en este chat: liberar el lock
+                    del self._chat_waiters[chat_id]
+                    del self._chat_locks[chat_id]
+        finally:
+            self.in_flight -= 1
+            self.processed += 1
+
+    async def initialize(self) -> None:
+        """No requiere recursos."""
+
+    async def shutdown(self) -> None:
+        """No requiere recursos."""
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent_updates": self.max_concurrent_updates,
+            "in_flight": self.in_flight,
+            "active_chats": len(self._chat_locks),
+            "processed": self.processed,
+        }
+
+
+class AIWorkerPool:
+    """
+    Pool acotado para las llamadas al módulo de IA (handlers pesados en LLM).
+
+    Como máximo `max_workers` llamadas en curso y `max_waiting` esperando;
+    si la espera está llena o supera `acquire_timeout`, se lanza
+    AIModuleSaturatedError en lugar de acumular trabajo indefinidamente.
+    """
+
+    def __init__(self, max_workers: int = None, max_waiting: int = None,
+                 acquire_timeout: float = None):
+        self.max_workers = max_workers or int(os.getenv("AI_MAX_CONCURRENT_CALLS", "8"))
+        self.max_waiting = max_waiting if max_waiting is not None else int(os.getenv("AI_MAX_WAITING_CALLS", "32"))
+        self.acquire_timeout = acquire_timeout or float(os.getenv("AI_QUEUE_TIMEOUT", "30"))
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.completed = 0
+        self.total_wait_seconds = 0.0
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        # Se crea de forma perezosa para vincularse al event loop en ejecución
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+        return self._semaphore
+
+    @property
+    def saturated(self) -> bool:
+        """True si no quedan plazas ni hueco en la cola de espera."""
+        return self.active >= self.max_workers and self.waiting >= self.max_waiting
+
+    @asynccontextmanager
+    async def slot(self):
+        """Reserva una plaza en el pool o lanza AIModuleSaturatedError."""
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_waiting:
+            self.rejected += 1
+            raise AIModuleSaturatedError("Módulo de IA saturado")
+
+        self.waiting += 1
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(semaphore.acquire(), timeout=self.acquire_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise AIModuleSaturatedError("Tiempo de espera agotado para el módulo de IA")
+        finally:
+            self.waiting -= 1
+        self.total_wait_seconds += time.monotonic() - started
+
+        self.active += 1
+        try:
+            yield
+        finally:
+            self.active -= 1
+            self.completed += 1
+            semaphore.release()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "max_waiting": self.max_waiting,
+            "active": self.active,
+            "waiting": self.waiting,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "avg_wait_seconds": round(self.total_wait_seconds / self.completed, 3) if self.completed else 0.0,
+            "saturated": self.saturated,
+        }
@@ -0,0 +1,169 @@
+"""
+Caché en memoria del historial de conversación del bot.
+
+Mantiene por usuario un ring buffer (deque acotado) con los mensajes más
+recientes y el resumen de contexto, con expulsión LRU entre usuarios.
+Es write-through: los gestores de memoria escriben en SQLite y en la caché
+a la vez, y ante un fallo de caché el buffer se reconstruye desde SQLite.
+"""
+
+import os
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+
+class _UserEntry:
+    """Estado cacheado de un usuario."""
+
+    __slots__ = ("messages", "loaded", "summary")
+
+    def __init__(self, max_messages: int):
+        self.messages: Deque[Dict[str, Any]] = deque(maxlen=max_messages)
+        # False si la entrada solo guarda el resumen y el historial aún no se leyó
+        self.loaded = False
+        self.summary: Optional[str] = None
+
+
+class ConversationCache:
+    """
+    Ring buffer por usuario delante de la tabla `messages`.
+
+    Una entrada, una vez cargada, contiene siempre los últimos `max_messages`
+    mensajes del usuario (o todos si tiene menos), por lo que cualquier consulta
+    con `limit <= max_messages` se sirve sin tocar la base de datos.
+    """
+
+    def __init__(self, max_users: int = None, max_messages: int = None):
+        self.max_users = max_users or int(os.getenv("CONVERSATION_CACHE_MAX_USERS", "1000"))
+        self.max_messages = max_messages or int(os.getenv("CONVERSATION_CACHE_SIZE", "50"))
+        self._entries: "OrderedDict[int, _UserEntry]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def now_timestamp() -> str:
+        """Timestamp con el mismo formato que CURRENT_TIMESTAMP de SQLite."""
+        return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+    def _touch(self, user_id: int) -> Optional[_UserEntry]:
+        entry = self._entries.get(user_id)
+        if entry is not None:
+            self._entries.move_to_end(user_id)
+        return entry
+
+    def _store(self, user_id: int, entry: _UserEntry) -> None:
+        self._entries[user_id] = entry
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_users:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def get_history(
+        self,
+        user_id: int,
+        limit: int,
+        loader: Callable[[int, int], List[Dict[str, Any]]],
+    ) -> List[Dict[str, Any]]:
+        """
+        Devuelve los últimos `limit` mensajes en orden cronológico.
+
+        Args:
+            user_id: ID del usuario de Telegram
+            limit: Número máximo de mensajes
+            loader: Función (user_id, limit) que lee el historial de SQLite
+                    en orden cronológico; se usa solo en caso de fallo
+
+        Raises:
+            Las excepciones del loader se propagan y la entrada queda sin
+            cargar, de modo que un error de lectura no se cachea como
+            historial vacío
+        """
+        if limit > self.max_messages:
+            # Ventana mayor que el buffer: no se puede servir desde caché
+            return loader(user_id, limit)
+
+        with self._lock:
+            entry = self._touch(user_id)
+            if entry is not None and entry.loaded:
+                self.hits += 1
+                return [dict(m) for m in list(entry.messages)[-limit:]] if limit > 0 else []
+            self.misses += 1
+
+        messages = loader(user_id, self.max_messages)
+
+        with self._lock:
+            # Otro hilo pudo haber cargado la entrada mientras leíamos de SQLite
+            entry = self._touch(user_id)
+            if entry is None:
+                entry = _UserEntry(self.max_messages)
+                self._store(user_id, entry)
+            if not entry.loaded:
+                entry.messages.extend(dict(m) for m in messages)
+                entry.loaded = True
+            return [dict(m) for m in list(entry.messages)[-limit:]] if limit > 0 else []
+
+    def append_message(self, user_id: int, role: str, content: str, timestamp: str = None) -> None:
+        """Write-through de un mensaje nuevo (solo si el usuario ya está en caché)."""
+        with self._lock:
+            entry = self._touch(user_id)
+            if entry is None or not entry.loaded:
+                # Se reconstruirá desde SQLite en la próxima lectura
+                return
+            entry.messages.append({
+                "role": role,
+                "content": content,
+                "timestamp": timestamp or self.now_timestamp(),
+            })
+
+    def get_summary(self, user_id: int) -> Optional[str]:
+        """Devuelve el resumen de contexto cacheado o None si no existe."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry.summary is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            return entry.summary
+
+    def set_summary(self, user_id: int, summary: str) -> None:
+        """Guarda el resumen de contexto del usuario."""
+        with self._lock:
+            entry = self._touch(user_id)
+            if entry is None:
+                entry = _UserEntry(self.max_messages)
+                self._store(user_id, entry)
+            entry.summary = summary
+
+    def invalidate_summary(self, user_id: int) -> None:
+        """Invalida el resumen de contexto (preferencias o análisis cambiaron)."""
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None:
+                entry.summary = None
+
+    def invalidate(self, user_id: int = None) -> None:
+        """Elimina un usuario de la caché, o toda la caché si no se indica usuario."""
+        with self._lock:
+            if user_id is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(user_id, None)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Estadísticas de uso de la caché."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "users": len(self._entries),
+                "max_users": self.max_users,
+                "max_messages": self.max_messages,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
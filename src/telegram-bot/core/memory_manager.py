@@ -4,6 +4,11 @@ import sqlite3
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 
+try:
+    from .conversation_cache import ConversationCache
+except ImportError:
+    from conversation_cache import ConversationCache
+
 class MemoryManager:
     """
     Gestor de memoria para el bot de Telegram.
@@ -20,6 +25,7 @@ class MemoryManager:
             db_path: Ruta al archivo de base de datos SQLite
         """
         self.db_path = db_path
+        self.cache = ConversationCache()
         self._init_db()
     
     def _init_db(self):
@@ -238,6 +244,8 @@ class MemoryManager:
         
         conn.commit()
         conn.close()
+        
+        self.cache.invalidate_summary(user_id)
     
     def add_message(self, user_id: int, role: str, content: str) -> None:
         """
@@ -257,9 +265,10 @@ class MemoryManager:
             self.create_or_update_user(user_id)
         
         # Añadir mensaje
+        timestamp = ConversationCache.now_timestamp()
         cursor.execute(
-            "INSERT INTO messages (user_id, role, content) VALUES (?, ?, ?)",
-            (user_id, role, content)
+            "INSERT INTO messages (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+            (user_id, role, content, timestamp)
         )
         
         # Actualizar timestamp de última actividad
@@ -270,6 +279,9 @@ class MemoryManager:
         
         conn.commit()
         conn.close()
+        
+        # Write-through en la caché de conversación
+        self.cache.append_message(user_id, role, content, timestamp)
     
     def get_conversation_history(self, user_id: int, limit: int = 10) -> List[Dict[str, Any]]:
         """
@@ -282,6 +294,10 @@ class MemoryManager:
         Returns:
             Lista de mensajes ordenados cronológicamente
         """
+        return self.cache.get_history(user_id, limit, self._load_conversation_history)
+    
+    def _load_conversation_history(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """Lee el historial de conversación directamente de SQLite."""
         conn = sqlite3.connect(self.db_path)
         cursor = conn.cursor()
         
@@ -347,6 +363,9 @@ class MemoryManager:
         conn.commit()
         conn.close()
         
+        # El último análisis forma parte del resumen de contexto
+        self.cache.invalidate_summary(user_id)
+        
         # Actualizar preferencias basadas en el uso
         self._update_preferences_from_usage(user_id, symbol, timeframe)
     
@@ -476,6 +495,10 @@ class MemoryManager:
         Returns:
             String con información contextual sobre el usuario
         """
+        cached = self.cache.get_summary(user_id)
+        if cached is not None:
+            return cached
+        
         user = self.get_user(user_id)
         if not user:
             return ""
@@ -500,7 +523,9 @@ class MemoryManager:
                 f"Último análisis: {recent_analysis['symbol']} en timeframe {recent_analysis['timeframe']}"
             )
         
-        return "\n".join(context_parts)
+        summary = "\n".join(context_parts)
+        self.cache.set_summary(user_id, summary)
+        return summary
         
     # Métodos para gestión de alertas
     
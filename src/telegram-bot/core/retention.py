@@ -0,0 +1,315 @@
+"""
+Retención y compactación de las bases de datos SQLite del bot.
+
+Elimina datos antiguos en lotes pequeños usando un índice por timestamp,
+archiva las filas eliminadas en ficheros JSONL comprimidos, ejecuta
+`incremental_vacuum` para devolver espacio al sistema y genera un informe
+con el tamaño de las tablas y los bytes recuperados. Ningún paso mantiene
+un bloqueo de escritura más allá de un lote; la conversión única a
+auto_vacuum incremental (VACUUM completo) es un comando de mantenimiento
+aparte: scripts/telegram-bot/db_maintenance.py.
+"""
+
+import os
+import gzip
+import json
+import time
+import sqlite3
+import logging
+import threading
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Tablas sujetas a retención y su columna de fecha
+RETENTION_TABLES = {
+    "messages": "timestamp",
+    "analyses": "timestamp",
+}
+
+
+class RetentionManager:
+    """
+    Job de retención para una base de datos SQLite del bot.
+
+    Se puede ejecutar puntualmente con `run_once()` o programar en un hilo
+    de fondo con `start()`.
+    """
+
+    def __init__(self, db_path: str, days_to_keep: int = None, batch_size: int = None,
+                 archive_dir: str = None, batch_pause: float = None,
+                 vacuum_pages: int = None, connection_timeout: int = 30):
+        self.db_path = db_path
+        self.days_to_keep = days_to_keep or int(os.getenv("RETENTION_DAYS", "30"))
+        self.batch_size = batch_size or int(os.getenv("RETENTION_BATCH_SIZE", "500"))
+        self.archive_dir = archive_dir if archive_dir is not None else os.getenv("RETENTION_ARCHIVE_DIR", "archive")
+        self.batch_pause = batch_pause if batch_pause is not None else float(os.getenv("RETENTION_BATCH_PAUSE", "0.05"))
+        self.vacuum_pages = vacuum_pages or int(os.getenv("RETENTION_VACUUM_PAGES", "1000"))
+        self.connection_timeout = connection_timeout
+
+        self.last_report: Optional[Dict[str, Any]] = None
+        self._run_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._prepare_database()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(
+            self.db_path,
+            timeout=self.connection_timeout,
+            check_same_thread=False
+        )
+
+    # ----------------------------------------
+    # Preparación
+    # ----------------------------------------
+
+    def _existing_tables(self, conn: sqlite3.Connection) -> List[str]:
+        rows = conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'").fetchall()
+        names = {row[0] for row in rows}
+        return [table for table in RETENTION_TABLES if table in names]
+
+    def _prepare_database(self) -> None:
+        """
+        Crea los índices por timestamp.
+
+        No cambia el modo de auto_vacuum: eso requiere un VACUUM completo con
+        bloqueo exclusivo y se hace aparte con `enable_incremental_vacuum()`
+        (scripts/telegram-bot/db_maintenance.py).
+        """
+        conn = self._connect()
+        try:
+            for table in self._existing_tables(conn):
+                column = RETENTION_TABLES[table]
+                conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS idx_{table}_{column} ON {table}({column})"
+                )
+            conn.commit()
+
+            if not self._has_incremental_vacuum(conn):
+                logger.warning(
+                    f"{self.db_path} no tiene auto_vacuum incremental: la retención no devolverá "
+                    f"espacio al sistema hasta ejecutar scripts/telegram-bot/db_maintenance.py "
+                    f"--enable-incremental-vacuum"
+                )
+        except sqlite3.Error as e:
+            logger.error(f"Error preparando la base de datos para retención: {e}")
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _has_incremental_vacuum(conn: sqlite3.Connection) -> bool:
+        return conn.execute("PRAGMA auto_vacuum").fetchone()[0] == 2
+
+    def enable_incremental_vacuum(self) -> bool:
+        """
+        Activa auto_vacuum incremental (operación de mantenimiento, una sola vez).
+
+        Cambiar el modo requiere un VACUUM completo que bloquea la base de datos
+        mientras reescribe el fichero, así que no se ejecuta al arrancar el bot.
+
+        Returns:
+            True si se hizo la conversión, False si el modo ya era incremental
+        """
+        with self._run_lock:
+            conn = self._connect()
+            try:
+                if self._has_incremental_vacuum(conn):
+                    return False
+                logger.info(f"Activando auto_vacuum incremental en {self.db_path}")
+                conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+                conn.execute("VACUUM")
+                return True
+            finally:
+                conn.close()
+
+    # ----------------------------------------
+    # Métricas
+    # ----------------------------------------
+
+    def _database_bytes(self, conn: sqlite3.Connection) -> int:
+        page_count = conn.execute("PRAGMA page_count").fetchone()[0]
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        return page_count * page_size
+
+    def get_table_sizes(self) -> Dict[str, Dict[str, Any]]:
+        """Filas y bytes por tabla (bytes solo si SQLite incluye dbstat)."""
+        conn = self._connect()
+        try:
+            tables = [
+                row[0] for row in conn.execute(
+                    "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'sqlite_%'"
+                ).fetchall()
+            ]
+            sizes: Dict[str, Dict[str, Any]] = {
+                table: {"rows": conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0], "bytes": None}
+                for table in tables
+            }
+            try:
+                for name, size in conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"):
+                    if name in sizes:
+                        sizes[name]["bytes"] = size
+            except sqlite3.Error:
+                pass  # dbstat no disponible en esta compilación de SQLite
+            return sizes
+        finally:
+            conn.close()
+
+    # ----------------------------------------
+    # Purga por lotes
+    # ----------------------------------------
+
+    def _archive_rows(self, table: str, columns: List[str], rows: List[tuple]) -> Optional[str]:
+        """Añade las filas a un fichero JSONL comprimido por tabla y día."""
+        if not self.archive_dir or not rows:
+            return None
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        db_name = os.path.splitext(os.path.basename(self.db_path))[0]
+        path = os.path.join(self.archive_dir, f"{db_name}_{table}_{day}.jsonl.gz")
+
+        # Cada apertura en modo 'at' añade un miembro gzip independiente y válido
+        with gzip.open(path, "at", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(dict(zip(columns, row)), default=str) + "\n")
+        return path
+
+    def purge_table(self, table: str, days_to_keep: int = None) -> Dict[str, Any]:
+        """Elimina (y archiva) las filas antiguas de una tabla en lotes pequeños."""
+        column = RETENTION_TABLES[table]
+        cutoff = f"-{int(days_to_keep or self.days_to_keep)} days"
+        deleted = 0
+        archives = set()
+
+        while not self._stopped.is_set():
+            conn = self._connect()
+            try:
+                cursor = conn.execute(
+                    f"SELECT rowid, * FROM {table} WHERE {column} < datetime('now', ?) "
+                    f"ORDER BY {column} LIMIT ?",
+                    (cutoff, self.batch_size)
+                )
+                rows = cursor.fetchall()
+                if not rows:
+                    break
+
+                columns = [description[0] for description in cursor.description][1:]
+                archive = self._archive_rows(table, columns, [row[1:] for row in rows])
+                if archive:
+                    archives.add(archive)
+
+                rowids = [row[0] for row in rows]
+                placeholders = ",".join("?" for _ in rowids)
+                conn.execute(f"DELETE FROM {table} WHERE rowid IN ({placeholders})", rowids)
+                conn.commit()
+                deleted += len(rowids)
+            finally:
+                conn.close()
+
+            if len(rows) < self.batch_size:
+                break
+            # Ceder el lock de escritura a los handlers del bot entre lotes
+            time.sleep(self.batch_pause)
+
+        return {"deleted": deleted, "archives": sorted(archives)}
+
+    def incremental_vacuum(self) -> int:
+        """Devuelve al sistema las páginas libres, en tramos de `vacuum_pages`."""
+        freed_pages = 0
+        while not self._stopped.is_set():
+            conn = self._connect()
+            try:
+                free_pages = conn.execute("PRAGMA freelist_count").fetchone()[0]
+                if free_pages == 0:
+                    break
+                pages = min(free_pages, self.vacuum_pages)
+                conn.execute(f"PRAGMA incremental_vacuum({pages})").fetchall()
+                conn.commit()
+                freed_pages += pages
+            finally:
+                conn.close()
+            time.sleep(self.batch_pause)
+        return freed_pages
+
+    def run_once(self, days_to_keep: int = None) -> Dict[str, Any]:
+        """Ejecuta un ciclo completo de retención y devuelve el informe."""
+        days_to_keep = days_to_keep or self.days_to_keep
+        with self._run_lock:
+            started = time.time()
+
+            conn = self._connect()
+            try:
+                bytes_before = self._database_bytes(conn)
+                tables = self._existing_tables(conn)
+            finally:
+                conn.close()
+
+            purged = {table: self.purge_table(table, days_to_keep) for table in tables}
+            freed_pages = self.incremental_vacuum()
+
+            conn = self._connect()
+            try:
+                bytes_after = self._database_bytes(conn)
+            finally:
+                conn.close()
+
+            report = {
+                "db_path": self.db_path,
+                "days_to_keep": days_to_keep,
+                "purged": purged,
+                "freed_pages": freed_pages,
+                "bytes_before": bytes_before,
+                "bytes_after": bytes_after,
+                "reclaimed_bytes": max(0, bytes_before - bytes_after),
+                "table_sizes": self.get_table_sizes(),
+                "duration_seconds": round(time.time() - started, 3),
+                "finished_at": datetime.now(timezone.utc).isoformat(),
+            }
+            self.last_report = report
+
+            deleted_total = sum(p["deleted"] for p in purged.values())
+            logger.info(
+                f"Retención completada en {self.db_path}: {deleted_total} filas eliminadas, "
+                f"{report['reclaimed_bytes']} bytes recuperados"
+            )
+            return report
+
+    # ----------------------------------------
+    # Programación
+    # ----------------------------------------
+
+    def start(self, interval_hours: float = None,
+              on_complete: Callable[[Dict[str, Any]], None] = None) -> None:
+        """
+        Programa `run_once()` periódicamente en un hilo de fondo.
+
+        Args:
+            interval_hours: Horas entre ejecuciones (RETENTION_INTERVAL_HOURS por defecto)
+            on_complete: Callback opcional que recibe el informe de cada ejecución
+        """
+        if self._thread and self._thread.is_alive():
+            return
+
+        interval = (interval_hours or float(os.getenv("RETENTION_INTERVAL_HOURS", "6"))) * 3600
+        self._stopped.clear()
+
+        def _loop():
+            while not self._stopped.wait(timeout=interval):
+                try:
+                    report = self.run_once()
+                    if on_complete:
+                        on_complete(report)
+                except Exception as e:
+                    logger.error(f"Error en el job de retención: {e}")
+
+        self._thread = threading.Thread(target=_loop, name="retention-job", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Detiene el job programado (el lote en curso termina normalmente)."""
+        self._stopped.set()
+        if self._thread:
+            self._thread.join(timeout=5)
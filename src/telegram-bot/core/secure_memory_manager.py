@@ -3,13 +3,23 @@ import json
 import sqlite3
 import time
 import hashlib
+import logging
 from datetime import datetime
 from typing import List, Dict, Any, Optional, Tuple
 from contextlib import contextmanager
 
+try:
+    from .conversation_cache import ConversationCache
+    from .retention import RetentionManager
+except ImportError:
+    from conversation_cache import ConversationCache
+    from retention import RetentionManager
+
 # Se importará después de crear los archivos de configuración
 # from .security_config import TelegramSecurityConfig, TelegramInputValidator, TelegramSecureLogger
 
+logger = logging.getLogger(__name__)
+
 class SecureMemoryManager:
     """
     Gestor de memoria securizado para el bot de Telegram.
@@ -20,7 +30,9 @@ class SecureMemoryManager:
         """Inicializa el gestor de memoria securizado."""
         self.db_path = db_path
         self.connection_timeout = 30
+        self.cache = ConversationCache()
         self._init_db()
+        self.retention = RetentionManager(db_path, connection_timeout=self.connection_timeout)
         print("SecureMemoryManager inicializado")
     
     @contextmanager
@@ -166,13 +178,17 @@ class SecureMemoryManager:
                         (user_id, user_id, message_count - 99)
                     )
                 
+                timestamp = ConversationCache.now_timestamp()
                 cursor.execute(
-                    "INSERT INTO messages (user_id, role, content) VALUES (?, ?, ?)",
-                    (user_id, role, content)
+                    "INSERT INTO messages (user_id, role, content, timestamp) VALUES (?, ?, ?, ?)",
+                    (user_id, role, content, timestamp)
                 )
                 
                 conn.commit()
-                return True
+            
+            # Write-through en la caché de conversación
+            self.cache.append_message(user_id, role, content, timestamp)
+            return True
                 
         except sqlite3.Error as e:
             print(f"Error añadiendo mensaje: {str(e)}")
@@ -237,37 +253,46 @@ class SecureMemoryManager:
         limit = max(1, min(limit, 50))  # Entre 1 y 50
         
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute(
-                    """
-                    SELECT role, content, timestamp 
-                    FROM messages 
-                    WHERE user_id = ? 
-                    ORDER BY timestamp DESC 
-                    LIMIT ?
-                    """,
-                    (user_id, limit)
-                )
-                
-                messages = cursor.fetchall()
-                
-                # Convertir a formato de diccionario
-                result = []
-                for msg in reversed(messages):  # Orden cronológico
-                    result.append({
-                        "role": msg[0],
-                        "content": msg[1],
-                        "timestamp": msg[2]
-                    })
-                
-                return result
-                
+            return self.cache.get_history(user_id, limit, self._load_conversation_history)
         except sqlite3.Error as e:
-            print(f"Error obteniendo historial: {str(e)}")
+            # La entrada de caché queda sin cargar y la próxima consulta reintenta
+            logger.error(f"Error obteniendo historial: {str(e)}")
             return []
     
+    def _load_conversation_history(self, user_id: int, limit: int) -> List[Dict[str, Any]]:
+        """
+        Lee el historial de conversación directamente de SQLite.
+        
+        Raises:
+            sqlite3.Error: Si la lectura falla (no se cachea un historial vacío)
+        """
+        with self._get_connection() as conn:
+            cursor = conn.cursor()
+            
+            cursor.execute(
+                """
+                SELECT role, content, timestamp 
+                FROM messages 
+                WHERE user_id = ? 
+                ORDER BY timestamp DESC 
+                LIMIT ?
+                """,
+                (user_id, limit)
+            )
+            
+            messages = cursor.fetchall()
+            
+            # Convertir a formato de diccionario
+            result = []
+            for msg in reversed(messages):  # Orden cronológico
+                result.append({
+                    "role": msg[0],
+                    "content": msg[1],
+                    "timestamp": msg[2]
+                })
+            
+            return result
+    
     def create_alert(
         self, 
         user_id: int, 
@@ -440,34 +465,34 @@ class SecureMemoryManager:
             print(f"Error eliminando alerta: {str(e)}")
             return False
     
-    def cleanup_old_data(self, days_to_keep: int = 30) -> None:
+    def cleanup_old_data(self, days_to_keep: int = 30) -> Optional[Dict[str, Any]]:
         """
         Limpia datos antiguos para mantener la base de datos eficiente.
+        
+        Elimina en lotes pequeños (ver RetentionManager) para no bloquear
+        la base de datos y devuelve el informe de retención.
         """
         try:
-            with self._get_connection() as conn:
-                cursor = conn.cursor()
-                
-                # Eliminar mensajes antiguos
-                cursor.execute(
-                    "DELETE FROM messages WHERE timestamp < datetime('now', '-{} days')".format(days_to_keep)
-                )
-                messages_deleted = cursor.rowcount
-                
-                # Eliminar análisis antiguos
-                cursor.execute(
-                    "DELETE FROM analyses WHERE timestamp < datetime('now', '-{} days')".format(days_to_keep)
-                )
-                analyses_deleted = cursor.rowcount
-                
-                conn.commit()
-                
-                print(
-                    f"Limpieza completada: {messages_deleted} mensajes, {analyses_deleted} análisis eliminados"
-                )
-                
-        except sqlite3.Error as e:
-            print(f"Error en limpieza de datos: {str(e)}")
+            report = self.retention.run_once(days_to_keep)
+            
+            # Los buffers en memoria pueden contener mensajes ya eliminados
+            self.cache.invalidate()
+            
+            deleted = {table: info["deleted"] for table, info in report["purged"].items()}
+            print(f"Limpieza completada: {deleted}, {report['reclaimed_bytes']} bytes recuperados")
+            return report
+            
+        except (sqlite3.Error, OSError) as e:
+            # OSError: fallo escribiendo el archivo de filas eliminadas
+            logger.error(f"Error en limpieza de datos: {str(e)}")
+            return None
+    
+    def start_retention_job(self, interval_hours: float = None) -> None:
+        """Programa la retención periódica de datos en segundo plano."""
+        self.retention.start(
+            interval_hours,
+            on_complete=lambda report: self.cache.invalidate()
+        )
     
     def get_user_config(self, user_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene la configuración personalizada del usuario."""
@@ -0,0 +1,99 @@
+"""
+Edición progresiva de mensajes de Telegram a partir de respuestas en streaming.
+
+El texto se va editando según llegan fragmentos del módulo de IA, con un
+intervalo mínimo entre ediciones para respetar los límites de Telegram
+(~1 edición/segundo por chat). La edición final se hace siempre, con el
+formato definitivo; si el streaming se corta, `text` conserva lo recibido.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Optional
+
+from telegram.error import BadRequest, RetryAfter
+
+logger = logging.getLogger(__name__)
+
+# Longitud máxima de un mensaje de Telegram
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+
+
+class ProgressiveMessageEditor:
+    """
+    Edita un mensaje con el texto acumulado de una respuesta en streaming.
+
+    Args:
+        edit: Corrutina que edita el mensaje (p.ej. `query.edit_message_text`
+              o `message.edit_text`); recibe el texto y kwargs de formato
+        min_interval: Segundos mínimos entre ediciones intermedias
+        min_chars: Caracteres nuevos mínimos para justificar una edición
+        cursor: Indicador que se añade mientras la respuesta sigue llegando
+    """
+
+    def __init__(self, edit: Callable[..., Awaitable[Any]], min_interval: float = None,
+                 min_chars: int = None, cursor: str = " ▌"):
+        self.edit = edit
+        self.min_interval = min_interval or float(os.getenv("TELEGRAM_STREAM_EDIT_INTERVAL", "1.2"))
+        self.min_chars = min_chars or int(os.getenv("TELEGRAM_STREAM_MIN_CHARS", "40"))
+        self.cursor = cursor
+
+        self.edits = 0
+        # Último texto acumulado recibido (aunque no se haya mostrado aún)
+        self.text = ""
+        self._last_edit = 0.0
+        self._last_length = 0
+        self._last_text: Optional[str] = None
+
+    @staticmethod
+    def _truncate(text: str, reserve: int = 0) -> str:
+        limit = TELEGRAM_MAX_MESSAGE_LENGTH - reserve
+        return text if len(text) <= limit else text[:limit - 1] + "…"
+
+    async def _safe_edit(self, text: str, wait_on_flood: bool = False, **kwargs) -> bool:
+        if text == self._last_text:
+            return True
+        try:
+            await self.edit(text, **kwargs)
+        except RetryAfter as e:
+            retry_after = e.retry_after
+            retry_after = retry_after.total_seconds() if hasattr(retry_after, "total_seconds") else float(retry_after)
+            if wait_on_flood:
+                # La edición final no se puede saltar
+                await asyncio.sleep(retry_after)
+                return await self._safe_edit(text, **kwargs)
+            # Telegram pide esperar: saltar ediciones intermedias hasta entonces
+            self._last_edit = time.monotonic() + retry_after
+            return False
+        except BadRequest as e:
+            if "not modified" in str(e).lower():
+                # El mensaje ya muestra este texto
+                self._last_text = text
+                return True
+            logger.debug(f"Edición progresiva rechazada: {e}")
+            return False
+        self.edits += 1
+        self._last_text = text
+        return True
+
+    async def update(self, text: str) -> None:
+        """Edición intermedia con el texto acumulado (sin formato, con cursor)."""
+        self.text = text
+        now = time.monotonic()
+        if now - self._last_edit < self.min_interval:
+            return
+        if len(text) - self._last_length < self.min_chars:
+            return
+
+        self._last_edit = now
+        self._last_length = len(text)
+        await self._safe_edit(self._truncate(text, len(self.cursor)) + self.cursor)
+
+    async def finish(self, text: str, parse_mode: Optional[str] = None) -> None:
+        """Edición final; si el formato falla se reintenta como texto plano."""
+        text = self._truncate(text)
+        if parse_mode and await self._safe_edit(text, wait_on_flood=True, parse_mode=parse_mode):
+            return
+        await self._safe_edit(text, wait_on_flood=True)
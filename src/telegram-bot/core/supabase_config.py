@@ -4,7 +4,11 @@ Proporciona una interfaz unificada para interactuar con Supabase desde el bot
 """
 
 import os
+import json
+import atexit
 import logging
+import threading
+import time
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
 import httpx
@@ -87,6 +91,200 @@ class SupabaseConfig:
             logger.error(f"❌ Error conectando a Supabase: {e}")
             return False
 
+class SupabaseWriteBuffer:
+    """
+    Buffer write-behind para escrituras no críticas en Supabase.
+    
+    - Upserts de usuarios coalescidos por telegram_id (gana la última escritura).
+    - Logs de actividad acumulados y enviados como insert masivo.
+    - Flush por tamaño (batch_size) o por tiempo (flush_interval) en un hilo de fondo.
+    - Las escrituras pendientes se vuelcan a un fichero local (spill) al cerrar
+      o si Supabase falla, y se recuperan al arrancar.
+    """
+    
+    def __init__(self, client, batch_size: int = None, flush_interval: float = None,
+                 spill_path: str = None):
+        self.client = client
+        self.batch_size = batch_size or int(os.getenv("SUPABASE_WRITE_BATCH_SIZE", "50"))
+        self.flush_interval = flush_interval or float(os.getenv("SUPABASE_WRITE_FLUSH_INTERVAL", "5"))
+        self.spill_path = spill_path or os.getenv("SUPABASE_SPILL_FILE", "supabase_pending_writes.jsonl")
+        
+        self._users: Dict[int, Dict[str, Any]] = {}
+        self._activities: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._flush_lock = threading.Lock()
+        
+        self._load_spill()
+        
+        self._thread = threading.Thread(
+            target=self._run, name="supabase-write-buffer", daemon=True
+        )
+        self._thread.start()
+        atexit.register(self.close)
+    
+    # ----------------------------------------
+    # Encolado
+    # ----------------------------------------
+    
+    def add_user(self, user_data: Dict[str, Any]) -> None:
+        """Encola un upsert de usuario (sustituye cualquier upsert pendiente del mismo usuario)."""
+        with self._lock:
+            self._users[user_data['telegram_id']] = user_data
+            pending = len(self._users) + len(self._activities)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+    
+    def add_activity(self, log_data: Dict[str, Any]) -> None:
+        """Encola un registro de actividad para el próximo insert masivo."""
+        with self._lock:
+            self._activities.append(log_data)
+            pending = len(self._users) + len(self._activities)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+    
+    def pending_count(self) -> int:
+        """Número de escrituras pendientes de enviar."""
+        with self._lock:
+            return len(self._users) + len(self._activities)
+    
+    # ----------------------------------------
+    # Flush
+    # ----------------------------------------
+    
+    def flush(self) -> bool:
+        """Envía a Supabase todas las escrituras pendientes. Devuelve True si no queda nada."""
+        with self._flush_lock:
+            with self._lock:
+                users = list(self._users.values())
+                activities = self._activities
+                self._users = {}
+                self._activities = []
+            
+            if not users and not activities:
+                return True
+            
+            failed_users: List[Dict[str, Any]] = []
+            failed_activities: List[Dict[str, Any]] = []
+            
+            if users:
+                try:
+                    self.client.table('telegram_users').upsert(
+                        users,
+                        on_conflict='telegram_id'
+                    ).execute()
+                    logger.debug(f"✅ {len(users)} usuarios sincronizados con Supabase")
+                except Exception as e:
+                    logger.error(f"❌ Error en upsert masivo de usuarios en Supabase: {e}")
+                    failed_users = users
+            
+            for start in range(0, len(activities), self.batch_size):
+                chunk = activities[start:start + self.batch_size]
+                try:
+                    self.client.table('activity_logs').insert(chunk).execute()
+                except Exception as e:
+                    logger.error(f"❌ Error en insert masivo de actividad en Supabase: {e}")
+                    failed_activities.extend(activities[start:])
+                    break
+            
+            if failed_users or failed_activities:
+                self._requeue(failed_users, failed_activities)
+                self._write_spill()
+                return False
+            
+            self._remove_spill()
+            return True
+    
+    def close(self) -> None:
+        """Detiene el hilo de fondo, hace un último flush y vuelca lo pendiente al disco."""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._wakeup.set()
+        self._thread.join(timeout=self.flush_interval + 5)
+        if not self.flush():
+            logger.warning(f"⚠️ Escrituras de Supabase pendientes guardadas en {self.spill_path}")
+    
+    def _requeue(self, users: List[Dict[str, Any]], activities: List[Dict[str, Any]]) -> None:
+        """Devuelve al buffer las escrituras que no se pudieron enviar."""
+        with self._lock:
+            for user_data in users:
+                # Un upsert más reciente del mismo usuario tiene prioridad
+                self._users.setdefault(user_data['telegram_id'], user_data)
+            self._activities = activities + self._activities
+    
+    def _run(self) -> None:
+        """Bucle del hilo de fondo: flush periódico o al alcanzar el tamaño de lote."""
+        while not self._stopped.is_set():
+            self._wakeup.wait(timeout=self.flush_interval)
+            self._wakeup.clear()
+            if self._stopped.is_set():
+                break
+            try:
+                if not self.flush():
+                    # Supabase no disponible: esperar un intervalo antes de reintentar
+                    time.sleep(self.flush_interval)
+            except Exception as e:
+                logger.error(f"❌ Error inesperado en el buffer de escritura de Supabase: {e}")
+    
+    # ----------------------------------------
+    # Fichero de spill
+    # ----------------------------------------
+    
+    def _write_spill(self) -> None:
+        """Persiste las escrituras pendientes en disco (escritura atómica)."""
+        with self._lock:
+            records = [{'type': 'user', 'data': u} for u in self._users.values()]
+            records += [{'type': 'activity', 'data': a} for a in self._activities]
+        
+        tmp_path = f"{self.spill_path}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                for record in records:
+                    f.write(json.dumps(record, default=str) + '\n')
+            os.replace(tmp_path, self.spill_path)
+        except OSError as e:
+            logger.error(f"❌ Error guardando escrituras pendientes de Supabase: {e}")
+    
+    def _remove_spill(self) -> None:
+        """Elimina el fichero de spill una vez que todo se ha enviado."""
+        try:
+            os.remove(self.spill_path)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            logger.warning(f"⚠️ No se pudo eliminar {self.spill_path}: {e}")
+    
+    def _load_spill(self) -> None:
+        """Recupera las escrituras pendientes de una ejecución anterior."""
+        if not os.path.exists(self.spill_path):
+            return
+        
+        loaded = 0
+        try:
+            with open(self.spill_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get('type') == 'user':
+                        self._users[record['data']['telegram_id']] = record['data']
+                    elif record.get('type') == 'activity':
+                        self._activities.append(record['data'])
+                    loaded += 1
+        except OSError as e:
+            logger.error(f"❌ Error leyendo escrituras pendientes de Supabase: {e}")
+            return
+        
+        if loaded:
+            logger.info(f"♻️ Recuperadas {loaded} escrituras pendientes de Supabase desde {self.spill_path}")
+            self._wakeup.set()
+
 class SupabaseService:
     """Servicio para operaciones comunes con Supabase desde el bot."""
     
@@ -95,9 +293,11 @@ class SupabaseService:
         if self.config.enabled:
             self.client = self.config.client
             self.admin_client = self.config.admin_client
+            self.write_buffer = SupabaseWriteBuffer(self.client)
         else:
             self.client = None
             self.admin_client = None
+            self.write_buffer = None
     
     # ========================================
     # OPERACIONES DE USUARIOS
@@ -136,6 +336,20 @@ class SupabaseService:
             logger.error(f"❌ Error creando/actualizando usuario {telegram_id} en Supabase: {e}")
             return False
     
+    def queue_user_upsert(self, telegram_id: int, username: str = None,
+                          first_name: str = None, last_name: str = None) -> None:
+        """Encola el upsert de un usuario sin bloquear (write-behind)."""
+        if not self.config.enabled:
+            return
+        
+        self.write_buffer.add_user({
+            'telegram_id': telegram_id,
+            'username': username,
+            'first_name': first_name,
+            'last_name': last_name,
+            'last_activity': datetime.now(timezone.utc).isoformat()
+        })
+    
     def get_user(self, telegram_id: int) -> Optional[Dict[str, Any]]:
         """Obtiene un usuario por su telegram_id desde Supabase."""
         if not self.config.enabled:
@@ -325,6 +539,27 @@ class SupabaseService:
             logger.error(f"❌ Error registrando actividad del usuario {user_id} en Supabase: {e}")
             return False
     
+    def queue_activity(self, user_id: int, action: str, details: Dict[str, Any] = None,
+                       ip_address: str = None, user_agent: str = None) -> None:
+        """Encola un registro de actividad para insertarlo en lote (write-behind)."""
+        if not self.config.enabled:
+            return
+        
+        self.write_buffer.add_activity({
+            'user_id': user_id,
+            'action': action,
+            'details': details or {},
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            'created_at': datetime.now(timezone.utc).isoformat()
+        })
+    
+    def flush_pending_writes(self) -> bool:
+        """Fuerza el envío de todas las escrituras encoladas."""
+        if not self.config.enabled:
+            return True
+        return self.write_buffer.flush()
+    
     # ========================================
     # OPERACIONES DE CONFIGURACIÓN
     # ========================================
@@ -1,14 +1,13 @@
 import os
 import sys
 import traceback
-import json
 import time
 import logging
 import httpx
 import re
 import asyncio
 import nest_asyncio
-from typing import List, Dict, Any, Optional, Union, Callable
+from typing import List, Dict, Any, Optional, Union, Callable, Awaitable
 from datetime import datetime, timedelta
 
 # Aplicar parche para event loops anidados
@@ -51,6 +50,9 @@ try:
     )
     from .secure_memory_manager import SecureMemoryManager
     from .supabase_config import supabase_service
+    from .concurrency import AIModuleSaturatedError, AIWorkerPool, PerChatUpdateProcessor
+    from .ai_client import AIModuleClient
+    from .streaming import ProgressiveMessageEditor
 
 except ImportError:
     # Fallback para ejecución directa
@@ -61,6 +63,9 @@ except ImportError:
     )
     from secure_memory_manager import SecureMemoryManager
     from supabase_config import supabase_service
+    from concurrency import AIModuleSaturatedError, AIWorkerPool, PerChatUpdateProcessor
+    from ai_client import AIModuleClient
+    from streaming import ProgressiveMessageEditor
 
 
 
@@ -140,8 +145,25 @@ if not TELEGRAM_TOKEN:
 # Inicializar componentes de seguridad
 validator = TelegramInputValidator()
 secure_logger = TelegramSecureLogger()
+logger = logging.getLogger(__name__)
 secure_memory = SecureMemoryManager(db_path=os.getenv("MEMORY_DB", "telegram_bot_memory_secure.db"))
 
+# Concurrencia: updates en paralelo entre chats (orden garantizado por chat)
+# y un pool acotado para las llamadas al módulo de IA
+update_processor = PerChatUpdateProcessor()
+ai_worker_pool = AIWorkerPool()
+
+# Cliente persistente hacia el módulo de IA (pool de conexiones + monitor de salud)
+ai_client = AIModuleClient(
+    base_url=AI_MODULE_URL,
+    api_secret=os.getenv("AI_MODULE_API_SECRET", "cr1nW3IDA-CQlkm6XBIoIdZmqv9mLj6U_-1z0ttyOZ4"),
+    timeout=TelegramSecurityConfig.AI_MODULE_TIMEOUT,
+    health_timeout=TelegramSecurityConfig.HEALTH_CHECK_TIMEOUT
+)
+
+# Respuestas del módulo de IA en streaming (edición progresiva del mensaje)
+STREAMING_ENABLED = os.getenv("BOT_STREAMING_ENABLED", "true").lower() == "true"
+
 secure_logger.safe_log("Bot de Telegram securizado inicializado", "info")
 secure_logger.safe_log(f"AI Module URL: {AI_MODULE_URL}", "info")
 
@@ -273,50 +295,67 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
 async def secure_ai_call(endpoint: str, payload: Dict[str, Any], user_id: int) -> Optional[Dict[str, Any]]:
     """
     Llamada segura al módulo de IA con timeouts y retry logic.
+    
+    Usa el cliente compartido: una sola petición sobre una conexión reutilizada,
+    sin health check por llamada (el estado lo mantiene el monitor de fondo).
     """
     if not httpx:
         secure_logger.safe_log("httpx no está instalado", "error")
         return None
     
-    url = f"{AI_MODULE_URL}/{endpoint}"
-    max_retries = 3
-    
-    for attempt in range(max_retries):
-        try:
-            async with httpx.AsyncClient(
-                timeout=TelegramSecurityConfig.AI_MODULE_TIMEOUT
-            ) as client:
-                # Health check usando endpoint disponible
-                health_resp = await client.get(
-                    f"{AI_MODULE_URL}/ping", 
-                    timeout=TelegramSecurityConfig.HEALTH_CHECK_TIMEOUT
-                )
-                health_resp.raise_for_status()
-                
-                # Llamada principal con headers de autorización
-                api_secret = "cr1nW3IDA-CQlkm6XBIoIdZmqv9mLj6U_-1z0ttyOZ4"
-                headers = {
-                    "Authorization": f"Bearer {api_secret}",
-                    "Content-Type": "application/json"
-                }
-                response = await client.post(url, json=payload, headers=headers)
-                response.raise_for_status()
-                
-                secure_logger.safe_log(f"Llamada exitosa a {endpoint}", "info", user_id)
-                return response.json()
-                
-        except httpx.TimeoutException:
-            secure_logger.safe_log(f"Timeout en intento {attempt + 1} para {endpoint}", "warning", user_id)
-            if attempt == max_retries - 1:
-                break
-        except httpx.HTTPError as e:
-            secure_logger.safe_log(f"Error HTTP en {endpoint}: {str(e)}", "error", user_id)
-            break
-        except Exception as e:
-            secure_logger.safe_log(f"Error inesperado en {endpoint}: {str(e)}", "error", user_id)
-            break
+    # Mensajes interactivos: prioridad alta en la cola del LLM del módulo de IA
+    payload = {"priority": "high", **payload}
+    try:
+        async with ai_worker_pool.slot():
+            result = await ai_client.post(endpoint, payload)
+    except AIModuleSaturatedError as e:
+        secure_logger.safe_log(f"Llamada a {endpoint} rechazada: {str(e)}", "warning", user_id)
+        return None
     
-    return None
+    if result is not None:
+        secure_logger.safe_log(f"Llamada exitosa a {endpoint}", "info", user_id)
+    else:
+        secure_logger.safe_log(f"Llamada fallida a {endpoint}", "error", user_id)
+    return result
+
+# Aviso que se añade al texto parcial cuando el streaming se corta
+STREAM_INTERRUPTED_NOTE = "\n\n⚠️ Respuesta incompleta: se interrumpió la conexión con el módulo de IA."
+
+async def secure_ai_stream(endpoint: str, payload: Dict[str, Any], user_id: int,
+                           on_text: Callable[[str], Awaitable[None]]) -> Optional[Dict[str, Any]]:
+    """
+    Llamada en streaming al endpoint `<endpoint>/stream` del módulo de IA.
+
+    `on_text` recibe el texto acumulado con cada fragmento. Devuelve el mismo
+    cuerpo que la versión no streaming; si el streaming falla antes de recibir
+    contenido se recurre a `secure_ai_call`. Si falla después devuelve None y el
+    llamante conserva el texto parcial (ProgressiveMessageEditor.text).
+    """
+    if not STREAMING_ENABLED:
+        return await secure_ai_call(endpoint, payload, user_id)
+
+    text = ""
+    try:
+        async with ai_worker_pool.slot():
+            async for event in ai_client.stream(f"{endpoint}/stream", {"priority": "high", **payload}):
+                event_type = event.get("type")
+                if event_type == "chunk":
+                    text += event.get("content", "")
+                    await on_text(text)
+                elif event_type == "done":
+                    secure_logger.safe_log(f"Streaming completado en {endpoint}", "info", user_id)
+                    return event.get("data")
+                elif event_type == "error":
+                    secure_logger.safe_log(f"Error en streaming de {endpoint}: {event}", "warning", user_id)
+                    break
+    except AIModuleSaturatedError as e:
+        secure_logger.safe_log(f"Llamada a {endpoint} rechazada: {str(e)}", "warning", user_id)
+        return None
+
+    if text:
+        # Ya se mostró contenido parcial: no repetir la generación completa
+        return None
+    return await secure_ai_call(endpoint, payload, user_id)
 
 def is_crypto_related_query(text: str) -> bool:
     """
@@ -806,16 +845,16 @@ async def process_message(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     user_id = update.effective_user.id
     text = update.message.text.strip()
 
-    # Actualizar información del usuario en Supabase
-    supabase_service.create_or_update_user(
+    # Actualizar información del usuario en Supabase (write-behind, no bloquea)
+    supabase_service.queue_user_upsert(
         telegram_id=user_id,
         username=update.effective_user.username,
         first_name=update.effective_user.first_name,
         last_name=update.effective_user.last_name,
     )
 
-    # Registrar actividad en Supabase
-    supabase_service.log_activity(
+    # Registrar actividad en Supabase (se envía en lote en segundo plano)
+    supabase_service.queue_activity(
         user_id=user_id,
         action="message_received",
         details={"text_length": len(text), "message_type": "text"}
@@ -1576,6 +1615,7 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await query.edit_message_text(
                 f"🔄 Procesando {action_emoji} {action_text} de {crypto_info['emoji']} {symbol} en {tf_info['emoji']} {tf_info['name']}..."
             )
+            editor = ProgressiveMessageEditor(query.edit_message_text)
             
             # Construir payload apropiado según el tipo de acción
             if action_type == "signal":
@@ -1587,6 +1627,8 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     "user_id": str(user_id)
                 }
                 
+                # Sin streaming: el texto de la IA lleva niveles de entrada/SL/TP sin
+                # validar, así que solo se muestra la señal ya validada
                 data = await secure_ai_call("advanced-strategy", payload, user_id)
                 if data and "result" in data:
                     result = data.get("result", {})
@@ -1624,13 +1666,16 @@ async def button_callback(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
                     "include_price_targets": True
                 }
                 
-                data = await secure_ai_call("analyze", payload, user_id)
+                data = await secure_ai_stream("analyze", payload, user_id, editor.update)
                 if data and "analysis" in data:
                     response_text = data.get("analysis", f"Sin {action_text} disponible")
+                elif editor.text:
+                    response_text = editor.text + STREAM_INTERRUPTED_NOTE
                 else:
                     response_text = f"❌ Error obteniendo {action_text} para {symbol} en {timeframe}"
             
-            await query.edit_message_text(response_text, parse_mode=ParseMode.MARKDOWN)
+            # Markdown con reintento en texto plano, truncado a 4096 y respetando RetryAfter
+            await editor.finish(response_text, ParseMode.MARKDOWN)
             
         elif callback_data.startswith(f"{CONFIG_PREFIX}"):
             # Configuración de usuario
@@ -2345,12 +2390,24 @@ async def error_handler(update: object, context: ContextTypes.DEFAULT_TYPE) -> N
     # Procesar mensaje normalmente
     await process_message(update, context)
 
-def main() -> None:
-    """Función principal del bot securizado."""
-    secure_logger.safe_log("Iniciando bot de Telegram securizado", "info")
+async def _close_ai_client(application) -> None:
+    """Cierra el pool de conexiones y el monitor de salud del cliente del módulo de IA."""
+    await ai_client.close()
+
+def build_application(webhook: bool = False):
+    """
+    Construye la aplicación de Telegram con todos los handlers.
     
-    # Crear aplicación
-    app = ApplicationBuilder().token(TELEGRAM_TOKEN).build()
+    Args:
+        webhook: Si es True se construye sin Updater (los updates llegan por el endpoint ASGI)
+    """
+    builder = ApplicationBuilder().token(TELEGRAM_TOKEN).concurrent_updates(update_processor)
+    if webhook:
+        # El servidor ASGI cierra el cliente del módulo de IA en su lifespan
+        builder = builder.updater(None)
+    else:
+        builder = builder.post_shutdown(_close_ai_client)
+    app = builder.build()
     
     # Añadir handlers con autenticación
     app.add_handler(CommandHandler("start", start))
@@ -2386,12 +2443,41 @@ def main() -> None:
     # Error handler
     app.add_error_handler(error_handler)
     
+    return app
+
+def main() -> None:
+    """Función principal del bot securizado."""
+    secure_logger.safe_log("Iniciando bot de Telegram securizado", "info")
+    
     # Configurar logging
     logging.basicConfig(
         format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
         level=logging.INFO
     )
     
+    # Retención periódica de la base de datos local (borrado por lotes + vacuum incremental)
+    secure_memory.start_retention_job()
+    
+    if os.getenv("BOT_MODE", "polling").lower() == "webhook":
+        # Modo webhook: endpoint ASGI servido con uvicorn
+        import uvicorn
+        try:
+            from .webhook_server import create_webhook_app
+        except ImportError:
+            from webhook_server import create_webhook_app
+        
+        asgi_app = create_webhook_app(
+            build_application(webhook=True), update_processor, ai_worker_pool, ai_client=ai_client
+        )
+        secure_logger.safe_log("Bot de Telegram securizado iniciado en modo webhook", "info")
+        uvicorn.run(
+            asgi_app,
+            host=os.getenv("BOT_WEBHOOK_HOST", "0.0.0.0"),
+            port=int(os.getenv("BOT_WEBHOOK_PORT", "8443"))
+        )
+        return
+    
+    app = build_application()
     secure_logger.safe_log("Bot de Telegram securizado iniciado exitosamente", "info")
     
     # Ejecutar bot
@@ -2525,7 +2611,7 @@ async def handle_suggestion_input(update: Update, context: ContextTypes.DEFAULT_
             secure_logger.safe_log(f"Sugerencia creada: {text[:50]}...", "info", user_id)
             
             # Registrar actividad en Supabase
-            supabase_service.log_activity(
+            supabase_service.queue_activity(
                 user_id=user_id,
                 action="suggestion_created",
                 details={"suggestion_id": result.get('id'), "text_length": len(text)}
@@ -2544,41 +2630,15 @@ async def handle_suggestion_input(update: Update, context: ContextTypes.DEFAULT_
 async def classify_intent_with_llm(user_message: str) -> dict:
     """
     Usa el LLM para clasificar la intención del usuario y extraer endpoint, símbolo y timeframe.
+    El AI Module enruta esta tarea al modelo local si está configurado.
     """
-    prompt = f'''
-Eres un asistente que clasifica solicitudes de trading de criptomonedas. 
-Dado el siguiente mensaje de usuario, responde SOLO en JSON con los siguientes campos:
-- endpoint: "signal", "analyze", "generate", "macro", etc.
-- symbol: símbolo detectado (ej: "BTC", "ETH", "SOL") o null si no hay.
-- timeframe: timeframe detectado (ej: "1h", "5m", "1d") o null si no hay.
-- user_prompt: el mensaje original.
-
-Ejemplo de entrada: "dame una señal de bitcoin en 5 minutos"
-Ejemplo de salida: {{"endpoint": "signal", "symbol": "BTC", "timeframe": "5m", "user_prompt": "dame una señal de bitcoin en 5 minutos"}}
-
-Mensaje del usuario: "{user_message}"
-'''
-    
-    payload = {"prompt": prompt}
-    llm_url = os.getenv("AI_MODULE_URL", "http://localhost:9004")
+    payload = {"message": user_message, "priority": "high"}
     try:
-        async with httpx.AsyncClient(timeout=30) as client:
-            resp = await client.post(f"{llm_url}/analyze_prompt", json=payload)
-            resp.raise_for_status()
-            data = resp.json()
-            # Intentar extraer el JSON de la respuesta del LLM
-            analysis = data.get("analysis", "")
-            try:
-                # Buscar el primer bloque JSON en la respuesta
-                start = analysis.find('{')
-                end = analysis.rfind('}') + 1
-                if start != -1 and end != -1:
-                    json_str = analysis[start:end]
-                    return json.loads(json_str)
-            except Exception:
-                pass
+        data = await ai_client.post("classify-intent", payload, timeout=30)
+        if data and isinstance(data.get("intent"), dict):
+            return data["intent"]
     except Exception as e:
-        print(f"Error clasificando intención con LLM: {e}")
+        logger.error(f"Error clasificando intención con LLM: {e}")
     # Fallback: si falla, usar analyze
     return {"endpoint": "analyze", "symbol": None, "timeframe": None, "user_prompt": user_message}
 
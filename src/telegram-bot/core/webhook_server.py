@@ -0,0 +1,137 @@
+"""
+Modo webhook del bot de Telegram (endpoint ASGI).
+
+Telegram envía cada Update por POST; el endpoint lo encola en la aplicación
+de python-telegram-bot, que lo procesa con PerChatUpdateProcessor (concurrente
+entre chats, ordenado dentro de cada chat). Cuando el bot o el módulo de IA
+están saturados se responde 503 y Telegram reintenta la entrega más tarde.
+
+Ejecución (desde src/telegram-bot):
+    uvicorn core.webhook_server:create_app --factory --host 0.0.0.0 --port 8443
+
+Prueba local con un Update sintético:
+    curl -X POST localhost:8443/telegram/webhook -H 'Content-Type: application/json' \\
+         -d '{"update_id": 1, "message": {"message_id": 1, "date": 0,
+              "chat": {"id": 42, "type": "private"},
+              "from": {"id": 42, "is_bot": false, "first_name": "Test"},
+              "text": "/start"}}'
+"""
+
+import os
+import hmac
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from telegram import Update
+from telegram.ext import Application
+
+try:
+    from .ai_client import AIModuleClient
+    from .concurrency import AIWorkerPool, PerChatUpdateProcessor
+except ImportError:
+    from ai_client import AIModuleClient
+    from concurrency import AIWorkerPool, PerChatUpdateProcessor
+
+logger = logging.getLogger(__name__)
+
+WEBHOOK_PATH = os.getenv("TELEGRAM_WEBHOOK_PATH", "/telegram/webhook")
+WEBHOOK_URL = os.getenv("TELEGRAM_WEBHOOK_URL")
+WEBHOOK_SECRET = os.getenv("TELEGRAM_WEBHOOK_SECRET")
+MAX_PENDING_UPDATES = int(os.getenv("BOT_MAX_PENDING_UPDATES", "200"))
+RETRY_AFTER_SECONDS = int(os.getenv("BOT_RETRY_AFTER_SECONDS", "5"))
+
+
+def create_webhook_app(
+    application: Application,
+    processor: PerChatUpdateProcessor,
+    ai_pool: Optional[AIWorkerPool] = None,
+    webhook_url: Optional[str] = WEBHOOK_URL,
+    secret_token: Optional[str] = WEBHOOK_SECRET,
+    ai_client: Optional[AIModuleClient] = None,
+) -> FastAPI:
+    """
+    Crea la aplicación ASGI que recibe los updates de Telegram.
+
+    Args:
+        application: Aplicación de PTB construida sin Updater
+        processor: Procesador de updates usado por la aplicación
+        ai_pool: Pool de llamadas al módulo de IA (para backpressure)
+        webhook_url: URL pública; si se indica se registra el webhook al arrancar
+        secret_token: Token que Telegram envía en X-Telegram-Bot-Api-Secret-Token
+        ai_client: Cliente del módulo de IA (se cierra al apagar y expone métricas)
+    """
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await application.initialize()
+        await application.start()
+        if webhook_url:
+            await application.bot.set_webhook(
+                url=f"{webhook_url.rstrip('/')}{WEBHOOK_PATH}",
+                secret_token=secret_token,
+                allowed_updates=Update.ALL_TYPES,
+                max_connections=int(os.getenv("TELEGRAM_WEBHOOK_MAX_CONNECTIONS", "40")),
+            )
+            logger.info(f"Webhook de Telegram registrado en {webhook_url}")
+        try:
+            yield
+        finally:
+            await application.stop()
+            await application.shutdown()
+            if ai_client:
+                await ai_client.close()
+
+    app = FastAPI(title="Crypto AI Bot - Telegram Webhook", lifespan=lifespan)
+
+    def _saturated() -> bool:
+        if processor.in_flight + application.update_queue.qsize() >= MAX_PENDING_UPDATES:
+            return True
+        return bool(ai_pool and ai_pool.saturated)
+
+    @app.post(WEBHOOK_PATH)
+    async def telegram_webhook(request: Request):
+        if secret_token:
+            received = request.headers.get("X-Telegram-Bot-Api-Secret-Token", "")
+            if not hmac.compare_digest(received, secret_token):
+                return Response(status_code=403)
+
+        if _saturated():
+            # Telegram reintenta la entrega; así el bot no acumula trabajo sin límite
+            return Response(status_code=503, headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
+
+        try:
+            data = await request.json()
+            update = Update.de_json(data, application.bot)
+        except Exception as e:
+            logger.warning(f"Update inválido recibido por webhook: {e}")
+            return Response(status_code=400)
+
+        await application.update_queue.put(update)
+        return JSONResponse({"ok": True})
+
+    @app.get("/health")
+    async def health():
+        return {
+            "status": "saturated" if _saturated() else "ok",
+            "update_queue": application.update_queue.qsize(),
+            "processor": processor.get_stats(),
+            "ai_pool": ai_pool.get_stats() if ai_pool else None,
+            "ai_module": ai_client.get_stats() if ai_client else None,
+        }
+
+    return app
+
+
+def create_app() -> FastAPI:
+    """Factory para `uvicorn --factory` con la configuración del bot securizado."""
+    try:
+        from .telegram_bot_secure import ai_client, ai_worker_pool, build_application, update_processor
+    except ImportError:
+        from telegram_bot_secure import ai_client, ai_worker_pool, build_application, update_processor
+
+    return create_webhook_app(
+        build_application(webhook=True), update_processor, ai_worker_pool, ai_client=ai_client
+    )
@@ -81,7 +81,9 @@ async def get_indicator_value(symbol: str, indicator: str, timeframe: str) -> Op
         payload = {
             "prompt": f"Dame el valor actual de {indicator} para {symbol} en {timeframe}",
             "user_context": "",
-            "conversation_history": []
+            "conversation_history": [],
+            # Comprobación en segundo plano: no debe adelantar a los mensajes del bot
+            "priority": "low"
         }
         
         async with httpx.AsyncClient(timeout=15) as client: